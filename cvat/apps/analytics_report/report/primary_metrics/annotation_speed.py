@@ -2,8 +2,11 @@
 #
 # SPDX-License-Identifier: MIT
 
+from bisect import bisect_left
 from copy import deepcopy
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 
 from dateutil import parser
 
@@ -17,7 +20,6 @@ from cvat.apps.analytics_report.report.primary_metrics.base import (
     DataExtractorBase,
     PrimaryMetricBase,
 )
-from cvat.apps.dataset_manager.task import merge_table_rows
 from cvat.apps.engine.models import SourceType
 
 
@@ -31,7 +33,16 @@ class JobAnnotationSpeedExtractor(DataExtractorBase):
     ):
         super().__init__(start_datetime, end_datetime, job_id, task_ids)
 
-        SELECT = ["job_id", "JSONExtractUInt(payload, 'working_time') as wt", "timestamp"]
+        # The working time is aggregated in ClickHouse: each job gets a single row
+        # with the sorted event timestamps and the cumulative working time,
+        # so the working time for any time range is a difference of two sums.
+        # Daily totals aren't enough here, because the ranges start at the previous
+        # report time, which is not aligned with the days.
+        SELECT = [
+            "job_id",
+            "arraySort(groupArray(timestamp)) as timestamps",
+            "arrayCumSum(arraySort((w, t) -> t, groupArray(wt), groupArray(timestamp)))",
+        ]
         WHERE = []
 
         if task_ids is not None:
@@ -47,8 +58,10 @@ class JobAnnotationSpeedExtractor(DataExtractorBase):
             ]
         )
 
+        GROUP_BY = ["job_id"]
+
         # bandit false alarm
-        self._query = f"SELECT {', '.join(SELECT)} FROM events WHERE {' AND '.join(WHERE)} ORDER BY timestamp"  # nosec B608
+        self._query = f"SELECT {', '.join(SELECT)} FROM (SELECT job_id, JSONExtractUInt(payload, 'working_time') as wt, timestamp FROM events WHERE {' AND '.join(WHERE)}) GROUP BY {', '.join(GROUP_BY)}"  # nosec B608
 
 
 class JobAnnotationSpeed(PrimaryMetricBase):
@@ -95,26 +108,17 @@ class JobAnnotationSpeed(PrimaryMetricBase):
                 .iterator(chunk_size=2000)
             )
 
-            db_tracks = merge_table_rows(
-                rows=db_tracks,
-                keys_for_merge={
-                    "shapes": [
-                        "trackedshape__id",
-                        "trackedshape__frame",
-                        "trackedshape__outside",
-                    ],
-                },
-                field_id="id",
-            )
-
             count = 0
-            for track in db_tracks:
-                if len(track["shapes"]) == 1:
-                    count += self._db_obj.segment.stop_frame - track["shapes"][0]["frame"] + 1
+            for _, track_rows in groupby(db_tracks, key=itemgetter("id")):
+                shapes = [row for row in track_rows if row["trackedshape__id"] is not None]
+                if len(shapes) == 1:
+                    count += self._db_obj.segment.stop_frame - shapes[0]["trackedshape__frame"] + 1
 
-                for prev_shape, cur_shape in zip(track["shapes"], track["shapes"][1:]):
-                    if prev_shape["outside"] is not True:
-                        count += cur_shape["frame"] - prev_shape["frame"]
+                for prev_shape, cur_shape in zip(shapes, shapes[1:]):
+                    if prev_shape["trackedshape__outside"] is not True:
+                        count += (
+                            cur_shape["trackedshape__frame"] - prev_shape["trackedshape__frame"]
+                        )
 
             return count
 
@@ -169,10 +173,16 @@ class JobAnnotationSpeed(PrimaryMetricBase):
         )
 
         working_time = 0
-        for row in rows:
-            wt, datetime = row
-            if start_datetime <= datetime < timestamp:
-                working_time += wt
+        if rows and start_datetime < timestamp:
+            timestamps, cumulative_working_time = rows[0]
+
+            def get_working_time_before(end_datetime):
+                end_idx = bisect_left(timestamps, end_datetime)
+                return cumulative_working_time[end_idx - 1] if end_idx else 0
+
+            working_time = get_working_time_before(timestamp) - get_working_time_before(
+                start_datetime
+            )
 
         data_series["working_time"].append(
             {
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: MIT
 
 from abc import ABCMeta, abstractmethod
+from collections import defaultdict
 from datetime import datetime, timezone
 
 from cvat.apps.analytics_report.report.primary_metrics.utils import make_clickhouse_query
@@ -22,7 +23,7 @@ class DataExtractorBase:
             "start_datetime": start_datetime,
             "end_datetime": end_datetime,
         }
-        self._rows = []
+        self._rows_by_job = {}
         self._initialized = False
 
         if task_ids is not None:
@@ -35,14 +36,21 @@ class DataExtractorBase:
 
     def extract_for_job(self, job_id: int, extras: dict = None):
         if not self._initialized:
-            self._rows = self._make_clickhouse_query(
+            rows = self._make_clickhouse_query(
                 {
                     key: value
                     for key, value in list(self._parameters.items()) + list((extras or {}).items())
                 }
             ).result_rows
+
+            # The query returns rows for all the jobs of a task or a project,
+            # the first column is expected to be the job id
+            self._rows_by_job = defaultdict(list)
+            for row in rows:
+                self._rows_by_job[row[0]].append(row[1:])
+
             self._initialized = True
-        return map(lambda x: x[1:], filter(lambda x: x[0] == job_id, self._rows))
+        return iter(self._rows_by_job.get(job_id, []))
 
 
 class PrimaryMetricBase(metaclass=ABCMeta):
@@ -0,0 +1,257 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import List, NamedTuple
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from cvat.apps.analytics_report.models import AnalyticsReport
+from cvat.apps.analytics_report.report.primary_metrics.annotation_speed import (
+    JobAnnotationSpeed,
+    JobAnnotationSpeedExtractor,
+)
+from cvat.apps.analytics_report.report.primary_metrics.base import DataExtractorBase
+from cvat.apps.engine.models import Data, Job, JobType, Segment, Task
+
+
+class _Event(NamedTuple):
+    task_id: int
+    job_id: int
+    working_time: int
+    timestamp: datetime
+
+
+def _filter_events(events: List[_Event], parameters: dict) -> List[_Event]:
+    # The WHERE clause of the working time queries
+    return [
+        e
+        for e in events
+        if e.working_time > 0
+        and parameters["start_datetime"] <= e.timestamp < parameters["end_datetime"]
+        and ("task_ids" not in parameters or e.task_id in parameters["task_ids"])
+        and ("job_id" not in parameters or e.job_id == parameters["job_id"])
+    ]
+
+
+def _query_aggregated_working_time(events: List[_Event], parameters: dict):
+    # The same results as the JobAnnotationSpeedExtractor query in ClickHouse:
+    # a row per job with the sorted timestamps and the cumulative working time
+    rows = []
+    for job_id in sorted(set(e.job_id for e in events)):
+        job_events = sorted(
+            (e for e in _filter_events(events, parameters) if e.job_id == job_id),
+            key=lambda e: e.timestamp,
+        )
+        if job_events:
+            rows.append(
+                (
+                    job_id,
+                    [e.timestamp for e in job_events],
+                    list(accumulate(e.working_time for e in job_events)),
+                )
+            )
+
+    return mock.Mock(result_rows=rows)
+
+
+def _get_previous_working_time(
+    events: List[_Event], parameters: dict, job_id: int, start_datetime, end_datetime
+):
+    # The previous implementation: the events were returned one per row and summed in Python
+    rows = [
+        (e.working_time, e.timestamp)
+        for e in sorted(_filter_events(events, parameters), key=lambda e: e.timestamp)
+        if e.job_id == job_id
+    ]
+
+    working_time = 0
+    for wt, timestamp in rows:
+        if start_datetime <= timestamp < end_datetime:
+            working_time += wt
+
+    return working_time / (1000 * 3600)
+
+
+class AnnotationSpeedWorkingTimeTest(TestCase):
+    _BASE_TIME = datetime(2024, 3, 1, 9, 30, 15, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.rng = random.Random(42)
+
+        self.jobs: List[Job] = []
+        for task_idx in range(2):
+            db_task = Task.objects.create(
+                name=f"task {task_idx}",
+                data=Data.objects.create(chunk_size=10, size=30, stop_frame=29),
+            )
+
+            for job_idx in range(3):
+                db_segment = Segment.objects.create(
+                    task=db_task, start_frame=job_idx * 10, stop_frame=job_idx * 10 + 9
+                )
+                db_job = Job.objects.create(segment=db_segment, type=JobType.ANNOTATION)
+
+                created_date = self._BASE_TIME + timedelta(hours=5 * len(self.jobs), seconds=7)
+                Job.objects.filter(id=db_job.id).update(
+                    created_date=created_date,
+                    updated_date=created_date + timedelta(days=2, hours=3, milliseconds=500),
+                )
+                db_job.refresh_from_db()
+                self.jobs.append(db_job)
+
+        self.events = self._make_events()
+
+    def _make_events(self) -> List[_Event]:
+        events = []
+        for db_job in self.jobs[:-1]:  # the last job has no events
+            event_times = [
+                db_job.created_date + timedelta(seconds=self.rng.randint(-3600, 4 * 24 * 3600))
+                for _ in range(100)
+            ]
+
+            # Events at the range boundaries and events with the same time
+            event_times += [db_job.created_date, db_job.updated_date] + event_times[:5]
+
+            events += [
+                _Event(
+                    task_id=db_job.segment.task_id,
+                    job_id=db_job.id,
+                    working_time=self.rng.choice([0, self.rng.randint(1, 600000)]),
+                    timestamp=timestamp,
+                )
+                for timestamp in event_times
+            ]
+
+        self.rng.shuffle(events)
+        return events
+
+    def _calculate(self, db_job: Job, extractor: DataExtractorBase) -> dict:
+        with mock.patch(
+            "cvat.apps.analytics_report.report.primary_metrics.base.make_clickhouse_query",
+            side_effect=lambda query, parameters: _query_aggregated_working_time(
+                self.events, parameters
+            ),
+        ):
+            return JobAnnotationSpeed(db_job, extractor).calculate()
+
+    def _check_working_time(self, *, extractor_args: dict, get_start_datetime=None):
+        extractor = JobAnnotationSpeedExtractor(**extractor_args)
+        parameters = extractor._parameters
+
+        for db_job in self.jobs:
+            with self.subTest(job=db_job.id):
+                db_job.refresh_from_db()
+                data_series = self._calculate(db_job, extractor)
+
+                start_datetime = (
+                    get_start_datetime(db_job) if get_start_datetime else db_job.created_date
+                )
+                self.assertEqual(
+                    data_series["working_time"][-1]["value"],
+                    _get_previous_working_time(
+                        self.events, parameters, db_job.id, start_datetime, db_job.updated_date
+                    ),
+                )
+
+    def test_task_working_time_matches_previous_computation(self):
+        self._check_working_time(
+            extractor_args=dict(
+                start_datetime=self._BASE_TIME - timedelta(days=1),
+                end_datetime=self._BASE_TIME + timedelta(days=10),
+                task_ids=sorted(set(db_job.segment.task_id for db_job in self.jobs)),
+            )
+        )
+
+    def test_job_working_time_matches_previous_computation(self):
+        for db_job in self.jobs:
+            extractor = JobAnnotationSpeedExtractor(
+                start_datetime=self._BASE_TIME - timedelta(days=1),
+                end_datetime=self._BASE_TIME + timedelta(days=10),
+                job_id=db_job.id,
+            )
+            data_series = self._calculate(db_job, extractor)
+
+            self.assertEqual(
+                data_series["working_time"][-1]["value"],
+                _get_previous_working_time(
+                    self.events,
+                    extractor._parameters,
+                    db_job.id,
+                    db_job.created_date,
+                    db_job.updated_date,
+                ),
+            )
+
+    def test_working_time_matches_previous_computation_in_limited_time_range(self):
+        self._check_working_time(
+            extractor_args=dict(
+                start_datetime=self._BASE_TIME + timedelta(hours=12, seconds=3),
+                end_datetime=self._BASE_TIME + timedelta(days=2, minutes=10),
+                task_ids=sorted(set(db_job.segment.task_id for db_job in self.jobs)),
+            )
+        )
+
+    def test_working_time_matches_previous_computation_after_previous_report(self):
+        # The time range starts at the previous report entry, which is not aligned with days
+        def _get_last_entry_datetime(db_job: Job) -> datetime:
+            return db_job.created_date + timedelta(days=1, hours=2, minutes=3, seconds=4)
+
+        for db_job in self.jobs:
+            entry_datetime = _get_last_entry_datetime(db_job).strftime("%Y-%m-%dT%H:%M:%SZ")
+            AnalyticsReport.objects.create(
+                job=db_job,
+                statistics=[
+                    {
+                        "name": "annotation_speed",
+                        "data_series": {
+                            "object_count": [{"value": 0, "datetime": entry_datetime}],
+                            "working_time": [{"value": 0, "datetime": entry_datetime}],
+                        },
+                    }
+                ],
+            )
+
+        self._check_working_time(
+            extractor_args=dict(
+                start_datetime=self._BASE_TIME - timedelta(days=1),
+                end_datetime=self._BASE_TIME + timedelta(days=10),
+                task_ids=sorted(set(db_job.segment.task_id for db_job in self.jobs)),
+            ),
+            get_start_datetime=_get_last_entry_datetime,
+        )
+
+    def test_job_without_events_has_no_working_time(self):
+        extractor = JobAnnotationSpeedExtractor(
+            start_datetime=self._BASE_TIME - timedelta(days=1),
+            end_datetime=self._BASE_TIME + timedelta(days=10),
+            job_id=self.jobs[-1].id,
+        )
+
+        data_series = self._calculate(self.jobs[-1], extractor)
+
+        self.assertEqual(data_series["working_time"][-1]["value"], 0)
+
+
+class DataExtractorTest(SimpleTestCase):
+    def test_extracts_same_rows_as_filtering(self):
+        rows = [(job_id, f"row {i}", i) for i, job_id in enumerate([3, 1, 3, 2, 1, 3])]
+
+        extractor = DataExtractorBase(
+            datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 2, 1, tzinfo=timezone.utc)
+        )
+        with mock.patch(
+            "cvat.apps.analytics_report.report.primary_metrics.base.make_clickhouse_query",
+            return_value=mock.Mock(result_rows=rows),
+        ) as make_clickhouse_query:
+            for job_id in [1, 2, 3, 4, 3]:
+                self.assertEqual(
+                    list(extractor.extract_for_job(job_id)),
+                    [row[1:] for row in rows if row[0] == job_id],
+                )
+
+        make_clickhouse_query.assert_called_once()
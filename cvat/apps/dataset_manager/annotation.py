@@ -3,12 +3,13 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import MutableMapping
 from copy import copy, deepcopy
 
 import math
-from typing import Optional, Sequence
+from typing import Callable, ClassVar, Iterable, Iterator, NamedTuple, Optional, Sequence
 import numpy as np
-from itertools import chain
+from itertools import accumulate, chain
 from scipy.optimize import linear_sum_assignment
 from shapely import geometry
 
@@ -17,6 +18,129 @@ from cvat.apps.engine.serializers import LabeledDataSerializer
 from cvat.apps.dataset_manager.util import deepcopy_simple
 
 
+class AnnotationRecord(MutableMapping):
+    """
+    A compact dict-like annotation object. Known keys are stored in slots,
+    other keys, added during processing, are stored in a separate dict.
+
+    The records are used for the internal processing of big annotation sets
+    (e.g. in export and quality checks). They can't be used in REST responses.
+    """
+
+    __slots__ = ('_extra', )
+    _fields: ClassVar[tuple[str, ...]] = ()
+    _field_set: ClassVar[frozenset[str]] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls._fields)
+
+    def __init__(self, **kwargs):
+        self._extra = None
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+                return
+            except AttributeError:
+                pass
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+            return
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return hasattr(self, key)
+
+        return self._extra is not None and key in self._extra
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key, default)
+        elif self._extra is not None:
+            return self._extra.get(key, default)
+
+        return default
+
+    def __iter__(self):
+        for key in self._fields:
+            if hasattr(self, key):
+                yield key
+
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def _copy_with(self, copy_value):
+        copied = type(self).__new__(type(self))
+        copied._extra = None
+        for key, value in self.items():
+            copied[key] = copy_value(value)
+        return copied
+
+    def copy(self):
+        return self._copy_with(lambda v: v)
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # The records don't share nested objects, so the memo can be ignored
+        return self._copy_with(deepcopy_simple)
+
+class AttributeRecord(AnnotationRecord):
+    _fields = ('spec_id', 'value')
+    __slots__ = _fields
+
+class TagRecord(AnnotationRecord):
+    _fields = ('id', 'label_id', 'frame', 'group', 'source', 'attributes')
+    __slots__ = _fields
+
+class ShapeRecord(AnnotationRecord):
+    # Labeled and tracked shapes. Tracked shapes don't have the label-related fields,
+    # but they are added to interpolated shapes, so they are stored in slots too.
+    _fields = (
+        'id', 'label_id', 'type', 'frame', 'group', 'source',
+        'occluded', 'outside', 'z_order', 'rotation', 'points', 'attributes',
+        'elements', 'keyframe', 'track_id',
+    )
+    __slots__ = _fields
+
+class TrackRecord(AnnotationRecord):
+    _fields = (
+        'id', 'label_id', 'frame', 'group', 'source', 'shapes', 'attributes', 'elements',
+    )
+    __slots__ = _fields
+
 class AnnotationIR:
     def __init__(self, dimension, data=None):
         self.reset()
@@ -154,6 +278,142 @@ class AnnotationIR:
         self.shapes = []
         self.tracks = []
 
+class AnnotationChunk(NamedTuple):
+    start_frame: int
+    "The first frame of the chunk"
+
+    stop_frame: Optional[int]
+    "The frame after the last frame of the chunk, None for the last chunk"
+
+    data: AnnotationIR
+    """
+    Tags and shapes on the chunk frames and the tracks, which can have shapes
+    on the chunk frames. The tracks can also have shapes outside the chunk.
+    """
+
+    track_ids: Sequence[int]
+    "Indices of the chunk tracks in the merged track list"
+
+class LazyAnnotationIR(AnnotationIR):
+    """
+    Task annotations, which are merged from the segment annotations
+    when they are accessed for the first time.
+
+    The segments are provided by a callable returning (start_frame, AnnotationIR)
+    pairs in the frame order. Use iter_chunks() to read the merged annotations
+    in the frame order without keeping all of them in memory.
+    """
+
+    def __init__(self, dimension, segments: Callable[[], Iterable[tuple[int, AnnotationIR]]], *,
+        overlap: int
+    ):
+        self._segments = segments
+        self._overlap = overlap
+        super().__init__(dimension)
+        self._is_loaded = False
+
+    def reset(self):
+        super().reset()
+        self._is_loaded = True
+
+    def _load(self):
+        if self._is_loaded:
+            return
+
+        self._is_loaded = True
+        annotation_manager = AnnotationManager(self)
+        for start_frame, data in self._segments():
+            if data.version > self.version:
+                self.version = data.version
+            annotation_manager.merge(data, start_frame, self._overlap, self.dimension)
+
+    @property
+    def tags(self):
+        self._load()
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        self._tags = value
+
+    @property
+    def shapes(self):
+        self._load()
+        return self._shapes
+
+    @shapes.setter
+    def shapes(self, value):
+        self._shapes = value
+
+    @property
+    def tracks(self):
+        self._load()
+        return self._tracks
+
+    @tracks.setter
+    def tracks(self, value):
+        self._tracks = value
+
+    @staticmethod
+    def _is_track_finished(track, frame):
+        # Such tracks have no shapes after the frame and can't be merged with other tracks
+        if not track["shapes"]:
+            return True
+
+        last_shape = track["shapes"][-1]
+        return last_shape["outside"] and last_shape["frame"] < frame
+
+    def iter_chunks(self) -> Iterator[AnnotationChunk]:
+        """
+        Merges the segment annotations in the frame order and yields the merged
+        annotations by frame ranges. A range is yielded when the next segments
+        can't change it anymore, i.e. when the overlap with the next segment is merged.
+        Only the annotations of the current overlap and the unfinished tracks
+        are kept between the chunks.
+
+        The chunk data shares the objects with the merge state, so a chunk
+        must be processed before the next one is requested.
+        """
+
+        if self._is_loaded:
+            yield AnnotationChunk(0, None, self, range(len(self.tracks)))
+            return
+
+        merged = AnnotationIR(self.dimension)
+        annotation_manager = AnnotationManager(merged)
+        track_ids = []
+        track_count = 0
+        chunk_start = 0
+        for start_frame, data in self._segments():
+            merged_track_count = len(merged.tracks)
+            annotation_manager.merge(data, start_frame, self._overlap, self.dimension)
+
+            # The merge only appends new tracks
+            new_track_count = len(merged.tracks) - merged_track_count
+            track_ids.extend(range(track_count, track_count + new_track_count))
+            track_count += new_track_count
+
+            if start_frame <= chunk_start:
+                continue
+
+            chunk_data = AnnotationIR(self.dimension)
+            chunk_data.tags = [t for t in merged.tags if t["frame"] < start_frame]
+            chunk_data.shapes = [s for s in merged.shapes if s["frame"] < start_frame]
+            chunk_data.tracks = list(merged.tracks)
+            yield AnnotationChunk(chunk_start, start_frame, chunk_data, list(track_ids))
+
+            merged.tags = [t for t in merged.tags if start_frame <= t["frame"]]
+            merged.shapes = [s for s in merged.shapes if start_frame <= s["frame"]]
+            unfinished_tracks = [
+                (track, track_id) for track, track_id in zip(merged.tracks, track_ids)
+                if not self._is_track_finished(track, start_frame)
+            ]
+            merged.tracks = [track for track, _ in unfinished_tracks]
+            track_ids = [track_id for _, track_id in unfinished_tracks]
+            chunk_start = start_frame
+
+        yield AnnotationChunk(chunk_start, None, merged, track_ids)
+
 class AnnotationManager:
     def __init__(self, data):
         self.data = data
@@ -174,7 +434,8 @@ class AnnotationManager:
         *,
         included_frames: Optional[Sequence[int]] = None,
         include_outside: bool = False,
-        use_server_track_ids: bool = False
+        use_server_track_ids: bool = False,
+        track_ids: Optional[Sequence[int]] = None,
     ) -> list:
         shapes = self.data.shapes
         tracks = TrackManager(self.data.tracks, dimension)
@@ -184,7 +445,7 @@ class AnnotationManager:
 
         return shapes + tracks.to_shapes(end_frame,
             included_frames=included_frames, include_outside=include_outside,
-            use_server_track_ids=use_server_track_ids
+            use_server_track_ids=use_server_track_ids, track_ids=track_ids,
         )
 
     def to_tracks(self):
@@ -432,11 +693,22 @@ class TrackManager(ObjectManager):
     def to_shapes(self, end_frame: int, *,
         included_frames: Optional[Sequence[int]] = None,
         include_outside: bool = False,
-        use_server_track_ids: bool = False
+        use_server_track_ids: bool = False,
+        track_ids: Optional[Sequence[int]] = None,
     ) -> list:
+        """
+        track_ids: the track ids to use instead of the track indices,
+            if the server ids are not used
+        """
+
         shapes = []
         for idx, track in enumerate(self.objects):
-            track_id = track["id"] if use_server_track_ids else idx
+            if use_server_track_ids:
+                track_id = track["id"]
+            elif track_ids is not None:
+                track_id = track_ids[idx]
+            else:
+                track_id = idx
             track_shapes = {}
 
             for shape in TrackManager.get_interpolated_shapes(
@@ -447,11 +719,16 @@ class TrackManager(ObjectManager):
                 include_outside=include_outside,
                 included_frames=included_frames,
             ):
+                if shape["keyframe"]:
+                    # Keyframes are the track shapes, they must not be changed,
+                    # because the track can be converted again
+                    shape = copy(shape)
+
                 shape["label_id"] = track["label_id"]
                 shape["group"] = track["group"]
                 shape["track_id"] = track_id
                 shape["source"] = track["source"]
-                shape["attributes"] += track["attributes"]
+                shape["attributes"] = shape["attributes"] + track["attributes"]
                 shape["elements"] = []
 
                 track_shapes[shape["frame"]] = shape
@@ -586,25 +863,36 @@ class TrackManager(ObjectManager):
 
             return angle_diff
 
-        def simple_interpolation(shape0, shape1):
-            shapes = []
+        def get_interpolated_frames(shape0, shape1, stop_frame=None):
+            # Only the frames that are going to be returned are computed
+            stop_frame = shape1["frame"] if stop_frame is None else min(shape1["frame"], stop_frame)
+            return [
+                frame for frame in range(shape0["frame"] + 1, stop_frame)
+                if included_frames is None or frame in included_frames
+            ]
+
+        def get_offsets(shape0, shape1, frames):
             distance = shape1["frame"] - shape0["frame"]
-            diff = np.subtract(shape1["points"], shape0["points"])
+            return (np.array(frames, dtype=float) - shape0["frame"]) / distance
 
-            for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                offset = (frame - shape0["frame"]) / distance
-                rotation = (shape0["rotation"] + find_angle_diff(
-                    shape1["rotation"], shape0["rotation"],
-                ) * offset + 360) % 360
-                points = shape0["points"] + diff * offset
+        def simple_interpolation(shape0, shape1, frames):
+            diff = np.subtract(shape1["points"], shape0["points"])
+            if not frames:
+                return []
 
-                if included_frames is None or frame in included_frames:
-                    shapes.append(copy_shape(shape0, frame, points, rotation))
+            offsets = get_offsets(shape0, shape1, frames)
+            rotations = (shape0["rotation"] + find_angle_diff(
+                shape1["rotation"], shape0["rotation"],
+            ) * offsets + 360) % 360
+            points = np.add(shape0["points"], np.multiply.outer(offsets, diff))
 
-            return shapes
+            return [
+                copy_shape(shape0, frame, frame_points, rotation)
+                for frame, frame_points, rotation in zip(frames, points, rotations.tolist())
+            ]
 
-        def simple_3d_interpolation(shape0, shape1):
-            result = simple_interpolation(shape0, shape1)
+        def simple_3d_interpolation(shape0, shape1, frames):
+            result = simple_interpolation(shape0, shape1, frames)
             angles = (shape0["points"][3:6] + shape1["points"][3:6])
             distance = shape1["frame"] - shape0["frame"]
 
@@ -620,93 +908,93 @@ class TrackManager(ObjectManager):
 
             return result
 
-        def points_interpolation(shape0, shape1):
+        def points_interpolation(shape0, shape1, frames):
             if len(shape0["points"]) == 2 and len(shape1["points"]) == 2:
-                return simple_interpolation(shape0, shape1)
+                return simple_interpolation(shape0, shape1, frames)
             else:
-                shapes = []
-                for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                    if included_frames is None or frame in included_frames:
-                        shapes.append(copy_shape(shape0, frame))
+                return [copy_shape(shape0, frame) for frame in frames]
 
-            return shapes
-
-        def interpolate_position(left_position, right_position, offset):
+        def interpolate_positions(left_position, right_position, offsets):
+            # The point matching depends only on the keyframes, so it is computed once
+            # for the whole segment. The matched points are interpolated for all the frames
+            # at once, and only the reduction is done per frame.
             def to_array(points):
-                return np.asarray(
-                    list(map(lambda point: [point["x"], point["y"]], points))
-                ).flatten()
+                return np.asarray(points, dtype=float).reshape(-1, 2)
 
-            def to_points(array):
-                return list(map(
-                    lambda point: {"x": point[0], "y": point[1]}, np.asarray(array).reshape(-1, 2)
-                ))
+            def segment_lengths(points):
+                # Squares of np.float64 scalars are computed differently from the array ones,
+                # so the lengths are computed per segment to keep the results the same
+                lengths = []
+                for i in range(1, len(points)):
+                    dx = points[i][0] - points[i - 1][0]
+                    dy = points[i][1] - points[i - 1][1]
+                    lengths.append(np.sqrt(dx ** 2 + dy ** 2))
+                return lengths
 
-            def curve_length(points):
+            def curve_length(lengths):
                 length = 0
-                for i in range(1, len(points)):
-                    dx = points[i]["x"] - points[i - 1]["x"]
-                    dy = points[i]["y"] - points[i - 1]["y"]
-                    length += np.sqrt(dx ** 2 + dy ** 2)
+                for segment_length in lengths:
+                    length += segment_length
                 return length
 
-            def curve_to_offset_vec(points, length):
-                offset_vector = [0]
-                accumulated_length = 0
-                for i in range(1, len(points)):
-                    dx = points[i]["x"] - points[i - 1]["x"]
-                    dy = points[i]["y"] - points[i - 1]["y"]
-                    accumulated_length += np.sqrt(dx ** 2 + dy ** 2)
-                    offset_vector.append(accumulated_length / length)
-
-                return offset_vector
-
-            def find_nearest_pair(value, curve):
-                minimum = [0, abs(value - curve[0])]
-                for i in range(1, len(curve)):
-                    distance = abs(value - curve[i])
-                    if distance < minimum[1]:
-                        minimum = [i, distance]
-
-                return minimum[0]
-
-            def match_left_right(left_curve, right_curve):
-                matching = {}
-                for i, left_curve_item in enumerate(left_curve):
-                    matching[i] = [find_nearest_pair(left_curve_item, right_curve)]
-                return matching
-
-            def match_right_left(left_curve, right_curve, left_right_matching):
-                matched_right_points = list(chain.from_iterable(left_right_matching.values()))
-                unmatched_right_points = filter(lambda x: x not in matched_right_points, range(len(right_curve)))
-                updated_matching = deepcopy_simple(left_right_matching)
-
-                for right_point in unmatched_right_points:
-                    left_point = find_nearest_pair(right_curve[right_point], left_curve)
-                    updated_matching[left_point].append(right_point)
+            def curve_to_offset_vec(lengths):
+                accumulated_lengths = list(accumulate(lengths))
+                if not accumulated_lengths:
+                    return np.zeros(1)
+
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    return np.array([0] + accumulated_lengths) / accumulated_lengths[-1]
+
+            def find_nearest_pairs(values, curve):
+                # The first of the closest points is chosen, NaN distances are skipped,
+                # but a NaN distance to the first point makes it the answer
+                nearest = np.empty(len(values), dtype=int)
+                chunk_size = max(1, 2 ** 20 // len(curve))
+                for chunk_start in range(0, len(values), chunk_size):
+                    chunk = values[chunk_start:chunk_start + chunk_size]
+                    distances = np.abs(chunk[:, np.newaxis] - curve[np.newaxis, :])
+                    first_is_nan = np.isnan(distances[:, 0])
+                    distances[np.isnan(distances)] = np.inf
+                    chunk_nearest = np.argmin(distances, axis=1)
+                    chunk_nearest[first_is_nan] = 0
+                    nearest[chunk_start:chunk_start + chunk_size] = chunk_nearest
+
+                return nearest
+
+            def match_points(left_curve, right_curve):
+                matching = [[right_point] for right_point in find_nearest_pairs(
+                    left_curve, right_curve
+                ).tolist()]
+
+                unmatched_right_points = np.setdiff1d(
+                    np.arange(len(right_curve)), [m[0] for m in matching]
+                )
+                if len(unmatched_right_points):
+                    for right_point, left_point in zip(
+                        unmatched_right_points.tolist(),
+                        find_nearest_pairs(right_curve[unmatched_right_points], left_curve).tolist()
+                    ):
+                        matching[left_point].append(right_point)
 
-                for key, value in updated_matching.items():
-                    updated_matching[key] = sorted(value)
+                    for left_point_matching in matching:
+                        left_point_matching.sort()
 
-                return updated_matching
+                return matching
 
-            def reduce_interpolation(interpolated_points, matching, left_points, right_points):
+            def reduce_interpolation(interpolated_points, segments):
                 def average_point(points):
                     sumX = 0
                     sumY = 0
                     for point in points:
-                        sumX += point["x"]
-                        sumY += point["y"]
+                        sumX += point[0]
+                        sumY += point[1]
 
-                    return {
-                        "x": sumX / len(points),
-                        "y": sumY / len(points)
-                    }
+                    return (sumX / len(points), sumY / len(points))
 
                 def compute_distance(point1, point2):
                     return np.sqrt(
-                        ((point1["x"] - point2["x"])) ** 2
-                        + ((point1["y"] - point2["y"]) ** 2)
+                        ((point1[0] - point2[0])) ** 2
+                        + ((point1[1] - point2[1]) ** 2)
                     )
 
                 def minimize_segment(base_length, N, start_interpolated, stop_interpolated):
@@ -736,44 +1024,50 @@ class TrackManager(ObjectManager):
                     return minimized
 
                 reduced = []
-                interpolated_indexes = {}
+                for start_interpolated, stop_interpolated, base_length, N in segments:
+                    if start_interpolated == stop_interpolated:
+                        reduced.append(interpolated_points[start_interpolated])
+                    else:
+                        reduced.extend(
+                            minimize_segment(base_length, N, start_interpolated, stop_interpolated)
+                        )
+
+                return reduced
+
+            def get_reduction_segments(matching, left_lengths, right_lengths):
+                # The segments don't depend on the interpolation offset,
+                # so they are computed once for all the frames
+                interpolated_indexes = []
                 accumulated = 0
-                for i in range(len(left_points)):
-                    interpolated_indexes[i] = []
-                    for _ in range(len(matching[i])):
-                        interpolated_indexes[i].append(accumulated)
-                        accumulated += 1
+                for left_point_matching in matching:
+                    interpolated_indexes.append(accumulated)
+                    accumulated += len(left_point_matching)
+
+                segments = []
 
                 def left_segment(start, stop):
-                    start_interpolated = interpolated_indexes[start][0]
-                    stop_interpolated = interpolated_indexes[stop][0]
+                    start_interpolated = interpolated_indexes[start]
+                    stop_interpolated = interpolated_indexes[stop]
 
                     if start_interpolated == stop_interpolated:
-                        reduced.append(interpolated_points[start_interpolated])
+                        segments.append((start_interpolated, stop_interpolated, None, None))
                         return
 
-                    base_length = curve_length(left_points[start: stop + 1])
+                    base_length = curve_length(left_lengths[start:stop])
                     N = stop - start + 1
-
-                    reduced.extend(
-                        minimize_segment(base_length, N, start_interpolated, stop_interpolated)
-                    )
-
+                    segments.append((start_interpolated, stop_interpolated, base_length, N))
 
                 def right_segment(left_point):
                     start = matching[left_point][0]
                     stop = matching[left_point][-1]
-                    start_interpolated = interpolated_indexes[left_point][0]
-                    stop_interpolated = interpolated_indexes[left_point][-1]
-                    base_length = curve_length(right_points[start: stop + 1])
+                    start_interpolated = interpolated_indexes[left_point]
+                    stop_interpolated = start_interpolated + len(matching[left_point]) - 1
+                    base_length = curve_length(right_lengths[start:stop])
                     N = stop - start + 1
-
-                    reduced.extend(
-                        minimize_segment(base_length, N, start_interpolated, stop_interpolated)
-                    )
+                    segments.append((start_interpolated, stop_interpolated, base_length, N))
 
                 previous_opened = None
-                for i in range(len(left_points)):
+                for i in range(len(matching)):
                     if len(matching[i]) == 1:
                         if previous_opened is not None:
                             if matching[i][0] == matching[previous_opened][0]:
@@ -795,39 +1089,35 @@ class TrackManager(ObjectManager):
                         right_segment(i)
 
                 if previous_opened is not None:
-                    left_segment(previous_opened, len(left_points) - 1)
+                    left_segment(previous_opened, len(matching) - 1)
 
-                return reduced
-
-            left_points = to_points(left_position["points"])
-            right_points = to_points(right_position["points"])
-            left_offset_vec = curve_to_offset_vec(left_points, curve_length(left_points))
-            right_offset_vec = curve_to_offset_vec(right_points, curve_length(right_points))
+                return segments
 
-            matching = match_left_right(left_offset_vec, right_offset_vec)
-            completed_matching = match_right_left(
-                left_offset_vec, right_offset_vec, matching
+            left_points = to_array(left_position["points"])
+            right_points = to_array(right_position["points"])
+            left_lengths = segment_lengths(left_points)
+            right_lengths = segment_lengths(right_points)
+            matching = match_points(
+                curve_to_offset_vec(left_lengths), curve_to_offset_vec(right_lengths)
             )
-
-            interpolated_points = []
-            for left_point_index, left_point in enumerate(left_points):
-                for right_point_index in completed_matching[left_point_index]:
-                    right_point = right_points[right_point_index]
-                    interpolated_points.append({
-                        "x": left_point["x"] + (right_point["x"] - left_point["x"]) * offset,
-                        "y": left_point["y"] + (right_point["y"] - left_point["y"]) * offset
-                    })
-
-            reducedPoints = reduce_interpolation(
-                interpolated_points,
-                completed_matching,
-                left_points,
-                right_points
+            segments = get_reduction_segments(matching, left_lengths, right_lengths)
+
+            pair_left_points = left_points[np.repeat(
+                np.arange(len(left_points)), [len(m) for m in matching]
+            )]
+            pair_right_points = right_points[list(chain.from_iterable(matching))]
+            interpolated = pair_left_points + np.multiply.outer(
+                offsets, pair_right_points - pair_left_points
             )
 
-            return to_array(reducedPoints).tolist()
+            for frame_points in interpolated:
+                reduced_points = reduce_interpolation(
+                    list(zip(frame_points[:, 0], frame_points[:, 1])), segments
+                )
+
+                yield np.asarray(reduced_points).flatten().tolist()
 
-        def polyshape_interpolation(shape0, shape1):
+        def polyshape_interpolation(shape0, shape1, frames):
             shapes = []
             is_polygon = shape0["type"] == ShapeType.POLYGON
             if is_polygon:
@@ -837,12 +1127,9 @@ class TrackManager(ObjectManager):
                 shape0["points"] = shape0["points"] + shape0["points"][:2]
                 shape1["points"] = shape1["points"] + shape1["points"][:2]
 
-            distance = shape1["frame"] - shape0["frame"]
-            for frame in range(shape0["frame"] + 1, shape1["frame"]):
-                offset = (frame - shape0["frame"]) / distance
-                points = interpolate_position(shape0, shape1, offset)
-
-                if included_frames is None or frame in included_frames:
+            if frames:
+                offsets = get_offsets(shape0, shape1, frames)
+                for frame, points in zip(frames, interpolate_positions(shape0, shape1, offsets)):
                     shapes.append(copy_shape(shape0, frame, points))
 
             if is_polygon:
@@ -854,7 +1141,7 @@ class TrackManager(ObjectManager):
 
             return shapes
 
-        def interpolate(shape0, shape1):
+        def interpolate(shape0, shape1, frames):
             is_same_type = shape0["type"] == shape1["type"]
             is_rectangle = shape0["type"] == ShapeType.RECTANGLE
             is_ellipse = shape0["type"] == ShapeType.ELLIPSE
@@ -869,13 +1156,13 @@ class TrackManager(ObjectManager):
 
             shapes = []
             if dimension == DimensionType.DIM_3D:
-                shapes = simple_3d_interpolation(shape0, shape1)
+                shapes = simple_3d_interpolation(shape0, shape1, frames)
             if is_rectangle or is_cuboid or is_ellipse or is_skeleton:
-                shapes = simple_interpolation(shape0, shape1)
+                shapes = simple_interpolation(shape0, shape1, frames)
             elif is_points:
-                shapes = points_interpolation(shape0, shape1)
+                shapes = points_interpolation(shape0, shape1, frames)
             elif is_polygon or is_polyline:
-                shapes = polyshape_interpolation(shape0, shape1)
+                shapes = polyshape_interpolation(shape0, shape1, frames)
             else:
                 raise NotImplementedError()
 
@@ -899,7 +1186,12 @@ class TrackManager(ObjectManager):
                 #        vvvvvvv
                 # ---- | ------- | ----- | ----->
                 #     prev      end   cur kf
-                interpolated = interpolate(prev_shape, shape)
+                if not prev_shape["outside"] or include_outside:
+                    frames = get_interpolated_frames(prev_shape, shape, stop_frame=end_frame)
+                else:
+                    # The interpolated shapes would be outside and filtered out anyway
+                    frames = []
+                interpolated = interpolate(prev_shape, shape, frames)
                 interpolated.append(shape)
 
                 for shape in sorted(interpolated, key=lambda shape: shape["frame"]):
@@ -923,7 +1215,9 @@ class TrackManager(ObjectManager):
                         shape["attributes"].append(deepcopy_simple(attr))
 
                 if not prev_shape["outside"] or include_outside:
-                    shapes.extend(interpolate(prev_shape, shape))
+                    shapes.extend(interpolate(
+                        prev_shape, shape, get_interpolated_frames(prev_shape, shape)
+                    ))
 
             shape["keyframe"] = True
             shapes.append(shape)
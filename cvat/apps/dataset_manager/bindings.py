@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import os.path as osp
 import sys
+from bisect import bisect_left
 from collections import namedtuple
 from functools import reduce
 from operator import add
@@ -32,7 +33,7 @@ from cvat.apps.engine.models import (AttributeSpec, AttributeType, Data, Dimensi
                                      JobType, Label, LabelType, Project, SegmentType, ShapeType,
                                      Task)
 
-from .annotation import AnnotationIR, AnnotationManager, TrackManager
+from .annotation import AnnotationIR, AnnotationManager, LazyAnnotationIR, TrackManager
 from .formats.transformations import CVATRleToCOCORle, EllipsesToMasks
 
 CVAT_INTERNAL_ATTRIBUTES = {'occluded', 'outside', 'keyframe', 'track_id', 'rotation'}
@@ -396,6 +397,33 @@ class CommonData(InstanceLabelData):
         )
 
     def group_by_frame(self, include_empty: bool = False):
+        included_frames = self.get_included_frames()
+
+        if isinstance(self._annotation_ir, LazyAnnotationIR):
+            # Merge and convert the task annotations by frame ranges
+            # to avoid keeping all of them in memory
+            return self._group_chunks_by_frame(included_frames, include_empty=include_empty)
+
+        return self._group_by_frame(self._annotation_ir, included_frames,
+            include_empty=include_empty)
+
+    def _group_chunks_by_frame(self, included_frames, *, include_empty: bool):
+        # The chunks are consecutive frame ranges, their frames are found by bisection
+        sorted_frames = sorted(included_frames)
+        for chunk in self._annotation_ir.iter_chunks():
+            start = bisect_left(sorted_frames, chunk.start_frame)
+            stop = len(sorted_frames) if chunk.stop_frame is None \
+                else bisect_left(sorted_frames, chunk.stop_frame)
+            chunk_frames = set(sorted_frames[start:stop])
+            if not chunk_frames:
+                continue
+
+            yield from self._group_by_frame(chunk.data, chunk_frames,
+                include_empty=include_empty, track_ids=chunk.track_ids)
+
+    def _group_by_frame(self, annotation_ir, included_frames, *,
+        include_empty: bool, track_ids: Optional[Sequence[int]] = None
+    ):
         frames = {}
         def get_frame(idx):
             frame_info = self._frame_info[idx]
@@ -415,19 +443,18 @@ class CommonData(InstanceLabelData):
                 )
             return frames[frame]
 
-        included_frames = self.get_included_frames()
-
         if include_empty:
             for idx in sorted(set(self._frame_info) & included_frames):
                 get_frame(idx)
 
-        anno_manager = AnnotationManager(self._annotation_ir)
+        anno_manager = AnnotationManager(annotation_ir)
         for shape in sorted(
-            anno_manager.to_shapes(self.stop, self._annotation_ir.dimension,
+            anno_manager.to_shapes(self.stop, annotation_ir.dimension,
                 # Skip outside, deleted and excluded frames
                 included_frames=included_frames,
                 include_outside=False,
-                use_server_track_ids=self._use_server_track_ids
+                use_server_track_ids=self._use_server_track_ids,
+                track_ids=track_ids,
             ),
             key=lambda shape: shape.get("z_order", 0)
         ):
@@ -449,7 +476,7 @@ class CommonData(InstanceLabelData):
                     label = self._export_label(label)
                     get_frame(shape['frame']).labels.update({label.id: label})
 
-        for tag in self._annotation_ir.tags:
+        for tag in annotation_ir.tags:
             if tag['frame'] not in included_frames:
                 continue
             get_frame(tag['frame']).tags.append(self._export_tag(tag))
@@ -908,7 +935,8 @@ class ProjectData(InstanceLabelData):
         task_annotations: Mapping[int, Any] = None,
         project_annotation=None,
         *,
-        use_server_track_ids: bool = False
+        use_server_track_ids: bool = False,
+        media_shard_dirs: Optional[Mapping[int, str]] = None
     ):
         self._annotation_irs = annotation_irs
         self._db_project = db_project
@@ -923,6 +951,7 @@ class ProjectData(InstanceLabelData):
         self._frame_steps: Dict[int, int] = {}
         self.new_tasks: Set[int] = set()
         self._use_server_track_ids = use_server_track_ids
+        self._media_shard_dirs = media_shard_dirs
 
         InstanceLabelData.__init__(self, db_project)
         self.init()
@@ -1219,6 +1248,14 @@ class ProjectData(InstanceLabelData):
     def deleted_frames(self):
         return self._deleted_frames
 
+    @property
+    def media_shard_dirs(self) -> Optional[Mapping[int, str]]:
+        """
+        The task media frames, prepared in advance by the parallel project export.
+        Each directory contains the encoded task frames, named by the frame number.
+        """
+        return self._media_shard_dirs
+
     @property
     def frame_step(self):
         return self._frame_steps
@@ -1400,6 +1437,21 @@ class ImageProvider3D(ImageProvider):
 
         return point_cloud_path, related_images
 
+class ImageProviderFromShards(ImageProvider):
+    def __init__(self, sources: Dict[int, ImageSource], shard_dirs: Mapping[int, str]) -> None:
+        super().__init__(sources)
+        self._shard_dirs = shard_dirs
+
+    def get_image_for_frame(self, source_id: int, frame_index: int, **image_kwargs):
+        frame_path = osp.join(self._shard_dirs[source_id], str(frame_index))
+
+        def image_loader(_):
+            with open(frame_path, 'rb') as f:
+                return f.read()
+
+        # the frames are stored encoded, as they are provided by the FrameProvider
+        return dm.ByteImage(data=image_loader, **image_kwargs)
+
 IMAGE_PROVIDERS_BY_DIMENSION = {
     DimensionType.DIM_3D: ImageProvider3D,
     DimensionType.DIM_2D: ImageProvider2D,
@@ -1492,58 +1544,72 @@ class CvatTaskOrJobDataExtractor(dm.SourceExtractor, CVATDataExtractorMixin):
         self._user = self._load_user_info(instance_meta) if dimension == DimensionType.DIM_3D else {}
         self._dimension = dimension
         self._format_type = format_type
-        dm_items = []
+        self._instance_data = instance_data
+        self._instance_meta = instance_meta
+        self._include_images = include_images
 
         is_video = instance_meta['mode'] == 'interpolation'
-        ext = ''
+        self._frame_ext = ''
         if is_video:
-            ext = FrameProvider.VIDEO_FRAME_EXT
+            self._frame_ext = FrameProvider.VIDEO_FRAME_EXT
 
         if dimension == DimensionType.DIM_3D or include_images:
             self._image_provider = IMAGE_PROVIDERS_BY_DIMENSION[dimension](
                 {0: ImageSource(instance_data.db_data, is_video=is_video)}
             )
 
-        for frame_data in instance_data.group_by_frame(include_empty=True):
-            image_args = {
-                'path': frame_data.name + ext,
-                'size': (frame_data.height, frame_data.width),
-            }
+        # The items are created on iteration, so that the frame annotations
+        # can be produced lazily and not kept in memory all at once
+        self._item_count = len(set(instance_data.frame_info) & instance_data.get_included_frames())
 
-            if dimension == DimensionType.DIM_3D:
-                dm_image = self._image_provider.get_image_for_frame(0, frame_data.id, **image_args)
-            elif include_images:
-                dm_image = self._image_provider.get_image_for_frame(0, frame_data.idx, **image_args)
-            else:
-                dm_image = dm.Image(**image_args)
-            dm_anno = self._read_cvat_anno(frame_data, instance_meta['labels'])
+    def __iter__(self):
+        for frame_data in self._instance_data.group_by_frame(include_empty=True):
+            yield self._make_item(frame_data)
 
-            if dimension == DimensionType.DIM_2D:
-                dm_item = dm.DatasetItem(
-                        id=osp.splitext(frame_data.name)[0],
-                        annotations=dm_anno, media=dm_image,
-                        attributes={'frame': frame_data.frame
-                    })
-            elif dimension == DimensionType.DIM_3D:
-                attributes = {'frame': frame_data.frame}
-                if format_type == "sly_pointcloud":
-                    attributes["name"] = self._user["name"]
-                    attributes["createdAt"] = self._user["createdAt"]
-                    attributes["updatedAt"] = self._user["updatedAt"]
-                    attributes["labels"] = []
-                    for (idx, (_, label)) in enumerate(instance_meta['labels']):
-                        attributes["labels"].append({"label_id": idx, "name": label["name"], "color": label["color"], "type": label["type"]})
-                        attributes["track_id"] = -1
+    def __len__(self):
+        return self._item_count
 
-                dm_item = dm.DatasetItem(
-                    id=osp.splitext(osp.split(frame_data.name)[-1])[0],
-                    annotations=dm_anno, media=PointCloud(dm_image[0]), related_images=dm_image[1],
-                    attributes=attributes
-                )
+    def _make_item(self, frame_data: CommonData.Frame) -> dm.DatasetItem:
+        dimension = self._dimension
+        instance_meta = self._instance_meta
 
-            dm_items.append(dm_item)
+        image_args = {
+            'path': frame_data.name + self._frame_ext,
+            'size': (frame_data.height, frame_data.width),
+        }
 
-        self._items = dm_items
+        if dimension == DimensionType.DIM_3D:
+            dm_image = self._image_provider.get_image_for_frame(0, frame_data.id, **image_args)
+        elif self._include_images:
+            dm_image = self._image_provider.get_image_for_frame(0, frame_data.idx, **image_args)
+        else:
+            dm_image = dm.Image(**image_args)
+        dm_anno = self._read_cvat_anno(frame_data, instance_meta['labels'])
+
+        if dimension == DimensionType.DIM_2D:
+            dm_item = dm.DatasetItem(
+                    id=osp.splitext(frame_data.name)[0],
+                    annotations=dm_anno, media=dm_image,
+                    attributes={'frame': frame_data.frame
+                })
+        elif dimension == DimensionType.DIM_3D:
+            attributes = {'frame': frame_data.frame}
+            if self._format_type == "sly_pointcloud":
+                attributes["name"] = self._user["name"]
+                attributes["createdAt"] = self._user["createdAt"]
+                attributes["updatedAt"] = self._user["updatedAt"]
+                attributes["labels"] = []
+                for (idx, (_, label)) in enumerate(instance_meta['labels']):
+                    attributes["labels"].append({"label_id": idx, "name": label["name"], "color": label["color"], "type": label["type"]})
+                    attributes["track_id"] = -1
+
+            dm_item = dm.DatasetItem(
+                id=osp.splitext(osp.split(frame_data.name)[-1])[0],
+                annotations=dm_anno, media=PointCloud(dm_image[0]), related_images=dm_image[1],
+                attributes=attributes
+            )
+
+        return dm_item
 
     def _read_cvat_anno(self, cvat_frame_anno: CommonData.Frame, labels: list):
         categories = self.categories()
@@ -1580,12 +1646,16 @@ class CVATProjectDataExtractor(dm.Extractor, CVATDataExtractorMixin):
         dm_items: List[dm.DatasetItem] = []
 
         if self._dimension == DimensionType.DIM_3D or include_images:
-            self._image_provider = IMAGE_PROVIDERS_BY_DIMENSION[self._dimension](
-                {
-                    task.id: ImageSource(task.data, is_video=task.mode == 'interpolation')
-                    for task in project_data.tasks
-                }
-            )
+            image_sources = {
+                task.id: ImageSource(task.data, is_video=task.mode == 'interpolation')
+                for task in project_data.tasks
+            }
+            if self._dimension == DimensionType.DIM_2D and project_data.media_shard_dirs is not None:
+                self._image_provider = ImageProviderFromShards(
+                    image_sources, project_data.media_shard_dirs
+                )
+            else:
+                self._image_provider = IMAGE_PROVIDERS_BY_DIMENSION[self._dimension](image_sources)
 
         ext_per_task: Dict[int, str] = {
             task.id: FrameProvider.VIDEO_FRAME_EXT if is_video else ''
@@ -0,0 +1,146 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import os.path as osp
+import shutil
+import threading
+from typing import List, Optional
+
+from django.conf import settings
+
+
+class ExportCache:
+    """
+    A size-capped cache of exported annotations and datasets in the file system,
+    shared by all the projects, tasks and jobs. The files of an instance are stored
+    in a separate directory, their names include a hash of the exported content.
+    When a new revision of a file is added, the previous revisions are removed.
+    The least recently used files are evicted when the size limit is exceeded.
+    """
+
+    # After an eviction, the cache is cleaned down to this fraction of its max size
+    _EVICTION_TARGET_RATIO = 0.9
+
+    def __init__(self, root: str, max_size: int):
+        self._root = root
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+        os.makedirs(self._root, exist_ok=True)
+
+    def get_instance_dir(self, instance_type: str, instance_id: int) -> str:
+        return osp.join(self._root, f'{instance_type}_{instance_id}')
+
+    def get_file_path(self, instance_type: str, instance_id: int, *,
+        file_name: str, content_key: str, ext: str
+    ) -> str:
+        return osp.join(self.get_instance_dir(instance_type, instance_id),
+            f'{file_name}-{content_key}.{ext}')
+
+    def touch(self, file_path: str) -> bool:
+        """
+        Marks the file as recently used. Returns False if there is no such file.
+        """
+
+        try:
+            os.utime(file_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def add(self, src_path: str, file_path: str):
+        """
+        Moves a file into the cache. The file must be on the same file system.
+        """
+
+        # rename is atomic, concurrent readers will see either no file or the whole file
+        os.replace(src_path, file_path)
+
+        self._remove_previous_revisions(file_path)
+
+        with self._lock:
+            self._evict(keep=file_path)
+
+    def remove_instance_files(self, instance_type: str, instance_id: int):
+        shutil.rmtree(self.get_instance_dir(instance_type, instance_id), ignore_errors=True)
+
+    @staticmethod
+    def _parse_file_name(file_name: str) -> Optional[tuple[str, str]]:
+        stem, _, ext = file_name.partition('.')
+        name, sep, _ = stem.rpartition('-')
+        if not sep:
+            return None
+
+        return name, ext
+
+    def _remove_previous_revisions(self, file_path: str):
+        instance_dir, file_name = osp.split(file_path)
+        file_kind = self._parse_file_name(file_name)
+
+        for entry in os.scandir(instance_dir):
+            if entry.name != file_name and entry.is_file() and \
+                    self._parse_file_name(entry.name) == file_kind:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass # removed by another process
+
+    def _list_files(self) -> List[os.DirEntry]:
+        files = []
+        for instance_entry in os.scandir(self._root):
+            if not instance_entry.is_dir():
+                continue
+
+            try:
+                files.extend(
+                    entry for entry in os.scandir(instance_entry.path)
+                    if entry.is_file() and self._parse_file_name(entry.name)
+                )
+            except FileNotFoundError:
+                pass # the instance has been removed
+
+        return files
+
+    def _evict(self, *, keep: str):
+        files = []
+        for entry in self._list_files():
+            try:
+                files.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+            except FileNotFoundError:
+                pass # removed by another process
+
+        size = sum(file_size for _, file_size, _ in files)
+        if size <= self._max_size:
+            return
+
+        target_size = self._max_size * self._EVICTION_TARGET_RATIO
+        for _, file_size, file_path in sorted(files):
+            if size <= target_size:
+                break
+            elif file_path == keep:
+                continue
+
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+
+            size -= file_size
+
+
+_export_cache = None
+_export_cache_lock = threading.Lock()
+
+def get_export_cache() -> ExportCache:
+    global _export_cache # pylint: disable=global-statement
+
+    with _export_cache_lock:
+        if _export_cache is None:
+            _export_cache = ExportCache(
+                root=settings.EXPORT_CACHE_ROOT,
+                max_size=settings.EXPORT_CACHE_SIZE,
+            )
+
+    return _export_cache
@@ -5,6 +5,7 @@
 
 import os
 import os.path as osp
+import shutil
 import zipfile
 from collections import OrderedDict
 from glob import glob
@@ -1373,12 +1374,20 @@ def dump_media_files(instance_data: CommonData, img_dir: str, project_data: Proj
     if instance_data.meta[instance_data.META_FIELD]['mode'] == 'interpolation':
         ext = FrameProvider.VIDEO_FRAME_EXT
 
-    frame_provider = FrameProvider(instance_data.db_data)
-    frames = frame_provider.get_frames(
-        instance_data.start, instance_data.stop,
-        frame_provider.Quality.ORIGINAL,
-        frame_provider.Type.BUFFER)
-    for frame_id, (frame_data, _) in zip(instance_data.rel_range, frames):
+    media_shard_dir = None
+    if project_data is not None and project_data.media_shard_dirs is not None:
+        media_shard_dir = project_data.media_shard_dirs.get(instance_data.db_instance.id)
+
+    if media_shard_dir:
+        # the frames are already extracted, they can be copied as is
+        frames = (osp.join(media_shard_dir, str(frame_id)) for frame_id in instance_data.rel_range)
+    else:
+        frame_provider = FrameProvider(instance_data.db_data)
+        frames = (frame_data for frame_data, _ in frame_provider.get_frames(
+            instance_data.start, instance_data.stop,
+            frame_provider.Quality.ORIGINAL,
+            frame_provider.Type.BUFFER))
+    for frame_id, frame in zip(instance_data.rel_range, frames):
         if (project_data is not None and (instance_data.db_instance.id, frame_id) in project_data.deleted_frames) \
             or frame_id in instance_data.deleted_frames:
             continue
@@ -1386,8 +1395,11 @@ def dump_media_files(instance_data: CommonData, img_dir: str, project_data: Proj
             else project_data.frame_info[(instance_data.db_instance.id, frame_id)]['path']
         img_path = osp.join(img_dir, frame_name + ext)
         os.makedirs(osp.dirname(img_path), exist_ok=True)
-        with open(img_path, 'wb') as f:
-            f.write(frame_data.getvalue())
+        if media_shard_dir:
+            shutil.copyfile(frame, img_path)
+        else:
+            with open(img_path, 'wb') as f:
+                f.write(frame.getvalue())
 
 def _export_task_or_job(dst_file, temp_dir, instance_data, anno_callback, save_images=False):
     with open(osp.join(temp_dir, 'annotations.xml'), 'wb') as f:
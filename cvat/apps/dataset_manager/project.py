@@ -3,17 +3,22 @@
 #
 # SPDX-License-Identifier: MIT
 
+import concurrent.futures
+import multiprocessing
 import os
+import os.path as osp
+import pickle # nosec
 from tempfile import TemporaryDirectory
 import rq
-from typing import Any, Callable, List, Mapping, Tuple
+from typing import Any, Callable, List, Mapping, Optional, Tuple
 from datumaro.components.errors import DatasetError, DatasetImportError, DatasetNotFoundError
 
-from django.db import transaction
+from django.db import connections, transaction
 from django.conf import settings
 
 from cvat.apps.engine import models
-from cvat.apps.engine.log import DatasetLogManager
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.log import DatasetLogManager, ServerLogManager
 from cvat.apps.engine.serializers import DataSerializer, TaskWriteSerializer
 from cvat.apps.engine.task import _create_thread as create_task
 from cvat.apps.dataset_manager.task import TaskAnnotation
@@ -23,9 +28,12 @@ from .bindings import ProjectData, load_dataset_data, CvatImportError
 from .formats.registry import make_exporter, make_importer
 
 dlogger = DatasetLogManager()
+slogger = ServerLogManager(__name__)
 
 def export_project(project_id, dst_file, format_name,
         server_url=None, save_images=False):
+    exporter = make_exporter(format_name)
+
     # For big tasks dump function may run for a long time and
     # we dont need to acquire lock after the task has been initialized from DB.
     # But there is the bug with corrupted dump file in case 2 or
@@ -33,11 +41,65 @@ def export_project(project_id, dst_file, format_name,
     # https://github.com/cvat-ai/cvat/issues/217
     with transaction.atomic():
         project = ProjectAnnotationAndData(project_id)
-        project.init_from_db()
+        worker_count = min(settings.DATASET_EXPORT_WORKERS, len(project.db_tasks))
+        if worker_count <= 1:
+            project.init_from_db(streaming=True)
+
+    if worker_count <= 1:
+        with open(dst_file, 'wb') as f:
+            project.export(f, exporter, host=server_url, save_images=save_images)
+    else:
+        temp_dir_base = project.db_project.get_tmp_dirname()
+        os.makedirs(temp_dir_base, exist_ok=True)
+        with TemporaryDirectory(dir=temp_dir_base) as shards_dir:
+            media_shard_dirs = project.init_from_shards(shards_dir,
+                save_images=save_images, worker_count=worker_count)
 
-    exporter = make_exporter(format_name)
-    with open(dst_file, 'wb') as f:
-        project.export(f, exporter, host=server_url, save_images=save_images)
+            with open(dst_file, 'wb') as f:
+                project.export(f, exporter, host=server_url, save_images=save_images,
+                    media_shard_dirs=media_shard_dirs)
+
+_ANNOTATIONS_SHARD_FILE = 'annotations.pickle'
+_MEDIA_SHARD_DIR = 'media'
+
+def _export_task_shard(task_id: int, shard_dir: str, *, save_images: bool) -> Optional[str]:
+    """
+    Writes the task annotations and, if requested, the task media frames
+    into the shard directory. Returns the media directory, if the frames are written.
+    """
+
+    with transaction.atomic():
+        annotation = TaskAnnotation(pk=task_id)
+        annotation.init_from_db(streaming=True)
+
+    os.makedirs(shard_dir)
+    with open(osp.join(shard_dir, _ANNOTATIONS_SHARD_FILE), 'wb') as f:
+        pickle.dump(annotation.ir_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    db_task = annotation.db_task
+    if not save_images or db_task.dimension != models.DimensionType.DIM_2D:
+        # 3d tasks refer to the media files directly, there is nothing to extract
+        return None
+
+    db_data = db_task.data
+    deleted_frames = set(db_data.deleted_frames)
+    media_dir = osp.join(shard_dir, _MEDIA_SHARD_DIR)
+    os.makedirs(media_dir)
+
+    frame_provider = FrameProvider(db_data)
+    try:
+        frames = frame_provider.get_frames(0, db_data.size,
+            quality=FrameProvider.Quality.ORIGINAL, out_type=FrameProvider.Type.BUFFER)
+        for frame_id, (frame_data, _) in enumerate(frames):
+            if frame_id in deleted_frames:
+                continue
+
+            with open(osp.join(media_dir, str(frame_id)), 'wb') as f:
+                f.write(frame_data.getvalue())
+    finally:
+        frame_provider.unload()
+
+    return media_dir
 
 class ProjectAnnotationAndData:
     def __init__(self, pk: int):
@@ -120,20 +182,81 @@ class ProjectAnnotationAndData:
         if attributes:
             models.AttributeSpec.objects.bulk_create([a[1] for a in attributes])
 
-    def init_from_db(self):
+    def init_from_db(self, *, streaming: bool = False):
         self.reset()
 
         for task in self.db_tasks:
             annotation = TaskAnnotation(pk=task.id)
-            annotation.init_from_db()
+            annotation.init_from_db(streaming=streaming)
             self.task_annotations[task.id] = annotation
             self.annotation_irs[task.id] = annotation.ir_data
 
-    def export(self, dst_file: str, exporter: Callable, host: str='', **options):
+    def init_from_shards(self, shards_dir: str, *,
+        save_images: bool, worker_count: int
+    ) -> Optional[dict[int, str]]:
+        """
+        Loads the task annotations and extracts the task media frames in parallel,
+        in separate processes. Each process writes a shard of a task into the shards
+        directory. Returns the task media directories, if the media are extracted.
+        """
+
+        self.reset()
+
+        rq_job = rq.get_current_job()
+        shard_dirs = {
+            db_task.id: osp.join(shards_dir, str(db_task.id)) for db_task in self.db_tasks
+        }
+        media_shard_dirs = {}
+
+        # The worker processes are forked, they must open their own DB connections
+        connections.close_all()
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=worker_count,
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            pending_tasks = {
+                executor.submit(_export_task_shard, task_id, shard_dir,
+                    save_images=save_images): task_id
+                for task_id, shard_dir in shard_dirs.items()
+            }
+
+            try:
+                for finished_count, future in enumerate(
+                    concurrent.futures.as_completed(pending_tasks), start=1
+                ):
+                    task_id = pending_tasks[future]
+                    media_shard_dir = future.result()
+                    if media_shard_dir:
+                        media_shard_dirs[task_id] = media_shard_dir
+
+                    slogger.project[self.db_project.id].info(
+                        f'Task {task_id} is prepared for export, '
+                        f'{finished_count} of {len(shard_dirs)} tasks'
+                    )
+                    if rq_job:
+                        rq_job.meta['status'] = 'Project tasks are being prepared for export...'
+                        rq_job.meta['progress'] = finished_count / len(shard_dirs)
+                        rq_job.save_meta()
+            except BaseException:
+                # Don't wait for the remaining tasks, the export is failed anyway
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        for task_id, shard_dir in shard_dirs.items():
+            with open(osp.join(shard_dir, _ANNOTATIONS_SHARD_FILE), 'rb') as f:
+                self.annotation_irs[task_id] = pickle.load(f) # nosec
+
+        return media_shard_dirs if save_images else None
+
+    def export(self, dst_file: str, exporter: Callable, host: str='', *,
+        media_shard_dirs: Optional[Mapping[int, str]] = None, **options
+    ):
         project_data = ProjectData(
             annotation_irs=self.annotation_irs,
             db_project=self.db_project,
-            host=host
+            host=host,
+            media_shard_dirs=media_shard_dirs,
         )
 
         temp_dir_base = self.db_project.get_tmp_dirname()
@@ -7,10 +7,14 @@ import os
 from collections import OrderedDict
 from copy import deepcopy
 from enum import Enum
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
 from tempfile import TemporaryDirectory
 from datumaro.components.errors import DatasetError, DatasetImportError, DatasetNotFoundError
 
 from django.db import transaction
+from django.db.models import Q
 from django.db.models.query import Prefetch
 from django.conf import settings
 from rest_framework.exceptions import ValidationError
@@ -21,10 +25,13 @@ from cvat.apps.engine.log import DatasetLogManager
 from cvat.apps.events.handlers import handle_annotations_change
 from cvat.apps.profiler import silk_profile
 
-from cvat.apps.dataset_manager.annotation import AnnotationIR, AnnotationManager
+from cvat.apps.dataset_manager.annotation import (
+    AnnotationIR, AnnotationManager, AttributeRecord, LazyAnnotationIR, ShapeRecord, TagRecord,
+    TrackRecord,
+)
 from cvat.apps.dataset_manager.bindings import TaskData, JobData, CvatImportError
 from cvat.apps.dataset_manager.formats.registry import make_exporter, make_importer
-from cvat.apps.dataset_manager.util import add_prefetch_fields, bulk_create, get_cached
+from cvat.apps.dataset_manager.util import add_prefetch_fields, bulk_copy_create, get_cached
 
 dlogger = DatasetLogManager()
 
@@ -76,7 +83,80 @@ def merge_table_rows(rows, keys_for_merge, field_id):
 
     return list(merged_rows.values())
 
+class _AnnotationDelta:
+    """
+    Collects row changes of an annotation update to write them together
+    """
+
+    def __init__(self):
+        self.updated = {}
+        self.created = []
+        self.created_tracked_shapes = []
+        self.deleted = {}
+
+    def update(self, db_obj, fields):
+        db_objects, updated_fields = self.updated.setdefault(type(db_obj), ([], set()))
+        db_objects.append(db_obj)
+        updated_fields.update(fields)
+
+    def create(self, db_obj):
+        self.created.append(db_obj)
+
+    def create_tracked_shape(self, shape, db_shape, db_attr_vals):
+        self.created_tracked_shapes.append((shape, db_shape, db_attr_vals))
+
+    def delete(self, db_model, obj_id):
+        self.deleted.setdefault(db_model, []).append(obj_id)
+
+    def merge(self, other):
+        for db_model, (db_objects, updated_fields) in other.updated.items():
+            own_objects, own_fields = self.updated.setdefault(db_model, ([], set()))
+            own_objects.extend(db_objects)
+            own_fields.update(updated_fields)
+
+        self.created.extend(other.created)
+        self.created_tracked_shapes.extend(other.created_tracked_shapes)
+
+        for db_model, obj_ids in other.deleted.items():
+            self.deleted.setdefault(db_model, []).extend(obj_ids)
+
+    def apply(self):
+        for db_model, obj_ids in self.deleted.items():
+            db_model.objects.filter(id__in=obj_ids).delete()
+
+        for db_model, (db_objects, updated_fields) in self.updated.items():
+            db_model.objects.bulk_update(db_objects, fields=sorted(updated_fields))
+
+        db_shapes = bulk_copy_create(
+            db_model=models.TrackedShape,
+            objects=[db_shape for _, db_shape, _ in self.created_tracked_shapes],
+            flt_param={}
+        )
+        created = list(self.created)
+        for (shape, _, db_attr_vals), db_shape in zip(self.created_tracked_shapes, db_shapes):
+            shape["id"] = db_shape.id
+            for db_attr_val in db_attr_vals:
+                db_attr_val.shape_id = db_shape.id
+                created.append(db_attr_val)
+
+        created_by_model = {}
+        for db_obj in created:
+            created_by_model.setdefault(type(db_obj), []).append(db_obj)
+
+        for db_model, db_objects in created_by_model.items():
+            bulk_copy_create(db_model=db_model, objects=db_objects, flt_param={})
+
 class JobAnnotation:
+    _TAG_FIELDS = ('label_id', 'frame', 'group', 'source')
+    _SHAPE_FIELDS = (
+        'label_id', 'type', 'frame', 'group', 'source',
+        'occluded', 'outside', 'z_order', 'rotation', 'points',
+    )
+    _TRACK_FIELDS = ('label_id', 'frame', 'group', 'source')
+    _TRACKED_SHAPE_FIELDS = (
+        'type', 'frame', 'occluded', 'outside', 'z_order', 'rotation', 'points',
+    )
+
     @classmethod
     def add_prefetch_info(cls, queryset):
         assert issubclass(queryset.model, models.Job)
@@ -107,9 +187,18 @@ class JobAnnotation:
             Prefetch('segment__task__project__label_set', queryset=label_qs),
         )
 
-    def __init__(self, pk, *, is_prefetched=False, queryset=None):
+    def __init__(self, pk, *, is_prefetched=False, queryset=None, prefetch_labels_only=False):
+        """
+        prefetch_labels_only: load only the label and attribute metadata of the task instead of
+            the full prefetched job data. It is intended for small annotation updates,
+            which don't need other job data.
+        """
+
         if queryset is None:
-            queryset = self.add_prefetch_info(models.Job.objects)
+            if prefetch_labels_only:
+                queryset = models.Job.objects.select_related('segment__task')
+            else:
+                queryset = self.add_prefetch_info(models.Job.objects)
 
         if is_prefetched:
             self.db_job: models.Job = queryset.select_related(
@@ -123,13 +212,28 @@ class JobAnnotation:
         self.stop_frame = db_segment.stop_frame
         self.ir_data = AnnotationIR(db_segment.task.dimension)
 
-        self.db_labels = {db_label.id:db_label
-            for db_label in (db_segment.task.project.label_set.all()
-            if db_segment.task.project_id else db_segment.task.label_set.all())}
+        db_task = db_segment.task
+        if prefetch_labels_only:
+            # The labels are read in the current transaction, so the request
+            # is validated against the actual labels and attributes
+            if db_task.project_id:
+                db_labels = models.Label.objects.filter(project_id=db_task.project_id)
+            else:
+                db_labels = models.Label.objects.filter(task_id=db_task.id)
+            db_labels = db_labels.prefetch_related('attributespec_set')
+        else:
+            db_labels = (db_task.project.label_set.all()
+                if db_task.project_id else db_task.label_set.all())
+
+        self.db_labels, self.db_attributes = self.prepare_label_metadata(db_labels)
 
-        self.db_attributes = {}
-        for db_label in self.db_labels.values():
-            self.db_attributes[db_label.id] = {
+    @staticmethod
+    def prepare_label_metadata(db_labels):
+        db_labels = {db_label.id:db_label for db_label in db_labels}
+
+        db_attributes = {}
+        for db_label in db_labels.values():
+            db_attributes[db_label.id] = {
                 "mutable": OrderedDict(),
                 "immutable": OrderedDict(),
                 "all": OrderedDict(),
@@ -140,11 +244,13 @@ class JobAnnotation:
                     ('value', db_attr.default_value),
                 ])
                 if db_attr.mutable:
-                    self.db_attributes[db_label.id]["mutable"][db_attr.id] = default_value
+                    db_attributes[db_label.id]["mutable"][db_attr.id] = default_value
                 else:
-                    self.db_attributes[db_label.id]["immutable"][db_attr.id] = default_value
+                    db_attributes[db_label.id]["immutable"][db_attr.id] = default_value
 
-                self.db_attributes[db_label.id]["all"][db_attr.id] = default_value
+                db_attributes[db_label.id]["all"][db_attr.id] = default_value
+
+        return db_labels, db_attributes
 
     def reset(self):
         self.ir_data.reset()
@@ -257,7 +363,7 @@ class JobAnnotation:
                 if elements or parent_track is None:
                     track["elements"] = elements
 
-            db_tracks = bulk_create(
+            db_tracks = bulk_copy_create(
                 db_model=models.LabeledTrack,
                 objects=db_tracks,
                 flt_param={"job_id": self.db_job.id}
@@ -266,7 +372,7 @@ class JobAnnotation:
             for db_attr_val in db_track_attr_vals:
                 db_attr_val.track_id = db_tracks[db_attr_val.track_id].id
 
-            bulk_create(
+            bulk_copy_create(
                 db_model=models.LabeledTrackAttributeVal,
                 objects=db_track_attr_vals,
                 flt_param={}
@@ -275,7 +381,7 @@ class JobAnnotation:
             for db_shape in db_shapes:
                 db_shape.track_id = db_tracks[db_shape.track_id].id
 
-            db_shapes = bulk_create(
+            db_shapes = bulk_copy_create(
                 db_model=models.TrackedShape,
                 objects=db_shapes,
                 flt_param={"track__job_id": self.db_job.id}
@@ -284,7 +390,7 @@ class JobAnnotation:
             for db_attr_val in db_shape_attr_vals:
                 db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
 
-            bulk_create(
+            bulk_copy_create(
                 db_model=models.TrackedShapeAttributeVal,
                 objects=db_shape_attr_vals,
                 flt_param={}
@@ -328,7 +434,7 @@ class JobAnnotation:
                 if shape_elements or parent_shape is None:
                     shape["elements"] = shape_elements
 
-            db_shapes = bulk_create(
+            db_shapes = bulk_copy_create(
                 db_model=models.LabeledShape,
                 objects=db_shapes,
                 flt_param={"job_id": self.db_job.id}
@@ -337,7 +443,7 @@ class JobAnnotation:
             for db_attr_val in db_attr_vals:
                 db_attr_val.shape_id = db_shapes[db_attr_val.shape_id].id
 
-            bulk_create(
+            bulk_copy_create(
                 db_model=models.LabeledShapeAttributeVal,
                 objects=db_attr_vals,
                 flt_param={}
@@ -372,7 +478,7 @@ class JobAnnotation:
             db_tags.append(db_tag)
             tag["attributes"] = attributes
 
-        db_tags = bulk_create(
+        db_tags = bulk_copy_create(
             db_model=models.LabeledImage,
             objects=db_tags,
             flt_param={"job_id": self.db_job.id}
@@ -381,7 +487,7 @@ class JobAnnotation:
         for db_attr_val in db_attr_vals:
             db_attr_val.image_id = db_tags[db_attr_val.tag_id].id
 
-        bulk_create(
+        bulk_copy_create(
             db_model=models.LabeledImageAttributeVal,
             objects=db_attr_vals,
             flt_param={}
@@ -429,9 +535,252 @@ class JobAnnotation:
         if not deleted_data_is_empty or not self._data_is_empty(self.data):
             self._set_updated_date()
 
+    def _update_object(self, delta, db_model, db_row, obj, fields):
+        db_obj = db_model(id=db_row['id'], **{
+            field: obj[field] for field in fields if field in obj
+        })
+        if any(getattr(db_obj, field) != db_row[field] for field in fields):
+            delta.update(db_obj, fields)
+
+    def _update_attributes(self, delta, db_model, owner_field, owner_id,
+        db_attr_vals, attributes, label_id, attr_type
+    ):
+        # Attributes are matched by spec_id, which is not possible for repeated specs
+        if len(set(db_attr_val['spec_id'] for db_attr_val in db_attr_vals)) != len(db_attr_vals):
+            return False
+
+        new_attr_vals = {}
+        for attr in attributes:
+            db_attr_val = db_model(**attr, **{owner_field: owner_id})
+            self._validate_attribute_for_existence(db_attr_val, label_id, attr_type)
+
+            if db_attr_val.spec_id in new_attr_vals:
+                return False
+
+            new_attr_vals[db_attr_val.spec_id] = db_attr_val
+
+        for db_attr_val_row in db_attr_vals:
+            db_attr_val = new_attr_vals.pop(db_attr_val_row['spec_id'], None)
+            if db_attr_val is None:
+                delta.delete(db_model, db_attr_val_row['id'])
+            elif db_attr_val.value != db_attr_val_row['value']:
+                db_attr_val.id = db_attr_val_row['id']
+                delta.update(db_attr_val, ['value'])
+
+        for db_attr_val in new_attr_vals.values():
+            delta.create(db_attr_val)
+
+        return True
+
+    def _update_tags_in_db(self, tags, delta):
+        db_tags = {
+            row['id']: row for row in self.db_job.labeledimage_set.filter(
+                id__in=[tag['id'] for tag in tags if tag.get('id') is not None]
+            ).values('id', *self._TAG_FIELDS)
+        }
+
+        db_attr_vals = {tag_id: [] for tag_id in db_tags}
+        for row in models.LabeledImageAttributeVal.objects.filter(
+            image_id__in=db_tags
+        ).values('id', 'image_id', 'spec_id', 'value'):
+            db_attr_vals[row['image_id']].append(row)
+
+        recreated_tags = []
+        for tag in tags:
+            db_tag = db_tags.get(tag.get('id'))
+            tag_delta = _AnnotationDelta()
+            if db_tag is not None:
+                self._validate_label_for_existence(tag['label_id'])
+                self._update_object(tag_delta, models.LabeledImage, db_tag, tag, self._TAG_FIELDS)
+
+            if db_tag is not None and self._update_attributes(tag_delta,
+                models.LabeledImageAttributeVal, 'image_id', db_tag['id'], db_attr_vals[db_tag['id']],
+                tag.get('attributes', []), tag['label_id'], 'all'
+            ):
+                delta.merge(tag_delta)
+            else:
+                recreated_tags.append(tag)
+
+        return recreated_tags
+
+    def _update_shapes_in_db(self, shapes, delta):
+        shape_ids = [shape['id'] for shape in shapes if shape.get('id') is not None]
+        db_shapes = {
+            row['id']: row for row in self.db_job.labeledshape_set.filter(
+                Q(id__in=shape_ids) | Q(parent_id__in=shape_ids)
+            ).values('id', 'parent', *self._SHAPE_FIELDS)
+        }
+
+        db_attr_vals = {shape_id: [] for shape_id in db_shapes}
+        for row in models.LabeledShapeAttributeVal.objects.filter(
+            shape_id__in=db_shapes
+        ).values('id', 'shape_id', 'spec_id', 'value'):
+            db_attr_vals[row['shape_id']].append(row)
+
+        db_element_ids = {}
+        for db_shape in db_shapes.values():
+            if db_shape['parent'] is not None:
+                db_element_ids.setdefault(db_shape['parent'], []).append(db_shape['id'])
+
+        def update_shape(shape, shape_delta, parent_id=None):
+            db_shape = db_shapes.get(shape.get('id'))
+            if db_shape is None or db_shape['parent'] != parent_id:
+                return False
+
+            elements = shape.get('elements', [])
+            if sorted(element.get('id') or 0 for element in elements) != \
+                    sorted(db_element_ids.get(db_shape['id'], [])):
+                return False
+
+            self._validate_label_for_existence(shape['label_id'])
+            self._update_object(shape_delta, models.LabeledShape, db_shape, shape,
+                self._SHAPE_FIELDS)
+
+            if not self._update_attributes(shape_delta,
+                models.LabeledShapeAttributeVal, 'shape_id', db_shape['id'],
+                db_attr_vals[db_shape['id']], shape.get('attributes', []), shape['label_id'], 'all'
+            ):
+                return False
+
+            return all(update_shape(element, shape_delta, db_shape['id']) for element in elements)
+
+        recreated_shapes = []
+        for shape in shapes:
+            shape_delta = _AnnotationDelta()
+            if update_shape(shape, shape_delta):
+                delta.merge(shape_delta)
+                shape.setdefault('elements', [])
+            else:
+                recreated_shapes.append(shape)
+
+        return recreated_shapes
+
+    def _update_tracks_in_db(self, tracks, delta):
+        # Only tracks without elements are updated in place. Frame synchronization
+        # of skeleton tracks can require changes in the parent track.
+        track_ids = [track['id'] for track in tracks if track.get('id') is not None]
+        db_tracks = {
+            row['id']: row for row in self.db_job.labeledtrack_set.filter(
+                id__in=track_ids, parent=None
+            ).exclude(
+                id__in=models.LabeledTrack.objects.filter(
+                    parent_id__in=track_ids
+                ).values('parent_id')
+            ).values('id', *self._TRACK_FIELDS)
+        }
+
+        db_track_attr_vals = {track_id: [] for track_id in db_tracks}
+        for row in models.LabeledTrackAttributeVal.objects.filter(
+            track_id__in=db_tracks
+        ).values('id', 'track_id', 'spec_id', 'value'):
+            db_track_attr_vals[row['track_id']].append(row)
+
+        db_tracked_shapes = {track_id: {} for track_id in db_tracks}
+        for row in models.TrackedShape.objects.filter(
+            track_id__in=db_tracks
+        ).values('id', 'track_id', *self._TRACKED_SHAPE_FIELDS):
+            db_tracked_shapes[row['track_id']][row['id']] = row
+
+        db_shape_attr_vals = {
+            shape_id: []
+            for track_shapes in db_tracked_shapes.values()
+            for shape_id in track_shapes
+        }
+        for row in models.TrackedShapeAttributeVal.objects.filter(
+            shape__track_id__in=db_tracks
+        ).values('id', 'shape_id', 'spec_id', 'value'):
+            db_shape_attr_vals[row['shape_id']].append(row)
+
+        def update_track(track, track_delta):
+            db_track = db_tracks.get(track.get('id'))
+            if db_track is None or track.get('elements'):
+                return False
+
+            self._validate_label_for_existence(track['label_id'])
+            self._sync_frames([track], None)
+            self._update_object(track_delta, models.LabeledTrack, db_track, track,
+                self._TRACK_FIELDS)
+
+            if not self._update_attributes(track_delta,
+                models.LabeledTrackAttributeVal, 'track_id', db_track['id'],
+                db_track_attr_vals[db_track['id']], track.get('attributes', []),
+                track['label_id'], 'immutable'
+            ):
+                return False
+
+            db_shapes = db_tracked_shapes[db_track['id']]
+            kept_shape_ids = set()
+            for shape in track['shapes']:
+                shape_id = shape.get('id')
+                if shape_id is None:
+                    db_shape = models.TrackedShape(
+                        **{k: v for k, v in shape.items() if k != 'attributes'},
+                        track_id=db_track['id'],
+                    )
+                    db_attr_vals = []
+                    for attr in shape.get('attributes', []):
+                        db_attr_val = models.TrackedShapeAttributeVal(**attr)
+                        self._validate_attribute_for_existence(db_attr_val,
+                            track['label_id'], 'mutable')
+                        db_attr_vals.append(db_attr_val)
+
+                    track_delta.create_tracked_shape(shape, db_shape, db_attr_vals)
+                    continue
+
+                db_shape = db_shapes.get(shape_id)
+                if db_shape is None or shape_id in kept_shape_ids:
+                    return False
+
+                kept_shape_ids.add(shape_id)
+                self._update_object(track_delta, models.TrackedShape, db_shape, shape,
+                    self._TRACKED_SHAPE_FIELDS)
+
+                if not self._update_attributes(track_delta,
+                    models.TrackedShapeAttributeVal, 'shape_id', shape_id,
+                    db_shape_attr_vals[shape_id], shape.get('attributes', []),
+                    track['label_id'], 'mutable'
+                ):
+                    return False
+
+            for shape_id in db_shapes:
+                if shape_id not in kept_shape_ids:
+                    track_delta.delete(models.TrackedShape, shape_id)
+
+            return True
+
+        recreated_tracks = []
+        for track in tracks:
+            track_delta = _AnnotationDelta()
+            if update_track(track, track_delta):
+                delta.merge(track_delta)
+                track.setdefault('elements', [])
+            else:
+                recreated_tracks.append(track)
+
+        return recreated_tracks
+
+    def _update(self, data):
+        # Existing objects are updated in place: only the changed rows are written.
+        # Objects, which can't be matched with the DB state (e.g. new or with changed
+        # elements), are recreated.
+        delta = _AnnotationDelta()
+        recreated_data = {
+            "tags": self._update_tags_in_db(data["tags"], delta),
+            "shapes": self._update_shapes_in_db(data["shapes"], delta),
+            "tracks": self._update_tracks_in_db(data["tracks"], delta),
+        }
+        delta.apply()
+
+        if not self._data_is_empty(recreated_data):
+            self._delete(recreated_data)
+            self._create(recreated_data)
+
+        self.ir_data.tags = data["tags"]
+        self.ir_data.shapes = data["shapes"]
+        self.ir_data.tracks = data["tracks"]
+
     def update(self, data):
-        self._delete(data)
-        self._create(data)
+        self._update(data)
         handle_annotations_change(self.db_job, self.data, "update")
 
         if not self._data_is_empty(self.data):
@@ -492,10 +841,10 @@ class JobAnnotation:
                     ('value', db_attr.value),
                 ]))
 
-    def _init_tags_from_db(self):
+    def _get_db_tag_rows(self, *order_by):
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_tags = self.db_job.labeledimage_set.values(
+        return self.db_job.labeledimage_set.values(
             'id',
             'frame',
             'label_id',
@@ -504,10 +853,11 @@ class JobAnnotation:
             'labeledimageattributeval__spec_id',
             'labeledimageattributeval__value',
             'labeledimageattributeval__id',
-        ).order_by('frame').iterator(chunk_size=2000)
+        ).order_by(*order_by).iterator(chunk_size=2000)
 
+    def _init_tags_from_db(self):
         db_tags = merge_table_rows(
-            rows=db_tags,
+            rows=self._get_db_tag_rows('frame'),
             keys_for_merge={
                 "labeledimageattributeval_set": [
                     'labeledimageattributeval__spec_id',
@@ -525,10 +875,10 @@ class JobAnnotation:
         serializer = serializers.LabeledImageSerializerFromDB(db_tags, many=True)
         self.ir_data.tags = serializer.data
 
-    def _init_shapes_from_db(self):
+    def _get_db_shape_rows(self, *order_by):
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_shapes = self.db_job.labeledshape_set.values(
+        return self.db_job.labeledshape_set.values(
             'id',
             'label_id',
             'type',
@@ -544,10 +894,11 @@ class JobAnnotation:
             'labeledshapeattributeval__spec_id',
             'labeledshapeattributeval__value',
             'labeledshapeattributeval__id',
-        ).order_by('frame').iterator(chunk_size=2000)
+        ).order_by(*order_by).iterator(chunk_size=2000)
 
+    def _init_shapes_from_db(self):
         db_shapes = merge_table_rows(
-            rows=db_shapes,
+            rows=self._get_db_shape_rows('frame'),
             keys_for_merge={
                 'labeledshapeattributeval_set': [
                     'labeledshapeattributeval__spec_id',
@@ -578,10 +929,10 @@ class JobAnnotation:
         serializer = serializers.LabeledShapeSerializerFromDB(list(shapes.values()), many=True)
         self.ir_data.shapes = serializer.data
 
-    def _init_tracks_from_db(self):
+    def _get_db_track_rows(self, *order_by):
         # NOTE: do not use .prefetch_related() with .values() since it's useless:
         # https://github.com/cvat-ai/cvat/pull/7748#issuecomment-2063695007
-        db_tracks = self.db_job.labeledtrack_set.values(
+        return self.db_job.labeledtrack_set.values(
             "id",
             "frame",
             "label_id",
@@ -602,10 +953,11 @@ class JobAnnotation:
             "trackedshape__trackedshapeattributeval__spec_id",
             "trackedshape__trackedshapeattributeval__value",
             "trackedshape__trackedshapeattributeval__id",
-        ).order_by('id', 'trackedshape__frame').iterator(chunk_size=2000)
+        ).order_by(*order_by).iterator(chunk_size=2000)
 
+    def _init_tracks_from_db(self):
         db_tracks = merge_table_rows(
-            rows=db_tracks,
+            rows=self._get_db_track_rows('id', 'trackedshape__frame'),
             keys_for_merge={
                 "labeledtrackattributeval_set": [
                     "labeledtrackattributeval__spec_id",
@@ -670,13 +1022,164 @@ class JobAnnotation:
         serializer = serializers.LabeledTrackSerializerFromDB(list(tracks.values()), many=True)
         self.ir_data.tracks = serializer.data
 
+    @staticmethod
+    def _make_attribute_records(rows, field_prefix, default_attribute_values):
+        id_key = field_prefix + 'id'
+        spec_id_key = field_prefix + 'spec_id'
+        value_key = field_prefix + 'value'
+
+        # A result table can consist many equal rows for attributes,
+        # only unique attributes are kept
+        attributes = {}
+        for row in rows:
+            attr_id = row[id_key]
+            if attr_id is not None and attr_id not in attributes:
+                attributes[attr_id] = AttributeRecord(
+                    spec_id=row[spec_id_key], value=row[value_key]
+                )
+        attributes = list(attributes.values())
+
+        spec_ids = set(attr['spec_id'] for attr in attributes)
+        for default_attr in default_attribute_values:
+            if default_attr['spec_id'] not in spec_ids:
+                attributes.append(AttributeRecord(
+                    spec_id=default_attr['spec_id'], value=default_attr['value']
+                ))
+
+        return attributes
+
+    def _stream_tags_from_db(self):
+        tags = []
+        for tag_id, tag_rows in groupby(self._get_db_tag_rows('frame', 'id'), key=itemgetter('id')):
+            tag_rows = list(tag_rows)
+            row = tag_rows[0]
+            tags.append(TagRecord(
+                id=tag_id,
+                label_id=row['label_id'],
+                frame=row['frame'],
+                group=row['group'],
+                source=row['source'],
+                attributes=self._make_attribute_records(tag_rows, 'labeledimageattributeval__',
+                    self.db_attributes[row['label_id']]["all"].values()),
+            ))
+
+        self.ir_data.tags = tags
+
+    def _stream_shapes_from_db(self):
+        shapes = {}
+        elements = {}
+        for shape_id, shape_rows in groupby(
+            self._get_db_shape_rows('frame', 'id'), key=itemgetter('id')
+        ):
+            shape_rows = list(shape_rows)
+            row = shape_rows[0]
+            shape = ShapeRecord(
+                id=shape_id,
+                label_id=row['label_id'],
+                type=row['type'],
+                frame=row['frame'],
+                group=row['group'],
+                source=row['source'],
+                occluded=row['occluded'],
+                outside=row['outside'],
+                z_order=row['z_order'],
+                rotation=row['rotation'],
+                points=row['points'],
+                attributes=self._make_attribute_records(shape_rows, 'labeledshapeattributeval__',
+                    self.db_attributes[row['label_id']]["all"].values()),
+            )
+
+            if row['parent'] is None:
+                shape['elements'] = []
+                shapes[shape_id] = shape
+            else:
+                elements.setdefault(row['parent'], []).append(shape)
+
+        for shape_id, shape_elements in elements.items():
+            shapes[shape_id]['elements'] = shape_elements
+
+        self.ir_data.shapes = list(shapes.values())
+
+    def _stream_tracks_from_db(self):
+        tracks = {}
+        elements = {}
+        for track_id, track_rows in groupby(
+            self._get_db_track_rows('id', 'trackedshape__frame', 'trackedshape__id'),
+            key=itemgetter('id')
+        ):
+            track_rows = list(track_rows)
+            row = track_rows[0]
+            db_attributes = self.db_attributes[row['label_id']]
+
+            shapes = []
+            # in case of trackedshapes need to interpolate attriute values and extend it
+            # by previous shape attribute values (not default values)
+            default_attribute_values = db_attributes["mutable"].values()
+            for shape_id, shape_rows in groupby(track_rows, key=itemgetter('trackedshape__id')):
+                if shape_id is None:
+                    continue
+
+                shape_rows = list(shape_rows)
+                shape_row = shape_rows[0]
+                attributes = self._make_attribute_records(shape_rows,
+                    'trackedshape__trackedshapeattributeval__', default_attribute_values)
+                shapes.append(ShapeRecord(
+                    id=shape_id,
+                    type=shape_row['trackedshape__type'],
+                    frame=shape_row['trackedshape__frame'],
+                    occluded=shape_row['trackedshape__occluded'],
+                    outside=shape_row['trackedshape__outside'],
+                    z_order=shape_row['trackedshape__z_order'],
+                    rotation=shape_row['trackedshape__rotation'],
+                    points=shape_row['trackedshape__points'],
+                    attributes=attributes,
+                ))
+                default_attribute_values = attributes
+
+            track = TrackRecord(
+                id=track_id,
+                label_id=row['label_id'],
+                frame=row['frame'],
+                group=row['group'],
+                source=row['source'],
+                shapes=shapes,
+                attributes=self._make_attribute_records(track_rows, 'labeledtrackattributeval__',
+                    db_attributes["immutable"].values()),
+            )
+
+            if row['parent'] is None:
+                track['elements'] = []
+                tracks[track_id] = track
+            else:
+                elements.setdefault(row['parent'], []).append(track)
+
+        for track_id, track_elements in elements.items():
+            tracks[track_id]['elements'] = track_elements
+
+        self.ir_data.tracks = list(tracks.values())
+
     def _init_version_from_db(self):
         self.ir_data.version = 0 # FIXME: should be removed in the future
 
-    def init_from_db(self):
-        self._init_tags_from_db()
-        self._init_shapes_from_db()
-        self._init_tracks_from_db()
+    def init_from_db(self, *, streaming: bool = False):
+        """
+        Loads the job annotations from the DB.
+
+        With streaming=True, the DB rows are read in frame order and converted
+        directly into compact annotation records, without the intermediate row merging
+        and serialization. This mode requires much less memory and time on big jobs,
+        but the records can't be returned in REST responses as is, so it is only
+        intended for the internal processing, such as export and quality checks.
+        """
+
+        if streaming:
+            self._stream_tags_from_db()
+            self._stream_shapes_from_db()
+            self._stream_tracks_from_db()
+        else:
+            self._init_tags_from_db()
+            self._init_shapes_from_db()
+            self._init_tracks_from_db()
         self._init_version_from_db()
 
     @property
@@ -778,7 +1281,24 @@ class TaskAnnotation:
             for db_job in self.db_jobs:
                 delete_job_data(db_job.id)
 
-    def init_from_db(self):
+    def init_from_db(self, *, streaming: bool = False, lazy: bool = False):
+        """
+        Loads the job annotations from the DB and merges them into the task annotations.
+
+        streaming: load the job annotations in the streaming mode, see JobAnnotation.init_from_db
+        lazy: don't load anything here. The job annotations are loaded in the frame order
+            and merged when the task annotations are accessed for the first time.
+            Task exports also can read them by frame ranges with ir_data.iter_chunks(),
+            which only keeps the annotations of the neighbor segments in memory.
+        """
+
+        if lazy:
+            self.ir_data = LazyAnnotationIR(self.db_task.dimension,
+                partial(self._iter_segment_annotations, streaming=streaming),
+                overlap=self.db_task.overlap,
+            )
+            return
+
         self.reset()
 
         for db_job in self.db_jobs:
@@ -786,7 +1306,7 @@ class TaskAnnotation:
                 continue
 
             annotation = JobAnnotation(db_job.id, is_prefetched=True)
-            annotation.init_from_db()
+            annotation.init_from_db(streaming=streaming)
             if annotation.ir_data.version > self.ir_data.version:
                 self.ir_data.version = annotation.ir_data.version
             db_segment = db_job.segment
@@ -795,6 +1315,15 @@ class TaskAnnotation:
             dimension = self.db_task.dimension
             self._merge_data(annotation.ir_data, start_frame, overlap, dimension)
 
+    def _iter_segment_annotations(self, *, streaming: bool = False):
+        # The merging requires the frame order, job ids can be in a different order
+        for db_job in self.db_jobs.order_by('segment__start_frame', 'id'):
+            with transaction.atomic():
+                annotation = JobAnnotation(db_job.id, is_prefetched=True)
+                annotation.init_from_db(streaming=streaming)
+
+            yield db_job.segment.start_frame, annotation.ir_data
+
     def export(self, dst_file, exporter, host='', **options):
         task_data = TaskData(
             annotation_ir=self.ir_data,
@@ -859,7 +1388,7 @@ def put_job_data(pk, data):
 @plugin_decorator
 @transaction.atomic
 def patch_job_data(pk, data, action):
-    annotation = JobAnnotation(pk)
+    annotation = JobAnnotation(pk, prefetch_labels_only=True)
     if action == PatchAction.CREATE:
         annotation.create(data)
     elif action == PatchAction.UPDATE:
@@ -883,7 +1412,7 @@ def export_job(job_id, dst_file, format_name, server_url=None, save_images=False
     # https://github.com/cvat-ai/cvat/issues/217
     with transaction.atomic():
         job = JobAnnotation(job_id)
-        job.init_from_db()
+        job.init_from_db(streaming=True)
 
     exporter = make_exporter(format_name)
     with open(dst_file, 'wb') as f:
@@ -930,9 +1459,11 @@ def export_task(task_id, dst_file, format_name, server_url=None, save_images=Fal
     # But there is the bug with corrupted dump file in case 2 or
     # more dump request received at the same time:
     # https://github.com/cvat-ai/cvat/issues/217
+    # The job annotations are loaded lazily during the export,
+    # each job is read in a separate transaction.
     with transaction.atomic():
         task = TaskAnnotation(task_id)
-        task.init_from_db()
+        task.init_from_db(streaming=True, lazy=True)
 
     exporter = make_exporter(format_name)
     with open(dst_file, 'wb') as f:
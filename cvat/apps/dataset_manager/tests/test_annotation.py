@@ -2,9 +2,15 @@
 #
 # SPDX-License-Identifier: MIT
 
-from cvat.apps.dataset_manager.annotation import TrackManager
+from copy import copy, deepcopy
 
-from unittest import TestCase
+from cvat.apps.dataset_manager.annotation import (
+    AnnotationIR, AnnotationManager, AttributeRecord, LazyAnnotationIR, ShapeRecord, TrackManager,
+    TrackRecord,
+)
+from cvat.apps.dataset_manager.bindings import CommonData
+
+from unittest import TestCase, mock
 
 
 class TrackManagerTest(TestCase):
@@ -324,3 +330,347 @@ class TrackManagerTest(TestCase):
 
         interpolated_shapes = TrackManager.get_interpolated_shapes(track, 0, 3, '2d')
         self.assertEqual(expected_shapes, interpolated_shapes)
+
+
+    def test_interpolation_respects_included_frames_and_end_frame(self):
+        track = {
+            "frame": 0,
+            "label_id": 0,
+            "group": None,
+            "attributes": [],
+            "source": "manual",
+            "shapes": [
+                {
+                    "frame": 0,
+                    "points": [0.0, 0.0, 10.0, 10.0],
+                    "rotation": 0,
+                    "type": "rectangle",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+                {
+                    "frame": 10,
+                    "points": [10.0, 10.0, 20.0, 20.0],
+                    "rotation": 90,
+                    "type": "rectangle",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+            ]
+        }
+
+        interpolated = TrackManager.get_interpolated_shapes(track, 0, 6, '2d',
+            included_frames=[0, 5, 8])
+
+        self.assertEqual(
+            [
+                {"frame": 0, "keyframe": True, "points": [0.0, 0.0, 10.0, 10.0], "rotation": 0},
+                {"frame": 5, "keyframe": False, "points": [5.0, 5.0, 15.0, 15.0], "rotation": 45.0},
+            ],
+            [
+                {k: v for k, v in shape.items() if k in ["frame", "keyframe", "points", "rotation"]}
+                for shape in interpolated
+            ]
+        )
+
+    def test_polygon_interpolation_does_not_depend_on_included_frames(self):
+        track = {
+            "frame": 0,
+            "label_id": 0,
+            "group": None,
+            "attributes": [],
+            "source": "manual",
+            "shapes": [
+                {
+                    "frame": 0,
+                    "points": [1.0, 2.0, 3.0, 4.0, 5.0, 2.0, 4.0, 1.0, 2.0, 1.0],
+                    "type": "polygon",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+                {
+                    "frame": 7,
+                    "points": [3.0, 4.0, 5.0, 6.0, 7.0, 6.0],
+                    "type": "polygon",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": []
+                },
+            ]
+        }
+
+        all_shapes = TrackManager.get_interpolated_shapes(deepcopy(track), 0, 10, '2d')
+        some_shapes = TrackManager.get_interpolated_shapes(deepcopy(track), 0, 10, '2d',
+            included_frames=[2, 3, 9])
+
+        self.assertEqual(list(range(10)), [shape["frame"] for shape in all_shapes])
+        self.assertEqual(
+            [shape for shape in all_shapes if shape["frame"] in [2, 3, 9]],
+            some_shapes
+        )
+
+    def test_can_convert_tracks_to_shapes_repeatedly(self):
+        track = {
+            "id": 1,
+            "frame": 0,
+            "label_id": 0,
+            "group": None,
+            "source": "manual",
+            "attributes": [{"spec_id": 1, "value": "a"}],
+            "shapes": [
+                {
+                    "frame": 0,
+                    "points": [1.0, 2.0, 3.0, 4.0],
+                    "rotation": 0,
+                    "type": "rectangle",
+                    "occluded": False,
+                    "outside": False,
+                    "attributes": [{"spec_id": 2, "value": "b"}]
+                },
+                {
+                    "frame": 2,
+                    "points": [3.0, 4.0, 5.0, 6.0],
+                    "rotation": 0,
+                    "type": "rectangle",
+                    "occluded": False,
+                    "outside": True,
+                    "attributes": []
+                },
+            ]
+        }
+        original_track = deepcopy(track)
+
+        track_manager = TrackManager([track], '2d')
+        shapes = track_manager.to_shapes(3)
+
+        self.assertEqual(shapes, track_manager.to_shapes(3))
+        self.assertEqual(
+            [[{"spec_id": 2, "value": "b"}, {"spec_id": 1, "value": "a"}]] * 2,
+            [shape["attributes"] for shape in shapes[:2]]
+        )
+        self.assertEqual(original_track["attributes"], track["attributes"])
+        self.assertNotIn("track_id", track["shapes"][0])
+
+
+class AnnotationRecordTest(TestCase):
+    def _make_track(self):
+        return TrackRecord(
+            id=1,
+            frame=0,
+            label_id=0,
+            group=None,
+            source="manual",
+            attributes=[AttributeRecord(spec_id=1, value="a")],
+            shapes=[
+                ShapeRecord(
+                    id=2,
+                    frame=0,
+                    points=[1.0, 2.0, 3.0, 4.0],
+                    rotation=0,
+                    type="rectangle",
+                    occluded=False,
+                    outside=False,
+                    z_order=0,
+                    attributes=[AttributeRecord(spec_id=2, value="b")],
+                ),
+                ShapeRecord(
+                    id=3,
+                    frame=2,
+                    points=[3.0, 4.0, 5.0, 6.0],
+                    rotation=0,
+                    type="rectangle",
+                    occluded=False,
+                    outside=False,
+                    z_order=0,
+                    attributes=[AttributeRecord(spec_id=2, value="c")],
+                ),
+            ],
+        )
+
+    def test_can_be_used_as_dict(self):
+        shape = ShapeRecord(id=1, frame=2, points=[1.0, 2.0])
+
+        self.assertEqual(2, shape["frame"])
+        self.assertNotIn("label_id", shape)
+        self.assertIsNone(shape.get("label_id"))
+        with self.assertRaises(KeyError):
+            shape["label_id"] # pylint: disable=pointless-statement
+
+        shape["track_id"] = 5
+        shape["custom_key"] = "value"
+        self.assertEqual(
+            {"id": 1, "frame": 2, "points": [1.0, 2.0], "track_id": 5, "custom_key": "value"},
+            dict(shape)
+        )
+
+        self.assertEqual("value", shape.pop("custom_key"))
+        self.assertNotIn("custom_key", shape)
+        self.assertEqual(4, len(shape))
+
+    def test_copies_are_independent(self):
+        shape = ShapeRecord(id=1, points=[1.0, 2.0], attributes=[AttributeRecord(spec_id=1, value="a")])
+
+        shallow_copy = copy(shape)
+        shallow_copy["id"] = 2
+        self.assertEqual(1, shape["id"])
+        self.assertIs(shape["points"], shallow_copy["points"])
+
+        deep_copy = deepcopy(shape)
+        deep_copy["points"].append(3.0)
+        deep_copy["attributes"][0]["value"] = "b"
+        self.assertEqual([1.0, 2.0], shape["points"])
+        self.assertEqual("a", shape["attributes"][0]["value"])
+
+    def test_interpolation_matches_dicts(self):
+        record_track = self._make_track()
+        dict_track = deepcopy({
+            **record_track,
+            "attributes": [dict(attr) for attr in record_track["attributes"]],
+            "shapes": [
+                {**shape, "attributes": [dict(attr) for attr in shape["attributes"]]}
+                for shape in record_track["shapes"]
+            ],
+        })
+
+        self.assertEqual(
+            TrackManager.get_interpolated_shapes(dict_track, 0, 4, '2d'),
+            [dict(shape) for shape in TrackManager.get_interpolated_shapes(
+                record_track, 0, 4, '2d'
+            )]
+        )
+
+
+class LazyAnnotationIRTest(TestCase):
+    def _make_shape(self, frame, points, **kwargs):
+        return {
+            "id": None,
+            "type": "rectangle",
+            "frame": frame,
+            "label_id": 0,
+            "group": 0,
+            "source": "manual",
+            "occluded": False,
+            "outside": False,
+            "z_order": 0,
+            "rotation": 0,
+            "points": points,
+            "attributes": [],
+            **kwargs
+        }
+
+    def _make_track(self, shapes):
+        return {
+            "id": None,
+            "frame": shapes[0]["frame"],
+            "label_id": 0,
+            "group": 0,
+            "source": "manual",
+            "attributes": [],
+            "shapes": [
+                {k: v for k, v in shape.items() if k not in ["id", "label_id", "group", "source"]}
+                for shape in shapes
+            ],
+        }
+
+    def _make_segments(self):
+        # 3 segments of 5 frames with the overlap of 2 frames: 0-4, 3-7, 6-10
+        segments = []
+        for start_frame, shapes, tracks in [
+            (0, [
+                self._make_shape(1, [0, 0, 5, 5]),
+                self._make_shape(4, [0, 0, 5, 5]),
+            ], [
+                self._make_track([
+                    self._make_shape(0, [0, 0, 10, 10]),
+                    self._make_shape(2, [2, 2, 12, 12], outside=True),
+                ]),
+                self._make_track([
+                    self._make_shape(1, [10, 10, 20, 20]),
+                    self._make_shape(4, [13, 13, 23, 23]),
+                ]),
+            ]),
+            (3, [
+                self._make_shape(4, [0, 0, 5, 5]),
+                self._make_shape(6, [1, 1, 6, 6]),
+            ], [
+                self._make_track([
+                    self._make_shape(3, [12, 12, 22, 22]),
+                    self._make_shape(4, [13, 13, 23, 23]),
+                    self._make_shape(7, [16, 16, 26, 26]),
+                ]),
+            ]),
+            (6, [
+                self._make_shape(6, [1, 1, 6, 6]),
+            ], [
+                self._make_track([
+                    self._make_shape(6, [15, 15, 25, 25]),
+                    self._make_shape(7, [16, 16, 26, 26]),
+                    self._make_shape(9, [18, 18, 28, 28], outside=True),
+                ]),
+                self._make_track([
+                    self._make_shape(8, [30, 30, 40, 40]),
+                ]),
+            ]),
+        ]:
+            segment = AnnotationIR('2d')
+            segment.shapes = shapes
+            segment.tracks = tracks
+            segment.tags = [{
+                "id": None, "frame": start_frame + 1, "label_id": 0, "group": 0,
+                "source": "manual", "attributes": []
+            }]
+            segments.append((start_frame, segment))
+
+        return segments
+
+    def _group_by_frame(self, annotation_ir, frames, track_ids=None):
+        return [
+            (shape["frame"], shape.get("track_id", -1), shape["points"])
+            for shape in AnnotationManager(annotation_ir).to_shapes(11, '2d',
+                included_frames=frames, track_ids=track_ids
+            )
+        ] + [(tag["frame"], -1, []) for tag in annotation_ir.tags if tag["frame"] in frames]
+
+    def test_can_load_merged_annotations(self):
+        expected = AnnotationIR('2d')
+        for start_frame, segment in self._make_segments():
+            AnnotationManager(expected).merge(segment, start_frame, 2, '2d')
+
+        annotations = LazyAnnotationIR('2d', self._make_segments, overlap=2)
+
+        self.assertEqual(expected.data, annotations.data)
+
+    def test_chunks_match_merged_annotations(self):
+        merged = AnnotationIR('2d')
+        for start_frame, segment in self._make_segments():
+            AnnotationManager(merged).merge(segment, start_frame, 2, '2d')
+        expected = sorted(self._group_by_frame(merged, set(range(11))))
+
+        annotations = LazyAnnotationIR('2d', self._make_segments, overlap=2)
+        chunk_ranges = []
+        actual = []
+        for chunk in annotations.iter_chunks():
+            chunk_ranges.append((chunk.start_frame, chunk.stop_frame))
+            chunk_frames = set(range(chunk.start_frame, chunk.stop_frame or 11))
+            actual.extend(self._group_by_frame(chunk.data, chunk_frames, chunk.track_ids))
+
+        self.assertEqual([(0, 3), (3, 6), (6, None)], chunk_ranges)
+        self.assertEqual(expected, sorted(actual))
+
+    def test_can_split_included_frames_by_chunks(self):
+        annotations = LazyAnnotationIR('2d', self._make_segments, overlap=2)
+        chunks = list(annotations.iter_chunks())
+        included_frames = {0, 2, 3, 4, 7, 9, 10} # the other frames are deleted or excluded
+
+        task_data = mock.Mock(_annotation_ir=mock.Mock(**{'iter_chunks.return_value': chunks}))
+        task_data._group_by_frame.side_effect = \
+            lambda annotation_ir, frames, **kwargs: [(annotation_ir, frames)]
+
+        self.assertEqual(
+            [(chunk.data, frames) for chunk, frames in zip(chunks, [{0, 2}, {3, 4}, {7, 9, 10}])],
+            list(CommonData._group_chunks_by_frame(task_data, included_frames,
+                include_empty=False))
+        )
@@ -0,0 +1,268 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from contextlib import ExitStack
+from copy import deepcopy
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+
+from cvat.apps.dataset_manager.task import (
+    JobAnnotation, PatchAction, get_job_data, patch_job_data,
+)
+from cvat.apps.engine.models import (
+    AttributeSpec, AttributeType, Data, Job, JobType, Label, LabeledImageAttributeVal,
+    LabeledShape, LabeledShapeAttributeVal, LabeledTrack, Segment, ShapeType, Task, TrackedShape,
+    TrackedShapeAttributeVal,
+)
+
+
+class AnnotationUpdateTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch('cvat.apps.dataset_manager.task.handle_annotations_change')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.task = Task.objects.create(
+            name='task', data=Data.objects.create(chunk_size=10, size=20, stop_frame=19),
+        )
+        self.label = Label.objects.create(task=self.task, name='car')
+        self.other_label = Label.objects.create(task=self.task, name='person')
+        self.color = AttributeSpec.objects.create(
+            label=self.label, name='color', mutable=False, input_type=AttributeType.SELECT,
+            default_value='red', values='red\ngreen',
+        )
+        self.speed = AttributeSpec.objects.create(
+            label=self.label, name='speed', mutable=True, input_type=AttributeType.NUMBER,
+            default_value='0', values='0\n100\n1',
+        )
+        self.model = AttributeSpec.objects.create(
+            label=self.label, name='model', mutable=True, input_type=AttributeType.TEXT,
+            default_value='', values='',
+        )
+
+        segment = Segment.objects.create(task=self.task, start_frame=0, stop_frame=19)
+        self.job = Job.objects.create(segment=segment, type=JobType.ANNOTATION)
+
+    def _patch(self, action, *, tags=(), shapes=(), tracks=()):
+        return patch_job_data(self.job.id, deepcopy({
+            'version': 0, 'tags': list(tags), 'shapes': list(shapes), 'tracks': list(tracks),
+        }), action)
+
+    def _make_shape(self, **kwargs):
+        shape = {
+            'type': str(ShapeType.RECTANGLE), 'frame': 0, 'label_id': self.label.id,
+            'group': 0, 'source': 'manual', 'occluded': False, 'outside': False, 'z_order': 0,
+            'rotation': 0.0, 'points': [1.0, 2.0, 3.0, 4.0], 'attributes': [
+                {'spec_id': self.color.id, 'value': 'red'},
+                {'spec_id': self.speed.id, 'value': '10'},
+            ],
+        }
+        shape.update(kwargs)
+        return shape
+
+    def _make_track(self, **kwargs):
+        track = {
+            'frame': 0, 'label_id': self.label.id, 'group': 0, 'source': 'manual',
+            'attributes': [{'spec_id': self.color.id, 'value': 'red'}],
+            'shapes': [
+                {
+                    'type': str(ShapeType.RECTANGLE), 'frame': frame, 'occluded': False,
+                    'outside': False, 'z_order': 0, 'rotation': 0.0,
+                    'points': [1.0 + frame, 2.0, 3.0 + frame, 4.0],
+                    'attributes': [{'spec_id': self.speed.id, 'value': str(frame)}],
+                }
+                for frame in [0, 5, 10]
+            ],
+        }
+        track.update(kwargs)
+        return track
+
+    def _get_attr_vals(self, db_model, **filters):
+        return {
+            row['spec_id']: (row['id'], row['value'])
+            for row in db_model.objects.filter(**filters).values('id', 'spec_id', 'value')
+        }
+
+    def _update(self, **data):
+        # The result is compared with the previous implementation,
+        # which deleted and created all the updated objects again
+        with transaction.atomic():
+            with ExitStack() as stack:
+                for method in [
+                    '_update_tags_in_db', '_update_shapes_in_db', '_update_tracks_in_db'
+                ]:
+                    stack.enter_context(mock.patch.object(
+                        JobAnnotation, method, lambda self, objects, delta: objects
+                    ))
+
+                self._patch(PatchAction.UPDATE, **data)
+
+            expected_annotations = get_job_data(self.job.id)
+            transaction.set_rollback(True)
+
+        result = self._patch(PatchAction.UPDATE, **data)
+
+        self.assertEqual(expected_annotations, get_job_data(self.job.id))
+        return result
+
+    def test_can_update_shape_in_place(self):
+        shape = self._patch(PatchAction.CREATE, shapes=[self._make_shape()])['shapes'][0]
+        old_attr_vals = self._get_attr_vals(LabeledShapeAttributeVal, shape_id=shape['id'])
+
+        shape['points'] = [5.0, 6.0, 7.0, 8.0]
+        shape['occluded'] = True
+        shape['attributes'] = [
+            {'spec_id': self.color.id, 'value': 'red'},
+            {'spec_id': self.speed.id, 'value': '20'},
+        ]
+        result = self._update(shapes=[shape])
+
+        db_shape = LabeledShape.objects.get(id=shape['id'])
+        self.assertEqual([5.0, 6.0, 7.0, 8.0], db_shape.points)
+        self.assertTrue(db_shape.occluded)
+        self.assertEqual({
+            self.color.id: old_attr_vals[self.color.id],
+            self.speed.id: (old_attr_vals[self.speed.id][0], '20'),
+        }, self._get_attr_vals(LabeledShapeAttributeVal, shape_id=shape['id']))
+
+    def test_can_add_and_remove_attributes(self):
+        shape = self._patch(PatchAction.CREATE, shapes=[self._make_shape()])['shapes'][0]
+        old_attr_vals = self._get_attr_vals(LabeledShapeAttributeVal, shape_id=shape['id'])
+
+        shape['attributes'] = [
+            {'spec_id': self.color.id, 'value': 'green'},
+            {'spec_id': self.model.id, 'value': 'sedan'},
+        ]
+        self._update(shapes=[shape])
+
+        attr_vals = self._get_attr_vals(LabeledShapeAttributeVal, shape_id=shape['id'])
+        self.assertEqual([self.color.id, self.model.id], sorted(attr_vals))
+        self.assertEqual((old_attr_vals[self.color.id][0], 'green'), attr_vals[self.color.id])
+        self.assertEqual('sedan', attr_vals[self.model.id][1])
+        self.assertFalse(LabeledShapeAttributeVal.objects.filter(
+            id=old_attr_vals[self.speed.id][0]
+        ).exists())
+
+    def test_can_update_tag_in_place(self):
+        tag = self._patch(PatchAction.CREATE, tags=[{
+            'frame': 1, 'label_id': self.label.id, 'group': 0, 'source': 'manual',
+            'attributes': [{'spec_id': self.color.id, 'value': 'red'}],
+        }])['tags'][0]
+        old_attr_vals = self._get_attr_vals(LabeledImageAttributeVal, image_id=tag['id'])
+
+        tag['label_id'] = self.other_label.id
+        tag['attributes'] = []
+        result = self._update(tags=[tag])
+
+        self.assertEqual([tag['id']], [t['id'] for t in result['tags']])
+        self.assertEqual({}, self._get_attr_vals(LabeledImageAttributeVal, image_id=tag['id']))
+        self.assertFalse(LabeledImageAttributeVal.objects.filter(
+            id=old_attr_vals[self.color.id][0]
+        ).exists())
+
+    def test_recreates_objects_which_cant_be_updated_in_place(self):
+        shapes = self._patch(PatchAction.CREATE, shapes=[self._make_shape(), self._make_shape()])
+        kept_shape, recreated_shape = shapes['shapes']
+        kept_attr_vals = self._get_attr_vals(LabeledShapeAttributeVal, shape_id=kept_shape['id'])
+
+        # Repeated attribute specs can't be matched with the DB rows
+        kept_shape['frame'] = 2
+        recreated_shape['frame'] = 3
+        recreated_shape['attributes'] = [
+            {'spec_id': self.model.id, 'value': 'a'},
+            {'spec_id': self.model.id, 'value': 'b'},
+        ]
+
+        with mock.patch.object(
+            JobAnnotation, '_create', autospec=True, side_effect=JobAnnotation._create
+        ) as create:
+            self._update(shapes=[kept_shape, recreated_shape])
+
+        # The first call is made by the reference update, which recreates all the objects
+        self.assertEqual(2, create.call_count)
+        self.assertEqual(
+            [recreated_shape['id']], [shape['id'] for shape in create.call_args[0][1]['shapes']]
+        )
+
+        self.assertEqual(kept_attr_vals, self._get_attr_vals(
+            LabeledShapeAttributeVal, shape_id=kept_shape['id']
+        ))
+        self.assertEqual(
+            ['a', 'b'],
+            sorted(LabeledShapeAttributeVal.objects.filter(
+                shape_id=recreated_shape['id']
+            ).values_list('value', flat=True))
+        )
+        self.assertEqual(
+            {kept_shape['id']: 2, recreated_shape['id']: 3},
+            dict(LabeledShape.objects.values_list('id', 'frame'))
+        )
+
+    def test_can_add_and_remove_tracked_shapes(self):
+        track = self._patch(PatchAction.CREATE, tracks=[self._make_track()])['tracks'][0]
+        db_shape_ids = {shape['frame']: shape['id'] for shape in track['shapes']}
+
+        shape0, _, shape10 = sorted(track['shapes'], key=lambda s: s['frame'])
+        shape0['points'] = [0.0, 0.0, 1.0, 1.0]
+        shape10['attributes'] = [{'spec_id': self.model.id, 'value': 'x'}]
+        new_shape = deepcopy(shape0)
+        new_shape.pop('id')
+        new_shape.update(frame=3, attributes=[{'spec_id': self.speed.id, 'value': '3'}])
+        # The new shape goes last. The reference update relies on bulk_create(),
+        # which returns the objects in the id order on SQLite
+        track['shapes'] = [shape0, shape10, new_shape]
+
+        result = self._update(tracks=[track])
+
+        self.assertEqual([track['id']], list(LabeledTrack.objects.values_list('id', flat=True)))
+        db_shapes = {
+            s.frame: s for s in TrackedShape.objects.filter(track_id=track['id'])
+        }
+        self.assertEqual([0, 3, 10], sorted(db_shapes))
+        self.assertEqual(db_shape_ids[0], db_shapes[0].id)
+        self.assertEqual(db_shape_ids[10], db_shapes[10].id)
+        self.assertFalse(TrackedShape.objects.filter(id=db_shape_ids[5]).exists())
+        self.assertEqual([0.0, 0.0, 1.0, 1.0], db_shapes[0].points)
+        self.assertEqual({self.speed.id: '3'}, {
+            spec_id: value for spec_id, (_, value) in self._get_attr_vals(
+                TrackedShapeAttributeVal, shape_id=db_shapes[3].id
+            ).items()
+        })
+        self.assertEqual([self.model.id], list(self._get_attr_vals(
+            TrackedShapeAttributeVal, shape_id=db_shapes[10].id
+        )))
+
+        self.assertEqual(
+            db_shapes[3].id,
+            next(s['id'] for s in result['tracks'][0]['shapes'] if s['frame'] == 3)
+        )
+
+    def test_rejects_deleted_label(self):
+        shape = self._patch(PatchAction.CREATE, shapes=[self._make_shape()])['shapes'][0]
+
+        deleted_label = Label.objects.create(task=self.task, name='bus')
+        self._patch(PatchAction.CREATE, shapes=[self._make_shape(
+            label_id=deleted_label.id, attributes=[],
+        )])
+        deleted_label_id = deleted_label.id
+        deleted_label.delete()
+
+        shape.update(label_id=deleted_label_id, attributes=[])
+        with self.assertRaisesMessage(ValidationError, 'label_id'):
+            self._patch(PatchAction.UPDATE, shapes=[shape])
+
+        with self.assertRaisesMessage(ValidationError, 'label_id'):
+            self._patch(PatchAction.CREATE, shapes=[shape])
+
+    def test_uses_actual_attribute_mutability(self):
+        track = self._patch(PatchAction.CREATE, tracks=[self._make_track()])['tracks'][0]
+
+        self.speed.mutable = False
+        self.speed.save()
+
+        with self.assertRaisesMessage(ValidationError, 'spec_id'):
+            self._patch(PatchAction.UPDATE, tracks=[track])
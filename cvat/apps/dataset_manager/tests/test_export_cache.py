@@ -0,0 +1,90 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import os.path as osp
+from tempfile import TemporaryDirectory
+
+from cvat.apps.dataset_manager.export_cache import ExportCache
+
+from unittest import TestCase
+
+
+class ExportCacheTest(TestCase):
+    def setUp(self):
+        self._temp_dir = TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _add_file(self, cache: ExportCache, size: int, *,
+        instance_id: int = 1, file_name: str = 'annotations_coco_1_0', content_key: str = 'a',
+        mtime: float = None,
+    ) -> str:
+        instance_dir = cache.get_instance_dir('task', instance_id)
+        os.makedirs(instance_dir, exist_ok=True)
+
+        src_path = osp.join(instance_dir, 'result')
+        with open(src_path, 'wb') as f:
+            f.write(b'0' * size)
+
+        file_path = cache.get_file_path('task', instance_id,
+            file_name=file_name, content_key=content_key, ext='zip')
+        cache.add(src_path, file_path)
+
+        if mtime is not None:
+            os.utime(file_path, (mtime, mtime))
+
+        return file_path
+
+    def test_can_touch_files(self):
+        cache = ExportCache(self._temp_dir.name, max_size=100)
+        file_path = self._add_file(cache, 10)
+        os.utime(file_path, (1, 1))
+
+        self.assertTrue(cache.touch(file_path))
+        self.assertLess(1, osp.getmtime(file_path))
+        self.assertFalse(cache.touch(file_path + '.missing'))
+
+    def test_removes_previous_revisions(self):
+        cache = ExportCache(self._temp_dir.name, max_size=100)
+        old_path = self._add_file(cache, 10, content_key='a')
+        other_format_path = self._add_file(cache, 10,
+            file_name='annotations_coco', content_key='a')
+        other_instance_path = self._add_file(cache, 10, instance_id=2, content_key='a')
+        new_path = self._add_file(cache, 10, content_key='b')
+
+        self.assertFalse(osp.exists(old_path))
+        self.assertTrue(osp.exists(new_path))
+        self.assertTrue(osp.exists(other_format_path))
+        self.assertTrue(osp.exists(other_instance_path))
+
+    def test_evicts_least_recently_used_files(self):
+        cache = ExportCache(self._temp_dir.name, max_size=100)
+        paths = [
+            self._add_file(cache, 40, instance_id=i, mtime=i)
+            for i in range(1, 3)
+        ]
+        cache.touch(paths[0])
+        new_path = self._add_file(cache, 40, instance_id=3)
+
+        self.assertTrue(osp.exists(paths[0]))
+        self.assertFalse(osp.exists(paths[1]))
+        self.assertTrue(osp.exists(new_path))
+
+    def test_keeps_added_file_above_size_limit(self):
+        cache = ExportCache(self._temp_dir.name, max_size=100)
+        old_path = self._add_file(cache, 40, instance_id=1, mtime=1)
+        new_path = self._add_file(cache, 200, instance_id=2)
+
+        self.assertFalse(osp.exists(old_path))
+        self.assertTrue(osp.exists(new_path))
+
+    def test_can_remove_instance_files(self):
+        cache = ExportCache(self._temp_dir.name, max_size=100)
+        removed_path = self._add_file(cache, 10, instance_id=1)
+        kept_path = self._add_file(cache, 10, instance_id=2)
+
+        cache.remove_instance_files('task', 1)
+
+        self.assertFalse(osp.exists(removed_path))
+        self.assertTrue(osp.exists(kept_path))
@@ -0,0 +1,112 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import os.path as osp
+import re
+import zipfile
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+
+from cvat.apps.dataset_manager.project import export_project
+from cvat.apps.engine.frame_provider import FrameProvider
+from cvat.apps.engine.models import (
+    AttributeSpec, AttributeType, Data, Image, Job, JobType, Label, LabeledImage, LabeledShape,
+    LabeledTrack, Project, Segment, ShapeType, Task, TrackedShape,
+)
+
+
+def _get_fake_frame(self, frame_number, quality=FrameProvider.Quality.ORIGINAL,
+    out_type=FrameProvider.Type.BUFFER
+):
+    return io.BytesIO(f'data {self._db_data.id}, frame {frame_number}'.encode()), 'image/jpeg'
+
+
+class ParallelProjectExportTest(TransactionTestCase):
+    # The worker processes are forked, so the test data must be committed
+
+    def setUp(self):
+        self.project = Project.objects.create(name='project')
+        self.label = Label.objects.create(project=self.project, name='car')
+        AttributeSpec.objects.create(
+            label=self.label, name='color', mutable=False, input_type=AttributeType.SELECT,
+            default_value='red', values='red\ngreen',
+        )
+
+        for task_idx in range(3):
+            self._create_task(task_idx, deleted_frames=[1] if task_idx == 1 else [])
+
+    def _create_task(self, task_idx, *, deleted_frames=()):
+        frame_count = 3 + task_idx
+        db_data = Data.objects.create(
+            chunk_size=10, size=frame_count, stop_frame=frame_count - 1,
+            deleted_frames=list(deleted_frames),
+        )
+        Image.objects.bulk_create([
+            Image(data=db_data, path=f'task_{task_idx}/frame_{frame}.jpg', frame=frame,
+                width=100, height=50)
+            for frame in range(frame_count)
+        ])
+
+        db_task = Task.objects.create(
+            name=f'task {task_idx}', project=self.project, data=db_data, mode='annotation',
+            overlap=0, segment_size=frame_count,
+        )
+        db_segment = Segment.objects.create(
+            task=db_task, start_frame=0, stop_frame=frame_count - 1
+        )
+        db_job = Job.objects.create(segment=db_segment, type=JobType.ANNOTATION)
+
+        LabeledImage.objects.create(job=db_job, label=self.label, frame=0)
+        for frame in range(frame_count):
+            LabeledShape.objects.create(
+                job=db_job, label=self.label, frame=frame, type=str(ShapeType.RECTANGLE),
+                points=[frame, task_idx, frame + 10, task_idx + 10],
+            )
+
+        db_track = LabeledTrack.objects.create(job=db_job, label=self.label, frame=0)
+        for frame in [0, frame_count - 1]:
+            TrackedShape.objects.create(
+                track=db_track, frame=frame, type=str(ShapeType.RECTANGLE),
+                points=[1, 2, 3 + frame, 4], outside=frame != 0,
+            )
+
+    def _export(self, *, worker_count, format_name, save_images):
+        with TemporaryDirectory() as temp_dir, \
+            override_settings(DATASET_EXPORT_WORKERS=worker_count), \
+            mock.patch.object(FrameProvider, 'get_frame', _get_fake_frame) \
+        :
+            dst_file = osp.join(temp_dir, 'export.zip')
+            export_project(self.project.id, dst_file, format_name, save_images=save_images)
+
+            with zipfile.ZipFile(dst_file) as archive:
+                return {
+                    name: re.sub(rb'<dumped>.*</dumped>', b'', archive.read(name))
+                    for name in archive.namelist()
+                }
+
+    def test_parallel_export_produces_same_files(self):
+        for format_name, save_images in [
+            ('CVAT for images 1.1', False),
+            ('CVAT for images 1.1', True),
+            ('CVAT for video 1.1', True),
+        ]:
+            with self.subTest(format=format_name, save_images=save_images):
+                serial_export = self._export(
+                    worker_count=1, format_name=format_name, save_images=save_images
+                )
+                parallel_export = self._export(
+                    worker_count=2, format_name=format_name, save_images=save_images
+                )
+
+                self.assertEqual(serial_export, parallel_export)
+
+                image_names = [name for name in serial_export if name.endswith('.jpg')]
+                if save_images:
+                    # 3 tasks with 3, 4 and 5 frames, and 1 deleted frame
+                    self.assertEqual(11, len(image_names))
+                else:
+                    self.assertEqual([], image_names)
@@ -0,0 +1,263 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from psycopg2.extras import Json
+
+from cvat.apps.dataset_manager import util
+from cvat.apps.dataset_manager.util import _CopyRowStream, _format_copy_value, bulk_copy_create
+from cvat.apps.engine.models import (
+    Data, Job, JobType, Label, LabeledImage, LabeledShape, Segment, ShapeType, Task,
+)
+
+
+class CopyValueFormatTest(SimpleTestCase):
+    def test_can_format_null(self):
+        self.assertEqual('\\N', _format_copy_value(None))
+
+    def test_can_format_scalars(self):
+        self.assertEqual('t', _format_copy_value(True))
+        self.assertEqual('f', _format_copy_value(False))
+        self.assertEqual('42', _format_copy_value(42))
+        self.assertEqual('1.5', _format_copy_value(1.5))
+        self.assertEqual('', _format_copy_value(''))
+
+    def test_can_escape_special_characters(self):
+        self.assertEqual('a\\tb\\nc\\rd', _format_copy_value('a\tb\nc\rd'))
+        self.assertEqual('C:\\\\dir\\\\file', _format_copy_value('C:\\dir\\file'))
+
+    def test_does_not_confuse_null_marker_string_with_null(self):
+        self.assertEqual('\\\\N', _format_copy_value('\\N'))
+
+    def test_can_format_json(self):
+        value = {'key': 'a\tb', 'path': 'C:\\dir', 'items': [1, None, True]}
+
+        self.assertEqual(
+            '{"key": "a\\\\tb", "path": "C:\\\\\\\\dir", "items": [1, null, true]}',
+            _format_copy_value(Json(value))
+        )
+
+
+class CopyRowStreamTest(SimpleTestCase):
+    def test_can_read_lines(self):
+        lines = ['first\tline\n', 'второй\n', '\n', 'last\n']
+
+        stream = _CopyRowStream(iter(lines))
+
+        self.assertEqual(''.join(lines).encode(), stream.read())
+
+    def test_can_read_lines_in_parts(self):
+        lines = ['a' * 10 + '\n', 'b\n', 'c' * 20 + '\n']
+        stream = _CopyRowStream(iter(lines))
+
+        parts = []
+        while part := stream.read(7):
+            parts.append(part)
+
+        self.assertEqual(''.join(lines).encode(), b''.join(parts))
+        self.assertTrue(all(len(part) == 7 for part in parts[:-1]))
+
+    def test_produces_lines_on_demand(self):
+        produced_lines = []
+
+        def _generate_lines():
+            for i in range(100):
+                produced_lines.append(i)
+                yield f'{i}\n'
+
+        stream = _CopyRowStream(_generate_lines())
+        stream.read(5)
+
+        self.assertLess(len(produced_lines), 10)
+
+
+class _FakeCursor:
+    def __init__(self, *, first_id: int = 100):
+        self.queries = []
+        self.copied_data = None
+        self._next_id = first_id
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.queries.append((sql, params))
+
+        if 'pg_get_serial_sequence' in sql:
+            self._rows = [('{}_id_seq'.format(params[0]),)]
+        elif 'nextval' in sql:
+            count = params[1]
+            self._rows = [(self._next_id + i,) for i in reversed(range(count))]
+            self._next_id += count
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+    def copy_expert(self, sql, file, size=8192):
+        self.queries.append((sql, None))
+
+        data = b''
+        while chunk := file.read(size):
+            data += chunk
+        self.copied_data = data.decode()
+
+
+class BulkCopyCreateTest(TestCase):
+    def setUp(self):
+        util._sequence_names.clear()
+        self.addCleanup(util._sequence_names.clear)
+
+        self.cursor = _FakeCursor()
+
+        patchers = [
+            mock.patch.dict(util.settings.DATABASES['default'],
+                ENGINE='django.db.backends.postgresql'),
+            mock.patch.object(util.connection, 'cursor', return_value=self.cursor),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _make_shape(self, **kwargs) -> LabeledShape:
+        params = dict(
+            job_id=3, label_id=4, frame=5, group=None, source='manual',
+            type=str(ShapeType.RECTANGLE), occluded=True, outside=False, z_order=0,
+            points=[1.0, 2.5, 3.0, 4.0], rotation=0.0,
+        )
+        params.update(kwargs)
+        return LabeledShape(**params)
+
+    def test_can_write_objects_with_copy(self):
+        shapes = [self._make_shape(), self._make_shape(frame=6, group=2, source='auto')]
+
+        returned_shapes = bulk_copy_create(LabeledShape, shapes, flt_param={'job_id': 3})
+
+        self.assertEqual(shapes, returned_shapes)
+
+        copy_query = self.cursor.queries[-1][0]
+        columns = [field.column for field in LabeledShape._meta.concrete_fields]
+        self.assertEqual(
+            'COPY {} ({}) FROM STDIN'.format(
+                connection.ops.quote_name(LabeledShape._meta.db_table),
+                ', '.join(connection.ops.quote_name(c) for c in columns)
+            ),
+            copy_query
+        )
+
+        rows = [
+            dict(zip(columns, line.split('\t')))
+            for line in self.cursor.copied_data.splitlines()
+        ]
+        self.assertEqual([
+            {
+                'id': '100', 'job_id': '3', 'label_id': '4', 'frame': '5', 'group': '\\N',
+                'source': 'manual', 'type': 'rectangle', 'occluded': 't', 'outside': 'f',
+                'z_order': '0', 'points': '1.0,2.5,3.0,4.0', 'rotation': '0.0', 'parent_id': '\\N',
+            },
+            {
+                'id': '101', 'job_id': '3', 'label_id': '4', 'frame': '6', 'group': '2',
+                'source': 'auto', 'type': 'rectangle', 'occluded': 't', 'outside': 'f',
+                'z_order': '0', 'points': '1.0,2.5,3.0,4.0', 'rotation': '0.0', 'parent_id': '\\N',
+            },
+        ], rows)
+
+        for shape in shapes:
+            self.assertFalse(shape._state.adding)
+
+    def test_reserves_ids_from_table_sequence(self):
+        shapes = [self._make_shape() for _ in range(3)]
+
+        bulk_copy_create(LabeledShape, shapes, flt_param={})
+
+        self.assertEqual([100, 101, 102], [shape.id for shape in shapes])
+
+        table = LabeledShape._meta.db_table
+        self.assertEqual(
+            [
+                ('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id']),
+                ('SELECT nextval(%s) FROM generate_series(1, %s)', [table + '_id_seq', 3]),
+            ],
+            self.cursor.queries[:-1]
+        )
+
+    def test_caches_sequence_names(self):
+        bulk_copy_create(LabeledShape, [self._make_shape()], flt_param={})
+        bulk_copy_create(LabeledShape, [self._make_shape()], flt_param={})
+
+        self.assertEqual(1, sum(
+            'pg_get_serial_sequence' in sql for sql, _ in self.cursor.queries
+        ))
+
+    def test_keeps_explicit_ids(self):
+        shapes = [self._make_shape(id=7), self._make_shape(), self._make_shape(id=5)]
+
+        bulk_copy_create(LabeledShape, shapes, flt_param={})
+
+        self.assertEqual([7, 100, 5], [shape.id for shape in shapes])
+        self.assertEqual(
+            ['7', '100', '5'],
+            [line.split('\t')[0] for line in self.cursor.copied_data.splitlines()]
+        )
+        self.assertIn(
+            ('SELECT nextval(%s) FROM generate_series(1, %s)',
+                [LabeledShape._meta.db_table + '_id_seq', 1]),
+            self.cursor.queries
+        )
+
+    def test_does_not_reserve_ids_if_all_objects_have_ids(self):
+        bulk_copy_create(LabeledShape, [self._make_shape(id=7)], flt_param={})
+
+        self.assertEqual(1, len(self.cursor.queries))
+        self.assertTrue(self.cursor.queries[0][0].startswith('COPY'))
+
+    def test_escapes_values(self):
+        shape = self._make_shape(source='a\tb\\c\nd')
+
+        bulk_copy_create(LabeledShape, [shape], flt_param={})
+
+        self.assertEqual(1, len(self.cursor.copied_data.splitlines()))
+        self.assertIn('\ta\\tb\\\\c\\nd\t', self.cursor.copied_data)
+
+    def test_does_nothing_for_empty_object_list(self):
+        self.assertEqual([], bulk_copy_create(LabeledShape, [], flt_param={}))
+        self.assertEqual([], self.cursor.queries)
+
+
+class BulkCopyCreateFallbackTest(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(
+            name='task', data=Data.objects.create(chunk_size=10, size=20, stop_frame=19),
+        )
+        self.label = Label.objects.create(task=self.task, name='car')
+        segment = Segment.objects.create(task=self.task, start_frame=0, stop_frame=19)
+        self.job = Job.objects.create(segment=segment, type=JobType.ANNOTATION)
+
+    def test_uses_bulk_create_on_other_databases(self):
+        self.assertNotIn('postgresql', util.settings.DATABASES['default']['ENGINE'])
+        LabeledImage.objects.create(job=self.job, label=self.label, frame=0)
+
+        with mock.patch.object(util, '_reserve_ids') as reserve_ids:
+            tags = bulk_copy_create(LabeledImage, [
+                LabeledImage(job=self.job, label=self.label, frame=frame, source='a\tb')
+                for frame in range(1, 4)
+            ], flt_param={'job_id': self.job.id})
+
+        reserve_ids.assert_not_called()
+        self.assertEqual([1, 2, 3], sorted(tag.frame for tag in tags))
+        self.assertTrue(all(tag.id is not None for tag in tags))
+        self.assertEqual(
+            {tag.id: tag.frame for tag in tags},
+            dict(LabeledImage.objects.filter(source='a\tb').values_list('id', 'frame'))
+        )
+        self.assertEqual(4, LabeledImage.objects.filter(job=self.job).count())
@@ -3,22 +3,23 @@
 #
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import json
 import os
 import os.path as osp
 import tempfile
 from datetime import timedelta
 
-import django_rq
 from datumaro.util.os_util import make_file_name
 from datumaro.util import to_snake_case
-from django.utils import timezone
-from django.conf import settings
 
 import cvat.apps.dataset_manager.task as task
 import cvat.apps.dataset_manager.project as project
+from cvat import __version__ as cvat_version
 from cvat.apps.engine.log import ServerLogManager
-from cvat.apps.engine.models import Project, Task, Job
+from cvat.apps.engine.models import AttributeSpec, Label, Project, Task, Job
 
+from .export_cache import get_export_cache
 from .formats.registry import EXPORT_FORMATS, IMPORT_FORMATS
 from .util import current_function_name
 
@@ -46,61 +47,108 @@ TASK_CACHE_TTL = DEFAULT_CACHE_TTL
 PROJECT_CACHE_TTL = DEFAULT_CACHE_TTL / 3
 JOB_CACHE_TTL = DEFAULT_CACHE_TTL
 
+_EXPORT_CACHE_KEY_TASK_FIELDS = (
+    'id', 'name', 'mode', 'overlap', 'bug_tracker', 'subset', 'dimension', 'created_date',
+    'owner__username', 'owner__email', 'assignee__username', 'assignee__email',
+    'data_id', 'data__start_frame', 'data__stop_frame', 'data__frame_filter',
+    'data__size', 'data__deleted_frames',
+)
+_EXPORT_CACHE_KEY_JOB_FIELDS = (
+    'id', 'type', 'updated_date', 'assignee__username', 'assignee__email',
+    'segment__task_id', 'segment__start_frame', 'segment__stop_frame', 'segment__frames',
+)
+_EXPORT_CACHE_KEY_PROJECT_FIELDS = (
+    'id', 'name', 'bug_tracker', 'created_date',
+    'owner__username', 'owner__email', 'assignee__username', 'assignee__email',
+)
+
+def get_export_cache_key(db_instance, dst_format, *, server_url=None, save_images=False) -> str:
+    """
+    Computes a hash of the data an export depends on: the annotation revisions
+    of the jobs, the exported frames, the label schema, the instance fields written
+    into the exported metadata and the export options.
+    """
+
+    if isinstance(db_instance, Project):
+        db_tasks = Task.objects.filter(project_id=db_instance.id)
+        db_jobs = Job.objects.filter(segment__task__project_id=db_instance.id)
+        db_labels = Label.objects.filter(project_id=db_instance.id)
+        project_fields = list(Project.objects.filter(id=db_instance.id)
+            .values_list(*_EXPORT_CACHE_KEY_PROJECT_FIELDS))
+    else:
+        if isinstance(db_instance, Task):
+            db_task = db_instance
+            db_jobs = Job.objects.filter(segment__task_id=db_task.id)
+        else:
+            db_task = db_instance.segment.task
+            db_jobs = Job.objects.filter(id=db_instance.id)
+
+        db_tasks = Task.objects.filter(id=db_task.id)
+        if db_task.project_id:
+            db_labels = Label.objects.filter(project_id=db_task.project_id)
+        else:
+            db_labels = Label.objects.filter(task_id=db_task.id)
+        project_fields = None
+
+    key_data = {
+        'version': cvat_version,
+        'instance': [db_instance.__class__.__name__.lower(), db_instance.id],
+        'format': dst_format,
+        'save_images': save_images,
+        'server_url': server_url,
+        'project': project_fields,
+        'tasks': list(db_tasks.order_by('id').values_list(*_EXPORT_CACHE_KEY_TASK_FIELDS)),
+        # the job update date is changed on each annotation update
+        'jobs': list(db_jobs.order_by('id').values_list(*_EXPORT_CACHE_KEY_JOB_FIELDS)),
+        'labels': list(db_labels.order_by('id').values_list(
+            'id', 'name', 'color', 'type', 'parent_id', 'skeleton__svg')),
+        'attributes': list(AttributeSpec.objects.filter(label__in=db_labels).order_by('id')
+            .values_list('id', 'label_id', 'name', 'mutable', 'input_type',
+                'default_value', 'values')),
+    }
+
+    return hashlib.sha256(json.dumps(key_data, default=str).encode()).hexdigest()
+
 def export(dst_format, project_id=None, task_id=None, job_id=None, server_url=None, save_images=False):
     try:
         if task_id is not None:
             logger = slogger.task[task_id]
-            cache_ttl = TASK_CACHE_TTL
             export_fn = task.export_task
             db_instance = Task.objects.get(pk=task_id)
         elif project_id is not None:
             logger = slogger.project[project_id]
-            cache_ttl = PROJECT_CACHE_TTL
             export_fn = project.export_project
             db_instance = Project.objects.get(pk=project_id)
         else:
             logger = slogger.job[job_id]
-            cache_ttl = JOB_CACHE_TTL
             export_fn = task.export_job
             db_instance = Job.objects.get(pk=job_id)
 
-        cache_dir = get_export_cache_dir(db_instance)
-
+        export_cache = get_export_cache()
         exporter = EXPORT_FORMATS[dst_format]
-        output_base = '%s_%s' % ('dataset' if save_images else 'annotations',
-            make_file_name(to_snake_case(dst_format)))
-        output_path = '%s.%s' % (output_base, exporter.EXT)
-        output_path = osp.join(cache_dir, output_path)
-
-        instance_time = timezone.localtime(db_instance.updated_date).timestamp()
-        if isinstance(db_instance, Project):
-            tasks_update = list(map(lambda db_task: timezone.localtime(
-                db_task.updated_date).timestamp(), db_instance.tasks.all()))
-            instance_time = max(tasks_update + [instance_time])
-        if not (osp.exists(output_path) and \
-                instance_time <= osp.getmtime(output_path)):
+        output_path = export_cache.get_file_path(
+            db_instance.__class__.__name__.lower(), db_instance.id,
+            file_name='%s_%s' % ('dataset' if save_images else 'annotations',
+                make_file_name(to_snake_case(dst_format))),
+            content_key=get_export_cache_key(db_instance, dst_format,
+                server_url=server_url, save_images=save_images),
+            ext=exporter.EXT,
+        )
+
+        if not export_cache.touch(output_path):
+            cache_dir = osp.dirname(output_path)
             os.makedirs(cache_dir, exist_ok=True)
             with tempfile.TemporaryDirectory(dir=cache_dir) as temp_dir:
                 temp_file = osp.join(temp_dir, 'result')
                 export_fn(db_instance.id, temp_file, dst_format,
                     server_url=server_url, save_images=save_images)
-                os.replace(temp_file, output_path)
-
-            archive_ctime = osp.getctime(output_path)
-            scheduler = django_rq.get_scheduler(settings.CVAT_QUEUES.EXPORT_DATA.value)
-            cleaning_job = scheduler.enqueue_in(time_delta=cache_ttl,
-                func=clear_export_cache,
-                file_path=output_path,
-                file_ctime=archive_ctime,
-                logger=logger)
+                export_cache.add(temp_file, output_path)
+
             logger.info(
-                "The {} '{}' is exported as '{}' at '{}' "
-                "and available for downloading for the next {}. "
-                "Export cache cleaning job is enqueued, id '{}'".format(
+                "The {} '{}' is exported as '{}' at '{}'".format(
                     db_instance.__class__.__name__.lower(),
                     db_instance.name if isinstance(db_instance, (Project, Task)) else db_instance.id,
-                    dst_format, output_path, cache_ttl,
-                    cleaning_job.id
+                    dst_format, output_path
                 ))
 
         return output_path
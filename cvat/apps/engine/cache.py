@@ -3,22 +3,33 @@
 #
 # SPDX-License-Identifier: MIT
 
+import concurrent.futures
+import hashlib
 import io
+import mmap
 import os
+import struct
+import threading
+import time
 import zipfile
+from collections import OrderedDict
 from datetime import datetime, timezone
 from io import BytesIO
 import shutil
 import tempfile
 import zlib
 
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import cv2
+import django_rq
 import PIL.Image
 import pickle # nosec
 from django.conf import settings
 from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.utils.encoding import force_str
+from redis.exceptions import LockError
 from rest_framework.exceptions import NotFound, ValidationError
 
 from cvat.apps.engine.cloud_provider import (Credentials,
@@ -33,17 +44,556 @@ from cvat.apps.engine.media_extractors import (ImageDatasetManifestReader,
                                                ZipCompressedChunkWriter)
 from cvat.apps.engine.mime_types import mimetypes
 from cvat.apps.engine.models import (DataChoice, DimensionType, Job, Image,
-                                     StorageChoice, CloudStorage)
+                                     SegmentType, StorageChoice, CloudStorage)
 from cvat.apps.engine.utils import md5_hash, preload_images
 from utils.dataset_manifest import ImageManifestManager
 
 slogger = ServerLogManager(__name__)
 
+# A cache item is a (data, mime type, checksum) tuple
+_CacheItem = Tuple[io.BytesIO, str, int]
+
+# Fixed header of the serialized cache items: magic, data checksum, mime type length
+_ITEM_HEADER = struct.Struct('<4sIH')
+_ITEM_MAGIC = b'CVC1'
+
+def _pack_item_header(mime: str, checksum: int) -> bytes:
+    encoded_mime = mime.encode()
+    return _ITEM_HEADER.pack(_ITEM_MAGIC, checksum, len(encoded_mime)) + encoded_mime
+
+def _unpack_item_header(buffer) -> Optional[Tuple[str, int, int]]:
+    """
+    Parses the item header in the buffer.
+    Returns the mime type, the checksum and the data offset,
+    or None if the buffer doesn't contain a valid header.
+    """
+
+    if len(buffer) < _ITEM_HEADER.size:
+        return None
+
+    magic, checksum, mime_length = _ITEM_HEADER.unpack_from(buffer)
+    if magic != _ITEM_MAGIC:
+        return None
+
+    data_offset = _ITEM_HEADER.size + mime_length
+    if len(buffer) < data_offset:
+        return None
+
+    mime = bytes(buffer[_ITEM_HEADER.size:data_offset]).decode()
+    return mime, checksum, data_offset
+
+def _get_item_data(item: _CacheItem):
+    data = item[0]
+    return data.getbuffer() if isinstance(data, io.BytesIO) else data
+
+def _is_expired(expires_at: Optional[float]) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+def _check_item_checksum(item: _CacheItem) -> bool:
+    item_checksum = item[2] if len(item) == 3 else None
+    return item_checksum == zlib.crc32(_get_item_data(item))
+
+
+class CacheTierStats:
+    __slots__ = ('hits', 'misses', 'evictions')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return { name: getattr(self, name) for name in self.__slots__ }
+
+
+class _CacheTier:
+    name: str
+
+    # Items from trusted tiers are not checked for integrity on read,
+    # their checksum is checked once, when the tier is filled
+    trusted: bool = False
+
+    def __init__(self):
+        self.stats = CacheTierStats()
+
+    def get(self, key: str) -> Tuple[Optional[_CacheItem], Optional[float]]:
+        """
+        Returns the item and its expiration time (a Unix timestamp).
+        The expiration time is None if it is unknown.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, item: _CacheItem, expires_at: Optional[float] = None) -> None:
+        """
+        Stores the item until the expiration time (a Unix timestamp).
+        If the expiration time is None, the item is stored until evicted.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class _MemoryCacheTier(_CacheTier):
+    """
+    A bounded in-process LRU cache. Each process (e.g. each server worker) has its own copy.
+    """
+
+    name = 'memory'
+    trusted = True
+
+    def __init__(self, max_size: int, max_items: int):
+        super().__init__()
+        self._max_size = max_size
+        self._max_items = max_items
+        self._size = 0
+        self._items: OrderedDict[str, Tuple[bytes, str, int, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            stored_item = self._items.get(key)
+            if stored_item is not None and _is_expired(stored_item[3]):
+                self._pop(key)
+                stored_item = None
+
+            if stored_item is None:
+                self.stats.misses += 1
+                return None, None
+
+            self._items.move_to_end(key)
+            self.stats.hits += 1
+
+        data, mime, checksum, expires_at = stored_item
+
+        # BytesIO shares the buffer with the immutable bytes object until it is modified
+        return (BytesIO(data), mime, checksum), expires_at
+
+    def set(self, key, item, expires_at=None):
+        data = item[0].getvalue() if isinstance(item[0], BytesIO) else bytes(item[0])
+        if self._max_size < len(data) or _is_expired(expires_at):
+            return
+
+        with self._lock:
+            self._pop(key)
+
+            self._items[key] = (data, item[1], item[2], expires_at)
+            self._size += len(data)
+
+            while self._max_size < self._size or self._max_items < len(self._items):
+                self._pop(next(iter(self._items)))
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def _pop(self, key):
+        stored_item = self._items.pop(key, None)
+        if stored_item is not None:
+            self._size -= len(stored_item[0])
+
+
+class _DiskCacheTier(_CacheTier):
+    """
+    A size-capped cache in the local file system, shared by the processes on the same host.
+    Items are stored as files with the expiration time and a fixed header
+    and read via memory mapping. Expired items are ignored.
+    The least recently used files are evicted when the size limit is exceeded.
+    """
+
+    # The expiration time of the item, a Unix timestamp
+    _EXPIRATION_HEADER = struct.Struct('<d')
+
+    name = 'disk'
+
+    # After an eviction, the tier is cleaned down to this fraction of its max size
+    _EVICTION_TARGET_RATIO = 0.9
+
+    def __init__(self, root: str, max_size: int):
+        super().__init__()
+        self._root = root
+        self._max_size = max_size
+        self._size = None # lazily estimated, as other processes can also modify the directory
+        self._lock = threading.Lock()
+
+        os.makedirs(self._root, exist_ok=True)
+
+    def _get_item_path(self, key: str) -> str:
+        return os.path.join(self._root, hashlib.sha1(key.encode()).hexdigest()) # nosec
+
+    def get(self, key):
+        path = self._get_item_path(key)
+
+        try:
+            with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                header = None
+                if self._EXPIRATION_HEADER.size <= len(mapped_file):
+                    expires_at, = self._EXPIRATION_HEADER.unpack_from(mapped_file)
+                    if not _is_expired(expires_at):
+                        with memoryview(mapped_file) as buffer:
+                            header = _unpack_item_header(buffer[self._EXPIRATION_HEADER.size:])
+
+                if header is None:
+                    self.stats.misses += 1
+                    return None, None
+
+                mime, checksum, data_offset = header
+                data = mapped_file[self._EXPIRATION_HEADER.size + data_offset:]
+
+            # Update the file access time for the LRU eviction
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            # ValueError is raised for empty files, which can't be mapped
+            self.stats.misses += 1
+            return None, None
+
+        self.stats.hits += 1
+        return (BytesIO(data), mime, checksum), expires_at
+
+    def set(self, key, item, expires_at=None):
+        data = _get_item_data(item)
+        if self._max_size < len(data) or _is_expired(expires_at):
+            return
+
+        path = self._get_item_path(key)
+        with tempfile.NamedTemporaryFile(dir=self._root, prefix='.', delete=False) as f:
+            try:
+                f.write(self._EXPIRATION_HEADER.pack(
+                    expires_at if expires_at is not None else float('inf')
+                ))
+                f.write(_pack_item_header(item[1], item[2]))
+                f.write(data)
+                file_size = f.tell()
+                f.close()
+
+                # rename is atomic, concurrent readers will see either the old or the new file
+                os.replace(f.name, path)
+            except Exception:
+                os.unlink(f.name)
+                raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._compute_size()
+            else:
+                self._size += file_size
+
+            if self._max_size < self._size:
+                self._evict()
+
+    def delete(self, key):
+        try:
+            os.unlink(self._get_item_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _list_files(self) -> List[os.DirEntry]:
+        return [
+            entry for entry in os.scandir(self._root)
+            if entry.is_file() and not entry.name.startswith('.')
+        ]
+
+    def _compute_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._list_files())
+
+    def _evict(self):
+        files = []
+        for entry in self._list_files():
+            try:
+                files.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+            except FileNotFoundError:
+                pass # removed by another process
+
+        self._size = sum(file_size for _, file_size, _ in files)
+        target_size = self._max_size * self._EVICTION_TARGET_RATIO
+        for _, file_size, file_path in sorted(files):
+            if self._size <= target_size:
+                break
+
+            try:
+                os.unlink(file_path)
+                self.stats.evictions += 1
+            except FileNotFoundError:
+                pass
+
+            self._size -= file_size
+
+
+def _get_redis_client(cache):
+    if not isinstance(cache, RedisCache):
+        return None
+
+    # The Django cache backend doesn't provide a public way to get the client
+    return cache._cache.get_client(write=True) # pylint: disable=protected-access
+
+
+class _RedisCacheTier(_CacheTier):
+    """
+    The shared cache. The eviction is controlled by the item TTL
+    and the memory policy of the Redis server.
+
+    Item data is stored as raw bytes, and the item metadata is stored in a separate small key.
+    This allows to avoid unpickling and copying of the data on each read.
+    Items stored with pickle by the Django cache backend are still supported for reading.
+    """
+
+    name = 'redis'
+
+    _META_KEY_SUFFIX = ':meta'
+
+    def __init__(self, cache):
+        super().__init__()
+        self._cache = cache
+        self._client = _get_redis_client(cache)
+
+    def _make_keys(self, key: str) -> Tuple[str, str]:
+        data_key = self._cache.make_and_validate_key(key)
+        return data_key, data_key + self._META_KEY_SUFFIX
+
+    def get(self, key):
+        expires_at = None
+
+        try:
+            if self._client:
+                item, expires_at = self._get_raw(key)
+            else:
+                item = self._cache.get(key)
+        except pickle.UnpicklingError:
+            slogger.glob.error(f'Unable to get item from cache: key {key}', exc_info=True)
+            item = None
+
+        if item:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+
+        return item or None, expires_at
+
+    def _get_raw(self, key) -> Tuple[Optional[_CacheItem], Optional[float]]:
+        data_key, meta_key = self._make_keys(key)
+        with self._client.pipeline(transaction=False) as pipe:
+            pipe.mget(data_key, meta_key)
+            pipe.pttl(data_key)
+            (data, meta), ttl = pipe.execute()
+
+        if data is None:
+            return None, None
+
+        # A negative TTL means that the key doesn't expire
+        expires_at = time.time() + ttl / 1000 if 0 <= ttl else None
+
+        if meta is None:
+            # The item was stored by the Django cache backend
+            return pickle.loads(data), expires_at # nosec
+
+        header = _unpack_item_header(meta)
+        if header is None:
+            return None, None
+
+        mime, checksum, _ = header
+
+        # BytesIO shares the buffer with the immutable bytes object until it is modified
+        return (BytesIO(data), mime, checksum), expires_at
+
+    def set(self, key, item, expires_at=None):
+        # The expiration is controlled by the cache backend timeout
+        if not self._client:
+            self._cache.set(key, item)
+            return
+
+        data_key, meta_key = self._make_keys(key)
+        timeout = self._cache.get_backend_timeout()
+        with self._client.pipeline() as pipe:
+            pipe.set(data_key, _get_item_data(item), ex=timeout)
+            pipe.set(meta_key, _pack_item_header(item[1], item[2]), ex=timeout)
+            pipe.execute()
+
+    def delete(self, key):
+        if self._client:
+            self._client.delete(*self._make_keys(key))
+        else:
+            self._cache.delete(key)
+
+
+_local_cache_tiers: Optional[List[_CacheTier]] = None
+_local_cache_tiers_lock = threading.Lock()
+
+def _get_local_cache_tiers() -> List[_CacheTier]:
+    global _local_cache_tiers # pylint: disable=global-statement
+
+    with _local_cache_tiers_lock:
+        if _local_cache_tiers is None:
+            tiers = []
+
+            if settings.MEDIA_CACHE_MEMORY_TIER_SIZE:
+                tiers.append(_MemoryCacheTier(
+                    max_size=settings.MEDIA_CACHE_MEMORY_TIER_SIZE,
+                    max_items=settings.MEDIA_CACHE_MEMORY_TIER_MAX_ITEMS,
+                ))
+
+            if settings.MEDIA_CACHE_DISK_TIER_SIZE:
+                tiers.append(_DiskCacheTier(
+                    root=settings.MEDIA_CACHE_DISK_TIER_ROOT,
+                    max_size=settings.MEDIA_CACHE_DISK_TIER_SIZE,
+                ))
+
+            _local_cache_tiers = tiers
+
+    return _local_cache_tiers
+
+
+class SingleFlightStats:
+    __slots__ = ('builds', 'coalesced', 'wait_timeouts')
+
+    def __init__(self):
+        self.builds = 0
+        self.coalesced = 0
+        self.wait_timeouts = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return { name: getattr(self, name) for name in self.__slots__ }
+
+
+class _SingleFlight:
+    """
+    Makes sure only one worker across all the processes prepares an item for a cache key.
+    The worker holding the key lock prepares the item, the others wait
+    for the notification and then read the prepared item from the cache.
+    """
+
+    _LOCK_KEY_PREFIX = 'media-cache-lock:'
+    _CHANNEL_KEY_PREFIX = 'media-cache-ready:'
+
+    stats = SingleFlightStats()
+
+    def __init__(self, client, *, wait_timeout: float, lock_timeout: float):
+        self._client = client
+        self._wait_timeout = wait_timeout
+        self._lock_timeout = lock_timeout
+
+    def run(
+        self,
+        key: str,
+        get_item: Callable[[], Optional[_CacheItem]],
+        create_item: Callable[[], _CacheItem],
+    ) -> _CacheItem:
+        lock = self._client.lock(self._LOCK_KEY_PREFIX + key, timeout=self._lock_timeout)
+        if lock.acquire(blocking=False):
+            try:
+                # The item could be prepared while we were checking the cache
+                item = get_item()
+                if not item:
+                    self.stats.builds += 1
+                    item = create_item()
+            finally:
+                try:
+                    lock.release()
+                except LockError:
+                    slogger.glob.warning(f'The preparation lock for {key} expired before release')
+
+                self._client.publish(self._CHANNEL_KEY_PREFIX + key, 1)
+
+            return item
+
+        self.stats.coalesced += 1
+        slogger.glob.info(f'Waiting for another worker to prepare the cache item: key {key}')
+
+        item = self._wait(key, lock, get_item)
+        if not item:
+            # The other worker has failed or is too slow, prepare the item here
+            self.stats.wait_timeouts += 1
+            item = create_item()
+
+        return item
+
+    def _wait(self, key, lock, get_item) -> Optional[_CacheItem]:
+        deadline = time.monotonic() + self._wait_timeout
+
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self._CHANNEL_KEY_PREFIX + key)
+
+            # The notification could be sent before we subscribed
+            while lock.locked():
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0:
+                    return None
+
+                # Wake up periodically in case the lock holder died without a notification
+                if pubsub.get_message(timeout=min(remaining_time, 1)):
+                    break
+        finally:
+            pubsub.close()
+
+        return get_item()
+
+
+def _get_single_flight(cache) -> Optional[_SingleFlight]:
+    client = _get_redis_client(cache)
+    if not settings.MEDIA_CACHE_PREPARATION_WAIT_TIMEOUT or not client:
+        return None
+
+    return _SingleFlight(client,
+        wait_timeout=settings.MEDIA_CACHE_PREPARATION_WAIT_TIMEOUT,
+        lock_timeout=settings.MEDIA_CACHE_PREPARATION_LOCK_TIMEOUT,
+    )
+
+
 class MediaCache:
     def __init__(self, dimension=DimensionType.DIM_2D):
         self._dimension = dimension
         self._cache = caches['media']
 
+        # The tiers are ordered from the fastest to the slowest one
+        self._tiers: List[_CacheTier] = [
+            *_get_local_cache_tiers(),
+            _RedisCacheTier(self._cache),
+        ]
+
+        self._single_flight = _get_single_flight(self._cache)
+
+    def get_tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        return { tier.name: tier.stats.to_dict() for tier in self._tiers }
+
+    @staticmethod
+    def get_single_flight_stats() -> Dict[str, int]:
+        return _SingleFlight.stats.to_dict()
+
+    def _get_default_expiration_time(self) -> Optional[float]:
+        timeout = self._cache.default_timeout
+        return time.time() + timeout if timeout is not None else None
+
+    def _get_cache_item(self, key) -> Optional[_CacheItem]:
+        for tier_index, tier in enumerate(self._tiers):
+            item, expires_at = tier.get(key)
+            if not item:
+                continue
+
+            if not tier.trusted and not _check_item_checksum(item):
+                slogger.glob.info(
+                    f'Cache item {key} has an invalid checksum in the {tier.name} cache tier'
+                )
+                tier.delete(key)
+                return None
+
+            # Fill the faster tiers, the items there must not outlive the item in this tier
+            if expires_at is None:
+                expires_at = self._get_default_expiration_time()
+
+            for upper_tier in self._tiers[:tier_index]:
+                upper_tier.set(key, item, expires_at)
+
+            return item
+
+        return None
+
+    def _set_cache_item(self, key, item: _CacheItem):
+        expires_at = self._get_default_expiration_time()
+        for tier in self._tiers:
+            tier.set(key, item, expires_at)
+
     def _get_or_set_cache_item(self, key, create_function):
         def create_item():
             slogger.glob.info(f'Starting to prepare chunk: key {key}')
@@ -52,33 +602,35 @@ class MediaCache:
 
             if item[0]:
                 item = (item[0], item[1], zlib.crc32(item[0].getbuffer()))
-                self._cache.set(key, item)
+                self._set_cache_item(key, item)
 
             return item
 
         slogger.glob.info(f'Starting to get chunk from cache: key {key}')
-        try:
-            item = self._cache.get(key)
-        except pickle.UnpicklingError:
-            slogger.glob.error(f'Unable to get item from cache: key {key}', exc_info=True)
-            item = None
+        item = self._get_cache_item(key)
         slogger.glob.info(f'Ending to get chunk from cache: key {key}, is_cached {bool(item)}')
 
         if not item:
-            item = create_item()
-        else:
-            # compare checksum
-            item_data = item[0].getbuffer() if isinstance(item[0], io.BytesIO) else item[0]
-            item_checksum = item[2] if len(item) == 3 else None
-            if item_checksum != zlib.crc32(item_data):
-                slogger.glob.info(f'Recreating cache item {key} due to checksum mismatch')
+            if self._single_flight:
+                item = self._single_flight.run(key,
+                    get_item=lambda: self._get_cache_item(key), create_item=create_item,
+                )
+            else:
                 item = create_item()
 
         return item[0], item[1]
 
+    @staticmethod
+    def _make_task_chunk_key(db_data_id, chunk_number, quality) -> str:
+        return f'{db_data_id}_{chunk_number}_{quality}'
+
+    @staticmethod
+    def _make_selective_job_chunk_key(job_id, chunk_number, quality) -> str:
+        return f'job_{job_id}_{chunk_number}_{quality}'
+
     def get_task_chunk_data_with_mime(self, chunk_number, quality, db_data):
         item = self._get_or_set_cache_item(
-            key=f'{db_data.id}_{chunk_number}_{quality}',
+            key=self._make_task_chunk_key(db_data.id, chunk_number, quality),
             create_function=lambda: self._prepare_task_chunk(db_data, quality, chunk_number),
         )
 
@@ -86,12 +638,33 @@ class MediaCache:
 
     def get_selective_job_chunk_data_with_mime(self, chunk_number, quality, job):
         item = self._get_or_set_cache_item(
-            key=f'job_{job.id}_{chunk_number}_{quality}',
+            key=self._make_selective_job_chunk_key(job.id, chunk_number, quality),
             create_function=lambda: self.prepare_selective_job_chunk(job, quality, chunk_number),
         )
 
         return item
 
+    def get_job_chunk_key(self, db_job: Job, chunk_number, quality) -> str:
+        if db_job.segment.type == SegmentType.SPECIFIC_FRAMES:
+            return self._make_selective_job_chunk_key(db_job.id, chunk_number, quality)
+
+        return self._make_task_chunk_key(db_job.segment.task.data.id, chunk_number, quality)
+
+    def has_cache_item(self, key) -> bool:
+        # Both raw and pickled items are stored under the same key
+        return self._cache.has_key(key)
+
+    def has_cache_items(self, keys: Sequence[str]) -> List[bool]:
+        client = _get_redis_client(self._cache)
+        if not client:
+            return [self.has_cache_item(key) for key in keys]
+
+        with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(self._cache.make_and_validate_key(key))
+
+            return [bool(exists) for exists in pipe.execute()]
+
     def get_local_preview_with_mime(self, frame_number, db_data):
         item = self._get_or_set_cache_item(
             key=f'data_{db_data.id}_{frame_number}_preview',
@@ -105,7 +678,11 @@ class MediaCache:
         db_storage: CloudStorage,
     ) -> Optional[Tuple[io.BytesIO, str]]:
         key = f'cloudstorage_{db_storage.id}_preview'
-        return self._cache.get(key)
+        item = self._get_cache_item(key)
+        if not item:
+            return None
+
+        return item[0], item[1]
 
     def get_or_set_cloud_preview_with_mime(
         self,
@@ -219,6 +796,10 @@ class MediaCache:
         kwargs = {}
         if self._dimension == DimensionType.DIM_3D:
             kwargs["dimension"] = DimensionType.DIM_3D
+        if writer_classes[quality] is ZipCompressedChunkWriter:
+            # Video chunks are encoded serially, as the frames of a video stream
+            # depend on each other and the codec uses its own threads
+            kwargs["encoding_threads"] = settings.CVAT_CHUNK_ENCODING_THREADS
         writer = writer_classes[quality](image_quality, **kwargs)
 
         buff = BytesIO()
@@ -247,6 +828,7 @@ class MediaCache:
         else:
             frame_size = None
 
+        chunk_frame_ids = []
         for frame_idx in range(db_data.chunk_size):
             frame_idx = (
                 db_data.start_frame + chunk_number * db_data.chunk_size + frame_idx * frame_step
@@ -254,22 +836,43 @@ class MediaCache:
             if db_data.stop_frame < frame_idx:
                 break
 
-            frame_bytes = None
+            chunk_frame_ids.append(frame_idx)
 
-            if frame_idx in frame_set:
-                frame_bytes = frame_provider.get_frame(frame_idx, quality=quality)[0]
+        # Each chunk of the task is loaded only once for all the job frames
+        job_frame_ids = [frame_idx for frame_idx in chunk_frame_ids if frame_idx in frame_set]
+        job_frames = frame_provider.get_frames_batch(job_frame_ids,
+            quality=quality, out_type=FrameProvider.Type.BUFFER,
+        )
+
+        if frame_size is not None:
+            # Decoded video frames can have different size, restore the original one
+            def _restore_frame_size(frame_bytes):
+                frame = PIL.Image.open(frame_bytes)
+                if frame.size != frame_size:
+                    frame = frame.resize(frame_size)
+
+                frame_bytes = BytesIO()
+                frame.save(frame_bytes, writer.IMAGE_EXT)
+                frame_bytes.seek(0)
+                return frame_bytes
 
-                if frame_size is not None:
-                    # Decoded video frames can have different size, restore the original one
+            # The chunk frames are already in memory, PIL releases the GIL while encoding
+            encoding_threads = min(settings.CVAT_CHUNK_ENCODING_THREADS, len(job_frames))
+            if 1 < encoding_threads:
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=encoding_threads
+                ) as executor:
+                    job_frames = list(executor.map(_restore_frame_size, job_frames))
+            else:
+                job_frames = list(map(_restore_frame_size, job_frames))
 
-                    frame = PIL.Image.open(frame_bytes)
-                    if frame.size != frame_size:
-                        frame = frame.resize(frame_size)
+        job_frames = dict(zip(job_frame_ids, job_frames))
 
-                    frame_bytes = BytesIO()
-                    frame.save(frame_bytes, writer.IMAGE_EXT)
-                    frame_bytes.seek(0)
+        for frame_idx in chunk_frame_ids:
+            frame_bytes = None
 
+            if frame_idx in job_frames:
+                frame_bytes = job_frames.pop(frame_idx)
             else:
                 # Populate skipped frames with placeholder data,
                 # this is required for video chunk decoding implementation in UI
@@ -347,3 +950,97 @@ class MediaCache:
         mime_type = 'application/zip'
         zip_buffer.seek(0)
         return zip_buffer, mime_type
+
+
+class ChunkPrefetcher:
+    """
+    Prepares the job chunks following the requested one in the background,
+    as annotators usually navigate through a job sequentially.
+    """
+
+    _QUEUE = settings.CVAT_QUEUES.CHUNKS.value
+
+    # The pending jobs are dropped from the task set after this time.
+    # Protects the set from leaking, if a worker dies
+    _PENDING_JOB_TTL = 3600
+
+    def __init__(self):
+        self._queue = django_rq.get_queue(self._QUEUE)
+
+    @classmethod
+    def _get_task_jobs_key(cls, task_id: int) -> str:
+        return f'{cls._QUEUE}:prefetch-task-{task_id}-jobs'
+
+    def enqueue_job_chunks(self, db_job: Job, chunk_number: int, quality, *, stop_chunk: int):
+        """
+        Enqueues preparation of the chunks after the specified one.
+        The chunks are limited by the stop chunk of the job (inclusive).
+        """
+
+        if not settings.MEDIA_CACHE_PREFETCH_CHUNKS:
+            return
+
+        task_id = db_job.segment.task.id
+        cache = MediaCache(dimension=db_job.segment.task.dimension)
+
+        last_chunk = min(chunk_number + settings.MEDIA_CACHE_PREFETCH_CHUNKS, stop_chunk)
+        chunks = range(chunk_number + 1, last_chunk + 1)
+        keys = [cache.get_job_chunk_key(db_job, next_chunk, quality) for next_chunk in chunks]
+
+        jobs_key = self._get_task_jobs_key(task_id)
+        with self._queue.connection.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(jobs_key, '-inf', time.time() - self._PENDING_JOB_TTL)
+            pipe.zrange(jobs_key, 0, -1)
+            _, pending_rq_ids = pipe.execute()
+
+        pending_rq_ids = set(force_str(rq_id) for rq_id in pending_rq_ids)
+
+        for next_chunk, key, is_cached in zip(chunks, keys, cache.has_cache_items(keys)):
+            rq_id = f'prefetch-chunk:{key}'
+            if is_cached or rq_id in pending_rq_ids:
+                continue
+
+            is_added, pending_jobs = self._add_pending_job(jobs_key, rq_id)
+            if not is_added:
+                # The job is being enqueued by a concurrent request
+                continue
+
+            if settings.MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS < pending_jobs:
+                self._queue.connection.zrem(jobs_key, rq_id)
+                slogger.task[task_id].debug(
+                    'Skipping chunk prefetching, the task has too many pending chunks'
+                )
+                break
+
+            self._queue.enqueue_call(
+                func=self._prepare_job_chunk,
+                args=(db_job.id, next_chunk, quality, task_id, rq_id),
+                job_id=rq_id,
+                result_ttl=0,
+                ttl=self._PENDING_JOB_TTL,
+                failure_ttl=self._PENDING_JOB_TTL,
+            )
+
+    def _add_pending_job(self, jobs_key: str, rq_id: str) -> Tuple[bool, int]:
+        with self._queue.connection.pipeline() as pipe:
+            pipe.zadd(jobs_key, { rq_id: time.time() }, nx=True)
+            pipe.zcard(jobs_key)
+            pipe.expire(jobs_key, self._PENDING_JOB_TTL)
+            added_jobs, pending_jobs, _ = pipe.execute()
+
+        return bool(added_jobs), pending_jobs
+
+    @classmethod
+    def _prepare_job_chunk(cls, job_id: int, chunk_number: int, quality, task_id: int, rq_id: str):
+        try:
+            db_job = Job.objects.select_related('segment__task__data').get(id=job_id)
+        except Job.DoesNotExist:
+            return
+        else:
+            cache = MediaCache(dimension=db_job.segment.task.dimension)
+            if db_job.segment.type == SegmentType.SPECIFIC_FRAMES:
+                cache.get_selective_job_chunk_data_with_mime(chunk_number, quality, db_job)
+            else:
+                cache.get_task_chunk_data_with_mime(chunk_number, quality, db_job.segment.task.data)
+        finally:
+            cls()._queue.connection.zrem(cls._get_task_jobs_key(task_id), rq_id)
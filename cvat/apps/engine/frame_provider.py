@@ -4,53 +4,267 @@
 # SPDX-License-Identifier: MIT
 
 import math
+import threading
+import time
+from collections import OrderedDict
 from enum import Enum
 from io import BytesIO
 import os
+from typing import Callable, Optional
 
+import av
 import cv2
 import numpy as np
+from django.conf import settings
 from PIL import Image, ImageOps
 
 from cvat.apps.engine.cache import MediaCache
 from cvat.apps.engine.media_extractors import VideoReader, ZipReader
 from cvat.apps.engine.mime_types import mimetypes
 from cvat.apps.engine.models import DataChoice, StorageMethodChoice, DimensionType
+from cvat.apps.engine.utils import rotate_image
 from rest_framework.exceptions import ValidationError
 
-class RandomAccessIterator:
-    def __init__(self, iterable):
-        self.iterable = iterable
-        self.iterator = None
-        self.pos = -1
+class _ChunkDecoder:
+    """
+    Provides random access to the frames of a chunk.
+    A closed decoder still serves the requests which have already got it,
+    but it doesn't keep the chunk open between them.
+    """
 
-    def __iter__(self):
-        return self
-
-    def __next__(self):
-        return self[self.pos + 1]
+    def __init__(self, source):
+        self._source = source
+        self._lock = threading.Lock()
+        self._is_closed = False
+        self.last_access_time = time.monotonic()
 
     def __getitem__(self, idx):
         assert 0 <= idx
-        if self.iterator is None or idx <= self.pos:
-            self.reset()
-        v = None
-        while self.pos < idx:
-            # NOTE: don't keep the last item in self, it can be expensive
-            v = next(self.iterator)
-            self.pos += 1
-        return v
-
-    def reset(self):
-        self.close()
-        self.iterator = iter(self.iterable)
+        with self._lock:
+            self.last_access_time = time.monotonic()
+            item = self._get_item(idx)
+            if self._is_closed:
+                # The decoder has been evicted from the pool while being used,
+                # the reopened chunk must not stay outside of the pool limits
+                self._close()
+            return item
+
+    @property
+    def is_closed(self) -> bool:
+        return self._is_closed
+
+    def _get_item(self, idx):
+        raise NotImplementedError
+
+    def _get_source(self):
+        if isinstance(self._source, BytesIO):
+            self._source.seek(0) # required for re-reading
+        return self._source
+
+    @property
+    def memory_size(self) -> int:
+        if isinstance(self._source, BytesIO):
+            return self._source.getbuffer().nbytes
+        return 0
 
     def close(self):
-        if self.iterator is not None:
-            if close := getattr(self.iterator, 'close', None):
-                close()
-        self.iterator = None
-        self.pos = -1
+        with self._lock:
+            self._is_closed = True
+            self._close()
+
+    def _close(self):
+        raise NotImplementedError
+
+class _ZipChunkDecoder(_ChunkDecoder):
+    def __init__(self, source):
+        super().__init__(source)
+        self._reader = None
+
+    def _get_item(self, idx):
+        if self._reader is None:
+            self._reader = ZipReader([self._get_source()])
+
+        # ZIP archives provide random access, there is no need to keep decoded frames
+        return self._reader.get_image(idx), self._reader.get_path(idx), idx
+
+    def _close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+class _VideoChunkDecoder(_ChunkDecoder):
+    """
+    Keeps the video container open between requests and remembers the last decoded frames.
+    Backward requests are served from the frame buffer or by seeking to the nearest
+    preceding key frame, instead of decoding the chunk from the start.
+    """
+
+    def __init__(self, source, *, frame_buffer_size: int):
+        super().__init__(source)
+        self._frame_buffer_size = max(frame_buffer_size, 1)
+        self._frame_buffer: OrderedDict[int, tuple] = OrderedDict()
+        # Tracked on changes, as the pool can read it while the buffer is being modified
+        self._frame_buffer_memory_size = 0
+        self._frame_pts: dict[int, int] = {} # frame pts -> frame index
+        self._key_frames: dict[int, int] = {} # frame index -> frame pts
+        self._container = None
+        self._frames = None
+        self._pos = -1
+
+    def _open(self):
+        self._container = av.open(self._get_source())
+        self._stream = self._container.streams.video[0]
+        self._stream.thread_type = 'AUTO'
+        self._rotation = int(self._stream.metadata.get('rotate', 0))
+        self._frames = self._decode()
+        self._pos = -1
+
+    def _restart(self):
+        self._container.close()
+        self._open()
+
+    def _decode(self):
+        for packet in self._container.demux(self._stream):
+            yield from packet.decode()
+
+    def _seek(self, idx) -> bool:
+        key_frame_idx = max((i for i in self._key_frames if i <= idx), default=None)
+        if key_frame_idx is None:
+            return False
+
+        self._container.seek(self._key_frames[key_frame_idx], stream=self._stream,
+            backward=True, any_frame=False)
+        self._frames = self._decode()
+
+        # The demuxer can land on an earlier key frame, find the actual position
+        frame = next(self._frames, None)
+        if frame is None or frame.pts not in self._frame_pts:
+            return False
+
+        self._pos = self._frame_pts[frame.pts]
+        self._add_frame(frame)
+        return self._pos <= idx
+
+    def _add_frame(self, frame):
+        self._frame_pts[frame.pts] = self._pos
+        if frame.key_frame:
+            self._key_frames[self._pos] = frame.pts
+
+        if self._rotation:
+            pts = frame.pts
+            frame = av.VideoFrame().from_ndarray(
+                rotate_image(frame.to_ndarray(format='bgr24'), 360 - self._rotation),
+                format='bgr24'
+            )
+            frame.pts = pts
+
+        replaced_item = self._frame_buffer.pop(self._pos, None)
+        if replaced_item is not None:
+            self._frame_buffer_memory_size -= self._get_frame_memory_size(replaced_item[0])
+
+        self._frame_buffer[self._pos] = (frame, self._source, frame.pts)
+        self._frame_buffer_memory_size += self._get_frame_memory_size(frame)
+        while self._frame_buffer_size < len(self._frame_buffer):
+            _, (evicted_frame, _, _) = self._frame_buffer.popitem(last=False)
+            self._frame_buffer_memory_size -= self._get_frame_memory_size(evicted_frame)
+
+    @staticmethod
+    def _get_frame_memory_size(frame) -> int:
+        return frame.width * frame.height * 3
+
+    def _get_item(self, idx):
+        if idx in self._frame_buffer:
+            self._frame_buffer.move_to_end(idx)
+            return self._frame_buffer[idx]
+
+        if self._container is None:
+            self._open()
+        elif idx <= self._pos and not self._seek(idx):
+            self._restart()
+
+        while self._pos < idx:
+            frame = next(self._frames)
+            self._pos += 1
+            self._add_frame(frame)
+
+        return self._frame_buffer[idx]
+
+    @property
+    def memory_size(self) -> int:
+        return super().memory_size + self._frame_buffer_memory_size
+
+    def _close(self):
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+            self._frames = None
+            self._pos = -1
+        self._frame_buffer.clear()
+        self._frame_buffer_memory_size = 0
+
+class _ChunkDecoderPool:
+    """
+    A process-wide pool of open chunk decoders, which allows to avoid reopening and
+    decoding the same chunk for each request. The least recently used decoders
+    are closed, when the pool exceeds its limits or the decoders are idle for too long.
+    """
+
+    def __init__(self, *, max_decoders: int, memory_limit: int, idle_timeout: float):
+        self._max_decoders = max_decoders
+        self._memory_limit = memory_limit
+        self._idle_timeout = idle_timeout
+        self._decoders: OrderedDict[tuple, _ChunkDecoder] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, create_decoder: Callable[[], _ChunkDecoder]) -> _ChunkDecoder:
+        with self._lock:
+            decoder = self._decoders.get(key)
+            if decoder is None:
+                decoder = create_decoder()
+                self._decoders[key] = decoder
+            else:
+                self._decoders.move_to_end(key)
+
+            self._evict(keep=key)
+
+        return decoder
+
+    def _evict(self, keep):
+        now = time.monotonic()
+        # The decoders can be used by other threads, read each size only once
+        memory_sizes = { key: decoder.memory_size for key, decoder in self._decoders.items() }
+        memory_size = sum(memory_sizes.values())
+
+        for key, decoder in list(self._decoders.items()):
+            if key == keep:
+                continue
+
+            if (
+                len(self._decoders) <= self._max_decoders and
+                memory_size <= self._memory_limit and
+                now - decoder.last_access_time < self._idle_timeout
+            ):
+                continue
+
+            memory_size -= memory_sizes[key]
+            decoder.close()
+            del self._decoders[key]
+
+_decoder_pool: Optional[_ChunkDecoderPool] = None
+_decoder_pool_lock = threading.Lock()
+
+def _get_decoder_pool() -> _ChunkDecoderPool:
+    global _decoder_pool # pylint: disable=global-statement
+
+    with _decoder_pool_lock:
+        if _decoder_pool is None:
+            _decoder_pool = _ChunkDecoderPool(
+                max_decoders=settings.MEDIA_DECODER_POOL_MAX_DECODERS,
+                memory_limit=settings.MEDIA_DECODER_POOL_MEMORY_LIMIT,
+                idle_timeout=settings.MEDIA_DECODER_POOL_IDLE_TIMEOUT,
+            )
+
+    return _decoder_pool
 
 class FrameProvider:
     VIDEO_FRAME_EXT = '.PNG'
@@ -66,39 +280,42 @@ class FrameProvider:
         NUMPY_ARRAY = 2
 
     class ChunkLoader:
-        def __init__(self, reader_class, path_getter):
+        def __init__(self, reader_class, path_getter, quality, db_data):
             self.chunk_id = None
             self.chunk_reader = None
             self.reader_class = reader_class
             self.get_chunk_path = path_getter
+            self.quality = quality
+            self.db_data = db_data
 
-        def load(self, chunk_id):
-            if self.chunk_id != chunk_id:
-                self.unload()
+        def _get_chunk_source(self, chunk_id):
+            return self.get_chunk_path(chunk_id)
+
+        def _create_decoder(self, chunk_id) -> _ChunkDecoder:
+            source = self._get_chunk_source(chunk_id)
+            if self.reader_class is VideoReader:
+                return _VideoChunkDecoder(source,
+                    frame_buffer_size=settings.MEDIA_DECODER_FRAME_BUFFER_SIZE)
+            return _ZipChunkDecoder(source)
 
-                self.chunk_id = chunk_id
-                self.chunk_reader = RandomAccessIterator(
-                    self.reader_class([self.get_chunk_path(chunk_id)]))
+        def load(self, chunk_id):
+            # The decoder is requested from the pool on each access, as the pool
+            # can close it meanwhile, and a closed decoder doesn't keep the chunk open
+            self.chunk_id = chunk_id
+            self.chunk_reader = _get_decoder_pool().get(
+                (self.db_data.id, chunk_id, self.quality),
+                lambda: self._create_decoder(chunk_id),
+            )
             return self.chunk_reader
 
         def unload(self):
+            # The decoder stays open in the pool, it can be reused by other requests
             self.chunk_id = None
-            if self.chunk_reader:
-                self.chunk_reader.close()
-                self.chunk_reader = None
+            self.chunk_reader = None
 
     class BuffChunkLoader(ChunkLoader):
-        def __init__(self, reader_class, path_getter, quality, db_data):
-            super().__init__(reader_class, path_getter)
-            self.quality = quality
-            self.db_data = db_data
-
-        def load(self, chunk_id):
-            if self.chunk_id != chunk_id:
-                self.chunk_id = chunk_id
-                self.chunk_reader = RandomAccessIterator(
-                    self.reader_class([self.get_chunk_path(chunk_id, self.quality, self.db_data)[0]]))
-            return self.chunk_reader
+        def _get_chunk_source(self, chunk_id):
+            return self.get_chunk_path(chunk_id, self.quality, self.db_data)[0]
 
     def __init__(self, db_data, dimension=DimensionType.DIM_2D):
         self._db_data = db_data
@@ -126,10 +343,14 @@ class FrameProvider:
         else:
             self._loaders[self.Quality.COMPRESSED] = self.ChunkLoader(
                 reader_class[db_data.compressed_chunk_type],
-                db_data.get_compressed_chunk_path)
+                db_data.get_compressed_chunk_path,
+                self.Quality.COMPRESSED,
+                self._db_data)
             self._loaders[self.Quality.ORIGINAL] = self.ChunkLoader(
                 reader_class[db_data.original_chunk_type],
-                db_data.get_original_chunk_path)
+                db_data.get_original_chunk_path,
+                self.Quality.ORIGINAL,
+                self._db_data)
 
     def __len__(self):
         return self._db_data.size
@@ -223,6 +444,81 @@ class FrameProvider:
         for idx in range(start_frame, stop_frame):
             yield self.get_frame(idx, quality=quality, out_type=out_type)
 
+    # Array shapes of the decoded images by PIL image mode
+    _PIL_MODE_CHANNELS = { 'L': (), 'RGB': (3,), 'RGBA': (4,) }
+
+    def _read_frames(self, frame_numbers, quality, convert=None):
+        """
+        Reads raw frames from chunks. Frames are grouped by chunk,
+        and each chunk is read once, in the order of frame offsets.
+        The frames are converted right after reading, if the conversion is specified.
+        """
+
+        frames_by_chunk = {}
+        for position, frame_number in enumerate(frame_numbers):
+            _, chunk_number, frame_offset = self._validate_frame_number(frame_number)
+            frames_by_chunk.setdefault(chunk_number, []).append((frame_offset, position))
+
+        loader = self._loaders[quality]
+        frames = [None] * len(frame_numbers)
+        for chunk_number in sorted(frames_by_chunk):
+            for frame_offset, position in sorted(frames_by_chunk[chunk_number]):
+                frame = loader.load(chunk_number)[frame_offset][0]
+                frames[position] = convert(frame) if convert else frame
+
+        return frames
+
+    def get_frames_batch(self, frame_numbers, quality=Quality.ORIGINAL, out_type=Type.NUMPY_ARRAY):
+        """
+        Returns a list of the requested frames in the requested order.
+
+        For the NUMPY_ARRAY output type, if all the frames have the same resolution,
+        the frames are decoded into a single preallocated array of shape (N, H, W[, C])
+        in the BGR format, and the returned frames are views of this array.
+        """
+
+        loader = self._loaders[quality]
+
+        if out_type != self.Type.NUMPY_ARRAY:
+            # Convert the frames while reading to avoid keeping all the decoded frames in memory
+            return self._read_frames(frame_numbers, quality,
+                convert=lambda frame: self._convert_frame(frame, loader.reader_class, out_type)
+            )
+
+        frames = self._read_frames(frame_numbers, quality)
+        if not frames:
+            return []
+
+        if loader.reader_class is VideoReader:
+            images = frames
+            shapes = [(frame.height, frame.width, 3) for frame in frames]
+        else:
+            images = [Image.open(frame) for frame in frames]
+            shapes = [
+                (image.height, image.width, *channels)
+                if (channels := self._PIL_MODE_CHANNELS.get(image.mode)) is not None else None
+                for image in images
+            ]
+
+        if shapes[0] is None or any(shape != shapes[0] for shape in shapes):
+            return [
+                self._convert_frame(frame, loader.reader_class, out_type)
+                for frame in frames
+            ]
+
+        batch = np.empty((len(frames), *shapes[0]), dtype=np.uint8)
+        if loader.reader_class is VideoReader:
+            for i, frame in enumerate(images):
+                batch[i] = frame.to_ndarray(format='bgr24')
+        else:
+            for i, image in enumerate(images):
+                batch[i] = np.asarray(image)
+
+            if batch.ndim == 4:
+                batch[..., :3] = batch[..., 2::-1] # RGB to BGR
+
+        return list(batch)
+
     @property
     def data_id(self):
         return self._db_data.id
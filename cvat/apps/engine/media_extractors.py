@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import concurrent.futures
 import os
 import sysconfig
 import tempfile
@@ -14,7 +15,8 @@ import struct
 from enum import IntEnum
 from abc import ABC, abstractmethod
 from contextlib import closing
-from typing import Iterable
+from collections import deque
+from typing import Iterable, Iterator
 
 import av
 import numpy as np
@@ -342,6 +344,9 @@ class ZipReader(ImageListReader):
                         sorting_method=sorting_method)
 
     def __del__(self):
+        self.close()
+
+    def close(self):
         self._zip_source.close()
 
     def get_preview(self, frame):
@@ -527,8 +532,7 @@ class ImageDatasetManifestReader(FragmentMediaReader):
         self._manifest.init_index()
 
     def __iter__(self):
-        for idx in self._frame_range:
-            yield self._manifest[idx]
+        yield from self._manifest.get_items(self._frame_range)
 
 class VideoDatasetManifestReader(FragmentMediaReader):
     def __init__(self, manifest_path, **kwargs):
@@ -700,17 +704,55 @@ class ZipChunkWriter(IChunkWriter):
         return []
 
 class ZipCompressedChunkWriter(ZipChunkWriter):
+    # Limits the number of images being encoded or waiting to be written,
+    # so that all the compressed images of a chunk are not kept in memory
+    MAX_PENDING_IMAGES_PER_THREAD = 2
+
+    def __init__(self, quality, dimension=DimensionType.DIM_2D, *, encoding_threads: int = 1):
+        super().__init__(quality, dimension=dimension)
+        self._encoding_threads = encoding_threads
+
+    def _compress_images(
+        self, images: Iterable[Image.Image|io.IOBase]
+    ) -> Iterator[tuple[int, int, io.BytesIO]]:
+        if self._encoding_threads <= 1:
+            for image in images:
+                yield self._compress_image(image, self._image_quality)
+            return
+
+        # PIL releases the GIL while decoding and encoding images,
+        # the results are returned in the input order
+        max_pending_images = self.MAX_PENDING_IMAGES_PER_THREAD * self._encoding_threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._encoding_threads) as executor:
+            pending_images = deque()
+            for image in images:
+                if len(pending_images) == max_pending_images:
+                    yield pending_images.popleft().result()
+
+                pending_images.append(
+                    executor.submit(self._compress_image, image, self._image_quality)
+                )
+
+            while pending_images:
+                yield pending_images.popleft().result()
+
     def save_as_chunk(
         self,
         images: Iterable[tuple[Image.Image|io.IOBase|str, str, str]],
         chunk_path: str, *, compress_frames: bool = True, zip_compress_level: int = 0
     ):
+        compressed_images = None
+        if self._dimension == DimensionType.DIM_2D and compress_frames:
+            # The images are encoded ahead of writing, only a few images are buffered
+            images, images_to_compress = itertools.tee(images)
+            compressed_images = self._compress_images(image for image, _, _ in images_to_compress)
+
         image_sizes = []
         with zipfile.ZipFile(chunk_path, 'x', compresslevel=zip_compress_level) as zip_chunk:
             for idx, (image, path, _) in enumerate(images):
                 if self._dimension == DimensionType.DIM_2D:
                     if compress_frames:
-                        w, h, image_buf = self._compress_image(image, self._image_quality)
+                        w, h, image_buf = next(compressed_images)
                     else:
                         assert isinstance(image, io.IOBase)
                         image_buf = io.BytesIO(image.read())
@@ -17,6 +17,7 @@ from typing import Any, Dict, Iterable, Optional, OrderedDict, Union
 from rest_framework import serializers, exceptions
 from django.contrib.auth.models import User, Group
 from django.db import transaction
+from django.db.models.manager import BaseManager
 
 from cvat.apps.dataset_manager.formats.utils import get_label_color
 from cvat.apps.engine import models
@@ -560,6 +561,19 @@ class StorageSerializer(serializers.ModelSerializer):
         model = models.Storage
         fields = ('id', 'location', 'cloud_storage_id')
 
+class JobReadListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        jobs = list(data.all() if isinstance(data, BaseManager) else data)
+
+        if request := self.context.get('request'):
+            # Check the task permissions for all the jobs in one request to OPA.
+            # The decisions are cached, so the job serializers will reuse them.
+            TaskPermission.check_access_batch([
+                TaskPermission.create_scope_view(request, job.segment.task) for job in jobs
+            ])
+
+        return super().to_representation(jobs)
+
 class JobReadSerializer(serializers.ModelSerializer):
     task_id = serializers.ReadOnlyField(source="segment.task.id")
     project_id = serializers.ReadOnlyField(source="get_project_id", allow_null=True)
@@ -588,6 +602,7 @@ class JobReadSerializer(serializers.ModelSerializer):
             'created_date', 'updated_date', 'issues', 'labels', 'type', 'organization',
             'target_storage', 'source_storage')
         read_only_fields = fields
+        list_serializer_class = JobReadListSerializer
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
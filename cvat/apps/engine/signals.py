@@ -10,6 +10,8 @@ from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from cvat.apps.dataset_manager.export_cache import get_export_cache
+
 from .models import CloudStorage, Data, Job, Profile, Project, StatusChoice, Task, Asset
 
 
@@ -49,6 +51,8 @@ def __save_user_handler(instance, **kwargs):
 def __delete_project_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(
+        functools.partial(get_export_cache().remove_instance_files, 'project', instance.id))
 
 @receiver(post_delete, sender=Asset,
     dispatch_uid=__name__ + ".__delete_asset_handler")
@@ -61,6 +65,8 @@ def __delete_asset_handler(instance, **kwargs):
 def __delete_task_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(
+        functools.partial(get_export_cache().remove_instance_files, 'task', instance.id))
 
     if instance.data and not instance.data.tasks.exists():
         instance.data.delete()
@@ -76,6 +82,8 @@ def __delete_task_handler(instance, **kwargs):
 def __delete_job_handler(instance, **kwargs):
     transaction.on_commit(
         functools.partial(shutil.rmtree, instance.get_dirname(), ignore_errors=True))
+    transaction.on_commit(
+        functools.partial(get_export_cache().remove_instance_files, 'job', instance.id))
 
 @receiver(post_delete, sender=Data,
     dispatch_uid=__name__ + ".delete_data_handler")
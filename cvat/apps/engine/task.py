@@ -486,7 +486,7 @@ def _create_task_manifest_from_cloud_data(
     cloud_storage_instance = db_storage_to_storage_instance(db_storage)
     content = cloud_storage_instance.bulk_download_to_memory(sorted_media)
     manifest.link(sources=content, DIM_3D=dimension == models.DimensionType.DIM_3D)
-    manifest.create()
+    manifest.create(workers=settings.CVAT_MANIFEST_CREATION_WORKERS)
 
 @transaction.atomic
 def _create_thread(
@@ -547,7 +547,8 @@ def _create_thread(
         if manifest_file:
             cloud_storage_manifest = ImageManifestManager(
                 os.path.join(db_data.cloud_storage.get_storage_dirname(), manifest_file),
-                db_data.cloud_storage.get_storage_dirname()
+                db_data.cloud_storage.get_storage_dirname(),
+                create_columns=True,
             )
             cloud_storage_manifest.set_index()
             cloud_storage_manifest_prefix = os.path.dirname(manifest_file)
@@ -904,7 +905,10 @@ def _create_thread(
     kwargs = {}
     if validate_dimension.dimension == models.DimensionType.DIM_3D:
         kwargs["dimension"] = validate_dimension.dimension
-    compressed_chunk_writer = compressed_chunk_writer_class(db_data.image_quality, **kwargs)
+    compressed_kwargs = {}
+    if compressed_chunk_writer_class is ZipCompressedChunkWriter:
+        compressed_kwargs["encoding_threads"] = settings.CVAT_CHUNK_ENCODING_THREADS
+    compressed_chunk_writer = compressed_chunk_writer_class(db_data.image_quality, **kwargs, **compressed_kwargs)
     original_chunk_writer = original_chunk_writer_class(original_quality, **kwargs)
 
     # calculate chunk size if it isn't specified
@@ -997,7 +1001,7 @@ def _create_thread(
                         data_dir=upload_dir,
                         DIM_3D=(db_task.dimension == models.DimensionType.DIM_3D),
                     )
-                    manifest.create()
+                    manifest.create(workers=settings.CVAT_MANIFEST_CREATION_WORKERS)
                 else:
                     manifest.init_index()
                 counter = itertools.count()
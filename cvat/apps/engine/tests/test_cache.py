@@ -0,0 +1,653 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import threading
+import time
+import zipfile
+import zlib
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+import fakeredis
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCacheClient
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from cvat.apps.engine import cache as media_cache_module
+from cvat.apps.engine.cache import (ChunkPrefetcher, MediaCache, _DiskCacheTier,
+    _MemoryCacheTier, _RedisCacheTier, _SingleFlight)
+from cvat.apps.engine.models import Job
+
+
+def _make_item(data: bytes, mime: str = 'image/jpeg'):
+    return BytesIO(data), mime, zlib.crc32(data)
+
+def _get_item_data(item):
+    return item[0].getvalue() if item is not None else None
+
+
+class MemoryCacheTierTest(SimpleTestCase):
+    def test_can_get_stored_item(self):
+        tier = _MemoryCacheTier(max_size=100, max_items=10)
+        tier.set('a', _make_item(b'data'))
+
+        item, expires_at = tier.get('a')
+        self.assertEqual(_get_item_data(item), b'data')
+        self.assertEqual(item[1:], ('image/jpeg', zlib.crc32(b'data')))
+        self.assertIsNone(expires_at)
+        self.assertEqual(tier.get('b'), (None, None))
+        self.assertEqual(tier.stats.to_dict(), { 'hits': 1, 'misses': 1, 'evictions': 0 })
+
+    def test_evicts_least_recently_used_items(self):
+        tier = _MemoryCacheTier(max_size=10, max_items=10)
+        tier.set('a', _make_item(b'aaaa'))
+        tier.set('b', _make_item(b'bbbb'))
+        tier.get('a')
+        tier.set('c', _make_item(b'cccc'))
+
+        self.assertEqual(_get_item_data(tier.get('a')[0]), b'aaaa')
+        self.assertIsNone(tier.get('b')[0])
+        self.assertEqual(_get_item_data(tier.get('c')[0]), b'cccc')
+        self.assertEqual(tier.stats.evictions, 1)
+
+    def test_evicts_items_above_count_limit(self):
+        tier = _MemoryCacheTier(max_size=100, max_items=2)
+        for key in ['a', 'b', 'c']:
+            tier.set(key, _make_item(key.encode()))
+
+        self.assertIsNone(tier.get('a')[0])
+        self.assertIsNotNone(tier.get('b')[0])
+        self.assertIsNotNone(tier.get('c')[0])
+
+    def test_skips_items_above_size_limit(self):
+        tier = _MemoryCacheTier(max_size=3, max_items=10)
+        tier.set('a', _make_item(b'aaaa'))
+
+        self.assertIsNone(tier.get('a')[0])
+
+    def test_expires_items(self):
+        tier = _MemoryCacheTier(max_size=100, max_items=10)
+        now = time.time()
+        tier.set('a', _make_item(b'aaaa'), now + 10)
+        tier.set('b', _make_item(b'bbbb'), now - 1)
+
+        self.assertEqual(tier.get('a')[1], now + 10)
+        self.assertIsNone(tier.get('b')[0])
+
+        with mock.patch('cvat.apps.engine.cache.time.time', return_value=now + 11):
+            self.assertIsNone(tier.get('a')[0])
+
+
+class DiskCacheTierTest(SimpleTestCase):
+    def setUp(self):
+        self._temp_dir = TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _get_item_path(self, tier: _DiskCacheTier, key: str) -> str:
+        return tier._get_item_path(key)
+
+    def test_can_get_stored_item(self):
+        tier = _DiskCacheTier(self._temp_dir.name, max_size=1000)
+        tier.set('a', _make_item(b'data', mime='video/mp4'))
+
+        item, expires_at = tier.get('a')
+        self.assertEqual(_get_item_data(item), b'data')
+        self.assertEqual(item[1:], ('video/mp4', zlib.crc32(b'data')))
+        self.assertEqual(expires_at, float('inf'))
+        self.assertEqual(tier.get('b'), (None, None))
+
+    def test_ignores_invalid_files(self):
+        tier = _DiskCacheTier(self._temp_dir.name, max_size=1000)
+        for key, content in [('empty', b''), ('broken', b'0' * 100)]:
+            with open(self._get_item_path(tier, key), 'wb') as f:
+                f.write(content)
+
+            self.assertIsNone(tier.get(key)[0])
+
+    def test_evicts_least_recently_used_items(self):
+        # each file takes 58 bytes: 8 bytes of the expiration time, a 20 bytes header
+        # with the mime type and 30 bytes of data
+        tier = _DiskCacheTier(self._temp_dir.name, max_size=150)
+        for i, key in enumerate(['a', 'b'], start=1):
+            tier.set(key, _make_item(key.encode() * 30))
+            os.utime(self._get_item_path(tier, key), (i, i))
+
+        tier.get('a')
+        tier.set('c', _make_item(b'c' * 30))
+
+        self.assertIsNotNone(tier.get('a')[0])
+        self.assertIsNone(tier.get('b')[0])
+        self.assertIsNotNone(tier.get('c')[0])
+        self.assertEqual(tier.stats.evictions, 1)
+
+    def test_expires_items(self):
+        tier = _DiskCacheTier(self._temp_dir.name, max_size=1000)
+        now = time.time()
+        tier.set('a', _make_item(b'aaaa'), now + 10)
+        tier.set('b', _make_item(b'bbbb'), now - 1)
+
+        self.assertEqual(tier.get('a')[1], now + 10)
+        self.assertFalse(os.path.exists(self._get_item_path(tier, 'b')))
+
+        with mock.patch('cvat.apps.engine.cache.time.time', return_value=now + 11):
+            self.assertIsNone(tier.get('a')[0])
+
+
+class _MediaCacheTestBase(SimpleTestCase):
+    _SHARED_CACHE_TIMEOUT = 100
+    _LOCAL_TIER_SIZE = 0
+
+    def setUp(self):
+        self._temp_dir = TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+        settings_override = override_settings(
+            CACHES={
+                'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache' },
+                'media': {
+                    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                    'TIMEOUT': self._SHARED_CACHE_TIMEOUT,
+                },
+            },
+            MEDIA_CACHE_MEMORY_TIER_SIZE=self._LOCAL_TIER_SIZE,
+            MEDIA_CACHE_DISK_TIER_ROOT=self._temp_dir.name,
+            MEDIA_CACHE_DISK_TIER_SIZE=self._LOCAL_TIER_SIZE,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # The in-memory caches are shared by all the tests in the process
+        caches['media'].clear()
+
+        self._reset_local_tiers()
+        self.addCleanup(self._reset_local_tiers)
+
+    @staticmethod
+    def _reset_local_tiers():
+        media_cache_module._local_cache_tiers = None
+
+
+class MediaCacheTiersTest(_MediaCacheTestBase):
+    _LOCAL_TIER_SIZE = 1000
+
+    def test_local_tiers_are_disabled_by_default(self):
+        self._reset_local_tiers()
+        with override_settings(MEDIA_CACHE_MEMORY_TIER_SIZE=0, MEDIA_CACHE_DISK_TIER_SIZE=0):
+            self.assertEqual([tier.name for tier in MediaCache()._tiers], ['redis'])
+
+    def test_can_fill_faster_tiers(self):
+        cache = MediaCache()
+        memory_tier, disk_tier, shared_tier = cache._tiers
+        shared_tier.set('a', _make_item(b'data'))
+
+        self.assertEqual(_get_item_data(cache._get_cache_item('a')), b'data')
+        self.assertEqual(_get_item_data(memory_tier.get('a')[0]), b'data')
+        self.assertEqual(_get_item_data(disk_tier.get('a')[0]), b'data')
+
+    def test_can_fill_all_tiers_with_created_item(self):
+        cache = MediaCache()
+
+        item = cache._get_or_set_cache_item('a', lambda: (BytesIO(b'data'), 'image/png'))
+
+        self.assertEqual((item[0].getvalue(), item[1]), (b'data', 'image/png'))
+        for tier in cache._tiers:
+            stored_item = tier.get('a')[0]
+            self.assertEqual(_get_item_data(stored_item), b'data')
+            self.assertEqual(stored_item[1:], ('image/png', zlib.crc32(b'data')))
+
+    def test_local_items_expire_with_shared_items(self):
+        cache = MediaCache()
+        memory_tier, disk_tier, shared_tier = cache._tiers
+        shared_tier.set('a', _make_item(b'data'))
+        cache._get_cache_item('a')
+
+        expiration_time = time.time() + self._SHARED_CACHE_TIMEOUT + 1
+        with mock.patch('cvat.apps.engine.cache.time.time', return_value=expiration_time):
+            self.assertIsNone(memory_tier.get('a')[0])
+            self.assertIsNone(disk_tier.get('a')[0])
+
+    def test_can_reject_item_with_invalid_checksum(self):
+        cache = MediaCache()
+        memory_tier, disk_tier, shared_tier = cache._tiers
+        shared_tier.set('a', (BytesIO(b'data'), 'image/jpeg', zlib.crc32(b'other data')))
+
+        self.assertIsNone(cache._get_cache_item('a'))
+        self.assertIsNone(shared_tier.get('a')[0])
+        self.assertIsNone(memory_tier.get('a')[0])
+        self.assertIsNone(disk_tier.get('a')[0])
+
+
+
+class RedisCacheTierTest(_MediaCacheTestBase):
+    def setUp(self):
+        super().setUp()
+
+        settings_override = override_settings(
+            CACHES={
+                'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache' },
+                'media': {
+                    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                    'LOCATION': 'redis://localhost:6379',
+                    'TIMEOUT': self._SHARED_CACHE_TIMEOUT,
+                },
+            },
+            # The single-flight locks are tested separately
+            MEDIA_CACHE_PREPARATION_WAIT_TIMEOUT=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self._client = fakeredis.FakeRedis()
+        self._client.flushall()
+
+        patcher = mock.patch.object(RedisCacheClient, 'get_client', return_value=self._client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self._tier = _RedisCacheTier(caches['media'])
+
+    def _assert_items_equal(self, actual_item, expected_item):
+        self.assertEqual(
+            (_get_item_data(actual_item), *actual_item[1:]),
+            (_get_item_data(expected_item), *expected_item[1:]),
+        )
+
+    def test_can_get_stored_item(self):
+        item = _make_item(b'data', mime='video/mp4')
+        self._tier.set('a', item)
+
+        stored_item, expires_at = self._tier.get('a')
+        self._assert_items_equal(stored_item, item)
+        self.assertAlmostEqual(expires_at, time.time() + self._SHARED_CACHE_TIMEOUT, delta=5)
+        self.assertEqual(self._tier.get('b'), (None, None))
+
+    def test_stores_raw_item_data(self):
+        self._tier.set('a', _make_item(b'data'))
+
+        data_key, meta_key = self._tier._make_keys('a')
+        self.assertEqual(self._client.get(data_key), b'data')
+        self.assertIsNotNone(self._client.get(meta_key))
+        self.assertTrue(MediaCache().has_cache_item('a'))
+
+    def test_can_get_pickled_item(self):
+        # The items stored before the raw format was introduced
+        item = _make_item(b'data', mime='image/png')
+        caches['media'].set('a', item)
+
+        stored_item, _ = self._tier.get('a')
+        self._assert_items_equal(stored_item, item)
+
+        data, mime = MediaCache()._get_or_set_cache_item('a', create_function=mock.Mock())
+        self.assertEqual((data.getvalue(), mime), (b'data', 'image/png'))
+
+    def test_recreates_pickled_item_without_checksum(self):
+        caches['media'].set('a', (BytesIO(b'old'), 'image/png'))
+        create_function = mock.Mock(return_value=(BytesIO(b'data'), 'image/png'))
+
+        data, _ = MediaCache()._get_or_set_cache_item('a', create_function=create_function)
+
+        self.assertEqual(data.getvalue(), b'data')
+        create_function.assert_called_once()
+        self._assert_items_equal(self._tier.get('a')[0], _make_item(b'data', mime='image/png'))
+
+    def test_ignores_invalid_item_metadata(self):
+        self._tier.set('a', _make_item(b'data'))
+        self._client.set(self._tier._make_keys('a')[1], b'invalid')
+
+        self.assertIsNone(self._tier.get('a')[0])
+
+    def test_can_delete_item(self):
+        self._tier.set('a', _make_item(b'data'))
+        self._tier.delete('a')
+
+        self.assertEqual(self._tier.get('a'), (None, None))
+        self.assertEqual(self._client.keys(), [])
+
+
+class _FakeRedisLock:
+    def __init__(self, client: '_FakeRedisClient', name: str):
+        self._client = client
+        self._name = name
+
+    def acquire(self, blocking=True):
+        assert not blocking
+
+        with self._client.condition:
+            if self._name in self._client.locks:
+                return False
+
+            self._client.locks.add(self._name)
+            return True
+
+    def release(self):
+        with self._client.condition:
+            self._client.locks.discard(self._name)
+
+    def locked(self):
+        with self._client.condition:
+            return self._name in self._client.locks
+
+
+class _FakePubSub:
+    def __init__(self, client: '_FakeRedisClient'):
+        self._client = client
+        self.channels = set()
+        self.messages = []
+
+    def subscribe(self, channel):
+        with self._client.condition:
+            self.channels.add(channel)
+            self._client.subscribers.add(self)
+
+    def get_message(self, timeout):
+        with self._client.condition:
+            self._client.condition.wait_for(lambda: self.messages, timeout=timeout)
+            return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        with self._client.condition:
+            self._client.subscribers.discard(self)
+
+
+class _FakeRedisClient:
+    """
+    Implements the locks and notifications used by the single-flight cache item preparation
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.locks = set()
+        self.subscribers = set()
+
+    def lock(self, name, timeout):
+        return _FakeRedisLock(self, name)
+
+    def publish(self, channel, message):
+        with self.condition:
+            for subscriber in self.subscribers:
+                if channel in subscriber.channels:
+                    subscriber.messages.append({ 'channel': channel, 'data': message })
+
+            self.condition.notify_all()
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _FakePubSub(self)
+
+
+class SingleFlightTest(_MediaCacheTestBase):
+    def setUp(self):
+        super().setUp()
+
+        self._client = _FakeRedisClient()
+        self._created_items = 0
+        self._created_items_lock = threading.Lock()
+
+    def _make_media_cache(self, *, wait_timeout: float = 10) -> MediaCache:
+        cache = MediaCache()
+        cache._single_flight = _SingleFlight(self._client,
+            wait_timeout=wait_timeout, lock_timeout=10,
+        )
+        return cache
+
+    def _create_item(self, *, delay: float = 0, fail: bool = False):
+        time.sleep(delay)
+
+        with self._created_items_lock:
+            self._created_items += 1
+
+        if fail:
+            raise Exception('Failed to prepare the item')
+
+        return BytesIO(b'data'), 'image/png'
+
+    def _get_items_concurrently(self, count: int, get_item) -> list:
+        barrier = threading.Barrier(count)
+        results = [None] * count
+
+        def run(i):
+            barrier.wait()
+            try:
+                results[i] = get_item(i)
+            except Exception as ex:
+                results[i] = ex
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_can_prepare_item_once_for_concurrent_requests(self):
+        results = self._get_items_concurrently(8,
+            lambda _: self._make_media_cache()._get_or_set_cache_item('a',
+                lambda: self._create_item(delay=0.5),
+            )
+        )
+
+        self.assertEqual(self._created_items, 1)
+        for data, mime in results:
+            self.assertEqual((data.getvalue(), mime), (b'data', 'image/png'))
+
+    def test_can_prepare_different_items_concurrently(self):
+        results = self._get_items_concurrently(4,
+            lambda i: self._make_media_cache()._get_or_set_cache_item(f'item_{i}',
+                lambda: self._create_item(delay=0.1),
+            )
+        )
+
+        self.assertEqual(self._created_items, 4)
+        self.assertTrue(all(data.getvalue() == b'data' for data, _ in results))
+
+    def test_can_prepare_item_if_lock_holder_fails(self):
+        results = self._get_items_concurrently(2,
+            lambda i: self._make_media_cache()._get_or_set_cache_item('a',
+                lambda: self._create_item(delay=0.5, fail=(i == 0)),
+            )
+        )
+
+        failed_results = [r for r in results if isinstance(r, Exception)]
+        self.assertLessEqual(len(failed_results), 1)
+        self.assertEqual(self._created_items, 1 + len(failed_results))
+        self.assertTrue(any(
+            not isinstance(r, Exception) and r[0].getvalue() == b'data' for r in results
+        ))
+
+    def test_can_prepare_item_after_wait_timeout(self):
+        # Another worker holds the lock and doesn't finish in time
+        self.assertTrue(self._client.lock(_SingleFlight._LOCK_KEY_PREFIX + 'a', 10).acquire(
+            blocking=False
+        ))
+
+        start_time = time.monotonic()
+        data, _ = self._make_media_cache(wait_timeout=0.3)._get_or_set_cache_item('a',
+            self._create_item,
+        )
+
+        self.assertLessEqual(0.3, time.monotonic() - start_time)
+        self.assertEqual(data.getvalue(), b'data')
+        self.assertEqual(self._created_items, 1)
+
+
+@override_settings(MEDIA_CACHE_PREFETCH_CHUNKS=3, MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS=4)
+class ChunkPrefetcherTest(_MediaCacheTestBase):
+    def setUp(self):
+        super().setUp()
+
+        self._queue = mock.Mock(connection=fakeredis.FakeStrictRedis())
+        self._job = mock.Mock(id=1, **{ 'segment.task.id': 2, 'segment.task.dimension': '2d' })
+
+        for patcher in [
+            mock.patch('cvat.apps.engine.cache.django_rq.get_queue', return_value=self._queue),
+            mock.patch.object(MediaCache, 'get_job_chunk_key',
+                side_effect=lambda db_job, chunk_number, quality: f'chunk_{chunk_number}'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _enqueue_job_chunks(self, chunk_number: int, *, stop_chunk: int = 100):
+        ChunkPrefetcher().enqueue_job_chunks(self._job, chunk_number, 'compressed',
+            stop_chunk=stop_chunk,
+        )
+
+    def _get_enqueued_chunks(self) -> list:
+        return [c.kwargs['args'][1] for c in self._queue.enqueue_call.call_args_list]
+
+    def _finish_chunk(self, chunk_number: int, *, is_cached: bool = True):
+        if is_cached:
+            caches['media'].set(f'chunk_{chunk_number}', b'data')
+
+        with mock.patch('cvat.apps.engine.cache.Job.objects') as job_objects:
+            job_objects.select_related.return_value.get.side_effect = Job.DoesNotExist
+            ChunkPrefetcher._prepare_job_chunk(self._job.id, chunk_number, 'compressed',
+                self._job.segment.task.id, f'prefetch-chunk:chunk_{chunk_number}',
+            )
+
+    def test_can_enqueue_next_chunks(self):
+        self._enqueue_job_chunks(0, stop_chunk=2)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2])
+        self.assertEqual(self._queue.enqueue_call.call_args.kwargs['job_id'],
+            'prefetch-chunk:chunk_2')
+
+    def test_skips_cached_chunks(self):
+        caches['media'].set('chunk_2', b'data')
+
+        self._enqueue_job_chunks(0)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 3])
+
+    def test_checks_cached_chunks_in_single_request(self):
+        with mock.patch.object(MediaCache, 'has_cache_items',
+            return_value=[False, True, False]
+        ) as has_cache_items, mock.patch.object(MediaCache, 'has_cache_item') as has_cache_item:
+            self._enqueue_job_chunks(0)
+
+        has_cache_items.assert_called_once_with(['chunk_1', 'chunk_2', 'chunk_3'])
+        has_cache_item.assert_not_called()
+        self.assertEqual(self._get_enqueued_chunks(), [1, 3])
+
+    def test_can_check_cached_chunks_in_redis(self):
+        with override_settings(CACHES={
+            'default': { 'BACKEND': 'django.core.cache.backends.locmem.LocMemCache' },
+            'media': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': 'redis://localhost:6379',
+            },
+        }), mock.patch.object(RedisCacheClient, 'get_client',
+            return_value=fakeredis.FakeRedis()
+        ):
+            cache = MediaCache()
+            cache._set_cache_item('chunk_2', _make_item(b'data'))
+
+            self.assertEqual(cache.has_cache_items(['chunk_1', 'chunk_2']), [False, True])
+
+    def test_skips_pending_chunks(self):
+        self._enqueue_job_chunks(0)
+        self._enqueue_job_chunks(1)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2, 3, 4])
+
+    def test_can_enqueue_chunk_again_after_failed_preparation(self):
+        self._enqueue_job_chunks(0, stop_chunk=1)
+        self._finish_chunk(1, is_cached=False)
+        self._enqueue_job_chunks(0, stop_chunk=1)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 1])
+
+    @override_settings(MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS=2)
+    def test_limits_pending_chunks_per_task(self):
+        self._enqueue_job_chunks(0)
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2])
+
+        self._finish_chunk(1)
+        self._enqueue_job_chunks(0)
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2, 3])
+
+    @override_settings(MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS=1)
+    def test_repeated_release_does_not_exceed_limit(self):
+        self._enqueue_job_chunks(0, stop_chunk=1)
+        self._finish_chunk(1)
+        self._finish_chunk(1)
+        self.assertEqual(self._queue.connection.zcard(ChunkPrefetcher._get_task_jobs_key(2)), 0)
+
+        self._enqueue_job_chunks(1)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2])
+
+    @override_settings(MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS=2)
+    def test_drops_stale_pending_chunks(self):
+        now = time.time()
+        with mock.patch('cvat.apps.engine.cache.time.time', return_value=now):
+            self._enqueue_job_chunks(0)
+
+        # The workers have died without releasing the chunks
+        with mock.patch('cvat.apps.engine.cache.time.time',
+            return_value=now + ChunkPrefetcher._PENDING_JOB_TTL + 1
+        ):
+            self._enqueue_job_chunks(0)
+
+        self.assertEqual(self._get_enqueued_chunks(), [1, 2, 1, 2])
+
+
+class SelectiveJobChunkTest(_MediaCacheTestBase):
+    _FRAME_SET = [0, 2, 3, 5, 6, 7, 9, 12]
+
+    def setUp(self):
+        super().setUp()
+
+        self._db_data = mock.Mock(start_frame=0, stop_frame=13, chunk_size=10, image_quality=80,
+            **{ 'get_frame_step.return_value': 1, 'video.width': 20, 'video.height': 10 })
+        self._db_job = mock.Mock(**{
+            'segment.task.data': self._db_data, 'segment.frame_set': set(self._FRAME_SET),
+        })
+
+        def _get_frames_batch(frame_numbers, **kwargs):
+            # Decoded video frames can have a different size
+            frames = []
+            for frame_number in frame_numbers:
+                frame = BytesIO()
+                Image.new('RGB', (20 - frame_number % 2, 10),
+                    (frame_number * 10, 0, 0)).save(frame, 'JPEG')
+                frame.seek(0)
+                frames.append(frame)
+            return frames
+
+        frame_provider_class = mock.Mock()
+        frame_provider_class.return_value.get_frames_batch.side_effect = _get_frames_batch
+
+        patcher = mock.patch.object(MediaCache, '_get_frame_provider_class',
+            return_value=frame_provider_class)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_chunk_images(self, chunk_number: int):
+        buff, mime_type = MediaCache().prepare_selective_job_chunk(
+            self._db_job, 'compressed', chunk_number
+        )
+        self.assertEqual(mime_type, 'application/zip')
+
+        with zipfile.ZipFile(buff) as chunk:
+            return {name: chunk.read(name) for name in chunk.namelist()}
+
+    def test_parallel_encoding_produces_same_chunk(self):
+        for chunk_number in [0, 1]:
+            with override_settings(CVAT_CHUNK_ENCODING_THREADS=1):
+                serial_chunk = self._get_chunk_images(chunk_number)
+            with override_settings(CVAT_CHUNK_ENCODING_THREADS=4):
+                parallel_chunk = self._get_chunk_images(chunk_number)
+
+            self.assertEqual(serial_chunk, parallel_chunk)
+
+        self.assertEqual(len(serial_chunk), 4)
+        for frame_number, image_data in zip(range(10, 14), serial_chunk.values()):
+            with Image.open(BytesIO(image_data)) as image:
+                if frame_number in self._FRAME_SET:
+                    self.assertEqual(image.size, (20, 10))
+                else:
+                    self.assertEqual(image.size, (1, 1))
@@ -0,0 +1,302 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import itertools
+import threading
+import time
+import zipfile
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Optional
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.frame_provider import (FrameProvider, _ChunkDecoderPool,
+    _get_decoder_pool, _VideoChunkDecoder, _ZipChunkDecoder)
+from cvat.apps.engine.models import DataChoice, StorageMethodChoice
+
+
+class _FakeDecoder:
+    def __init__(self, memory_size: int = 0, last_access_time: Optional[float] = None):
+        self.memory_size = memory_size
+        self.last_access_time = (
+            last_access_time if last_access_time is not None else time.monotonic()
+        )
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _make_frame(pts: int, width: int = 4, height: int = 2):
+    return SimpleNamespace(pts=pts, key_frame=(pts == 0), width=width, height=height)
+
+
+class VideoChunkDecoderTest(SimpleTestCase):
+    def _make_decoder(self, frame_buffer_size: int) -> _VideoChunkDecoder:
+        decoder = _VideoChunkDecoder(BytesIO(b'data'), frame_buffer_size=frame_buffer_size)
+        decoder._rotation = 0
+        return decoder
+
+    def _add_frames(self, decoder: _VideoChunkDecoder, frame_numbers):
+        for frame_number in frame_numbers:
+            with decoder._lock:
+                decoder._pos = frame_number
+                decoder._add_frame(_make_frame(frame_number))
+
+    def test_memory_size_includes_buffered_frames(self):
+        decoder = self._make_decoder(frame_buffer_size=3)
+        frame_size = 4 * 2 * 3
+
+        self._add_frames(decoder, range(2))
+        self.assertEqual(decoder.memory_size, 4 + 2 * frame_size)
+
+        # The evicted and replaced frames are not counted
+        self._add_frames(decoder, [*range(2, 10), 9])
+        self.assertEqual(decoder.memory_size, 4 + 3 * frame_size)
+        self.assertEqual(list(decoder._frame_buffer), [7, 8, 9])
+
+        decoder.close()
+        self.assertEqual(decoder.memory_size, 4)
+
+    def test_can_seek_to_first_key_frame(self):
+        decoder = self._make_decoder(frame_buffer_size=2)
+        self._add_frames(decoder, range(3))
+        decoder._container = mock.Mock()
+        decoder._stream = mock.Mock()
+
+        with mock.patch.object(decoder, '_decode', return_value=iter([_make_frame(0)])):
+            self.assertTrue(decoder._seek(1))
+
+        decoder._container.seek.assert_called_once_with(0, stream=decoder._stream,
+            backward=True, any_frame=False)
+        self.assertEqual(decoder._pos, 0)
+
+
+class ChunkDecoderPoolTest(SimpleTestCase):
+    def _make_pool(self, *, max_decoders=10, memory_limit=1000, idle_timeout=100):
+        return _ChunkDecoderPool(
+            max_decoders=max_decoders, memory_limit=memory_limit, idle_timeout=idle_timeout,
+        )
+
+    def test_reuses_decoders(self):
+        pool = self._make_pool()
+        decoder = pool.get('a', _FakeDecoder)
+
+        self.assertIs(pool.get('a', _FakeDecoder), decoder)
+
+    def test_evicts_least_recently_used_decoders_above_count_limit(self):
+        pool = self._make_pool(max_decoders=2)
+        decoders = { key: pool.get(key, _FakeDecoder) for key in ['a', 'b'] }
+        pool.get('a', _FakeDecoder)
+        decoders['c'] = pool.get('c', _FakeDecoder)
+
+        self.assertEqual(list(pool._decoders), ['a', 'c'])
+        self.assertTrue(decoders['b'].closed)
+        self.assertFalse(decoders['a'].closed)
+
+    def test_evicts_decoders_above_memory_limit(self):
+        pool = self._make_pool(memory_limit=100)
+        decoders = {
+            key: pool.get(key, lambda: _FakeDecoder(memory_size=40)) for key in ['a', 'b', 'c']
+        }
+
+        self.assertEqual(list(pool._decoders), ['b', 'c'])
+        self.assertTrue(decoders['a'].closed)
+
+    def test_keeps_requested_decoder_above_memory_limit(self):
+        pool = self._make_pool(memory_limit=100)
+        pool.get('a', lambda: _FakeDecoder(memory_size=40))
+        decoder = pool.get('b', lambda: _FakeDecoder(memory_size=200))
+
+        self.assertEqual(list(pool._decoders), ['b'])
+        self.assertFalse(decoder.closed)
+
+    def test_evicts_idle_decoders(self):
+        pool = self._make_pool(idle_timeout=10)
+        with mock.patch('cvat.apps.engine.frame_provider.time.monotonic', return_value=100):
+            idle_decoder = pool.get('a', lambda: _FakeDecoder(last_access_time=80))
+            pool.get('b', lambda: _FakeDecoder(last_access_time=95))
+            pool.get('c', lambda: _FakeDecoder(last_access_time=100))
+
+        self.assertEqual(list(pool._decoders), ['b', 'c'])
+        self.assertTrue(idle_decoder.closed)
+
+    def test_can_evict_while_decoders_are_used(self):
+        pool = self._make_pool(memory_limit=10 ** 9)
+        frame_buffer_size = 10
+        decoder = pool.get('video',
+            lambda: _VideoChunkDecoder(BytesIO(), frame_buffer_size=frame_buffer_size)
+        )
+        decoder._rotation = 0
+
+        errors = []
+        stop_event = threading.Event()
+
+        def use_decoder():
+            try:
+                for frame_number in range(20000):
+                    with decoder._lock:
+                        decoder._pos = frame_number
+                        decoder._add_frame(_make_frame(frame_number))
+            except Exception as ex:
+                errors.append(ex)
+            finally:
+                stop_event.set()
+
+        def use_pool():
+            try:
+                i = 0
+                while not stop_event.is_set():
+                    pool.get(i % 5, _FakeDecoder)
+                    i += 1
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=use_decoder), threading.Thread(target=use_pool)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(decoder.memory_size, frame_buffer_size * 4 * 2 * 3)
+
+
+class FrameProviderBatchTest(SimpleTestCase):
+    # The decoder pool is shared by the process, the data ids must be unique
+    _data_ids = itertools.count(10 ** 6)
+
+    def _make_image(self, frame_number: int, size=(3, 2)) -> Image.Image:
+        return Image.new('RGB', size, (frame_number * 10, 1, 2))
+
+    def _make_frame_provider(self, images, *, chunk_size: int = 2) -> FrameProvider:
+        chunks = []
+        for chunk_start in range(0, len(images), chunk_size):
+            chunk = BytesIO()
+            with zipfile.ZipFile(chunk, 'w') as zip_chunk:
+                for i, image in enumerate(images[chunk_start:chunk_start + chunk_size]):
+                    image_data = BytesIO()
+                    image.save(image_data, format='PNG')
+                    zip_chunk.writestr(f'{i:06d}.png', image_data.getvalue())
+            chunks.append(chunk)
+
+        self._chunk_requests = []
+        def get_chunk(chunk_number, quality, db_data):
+            self._chunk_requests.append(chunk_number)
+            return BytesIO(chunks[chunk_number].getvalue()), 'application/zip'
+
+        patcher = mock.patch.object(MediaCache, 'get_task_chunk_data_with_mime',
+            side_effect=get_chunk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        db_data = mock.Mock(
+            id=next(self._data_ids), size=len(images), chunk_size=chunk_size,
+            storage_method=StorageMethodChoice.CACHE,
+            compressed_chunk_type=DataChoice.IMAGESET,
+            original_chunk_type=DataChoice.IMAGESET,
+        )
+        return FrameProvider(db_data)
+
+    def _get_expected_frame(self, image: Image.Image) -> np.ndarray:
+        return np.asarray(image)[..., ::-1]
+
+    def test_can_get_frames_in_requested_order(self):
+        images = [self._make_image(i) for i in range(5)]
+        frame_provider = self._make_frame_provider(images)
+        frame_numbers = [3, 0, 4, 2, 3]
+
+        frames = frame_provider.get_frames_batch(frame_numbers)
+
+        self.assertIsInstance(frames, list)
+        self.assertEqual(len(frames), len(frame_numbers))
+        for frame_number, frame in zip(frame_numbers, frames):
+            np.testing.assert_array_equal(frame, self._get_expected_frame(images[frame_number]))
+
+        # Each chunk is loaded once
+        self.assertEqual(sorted(self._chunk_requests), [0, 1, 2])
+
+    def test_can_get_frames_as_views_of_single_array(self):
+        frame_provider = self._make_frame_provider([self._make_image(i) for i in range(3)])
+
+        frames = frame_provider.get_frames_batch([0, 1, 2])
+
+        self.assertTrue(all(frame.base is frames[0].base for frame in frames))
+        self.assertEqual(frames[0].base.shape, (3, 2, 3, 3))
+
+    def test_can_get_frames_with_different_resolutions(self):
+        images = [self._make_image(0, size=(3, 2)), self._make_image(1, size=(4, 5))]
+        frame_provider = self._make_frame_provider(images)
+
+        frames = frame_provider.get_frames_batch([1, 0])
+
+        self.assertIsInstance(frames, list)
+        np.testing.assert_array_equal(frames[0], self._get_expected_frame(images[1]))
+        np.testing.assert_array_equal(frames[1], self._get_expected_frame(images[0]))
+
+    def test_can_get_frames_of_other_types(self):
+        images = [self._make_image(i) for i in range(3)]
+        frame_provider = self._make_frame_provider(images)
+
+        for out_type in [FrameProvider.Type.BUFFER, FrameProvider.Type.PIL]:
+            with self.subTest(out_type=out_type):
+                frames = frame_provider.get_frames_batch([2, 0], out_type=out_type)
+
+                self.assertIsInstance(frames, list)
+                for frame_number, frame in zip([2, 0], frames):
+                    expected_frame, _ = frame_provider.get_frame(frame_number,
+                        out_type=out_type)
+                    if out_type == FrameProvider.Type.BUFFER:
+                        self.assertEqual(frame.getvalue(), expected_frame.getvalue())
+                    else:
+                        self.assertEqual(frame.tobytes(), expected_frame.tobytes())
+
+    def test_can_get_empty_batch(self):
+        frame_provider = self._make_frame_provider([self._make_image(0)])
+
+        self.assertEqual(frame_provider.get_frames_batch([]), [])
+
+    def test_reacquires_decoder_closed_by_pool(self):
+        images = [self._make_image(i) for i in range(3)]
+        frame_provider = self._make_frame_provider(images)
+
+        frame_provider.get_frame(0)
+        decoder_key = (frame_provider.data_id, 0, FrameProvider.Quality.ORIGINAL)
+        decoder = _get_decoder_pool()._decoders.pop(decoder_key)
+        decoder.close()
+
+        frame, _ = frame_provider.get_frame(1)
+
+        self.assertEqual(frame.getvalue(), frame_provider.get_frame(1)[0].getvalue())
+        self.assertIsNot(_get_decoder_pool()._decoders[decoder_key], decoder)
+        self.assertIsNone(decoder._reader)
+        self.assertEqual(self._chunk_requests, [0, 0])
+
+    def test_closed_decoder_does_not_keep_chunk_open(self):
+        chunk = BytesIO()
+        with zipfile.ZipFile(chunk, 'w') as zip_chunk:
+            zip_chunk.writestr('000000.png', b'data')
+        decoder = _ZipChunkDecoder(chunk)
+
+        self.assertEqual(decoder[0][0].getvalue(), b'data')
+        self.assertIsNotNone(decoder._reader)
+
+        decoder.close()
+
+        # The requests which have already got the decoder are still served
+        self.assertEqual(decoder[0][0].getvalue(), b'data')
+        self.assertTrue(decoder.is_closed)
+        self.assertIsNone(decoder._reader)
+
+    def test_cannot_get_frames_out_of_range(self):
+        frame_provider = self._make_frame_provider([self._make_image(0)])
+
+        with self.assertRaises(ValidationError):
+            frame_provider.get_frames_batch([0, 1])
@@ -0,0 +1,454 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from django.test import SimpleTestCase
+from PIL import Image, ImageFile
+
+from utils import dataset_manifest
+from utils.dataset_manifest import ImageManifestManager
+from utils.dataset_manifest.core import _ImageColumns, _Index
+
+
+def _make_manifest_items(count: int):
+    return [
+        {
+            'name': f'images/image_{i}', 'extension': '.jpg',
+            'width': 10 + i, 'height': 20 + i, 'checksum': f'{i:032x}',
+        }
+        for i in range(count)
+    ]
+
+
+class _ManifestTestBase(SimpleTestCase):
+    def setUp(self):
+        self._temp_dir = TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+    def _get_path(self, *parts: str) -> str:
+        return os.path.join(self._temp_dir.name, *parts)
+
+    def _create_manifest(
+        self, items, *, path=None, create_index=True, create_columns=False
+    ) -> ImageManifestManager:
+        path = path or self._temp_dir.name
+        os.makedirs(path, exist_ok=True)
+        manifest = ImageManifestManager(
+            path, create_index=create_index, create_columns=create_columns
+        )
+        manifest.create(content=items)
+        return manifest
+
+    def _write_manifest_lines(self, items, *, path=None):
+        path = path or self._temp_dir.name
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, 'manifest.jsonl'), 'w') as manifest_file:
+            manifest_file.write('{"version":"1.1"}\n{"type":"images"}\n')
+            for item in items:
+                manifest_file.write(json.dumps(item, separators=(',', ':')) + '\n')
+
+
+class ManifestIndexTest(_ManifestTestBase):
+    def _get_line_offsets(self, manifest: ImageManifestManager):
+        offsets = []
+        with open(manifest.manifest.path, 'rb') as manifest_file:
+            for _ in range(manifest.manifest.get_header_lines_count()):
+                manifest_file.readline()
+
+            while True:
+                offset = manifest_file.tell()
+                if not manifest_file.readline():
+                    break
+                offsets.append(offset)
+
+        return offsets
+
+    def test_can_create_binary_index(self):
+        items = _make_manifest_items(5)
+        manifest = self._create_manifest(items)
+
+        self.assertTrue(os.path.exists(self._get_path(_Index.FILE_NAME)))
+        self.assertFalse(os.path.exists(self._get_path(_Index.LEGACY_FILE_NAME)))
+        self.assertEqual(os.path.getsize(self._get_path(_Index.FILE_NAME)), 8 * len(items))
+
+        loaded_manifest = ImageManifestManager(self._temp_dir.name)
+        loaded_manifest.init_index()
+        self.assertEqual(list(loaded_manifest.index), self._get_line_offsets(manifest))
+        self.assertEqual([loaded_manifest[i] for i in range(len(items))], items)
+
+    def test_can_read_item_ranges(self):
+        items = _make_manifest_items(10)
+        manifest = self._create_manifest(items)
+
+        self.assertEqual(manifest[2:8:3], items[2:8:3])
+        self.assertEqual(list(manifest.get_items([7, 1, 4])), [items[7], items[1], items[4]])
+        self.assertEqual([item for _, item in manifest], items)
+
+    def test_can_read_legacy_index(self):
+        items = _make_manifest_items(3)
+        manifest = self._create_manifest(items)
+        offsets = self._get_line_offsets(manifest)
+
+        os.remove(self._get_path(_Index.FILE_NAME))
+        with open(self._get_path(_Index.LEGACY_FILE_NAME), 'w') as index_file:
+            json.dump({str(i): offset for i, offset in enumerate(offsets)}, index_file)
+
+        read_only_manifest = ImageManifestManager(self._temp_dir.name, create_index=False)
+        read_only_manifest.init_index()
+        self.assertEqual(read_only_manifest[1], items[1])
+        self.assertFalse(os.path.exists(self._get_path(_Index.FILE_NAME)))
+
+        # The legacy index is replaced, when the index can be written
+        manifest = ImageManifestManager(self._temp_dir.name)
+        manifest.init_index()
+        self.assertEqual(manifest[2], items[2])
+        self.assertTrue(os.path.exists(self._get_path(_Index.FILE_NAME)))
+        self.assertFalse(os.path.exists(self._get_path(_Index.LEGACY_FILE_NAME)))
+
+        manifest.init_index()
+        self.assertEqual(list(manifest.index), offsets)
+
+    def test_can_convert_legacy_index_concurrently(self):
+        items = _make_manifest_items(3)
+        manifest = self._create_manifest(items)
+        offsets = self._get_line_offsets(manifest)
+
+        os.remove(self._get_path(_Index.FILE_NAME))
+        with open(self._get_path(_Index.LEGACY_FILE_NAME), 'w') as index_file:
+            json.dump({str(i): offset for i, offset in enumerate(offsets)}, index_file)
+
+        first_index = _Index(self._temp_dir.name)
+        second_index = _Index(self._temp_dir.name)
+        first_index.load()
+        second_index.load()
+
+        # The second process writes the index while the first one is writing it
+        original_replace = os.replace
+        def _replace(src, dst):
+            with mock.patch('os.replace', original_replace):
+                second_index.dump()
+            original_replace(src, dst)
+
+        with mock.patch('os.replace', side_effect=_replace):
+            first_index.dump()
+
+        self.assertEqual(
+            [_Index.FILE_NAME],
+            [name for name in os.listdir(self._temp_dir.name) if name.startswith('index')]
+        )
+
+        manifest.init_index()
+        self.assertEqual(list(manifest.index), offsets)
+
+    def test_can_create_index_for_read_only_manifest(self):
+        items = _make_manifest_items(3)
+        self._write_manifest_lines(items)
+
+        manifest = ImageManifestManager(self._temp_dir.name, create_index=False)
+        manifest.init_index()
+
+        self.assertEqual(manifest[1], items[1])
+        self.assertFalse(os.path.exists(self._get_path(_Index.FILE_NAME)))
+
+    def test_can_load_empty_index(self):
+        self._write_manifest_lines([])
+        ImageManifestManager(self._temp_dir.name).init_index()
+
+        manifest = ImageManifestManager(self._temp_dir.name)
+        self.assertTrue(manifest.is_empty())
+        self.assertEqual(len(manifest), 0)
+
+    def test_can_update_index_partially(self):
+        items = _make_manifest_items(4)
+        manifest = self._create_manifest(items)
+
+        # Rewrite the last items with the items of different lengths and append new items
+        updated_items = items[:2] + [
+            {**item, 'name': item['name'] + '_updated'} for item in _make_manifest_items(5)[2:]
+        ]
+        self._write_manifest_lines(updated_items)
+
+        manifest.index.partial_update(manifest.manifest.path, 2)
+        self.assertEqual(list(manifest.index), self._get_line_offsets(manifest))
+        self.assertEqual(manifest[:], updated_items)
+
+        # Only append new items after the last known item
+        appended_items = updated_items + _make_manifest_items(7)[5:]
+        self._write_manifest_lines(appended_items)
+
+        manifest.index.partial_update(manifest.manifest.path, len(manifest.index))
+        self.assertEqual(manifest[:], appended_items)
+
+        manifest.index.dump()
+        loaded_manifest = ImageManifestManager(self._temp_dir.name)
+        loaded_manifest.init_index()
+        self.assertEqual(list(loaded_manifest.index), self._get_line_offsets(manifest))
+
+
+class ManifestColumnsTest(_ManifestTestBase):
+    _ITEM_NAMES = [
+        'b/c/image_10', 'image_2', 'a/image_1', 'b/image_3', 'b/c/image_2', 'image_1', 'a/image_1',
+    ]
+
+    def _make_items(self):
+        return [
+            {**item, 'name': name}
+            for name, item in zip(self._ITEM_NAMES, _make_manifest_items(len(self._ITEM_NAMES)))
+        ]
+
+    def _create_manifests(self, items):
+        """
+        Creates the same manifest with and without the columns.
+        The manifest without the columns is read line by line.
+        """
+
+        manifest = self._create_manifest(
+            items, path=self._get_path('columns'), create_columns=True
+        )
+        self._write_manifest_lines(items, path=self._get_path('lines'))
+        lines_manifest = ImageManifestManager(self._get_path('lines'), create_index=False)
+
+        self.assertIsNotNone(manifest._init_columns())
+        self.assertIsNone(lines_manifest._init_columns())
+
+        return manifest, lines_manifest
+
+    def test_can_get_data_names(self):
+        manifest, lines_manifest = self._create_manifests(self._make_items())
+
+        self.assertEqual(list(manifest.data), list(lines_manifest.data))
+        self.assertEqual(list(manifest.data)[:2], ['b/c/image_10.jpg', 'image_2.jpg'])
+
+    def test_can_get_subset(self):
+        manifest, lines_manifest = self._create_manifests(self._make_items())
+
+        for subset_names in [
+            ['image_1.jpg', 'b/image_3.jpg'],
+            ['a/image_1.jpg', 'missing.jpg', 'b/c/image_10.jpg', 'a/image_1.jpg'],
+            ['missing.jpg'],
+            [],
+        ]:
+            with self.subTest(subset_names=subset_names):
+                self.assertEqual(
+                    manifest.get_subset(subset_names), lines_manifest.get_subset(subset_names)
+                )
+
+    def test_can_emulate_hierarchical_structure(self):
+        manifest, lines_manifest = self._create_manifests(self._make_items())
+
+        for kwargs in [
+            {},
+            { 'prefix': 'b/' },
+            { 'prefix': 'b/c/' },
+            { 'prefix': 'b/c/image_1' },
+            { 'prefix': 'ima' },
+            { 'prefix': 'missing/' },
+            { 'manifest_prefix': 'root' },
+            { 'manifest_prefix': 'root', 'prefix': 'root/b/' },
+            { 'default_prefix': 'b/' },
+            { 'start_index': 1, 'page_size': 2 },
+        ]:
+            with self.subTest(**kwargs):
+                kwargs = { 'page_size': 100, 'start_index': 0, **kwargs }
+                self.assertEqual(
+                    manifest.emulate_hierarchical_structure(**kwargs),
+                    lines_manifest.emulate_hierarchical_structure(**kwargs),
+                )
+
+    def test_can_create_columns_for_empty_placeholder_items(self):
+        # Items outside of the start/step range are written as empty placeholders
+        items = self._make_items()
+        items[1] = items[4] = {}
+        self._write_manifest_lines(items)
+
+        manifest = ImageManifestManager(self._temp_dir.name, create_columns=True)
+        columns = manifest._init_columns()
+
+        self.assertEqual(len(columns), len(items))
+        self.assertEqual(columns['name'][1], b'')
+        self.assertEqual(columns['width'][1], -1)
+        self.assertEqual(manifest.get_subset(['b/image_3.jpg']), ([0], [items[3]]))
+        self.assertEqual(manifest.emulate_hierarchical_structure(page_size=100, start_index=0), {
+            'content': [
+                { 'name': 'a', 'type': 'DIR' },
+                { 'name': 'b', 'type': 'DIR' },
+                { 'name': 'image_1.jpg', 'type': 'REG' },
+            ],
+            'next': None,
+        })
+
+    def test_can_create_columns_for_existing_manifest(self):
+        items = self._make_items()
+        self._write_manifest_lines(items)
+
+        manifest = ImageManifestManager(self._temp_dir.name, create_columns=True)
+        self.assertEqual(list(manifest.data)[0], 'b/c/image_10.jpg')
+        self.assertTrue(os.path.isdir(self._get_path(_ImageColumns.DIR_NAME)))
+
+        # The existing columns are used without creating them
+        manifest = ImageManifestManager(self._temp_dir.name)
+        self.assertIsNotNone(manifest._init_columns())
+        self.assertEqual(list(manifest.data)[0], 'b/c/image_10.jpg')
+
+    def test_recreates_columns_for_changed_manifest(self):
+        items = self._make_items()
+        manifest = self._create_manifest(items, create_columns=True)
+        self.assertEqual(len(manifest._init_columns()), len(items))
+
+        updated_items = items + [{**items[0], 'name': 'new_image'}]
+        self._write_manifest_lines(updated_items)
+        manifest.set_index()
+
+        self.assertEqual(list(manifest.data)[-1], 'new_image.jpg')
+        self.assertTrue(ImageManifestManager(self._temp_dir.name)._columns.is_actual(
+            manifest.manifest.path
+        ))
+
+    def test_does_not_create_columns_by_default(self):
+        items = self._make_items()
+        manifest = self._create_manifest(items)
+        self.assertFalse(os.path.exists(self._get_path(_ImageColumns.DIR_NAME)))
+
+        for manifest in [
+            manifest,
+            ImageManifestManager(self._temp_dir.name),
+            ImageManifestManager(self._temp_dir.name, create_index=False),
+        ]:
+            self.assertEqual(list(manifest.data)[0], 'b/c/image_10.jpg')
+            self.assertIsNone(manifest._init_columns())
+
+        self.assertFalse(os.path.exists(self._get_path(_ImageColumns.DIR_NAME)))
+
+    def test_can_create_columns_concurrently(self):
+        items = self._make_items()
+        self._write_manifest_lines(items)
+        manifest_path = self._get_path('manifest.jsonl')
+
+        first_columns = _ImageColumns(self._temp_dir.name)
+        second_columns = _ImageColumns(self._temp_dir.name)
+        first_columns.create(manifest_path, items)
+        second_columns.create(manifest_path, items)
+
+        # The second process saves the columns while the first one is saving them
+        original_rename = os.rename
+        def _rename(src, dst):
+            with mock.patch('os.rename', original_rename):
+                second_columns.dump(manifest_path)
+            original_rename(src, dst)
+
+        with mock.patch('os.rename', side_effect=_rename):
+            first_columns.dump(manifest_path)
+
+        self.assertEqual(
+            [_ImageColumns.DIR_NAME],
+            [name for name in os.listdir(self._temp_dir.name) if name.startswith('columns')]
+        )
+
+        manifest = ImageManifestManager(self._temp_dir.name)
+        self.assertIsNotNone(manifest._init_columns())
+        self.assertEqual(list(manifest.data)[0], 'b/c/image_10.jpg')
+
+    def test_can_replace_outdated_columns(self):
+        items = self._make_items()
+        self._create_manifest(items, create_columns=True)
+
+        updated_items = items + [{**items[0], 'name': 'new_image'}]
+        self._write_manifest_lines(updated_items)
+
+        manifest = ImageManifestManager(self._temp_dir.name, create_columns=True)
+        self.assertEqual(list(manifest.data)[-1], 'new_image.jpg')
+        self.assertEqual(
+            [_ImageColumns.DIR_NAME],
+            [name for name in os.listdir(self._temp_dir.name) if name.startswith('columns')]
+        )
+
+
+class ParallelManifestCreationTest(_ManifestTestBase):
+    def setUp(self):
+        super().setUp()
+
+        self._data_dir = self._get_path('data')
+        self._sources = []
+        for i in range(20):
+            path = os.path.join(self._data_dir, f'dir_{i % 3}', f'image_{i}.jpg')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            image = Image.new('RGB', (10 + i, 20 + 2 * i), (i, 2 * i, 3 * i))
+            exif = Image.Exif()
+            if i % 4 == 0:
+                exif[274] = 6 # the rotated images have the swapped width and height
+            image.save(path, exif=exif)
+
+            self._sources.append(path)
+
+    def _create_manifest_file(self, name: str, *, workers: int, **kwargs) -> str:
+        path = self._get_path(name)
+        os.makedirs(path)
+
+        manifest = ImageManifestManager(path)
+        manifest.link(sources=self._sources, data_dir=self._data_dir, use_image_hash=True,
+            **kwargs)
+        manifest.create(workers=workers)
+
+        with open(manifest.manifest.path) as manifest_file:
+            return manifest_file.read()
+
+    def test_parallel_creation_produces_same_manifest(self):
+        serial_manifest = self._create_manifest_file('serial', workers=1)
+
+        for workers in [2, 4, 32]:
+            with self.subTest(workers=workers):
+                self.assertEqual(
+                    self._create_manifest_file(f'parallel_{workers}', workers=workers),
+                    serial_manifest,
+                )
+
+        items = [json.loads(line) for line in serial_manifest.splitlines()[2:]]
+        self.assertEqual(len(items), len(self._sources))
+        self.assertEqual(items[0]['name'], 'dir_0/image_0')
+        self.assertEqual((items[0]['width'], items[0]['height']), (20, 10))
+        self.assertTrue(all(item['checksum'] for item in items))
+
+    def test_parallel_creation_produces_same_manifest_for_frame_range(self):
+        kwargs = { 'start': 3, 'stop': 17, 'step': 4 }
+
+        self.assertEqual(
+            self._create_manifest_file('parallel', workers=4, **kwargs),
+            self._create_manifest_file('serial', workers=1, **kwargs),
+        )
+
+    def test_reads_only_image_headers_without_checksum(self):
+        # JPEG images keep EXIF in the header, so the image data is not decoded
+        manifest = ImageManifestManager(self._get_path())
+        manifest.link(sources=self._sources, data_dir=self._data_dir, use_image_hash=False)
+
+        with mock.patch.object(ImageFile.ImageFile, 'load') as load_image:
+            manifest.create(workers=4)
+
+        load_image.assert_not_called()
+        self.assertEqual(len(manifest), len(self._sources))
+
+    def test_can_create_manifest_in_parallel_with_tool(self):
+        manifests = []
+        for workers in [1, 4]:
+            output_dir = self._get_path(f'tool_{workers}')
+            subprocess.run([
+                    sys.executable,
+                    os.path.join(os.path.dirname(dataset_manifest.__file__), 'create.py'),
+                    '--output-dir', output_dir, '--workers', str(workers), self._data_dir,
+                ],
+                check=True, capture_output=True,
+            )
+
+            with open(os.path.join(output_dir, 'manifest.jsonl')) as manifest_file:
+                manifests.append(manifest_file.read())
+
+        self.assertEqual(manifests[0], manifests[1])
+        self.assertEqual(len(manifests[0].splitlines()), 2 + len(self._sources))
@@ -0,0 +1,89 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+import time
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from PIL import Image
+
+from cvat.apps.engine.media_extractors import ZipCompressedChunkWriter
+
+
+class ZipCompressedChunkWriterTest(SimpleTestCase):
+    def _make_images(self, count: int):
+        rng = np.random.default_rng(42)
+        return [
+            (Image.fromarray(rng.integers(0, 255, (8 + i, 10, 3), dtype=np.uint8)), f'{i}.png', None)
+            for i in range(count)
+        ]
+
+    def _save_chunk(self, images, *, encoding_threads: int):
+        chunk = BytesIO()
+        writer = ZipCompressedChunkWriter(90, encoding_threads=encoding_threads)
+        image_sizes = writer.save_as_chunk(iter(images), chunk)
+
+        with zipfile.ZipFile(chunk) as zip_chunk:
+            files = [(name, zip_chunk.read(name)) for name in zip_chunk.namelist()]
+
+        return image_sizes, files
+
+    def test_parallel_encoding_produces_same_chunk(self):
+        images = self._make_images(10)
+
+        serial_result = self._save_chunk(images, encoding_threads=1)
+        parallel_result = self._save_chunk(images, encoding_threads=4)
+
+        self.assertEqual(parallel_result, serial_result)
+        self.assertEqual(serial_result[0], [(10, 8 + i) for i in range(10)])
+
+    def test_limits_pending_images(self):
+        encoding_threads = 2
+        max_pending_images = (
+            ZipCompressedChunkWriter.MAX_PENDING_IMAGES_PER_THREAD * encoding_threads
+        )
+
+        pending_images = 0
+        max_observed_pending_images = 0
+        lock = threading.Lock()
+        compress_image = ZipCompressedChunkWriter._compress_image
+
+        def count_images():
+            nonlocal pending_images, max_observed_pending_images
+            for image in self._make_images(20):
+                with lock:
+                    pending_images += 1
+                    max_observed_pending_images = max(
+                        max_observed_pending_images, pending_images
+                    )
+                yield image
+
+        def slow_compress_image(image, quality):
+            time.sleep(0.01)
+            return compress_image(image, quality)
+
+        def write_image(*args, **kwargs):
+            nonlocal pending_images
+            with lock:
+                pending_images -= 1
+            return original_writestr(*args, **kwargs)
+
+        original_writestr = zipfile.ZipFile.writestr
+        with (
+            mock.patch.object(ZipCompressedChunkWriter, '_compress_image',
+                side_effect=slow_compress_image),
+            mock.patch.object(zipfile.ZipFile, 'writestr', autospec=True,
+                side_effect=write_image),
+        ):
+            ZipCompressedChunkWriter(90, encoding_threads=encoding_threads).save_as_chunk(
+                count_images(), BytesIO()
+            )
+
+        self.assertEqual(pending_images, 0)
+        # One more image can be read by the writer while the encoding results are awaited
+        self.assertLessEqual(max_observed_pending_images, max_pending_images + 1)
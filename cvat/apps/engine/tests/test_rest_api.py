@@ -47,6 +47,7 @@ from cvat.apps.engine.models import (AttributeSpec, AttributeType, Data, Job,
     StorageChoice, DimensionType, SortingMethod)
 from cvat.apps.engine.media_extractors import ValidateDimension, sort
 from cvat.apps.engine.tests.utils import get_paginated_collection
+from cvat.apps.events.sink import get_event_sink
 from utils.dataset_manifest import ImageManifestManager, VideoManifestManager
 
 from cvat.apps.engine.tests.utils import (ApiTestBase, ForceLogin,
@@ -530,11 +531,16 @@ class ServerExceptionAPITestCase(ApiTestBase):
 
     def _run_api_v2_server_exception(self, user):
         with ForceLogin(user, self.client):
-            #pylint: disable=unused-variable
-            with mock.patch("cvat.apps.events.views.vlogger") as vlogger:
+            with mock.patch("cvat.apps.events.sink.vlogger") as vlogger:
                 response = self.client.post('/api/events',
                     self.data, format='json')
 
+                # The events are sent by a background thread
+                get_event_sink().flush()
+
+        if response.status_code == status.HTTP_201_CREATED:
+            self.assertEqual(len(self.data['events']), vlogger.info.call_count)
+
         return response
 
     def test_api_v2_server_exception_admin(self):
@@ -580,11 +586,16 @@ class ServerLogsAPITestCase(ApiTestBase):
 
     def _run_api_v2_server_logs(self, user):
         with ForceLogin(user, self.client):
-            #pylint: disable=unused-variable
-            with mock.patch("cvat.apps.events.views.vlogger") as vlogger:
+            with mock.patch("cvat.apps.events.sink.vlogger") as vlogger:
                 response = self.client.post('/api/events',
                     self.data, format='json')
 
+                # The events are sent by a background thread
+                get_event_sink().flush()
+
+        if response.status_code == status.HTTP_201_CREATED:
+            self.assertEqual(len(self.data['events']), vlogger.info.call_count)
+
         return response
 
     def test_api_v2_server_logs_admin(self):
@@ -20,7 +20,7 @@ from attr.converters import to_bool
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
-from django.db.models import Count
+from django.db.models import Count, Max
 from django.db.models.query import Prefetch
 from django.http import HttpResponse, HttpRequest, HttpResponseNotFound, HttpResponseBadRequest
 from django.utils import timezone
@@ -83,7 +83,7 @@ from . import models, task
 from .log import ServerLogManager
 from cvat.apps.iam.filters import ORGANIZATION_OPEN_API_PARAMETERS
 from cvat.apps.iam.permissions import PolicyEnforcer, IsAuthenticatedOrReadPublicResource
-from cvat.apps.engine.cache import MediaCache
+from cvat.apps.engine.cache import ChunkPrefetcher, MediaCache
 from cvat.apps.engine.permissions import (CloudStoragePermission,
     CommentPermission, IssuePermission, JobPermission, LabelPermission, ProjectPermission,
     TaskPermission, UserPermission)
@@ -654,6 +654,9 @@ class DataChunkGetter:
                 # TODO: av.FFmpegError processing
                 if settings.USE_CACHE and db_data.storage_method == StorageMethodChoice.CACHE:
                     buff, mime_type = frame_provider.get_chunk(self.number, self.quality)
+
+                    # Cached chunks are wrapped into BytesIO without copying,
+                    # so getvalue() returns the cached bytes object as is
                     return HttpResponse(buff.getvalue(), content_type=mime_type)
 
                 # Follow symbol links if the chunk is a link on a real image otherwise
@@ -720,10 +723,20 @@ class JobDataGetter(DataChunkGetter):
                     chunk_number=self.number, quality=self.quality, db_job=self.job
                 )
 
-            return HttpResponse(buf.getvalue(), content_type=mime)
+            response = HttpResponse(buf.getvalue(), content_type=mime)
 
         else:
-            return super().__call__(request, start, stop, db_data)
+            response = super().__call__(request, start, stop, db_data)
+
+        if (
+            self.type == 'chunk' and response.status_code == status.HTTP_200_OK and
+            settings.USE_CACHE and db_data.storage_method == StorageMethodChoice.CACHE
+        ):
+            stop_chunk = stop // db_data.chunk_size
+            ChunkPrefetcher().enqueue_job_chunks(self.job, self.number, self.quality,
+                stop_chunk=stop_chunk)
+
+        return response
 
 
 @extend_schema(tags=['tasks'])
@@ -2531,7 +2544,9 @@ class CloudStorageViewSet(viewsets.GenericViewSet, mixins.ListModelMixin,
                 if not os.path.exists(full_manifest_path) or \
                         datetime.fromtimestamp(os.path.getmtime(full_manifest_path), tz=timezone.utc) < storage.get_file_last_modified(manifest_path):
                     storage.download_file(manifest_path, full_manifest_path)
-                manifest = ImageManifestManager(full_manifest_path, db_storage.get_storage_dirname())
+                manifest = ImageManifestManager(
+                    full_manifest_path, db_storage.get_storage_dirname(), create_columns=True
+                )
                 # need to update index
                 manifest.set_index()
                 try:
@@ -2962,8 +2977,9 @@ def _export_annotations(
 
     last_instance_update_time = timezone.localtime(db_instance.updated_date)
     if isinstance(db_instance, Project):
-        tasks_update = list(map(lambda db_task: timezone.localtime(db_task.updated_date), db_instance.tasks.all()))
-        last_instance_update_time = max(tasks_update + [last_instance_update_time])
+        tasks_update = db_instance.tasks.aggregate(Max('updated_date'))['updated_date__max']
+        if tasks_update:
+            last_instance_update_time = max(timezone.localtime(tasks_update), last_instance_update_time)
 
     timestamp = datetime.strftime(last_instance_update_time, "%Y_%m_%d_%H_%M_%S")
     is_annotation_file = rq_id.startswith('export:annotations')
@@ -2987,24 +3003,26 @@ def _export_annotations(
 
                     if not file_path:
                         return Response('A result for exporting job was not found for finished RQ job', status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                    elif not osp.exists(file_path):
-                        return Response('The result file does not exist in export cache', status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-                    if action == "download":
-                        filename = filename or \
-                            build_annotations_file_name(
-                                class_name=db_instance.__class__.__name__,
-                                identifier=db_instance.name if isinstance(db_instance, (Task, Project)) else db_instance.id,
-                                timestamp=timestamp,
-                                format_name=format_name,
-                                is_annotation_file=is_annotation_file,
-                                extension=osp.splitext(file_path)[1]
-                            )
-
+                    elif osp.exists(file_path):
+                        if action == "download":
+                            filename = filename or \
+                                build_annotations_file_name(
+                                    class_name=db_instance.__class__.__name__,
+                                    identifier=db_instance.name if isinstance(db_instance, (Task, Project)) else db_instance.id,
+                                    timestamp=timestamp,
+                                    format_name=format_name,
+                                    is_annotation_file=is_annotation_file,
+                                    extension=osp.splitext(file_path)[1]
+                                )
+
+                            rq_job.delete()
+                            return sendfile(request, file_path, attachment=True, attachment_filename=filename)
+
+                        return Response(status=status.HTTP_201_CREATED)
+                    else:
+                        # The file could be evicted from the export cache
+                        # before downloading, in this case it is exported again
                         rq_job.delete()
-                        return sendfile(request, file_path, attachment=True, attachment_filename=filename)
-
-                    return Response(status=status.HTTP_201_CREATED)
                 else:
                     raise NotImplementedError(f"Export to {location} location is not implemented yet")
             elif rq_job.is_failed:
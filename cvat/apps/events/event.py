@@ -2,13 +2,12 @@
 #
 # SPDX-License-Identifier: MIT
 
-from rest_framework.renderers import JSONRenderer
 from datetime import datetime, timezone
 from typing import Optional
 
 from django.db import transaction
 
-from cvat.apps.engine.log import vlogger
+from .sink import dumps, emit_events
 
 def event_scope(action, resource):
     return f"{action}:{resource}"
@@ -59,16 +58,16 @@ def record_server_event(
         "scope": scope,
         "timestamp": str(datetime.now(timezone.utc).timestamp()),
         "source": "server",
-        "payload": JSONRenderer().render(payload_with_request_id).decode('UTF-8'),
+        "payload": dumps(payload_with_request_id),
         **kwargs,
     }
 
-    rendered_data = JSONRenderer().render(data).decode('UTF-8')
+    rendered_data = dumps(data)
 
     if on_commit:
-        transaction.on_commit(lambda: vlogger.info(rendered_data), robust=True)
+        transaction.on_commit(lambda: emit_events([rendered_data]), robust=True)
     else:
-        vlogger.info(rendered_data)
+        emit_events([rendered_data])
 
 
 class EventScopeChoice:
@@ -2,17 +2,24 @@
 #
 # SPDX-License-Identifier: MIT
 
-import os
 import csv
-from datetime import datetime, timedelta, timezone
-from dateutil import parser
+import gzip
+import io
+import os
+import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from tempfile import TemporaryDirectory
+from typing import List, Optional, Sequence, Tuple
 
+import clickhouse_connect
 import django_rq
+import pyarrow as pa
+import pyarrow.parquet as pq
+from clickhouse_connect.datatypes.registry import get_from_name as get_clickhouse_type
+from dateutil import parser
 from django.conf import settings
-import clickhouse_connect
-
-
 from rest_framework import serializers, status
 from rest_framework.response import Response
 
@@ -24,50 +31,227 @@ slogger = ServerLogManager(__name__)
 
 DEFAULT_CACHE_TTL = timedelta(hours=1)
 
-def _create_csv(query_params, output_filename, cache_ttl):
-    try:
-        clickhouse_settings = settings.CLICKHOUSE['events']
+class ExportFormat:
+    CSV = 'csv'
+    CSV_GZ = 'csv.gz'
+    PARQUET = 'parquet'
 
-        time_filter = {
-            'from': query_params.pop('from'),
-            'to': query_params.pop('to'),
-        }
+    @classmethod
+    def choices(cls) -> List[str]:
+        return [cls.CSV, cls.CSV_GZ, cls.PARQUET]
 
-        query = "SELECT * FROM events"
-        conditions = []
-        parameters = {}
+# The rows are received from ClickHouse and written by blocks of this size,
+# so the memory use doesn't depend on the number of exported events
+_QUERY_BLOCK_SIZE = 10000
 
-        if time_filter['from']:
-            conditions.append(f"timestamp >= {{from:DateTime64}}")
-            parameters['from'] = time_filter['from']
+def _get_clickhouse_client():
+    clickhouse_settings = settings.CLICKHOUSE['events']
 
-        if time_filter['to']:
-            conditions.append(f"timestamp <= {{to:DateTime64}}")
-            parameters['to'] = time_filter['to']
+    return clickhouse_connect.get_client(
+        host=clickhouse_settings['HOST'],
+        database=clickhouse_settings['NAME'],
+        port=clickhouse_settings['PORT'],
+        username=clickhouse_settings['USER'],
+        password=clickhouse_settings['PASSWORD'],
+    )
+
+def _split_time_range(time_from, time_to, count: int) -> List[Tuple[float, float, bool]]:
+    """
+    Returns consecutive (from, to, includes "to") time ranges covering the input range
+    """
+
+    if time_from is None or time_to is None or count <= 1:
+        return [(time_from, time_to, True)]
+
+    if isinstance(time_from, datetime):
+        time_from = time_from.timestamp()
+    if isinstance(time_to, datetime):
+        time_to = time_to.timestamp()
+
+    step = (time_to - time_from) / count
+    bounds = [time_from + i * step for i in range(count)] + [time_to]
+    return [
+        (range_from, range_to, i == count - 1)
+        for i, (range_from, range_to) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+def _get_arrow_type(column_type) -> pa.DataType:
+    base_type = column_type.base_type
+    if base_type in ('UInt8', 'UInt16', 'UInt32', 'UInt64', 'Int8', 'Int16', 'Int32', 'Int64',
+        'Float32', 'Float64',
+    ):
+        return getattr(pa, base_type.lower())()
+    elif base_type == 'DateTime64':
+        return pa.timestamp('us', tz='UTC')
+    elif base_type == 'DateTime':
+        return pa.timestamp('s', tz='UTC')
+    else:
+        return pa.string()
+
+def _get_arrow_schema(column_names: Sequence[str], column_types) -> pa.Schema:
+    return pa.schema([
+        (name, _get_arrow_type(column_type))
+        for name, column_type in zip(column_names, column_types)
+    ])
+
+def _describe_events_table() -> Tuple[Sequence[str], Sequence]:
+    """
+    Returns the column names and types of the events table.
+    ClickHouse returns no columns for queries without results.
+    """
+
+    with _get_clickhouse_client() as client:
+        rows = client.query("DESCRIBE TABLE events").result_rows
+
+    return [row[0] for row in rows], [get_clickhouse_type(row[1]) for row in rows]
+
+class _PartWriter:
+    """
+    Writes the events of a time range to a separate file.
+    The CSV parts are written without a header and can be concatenated,
+    including the gzip-compressed ones.
+    """
+
+    def __init__(self, path: str, file_format: str, column_names: Sequence[str], column_types):
+        self._file_format = file_format
+        self.schema: Optional[pa.Schema] = None
+
+        if file_format == ExportFormat.PARQUET:
+            self.schema = _get_arrow_schema(column_names, column_types)
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            if file_format == ExportFormat.CSV_GZ:
+                self._file = gzip.open(path, 'wt', encoding='UTF8', newline='')
+            else:
+                self._file = open(path, 'w', encoding='UTF8', newline='')
+            self._writer = csv.writer(self._file)
+
+    def write(self, columns: Sequence[Sequence]):
+        if self._file_format == ExportFormat.PARQUET:
+            self._writer.write_batch(pa.record_batch([
+                pa.array(
+                    column if not pa.types.is_string(field.type) else
+                        [str(v) if v is not None else None for v in column],
+                    type=field.type
+                )
+                for column, field in zip(columns, self.schema)
+            ], schema=self.schema))
+        else:
+            self._writer.writerows(zip(*columns))
+
+    def close(self):
+        if self._file_format == ExportFormat.PARQUET:
+            self._writer.close()
+        else:
+            self._file.close()
+
+def _export_time_range(query: str, parameters: dict, part_path: str, file_format: str
+) -> Tuple[Sequence[str], Optional[pa.Schema]]:
+    """
+    Streams the query results to the part file. Returns the column names and,
+    for Parquet, the schema. The column names are empty if there are no results.
+    """
+
+    with (
+        _get_clickhouse_client() as client,
+        client.query_column_block_stream(query, parameters=parameters,
+            settings={'max_block_size': _QUERY_BLOCK_SIZE}) as stream,
+    ):
+        column_names = stream.source.column_names
+        if not column_names:
+            return column_names, None
+
+        writer = _PartWriter(part_path, file_format, column_names, stream.source.column_types)
+        try:
+            for block in stream:
+                writer.write(block)
+        finally:
+            writer.close()
+
+    return column_names, writer.schema
+
+def _merge_parts(output_filename: str, file_format: str, part_paths: Sequence[str], part_results):
+    parts = [
+        part_path for part_path, (names, _) in zip(part_paths, part_results) if names
+    ]
+
+    if parts:
+        column_names, schema = next((names, schema) for names, schema in part_results if names)
+    else:
+        # The file must have the columns even if there are no events
+        column_names, column_types = _describe_events_table()
+        schema = None
+        if file_format == ExportFormat.PARQUET:
+            schema = _get_arrow_schema(column_names, column_types)
+
+    if file_format == ExportFormat.PARQUET:
+        with pq.ParquetWriter(output_filename, schema) as writer:
+            for part_path in parts:
+                part_file = pq.ParquetFile(part_path)
+                for i in range(part_file.num_row_groups):
+                    writer.write_table(part_file.read_row_group(i))
+        return
+
+    header = io.StringIO(newline='')
+    csv.writer(header).writerow(column_names)
+    header = header.getvalue().encode('UTF8')
+    if file_format == ExportFormat.CSV_GZ:
+        # gzip files can be concatenated, the result is a valid gzip file
+        header = gzip.compress(header)
+
+    with open(output_filename, 'wb') as output_file:
+        output_file.write(header)
+        for part_path in parts:
+            with open(part_path, 'rb') as part_file:
+                shutil.copyfileobj(part_file, output_file)
+
+def _export_events(query_params, output_filename, cache_ttl, file_format=ExportFormat.CSV):
+    try:
+        query_params = dict(query_params)
+        time_ranges = _split_time_range(query_params.pop('from'), query_params.pop('to'),
+            settings.EVENTS_EXPORT_WORKERS)
+
+        conditions = []
+        parameters = {}
 
         for param, value in query_params.items():
             if value:
                 conditions.append(f"{param} = {{{param}:UInt64}}")
                 parameters[param] = value
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
+        queries = []
+        for time_from, time_to, includes_time_to in time_ranges:
+            range_conditions = list(conditions)
+            range_parameters = dict(parameters)
 
-        query += " ORDER BY timestamp ASC"
+            if time_from:
+                range_conditions.append("timestamp >= {from:DateTime64}")
+                range_parameters['from'] = time_from
 
-        with clickhouse_connect.get_client(
-            host=clickhouse_settings['HOST'],
-            database=clickhouse_settings['NAME'],
-            port=clickhouse_settings['PORT'],
-            username=clickhouse_settings['USER'],
-            password=clickhouse_settings['PASSWORD'],
-        ) as client:
-            result = client.query(query, parameters=parameters)
+            if time_to:
+                range_conditions.append(
+                    "timestamp {} {{to:DateTime64}}".format('<=' if includes_time_to else '<')
+                )
+                range_parameters['to'] = time_to
 
-        with open(output_filename, 'w', encoding='UTF8') as f:
-            writer = csv.writer(f)
-            writer.writerow(result.column_names)
-            writer.writerows(result.result_rows)
+            query = "SELECT * FROM events"
+            if range_conditions:
+                query += " WHERE " + " AND ".join(range_conditions)
+            query += " ORDER BY timestamp ASC"
+
+            queries.append((query, range_parameters))
+
+        with TemporaryDirectory(dir=settings.TMP_FILES_ROOT) as parts_dir:
+            part_paths = [os.path.join(parts_dir, f'{i}.part') for i in range(len(queries))]
+
+            # The time ranges are ordered, so the parts can be merged in the same order
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                part_results = list(executor.map(
+                    lambda args: _export_time_range(*args[0], args[1], file_format),
+                    zip(queries, part_paths)
+                ))
+
+            _merge_parts(output_filename, file_format, part_paths, part_results)
 
         archive_ctime = os.path.getctime(output_filename)
         scheduler = django_rq.get_scheduler(settings.CVAT_QUEUES.EXPORT_DATA.value)
@@ -90,6 +274,7 @@ def _create_csv(query_params, output_filename, cache_ttl):
 def export(request, filter_query, queue_name):
     action = request.query_params.get('action', None)
     filename = request.query_params.get('filename', None)
+    file_format = request.query_params.get('format', ExportFormat.CSV)
 
     query_params = {
         'org_id': filter_query.get('org_id', None),
@@ -128,8 +313,12 @@ def export(request, filter_query, queue_name):
         raise serializers.ValidationError(
             "Unexpected action specified for the request")
 
+    if file_format not in ExportFormat.choices():
+        raise serializers.ValidationError(
+            f"Unexpected format specified for the request: {file_format}")
+
     query_id = request.query_params.get('query_id', None) or uuid.uuid4()
-    rq_id = f"export:csv-logs-{query_id}-by-{request.user}"
+    rq_id = f"export:{file_format}-logs-{query_id}-by-{request.user}"
     response_data = {
         'query_id': query_id,
     }
@@ -143,7 +332,7 @@ def export(request, filter_query, queue_name):
             if action == "download" and os.path.exists(file_path):
                 rq_job.delete()
                 timestamp = datetime.strftime(datetime.now(), "%Y_%m_%d_%H_%M_%S")
-                filename = filename or f"logs_{timestamp}.csv"
+                filename = filename or f"logs_{timestamp}.{file_format}"
 
                 return sendfile(request, file_path, attachment=True,
                     attachment_filename=filename)
@@ -159,10 +348,10 @@ def export(request, filter_query, queue_name):
             return Response(data=response_data, status=status.HTTP_202_ACCEPTED)
 
     ttl = DEFAULT_CACHE_TTL.total_seconds()
-    output_filename = os.path.join(settings.TMP_FILES_ROOT, f"{query_id}.csv")
+    output_filename = os.path.join(settings.TMP_FILES_ROOT, f"{query_id}.{file_format}")
     queue.enqueue_call(
-        func=_create_csv,
-        args=(query_params, output_filename, DEFAULT_CACHE_TTL),
+        func=_export_events,
+        args=(query_params, output_filename, DEFAULT_CACHE_TTL, file_format),
         job_id=rq_id,
         meta={},
         result_ttl=ttl, failure_ttl=ttl)
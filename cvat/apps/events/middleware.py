@@ -0,0 +1,16 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from .sink import start_request_events
+
+class EventBufferMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        finish_request_events = start_request_events()
+        try:
+            return self.get_response(request)
+        finally:
+            finish_request_events()
@@ -7,8 +7,7 @@ from django.conf import settings
 
 from rest_framework.exceptions import PermissionDenied
 
-from cvat.apps.iam.permissions import OpenPolicyAgentPermission, StrEnum
-from cvat.utils.http import make_requests_session
+from cvat.apps.iam.permissions import OpenPolicyAgentPermission, StrEnum, query_opa
 
 class EventsPermission(OpenPolicyAgentPermission):
     class Scopes(StrEnum):
@@ -32,8 +31,7 @@ class EventsPermission(OpenPolicyAgentPermission):
     def filter(self, query_params):
         url = self.url.replace('/allow', '/filter')
 
-        with make_requests_session() as session:
-            r = session.post(url, json=self.payload).json()['result']
+        r = query_opa(url, self.payload)
 
         filter_params = query_params.copy()
         for query in r:
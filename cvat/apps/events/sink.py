@@ -0,0 +1,161 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+import atexit
+import os
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Sequence
+
+import orjson
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from cvat.apps.engine.log import ServerLogManager, vlogger
+
+slogger = ServerLogManager(__name__)
+
+_json_encoder = JSONEncoder()
+
+def dumps(obj: Any) -> str:
+    """
+    Renders an event or its payload to JSON. The types, which are not supported natively,
+    are converted in the same way as in the REST API responses.
+    """
+    return orjson.dumps(obj, default=_json_encoder.default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode('UTF-8')
+
+
+class EventSink:
+    """
+    Sends rendered events to the analytics pipeline in a background thread.
+    The number of pending events is limited. When the queue is full,
+    the events are sent in the calling thread, which slows down the producers
+    instead of dropping the events.
+    """
+
+    def __init__(self, *,
+        max_size: int,
+        batch_size: int = 1000,
+        emit: Optional[Callable[[str], None]] = None,
+    ):
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._emit = emit
+
+        self._reset()
+
+        # Threads don't survive forks, e.g. in the RQ workers,
+        # the queued events are sent by the parent process
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        self._events = deque()
+        self._pending_count = 0 # including the events being sent by the worker
+        self._condition = threading.Condition()
+        self._worker = None
+
+    def put(self, events: Sequence[str]) -> None:
+        if not events:
+            return
+
+        with self._condition:
+            if self._max_size < self._pending_count + len(events):
+                put_in_queue = False
+            else:
+                self._ensure_worker()
+                self._events.extend(events)
+                self._pending_count += len(events)
+                self._condition.notify_all()
+                put_in_queue = True
+
+        if not put_in_queue:
+            self._send(events)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the queued events are sent. Returns False on timeout.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending_count, timeout=timeout)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+
+        self._worker = threading.Thread(target=self._run, name='cvat-event-sink', daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._events)
+
+                batch = [
+                    self._events.popleft()
+                    for _ in range(min(self._batch_size, len(self._events)))
+                ]
+
+            try:
+                self._send(batch)
+            finally:
+                with self._condition:
+                    self._pending_count -= len(batch)
+                    self._condition.notify_all()
+
+    def _send(self, events: Sequence[str]) -> None:
+        emit = self._emit or vlogger.info
+        for event in events:
+            try:
+                emit(event)
+            except Exception: # pylint: disable=broad-except
+                slogger.glob.exception("Failed to send an event")
+
+
+_event_sink: Optional[EventSink] = None
+_event_sink_lock = threading.Lock()
+
+def get_event_sink() -> EventSink:
+    global _event_sink # pylint: disable=global-statement
+
+    with _event_sink_lock:
+        if _event_sink is None:
+            _event_sink = EventSink(max_size=settings.EVENTS_QUEUE_SIZE)
+            atexit.register(_event_sink.flush, timeout=settings.EVENTS_FLUSH_TIMEOUT)
+
+    return _event_sink
+
+
+_request_events: ContextVar[Optional[List[str]]] = ContextVar('request_events', default=None)
+
+def start_request_events() -> Callable[[], None]:
+    """
+    Starts collecting the events of the current request.
+    Returns a function, which stops the collection and sends the collected events.
+    """
+
+    request_events = []
+    token = _request_events.set(request_events)
+
+    def finish():
+        _request_events.reset(token)
+        get_event_sink().put(request_events)
+
+    return finish
+
+def emit_events(events: Sequence[str]) -> None:
+    """
+    Sends rendered events to the analytics pipeline. During a request, the events are
+    collected and sent in bulk after the response is ready. Outside requests,
+    e.g. in the RQ jobs, the events are sent immediately.
+    """
+
+    request_events = _request_events.get()
+    if request_events is not None:
+        request_events.extend(events)
+    else:
+        for event in events:
+            vlogger.info(event)
@@ -2,15 +2,28 @@
 #
 # SPDX-License-Identifier: MIT
 
+import csv
+import gzip
 import json
+import os
+import tempfile
+import threading
 import unittest
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from typing import List, Optional
+from unittest import mock
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+from clickhouse_connect.datatypes.registry import get_from_name as get_clickhouse_type
 from django.contrib.auth import get_user_model
 from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
 
+from cvat.apps.events.export import _merge_parts, _PartWriter, _split_time_range
 from cvat.apps.events.serializers import ClientEventsSerializer
+from cvat.apps.events.sink import EventSink, dumps, emit_events, start_request_events
 from cvat.apps.organizations.models import Organization
 
 class WorkingTimeTestCase(unittest.TestCase):
@@ -175,3 +188,195 @@ class WorkingTimeTestCase(unittest.TestCase):
         )
 
         self.assertEqual(self._working_time(events[0]), 0)
+
+class EventSinkTestCase(unittest.TestCase):
+    def test_can_render_like_rest_api(self):
+        data = {
+            "timestamp": datetime(2024, 1, 1, 12, tzinfo=timezone.utc),
+            "value": Decimal("0.5"),
+            1: ["a", None],
+        }
+
+        self.assertEqual(json.loads(dumps(data)), json.loads(JSONRenderer().render(data)))
+
+    def test_can_send_events_in_background(self):
+        sent = []
+        sink = EventSink(max_size=10, batch_size=2, emit=sent.append)
+
+        sink.put(["a", "b", "c"])
+
+        self.assertTrue(sink.flush(timeout=5))
+        self.assertEqual(sent, ["a", "b", "c"])
+
+    def test_can_send_events_in_calling_thread_if_queue_is_full(self):
+        emitted = threading.Event()
+        can_continue = threading.Event()
+        sent = []
+
+        def emit(event):
+            if event == "a":
+                emitted.set()
+                can_continue.wait(timeout=5)
+            sent.append(event)
+
+        sink = EventSink(max_size=2, emit=emit)
+        sink.put(["a", "b"])
+        self.assertTrue(emitted.wait(timeout=5))
+
+        sink.put(["c"])
+        self.assertEqual(sent, ["c"])
+
+        can_continue.set()
+        self.assertTrue(sink.flush(timeout=5))
+        self.assertEqual(sent, ["c", "a", "b"])
+
+    def test_can_collect_request_events(self):
+        sink = EventSink(max_size=10)
+
+        with (
+            mock.patch("cvat.apps.events.sink.vlogger") as vlogger,
+            mock.patch("cvat.apps.events.sink.get_event_sink", return_value=sink),
+        ):
+            finish_request_events = start_request_events()
+            emit_events(["a"])
+            emit_events(["b"])
+            vlogger.info.assert_not_called()
+
+            finish_request_events()
+            self.assertTrue(sink.flush(timeout=5))
+            self.assertEqual(vlogger.info.call_args_list, [mock.call("a"), mock.call("b")])
+
+            emit_events(["c"])
+            vlogger.info.assert_called_with("c")
+
+class ExportTimeRangeTestCase(unittest.TestCase):
+    def test_can_split_time_range(self):
+        self.assertEqual(_split_time_range(0, 12, 3), [
+            (0, 4, False), (4, 8, False), (8, 12, True),
+        ])
+
+    def test_can_split_datetime_range(self):
+        time_to = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        time_from = time_to - timedelta(days=1)
+
+        ranges = _split_time_range(time_from, time_to, 2)
+        self.assertEqual(ranges[0][0], time_from.timestamp())
+        self.assertEqual(ranges[-1][1], time_to.timestamp())
+        self.assertEqual(ranges[0][1], ranges[1][0])
+
+    def test_does_not_split_open_time_range(self):
+        self.assertEqual(_split_time_range(10, None, 4), [(10, None, True)])
+
+class ExportMergeTestCase(unittest.TestCase):
+    _COLUMN_NAMES = ["scope", "timestamp", "job_id", "payload"]
+    _COLUMN_TYPES = ["String", "DateTime64(3, 'Etc/UTC')", "Nullable(UInt64)", "String"]
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._temp_dir.cleanup)
+
+        self.column_types = [get_clickhouse_type(t) for t in self._COLUMN_TYPES]
+
+    def _make_rows(self, count: int, start: int = 0) -> List[tuple]:
+        return [
+            (
+                f"event {i}",
+                datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i),
+                i if i % 2 else None,
+                '{"text": "a,b\n\\"c\\""}',
+            )
+            for i in range(start, start + count)
+        ]
+
+    def _write_parts(self, file_format: str, parts_rows: List[List[tuple]]):
+        part_paths = []
+        part_results = []
+        for i, rows in enumerate(parts_rows):
+            part_path = os.path.join(self._temp_dir.name, f"{i}.part")
+            part_paths.append(part_path)
+
+            if not rows:
+                # The parts without results are not written
+                part_results.append(((), None))
+                continue
+
+            writer = _PartWriter(part_path, file_format, self._COLUMN_NAMES, self.column_types)
+            try:
+                for block_start in range(0, len(rows), 2):
+                    writer.write(list(zip(*rows[block_start : block_start + 2])))
+            finally:
+                writer.close()
+
+            part_results.append((self._COLUMN_NAMES, writer.schema))
+
+        return part_paths, part_results
+
+    def _merge(self, file_format: str, parts_rows: List[List[tuple]]) -> str:
+        output_path = os.path.join(self._temp_dir.name, f"output.{file_format}")
+        part_paths, part_results = self._write_parts(file_format, parts_rows)
+
+        with mock.patch(
+            "cvat.apps.events.export._describe_events_table",
+            return_value=(self._COLUMN_NAMES, self.column_types),
+        ) as describe_events_table:
+            _merge_parts(output_path, file_format, part_paths, part_results)
+
+        if any(parts_rows):
+            describe_events_table.assert_not_called()
+        else:
+            describe_events_table.assert_called_once()
+
+        return output_path
+
+    def _read_csv(self, file) -> List[List[str]]:
+        return list(csv.reader(file))
+
+    def _get_expected_csv_rows(self, rows: List[tuple]) -> List[List[str]]:
+        return [self._COLUMN_NAMES] + [
+            ["" if v is None else str(v) for v in row] for row in rows
+        ]
+
+    def test_can_merge_csv(self):
+        parts_rows = [self._make_rows(3), [], self._make_rows(4, start=3)]
+
+        with open(self._merge("csv", parts_rows), encoding="UTF8", newline="") as f:
+            self.assertEqual(
+                self._read_csv(f),
+                self._get_expected_csv_rows(self._make_rows(7)),
+            )
+
+    def test_can_merge_csv_gz(self):
+        parts_rows = [[], self._make_rows(5), self._make_rows(1, start=5)]
+
+        with gzip.open(self._merge("csv.gz", parts_rows), "rt", encoding="UTF8", newline="") as f:
+            self.assertEqual(
+                self._read_csv(f),
+                self._get_expected_csv_rows(self._make_rows(6)),
+            )
+
+    def test_can_merge_parquet(self):
+        parts_rows = [self._make_rows(3), self._make_rows(2, start=3), []]
+
+        table = pq.read_table(self._merge("parquet", parts_rows))
+
+        self.assertEqual(table.column_names, self._COLUMN_NAMES)
+        self.assertEqual(
+            [tuple(row.values()) for row in table.to_pylist()],
+            self._make_rows(5),
+        )
+
+    def test_writes_columns_for_empty_csv(self):
+        for file_format, open_file in [("csv", open), ("csv.gz", gzip.open)]:
+            with self.subTest(format=file_format):
+                output_path = self._merge(file_format, [[], []])
+
+                with open_file(output_path, "rt", encoding="UTF8", newline="") as f:
+                    self.assertEqual(self._read_csv(f), [self._COLUMN_NAMES])
+
+    def test_writes_schema_for_empty_parquet(self):
+        table = pq.read_table(self._merge("parquet", [[], [], []]))
+
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.column_names, self._COLUMN_NAMES)
+        self.assertEqual(table.schema.field("job_id").type, pa.uint64())
+        self.assertEqual(table.schema.field("timestamp").type, pa.timestamp("us", tz="UTC"))
@@ -7,14 +7,12 @@ from rest_framework import status, viewsets
 from rest_framework.response import Response
 from drf_spectacular.utils import OpenApiResponse, OpenApiParameter, extend_schema
 from drf_spectacular.types import OpenApiTypes
-from rest_framework.renderers import JSONRenderer
-
 
 from cvat.apps.iam.filters import ORGANIZATION_OPEN_API_PARAMETERS
 from cvat.apps.events.permissions import EventsPermission
 from cvat.apps.events.serializers import ClientEventsSerializer
-from cvat.apps.engine.log import vlogger
 from .export import export
+from .sink import dumps, emit_events
 
 class EventsViewSet(viewsets.ViewSet):
     serializer_class = None
@@ -31,9 +29,7 @@ class EventsViewSet(viewsets.ViewSet):
         serializer = ClientEventsSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
 
-        for event in serializer.data["events"]:
-            message = JSONRenderer().render(event).decode('UTF-8')
-            vlogger.info(message)
+        emit_events([dumps(event) for event in serializer.data["events"]])
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -57,6 +53,9 @@ class EventsViewSet(viewsets.ViewSet):
                 description="Filter events before the datetime. If no 'from' or 'to' parameters are passed, the last 30 days will be set."),
             OpenApiParameter('filename', description='Desired output file name',
                 location=OpenApiParameter.QUERY, type=OpenApiTypes.STR, required=False),
+            OpenApiParameter('format', location=OpenApiParameter.QUERY,
+                description='Output file format. CSV is used by default',
+                type=OpenApiTypes.STR, required=False, enum=['csv', 'csv.gz', 'parquet']),
             OpenApiParameter('action', location=OpenApiParameter.QUERY,
                 description='Used to start downloading process after annotation file had been created',
                 type=OpenApiTypes.STR, required=False, enum=['download']),
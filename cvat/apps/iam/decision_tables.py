@@ -0,0 +1,204 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+In-process evaluation of the "allow" policy rules.
+
+The permissions of each policy package are described by a rule table
+(rules/tests/configs/<package>.csv), which is also used to generate the OPA tests.
+The OPA tests check that the Rego rules give the same decisions as the table,
+so evaluating the table directly allows to check access without an OPA request.
+"""
+
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from attrs import define, field
+
+PRIVILEGES = ['admin', 'business', 'user', 'worker', None]
+ORG_ROLES = ['owner', 'maintainer', 'supervisor', 'worker', None]
+
+SANDBOX = 'sandbox'
+ORGANIZATION = 'organization'
+
+OwnershipCheck = Callable[[dict], bool]
+
+def _get_priority(values: List[Optional[str]], value: Optional[str]) -> int:
+    # unknown values have the lowest priority, as null
+    return values.index(value) if value in values else len(values) - 1
+
+def _get_value(data: Optional[dict], *path: str) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+
+    return data
+
+def _check_ownership_by_path(*path: str) -> OwnershipCheck:
+    def check(query_input: dict) -> bool:
+        user_id = query_input['auth']['user']['id']
+        return user_id is not None and \
+            _get_value(query_input['resource'], *path, 'id') == user_id
+
+    return check
+
+def _get_ownership_check(ownership: str) -> OwnershipCheck:
+    # e.g. "owner" -> resource.owner.id, "project:assignee" -> resource.project.assignee.id
+    if ownership == 'none':
+        # Rules for non-owners don't check the ownership, so they apply to owners as well
+        return lambda query_input: True
+    elif ownership == 'self':
+        return _check_ownership_by_path()
+    else:
+        return _check_ownership_by_path(*ownership.split(':'))
+
+@define(frozen=True)
+class DecisionRule:
+    context: Optional[str]
+    privilege: Optional[str]
+    strict_privilege: bool
+    membership: Optional[str]
+    ownership_check: Optional[OwnershipCheck]
+    limit: Optional[CodeType]
+
+    def matches(self, query_input: dict, context: str) -> bool:
+        if self.context is not None and self.context != context:
+            return False
+
+        privilege = query_input['auth']['user']['privilege']
+        if self.strict_privilege:
+            if privilege != self.privilege:
+                return False
+        elif _get_priority(PRIVILEGES, self.privilege) < _get_priority(PRIVILEGES, privilege):
+            return False
+
+        if self.membership is not None:
+            organization = query_input['auth']['organization']
+            role = organization['user']['role'] if organization else None
+            if _get_priority(ORG_ROLES, self.membership) < _get_priority(ORG_ROLES, role):
+                return False
+
+        if self.ownership_check is not None and not self.ownership_check(query_input):
+            return False
+
+        if self.limit is not None:
+            try:
+                # pylint: disable-next=eval-used
+                if not eval(self.limit, {'resource': query_input['resource']}):
+                    return False
+            except (KeyError, TypeError):
+                # the corresponding Rego expression is undefined
+                return False
+
+        return True
+
+@define
+class DecisionTable:
+    """
+    The rules of a policy package, grouped by scope.
+    Access is allowed if any of the rules for the requested scope matches the input.
+    """
+
+    rules: Dict[str, List[DecisionRule]] = field(factory=dict)
+    check_organization: bool = False
+    """
+    Whether the resource must be in the organization of the request
+    when the request is made in an organization
+    """
+
+    @classmethod
+    def from_csv(cls, path: Path, *,
+        check_organization: bool = False,
+        ownership_checks: Optional[Dict[str, OwnershipCheck]] = None,
+    ) -> DecisionTable:
+        ownership_checks = ownership_checks or {}
+
+        def _parse_value(value: str) -> Optional[str]:
+            value = value.strip().lower()
+            return None if value in ('n/a', 'none') else value
+
+        table = cls(check_organization=check_organization)
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                row = {k.lower(): v for k, v in row.items()}
+
+                limit = row.get('limit', '').strip()
+                limit = compile(limit, f'{path}:limit', 'eval') if limit else None
+
+                for ownership in row['ownership'].split(','):
+                    ownership = ownership.strip().lower()
+                    if ownership == 'n/a':
+                        ownership_check = None
+                    else:
+                        ownership_check = ownership_checks.get(ownership) or \
+                            _get_ownership_check(ownership)
+
+                    table.rules.setdefault(row['scope'].strip().lower(), []).append(DecisionRule(
+                        context=_parse_value(row['context']),
+                        privilege=_parse_value(row['privilege']),
+                        strict_privilege=row.get('strict_privilege', '').lower() == 'true',
+                        membership=_parse_value(row['membership']),
+                        ownership_check=ownership_check,
+                        limit=limit,
+                    ))
+
+        return table
+
+    def evaluate(self, query_input: dict) -> bool:
+        if query_input['auth']['user']['privilege'] == PRIVILEGES[0]:
+            return True
+
+        organization = query_input['auth']['organization']
+        context = ORGANIZATION if organization else SANDBOX
+
+        resource = query_input.get('resource')
+        if self.check_organization and context == ORGANIZATION and resource is not None:
+            resource_organization = resource.get('organization')
+            if not resource_organization or resource_organization['id'] != organization['id']:
+                return False
+
+        return any(
+            rule.matches(query_input, context)
+            for rule in self.rules.get(query_input['scope'], [])
+        )
+
+# Only the packages whose Rego rules are fully described by the rule tables are listed.
+# The other packages have additional rules, which are checked by OPA.
+_TABLE_OPTIONS = {
+    'analytics': {},
+    'annotationguides': {
+        'check_organization': True,
+        'ownership_checks': {
+            'job:assignee': lambda query_input: bool(
+                _get_value(query_input['resource'], 'target', 'is_job_staff')
+            ),
+        },
+    },
+    'cloudstorages': { 'check_organization': True },
+    'comments': { 'check_organization': True },
+    'events': {},
+    'issues': { 'check_organization': True },
+    'jobs': { 'check_organization': True },
+    'lambda': {},
+    'projects': { 'check_organization': True },
+    'server': {},
+    'tasks': { 'check_organization': True },
+    'users': {},
+    'webhooks': { 'check_organization': True },
+}
+
+def load_decision_tables(rules_paths: Iterable[Path]) -> Dict[str, DecisionTable]:
+    tables = {}
+    for rules_path in sorted(rules_paths):
+        for package, options in _TABLE_OPTIONS.items():
+            table_path = rules_path / 'tests' / 'configs' / f'{package}.csv'
+            if table_path.is_file():
+                tables[package] = DecisionTable.from_csv(table_path, **options)
+
+    return tables
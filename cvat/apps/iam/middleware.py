@@ -2,10 +2,22 @@
 #
 # SPDX-License-Identifier: MIT
 
+from contextvars import ContextVar
+from typing import Optional
+
 from django.utils.functional import SimpleLazyObject
 from rest_framework.exceptions import ValidationError, NotFound
 from django.conf import settings
 
+_request_cache: ContextVar[Optional[dict]] = ContextVar('iam_request_cache', default=None)
+
+def get_request_cache() -> Optional[dict]:
+    """
+    Returns a dict for the IAM values, which can be reused until the end
+    of the current request, e.g. permission decisions. Returns None outside requests.
+    """
+    return _request_cache.get()
+
 
 def get_organization(request):
     from cvat.apps.organizations.models import Organization
@@ -56,4 +68,8 @@ class ContextMiddleware:
         # https://stackoverflow.com/questions/26240832/django-and-middleware-which-uses-request-user-is-always-anonymous
         request.iam_context = SimpleLazyObject(lambda: get_organization(request))
 
-        return self.get_response(request)
+        request_cache_token = _request_cache.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_cache.reset(request_cache_token)
@@ -5,13 +5,21 @@
 
 from __future__ import annotations
 
+import hashlib
 import importlib
+import json
 import operator
+import os
+import re
+import threading
+import time
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, TypeVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
+import requests
 from attrs import define, field
 from django.apps import AppConfig
 from django.conf import settings
@@ -21,7 +29,8 @@ from rest_framework.permissions import BasePermission
 from cvat.apps.organizations.models import Membership, Organization
 from cvat.utils.http import make_requests_session
 
-from .utils import add_opa_rules_path
+from .middleware import get_request_cache
+from .utils import add_opa_rules_path, get_decision_tables
 
 class StrEnum(str, Enum):
     def __str__(self) -> str:
@@ -32,6 +41,160 @@ class PermissionResult:
     allow: bool
     reasons: List[str] = field(factory=list)
 
+_opa_session_storage = threading.local()
+
+def get_opa_session() -> requests.Session:
+    """
+    Returns a persistent session for OPA requests, which keeps the connections open.
+    Sessions are not shared between threads and processes.
+    """
+
+    session, pid = getattr(_opa_session_storage, 'session', (None, None))
+    if session is None or pid != os.getpid():
+        session = make_requests_session()
+        _opa_session_storage.session = (session, os.getpid())
+
+    return session
+
+class _DecisionCache:
+    """
+    An in-process LRU cache of OPA query results with a time limit.
+    The results depend only on the query and the policy rules,
+    so the query hash is used as the key.
+    """
+
+    def __init__(self, *, ttl: int, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._items: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            expiration_time, result = item
+            if expiration_time < time.monotonic():
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return result
+
+    def set(self, key: str, result: Any) -> None:
+        if self._ttl <= 0 or self._max_size <= 0:
+            return
+
+        with self._lock:
+            self._items[key] = (time.monotonic() + self._ttl, result)
+            self._items.move_to_end(key)
+
+            while self._max_size < len(self._items):
+                self._items.popitem(last=False)
+
+_decision_cache = _DecisionCache(
+    ttl=settings.IAM_OPA_DECISION_CACHE_TTL,
+    max_size=settings.IAM_OPA_DECISION_CACHE_MAX_SIZE,
+)
+
+def _get_opa_query_key(url: str, payload: dict) -> str:
+    return hashlib.sha256(
+        json.dumps([url, payload], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+def _get_cached_opa_result(key: str) -> Optional[Any]:
+    request_cache = get_request_cache()
+    if request_cache is not None:
+        result = request_cache.get(('opa', key))
+        if result is not None:
+            return result
+
+    result = _decision_cache.get(key)
+    if result is not None and request_cache is not None:
+        request_cache[('opa', key)] = result
+
+    return result
+
+def _cache_opa_result(key: str, result: Any) -> None:
+    _decision_cache.set(key, result)
+
+    request_cache = get_request_cache()
+    if request_cache is not None:
+        request_cache[('opa', key)] = result
+
+def query_opa(url: str, payload: dict) -> Any:
+    """
+    Returns the result of an OPA query. The results are reused during the current request
+    and, for IAM_OPA_DECISION_CACHE_TTL seconds, between requests.
+    """
+
+    key = _get_opa_query_key(url, payload)
+    result = _get_cached_opa_result(key)
+    if result is None:
+        result = get_opa_session().post(url, json=payload).json()['result']
+        _cache_opa_result(key, result)
+
+    return result
+
+def _get_policy_package(url: str) -> Optional[str]:
+    prefix = settings.IAM_OPA_DATA_URL + '/'
+    suffix = '/allow'
+    if url.startswith(prefix) and url.endswith(suffix):
+        package = url[len(prefix):-len(suffix)]
+        if re.fullmatch(r'[a-z_][a-z0-9_]*', package):
+            return package
+
+    return None
+
+def _evaluate_embedded(url: str, payload: dict) -> Optional[bool]:
+    """
+    Evaluates an "allow" query in the server process, if the embedded policy engine
+    is enabled and the policy package is described by a rule table. Returns None otherwise.
+    """
+
+    if settings.IAM_POLICY_ENGINE != 'embedded':
+        return None
+
+    table = get_decision_tables().get(_get_policy_package(url))
+    if table is None:
+        return None
+
+    return table.evaluate(payload['input'])
+
+def _query_opa_batch(queries: Sequence[Tuple[str, dict]]) -> Optional[List[Any]]:
+    """
+    Evaluates the "allow" rules of the (package, input) queries in one ad-hoc OPA query.
+    Returns None if any of the results is undefined.
+    """
+
+    # JSON values are valid Rego terms, so the inputs can be embedded into the query
+    query = '; '.join(
+        f'r{i} := data.{package}.allow with input as {json.dumps(query_input)}'
+        for i, (package, query_input) in enumerate(queries)
+    )
+    response = get_opa_session().post(settings.IAM_OPA_HOST + '/v1/query',
+        json={ 'query': query })
+    bindings = response.json().get('result')
+    if not bindings:
+        return None
+
+    return [bindings[0][f'r{i}'] for i in range(len(queries))]
+
+def _parse_permission_result(output) -> PermissionResult:
+    allow = False
+    reasons = []
+    if isinstance(output, dict):
+        allow = output['allow']
+        reasons = output.get('reasons', [])
+    elif isinstance(output, bool):
+        allow = output
+    else:
+        raise ValueError("Unexpected response format")
+
+    return PermissionResult(allow=allow, reasons=reasons)
+
 def get_organization(request, obj):
     # Try to get organization from an object otherwise, return the organization that is specified in query parameters
     if isinstance(obj, Organization):
@@ -48,10 +211,13 @@ def get_organization(request, obj):
 
             raise exc
 
-        try:
-            return Organization.objects.get(id=organization_id)
-        except Organization.DoesNotExist:
-            return None
+        def _get_organization():
+            try:
+                return Organization.objects.get(id=organization_id)
+            except Organization.DoesNotExist:
+                return None
+
+        return _get_request_cached(('organization', organization_id), _get_organization)
 
     return request.iam_context['organization']
 
@@ -59,11 +225,25 @@ def get_membership(request, organization):
     if organization is None:
         return None
 
-    return Membership.objects.filter(
-        organization=organization,
-        user=request.user,
-        is_active=True
-    ).first()
+    return _get_request_cached(('membership', organization.id, request.user.id),
+        lambda: Membership.objects.filter(
+            organization=organization,
+            user=request.user,
+            is_active=True
+        ).first()
+    )
+
+def _get_request_cached(key: tuple, get_value: Callable[[], Any]) -> Any:
+    # Permissions are often checked for many objects of the same organization
+    # during a request, e.g. in lists, so the DB objects are reused
+    request_cache = get_request_cache()
+    if request_cache is None:
+        return get_value()
+
+    if key not in request_cache:
+        request_cache[key] = get_value()
+
+    return request_cache[key]
 
 def build_iam_context(request, organization: Optional[Organization], membership: Optional[Membership]):
     return {
@@ -147,27 +327,61 @@ class OpenPolicyAgentPermission(metaclass=ABCMeta):
         return None
 
     def check_access(self) -> PermissionResult:
-        with make_requests_session() as session:
-            response = session.post(self.url, json=self.payload)
-            output = response.json()['result']
-
-        allow = False
-        reasons = []
-        if isinstance(output, dict):
-            allow = output['allow']
-            reasons = output.get('reasons', [])
-        elif isinstance(output, bool):
-            allow = output
+        result = _evaluate_embedded(self.url, self.payload)
+        if result is None:
+            result = query_opa(self.url, self.payload)
+
+        return _parse_permission_result(result)
+
+    @staticmethod
+    def check_access_batch(
+        permissions: Sequence[OpenPolicyAgentPermission]
+    ) -> List[PermissionResult]:
+        """
+        Checks the permissions and returns the results in the same order.
+        The permissions which can't be evaluated by the embedded policy engine
+        and have no cached decisions are evaluated in one OPA request.
+        """
+
+        keys = [_get_opa_query_key(perm.url, perm.payload) for perm in permissions]
+        results = {}
+        for key, perm in zip(keys, permissions):
+            if key not in results:
+                result = _evaluate_embedded(perm.url, perm.payload)
+                results[key] = result if result is not None else _get_cached_opa_result(key)
+
+        batch = {}
+        for key, perm in zip(keys, permissions):
+            if results[key] is not None or key in batch:
+                continue
+
+            package = _get_policy_package(perm.url)
+            if package is None:
+                results[key] = query_opa(perm.url, perm.payload)
+            else:
+                batch[key] = perm
+
+        batch_results = None
+        if 1 < len(batch):
+            batch_results = _query_opa_batch([
+                (_get_policy_package(perm.url), perm.payload['input'])
+                for perm in batch.values()
+            ])
+
+        if batch_results is not None:
+            for key, result in zip(batch, batch_results):
+                results[key] = result
+                _cache_opa_result(key, result)
         else:
-            raise ValueError("Unexpected response format")
+            for key, perm in batch.items():
+                results[key] = query_opa(perm.url, perm.payload)
 
-        return PermissionResult(allow=allow, reasons=reasons)
+        return [_parse_permission_result(results[key]) for key in keys]
 
     def filter(self, queryset):
         url = self.url.replace('/allow', '/filter')
 
-        with make_requests_session() as session:
-            r = session.post(url, json=self.payload).json()['result']
+        r = query_opa(url, self.payload)
 
         q_objects = []
         ops_dict = {
@@ -215,8 +429,8 @@ class PolicyEnforcer(BasePermission):
 
         iam_context = get_iam_context(request, obj)
         for perm_class in OpenPolicyAgentPermission.__subclasses__():
-            for perm in perm_class.create(request, view, obj, iam_context):
-                result = perm.check_access()
+            permissions = perm_class.create(request, view, obj, iam_context)
+            for result in OpenPolicyAgentPermission.check_access_batch(permissions):
                 if not result.allow:
                     return False
 
@@ -243,79 +457,6 @@ class IsAuthenticatedOrReadPublicResource(BasePermission):
             request.method == 'GET' and is_public_obj(obj)
         )
 
-<<<<<<< HEAD
-
-class AnalyticsReportPermission(OpenPolicyAgentPermission):
-    class Scopes(StrEnum):
-        LIST = 'list'
-        CREATE = 'create'
-
-    @classmethod
-    def create(cls, request, view, obj, iam_context):
-        Scopes = __class__.Scopes
-        permissions = []
-        if view.basename == 'analytics_reports':
-            scopes = cls.get_scopes(request, view, obj)
-            for scope in scopes:
-                self = cls.create_base_perm(request, view, scope, iam_context, obj)
-                permissions.append(self)
-
-            if view.action == Scopes.LIST:
-                job_id = request.query_params.get('job_id', None)
-                task_id = request.query_params.get('task_id', None)
-                project_id = request.query_params.get('project_id', None)
-            else:
-                job_id = request.data.get('job_id', None)
-                task_id = request.data.get('task_id', None)
-                project_id = request.data.get('project_id', None)
-
-            if job_id:
-                try:
-                    job = Job.objects.get(id=job_id)
-                except Job.DoesNotExist as ex:
-                    raise ValidationError(str(ex))
-
-                iam_context = get_iam_context(request, job)
-                perm = JobPermission.create_scope_view(iam_context, int(job_id))
-                permissions.append(perm)
-
-            if task_id:
-                try:
-                    task = Task.objects.get(id=task_id)
-                except Task.DoesNotExist as ex:
-                    raise ValidationError(str(ex))
-
-                iam_context = get_iam_context(request, task)
-                perm = TaskPermission.create_scope_view(request, int(task_id), iam_context)
-                permissions.append(perm)
-
-            if project_id:
-                try:
-                    project = Project.objects.get(id=project_id)
-                except Project.DoesNotExist as ex:
-                    raise ValidationError(str(ex))
-
-                iam_context = get_iam_context(request, project)
-                perm = ProjectPermission.create_scope_view(iam_context, int(project_id))
-                permissions.append(perm)
-
-        return permissions
-
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.url = settings.IAM_OPA_DATA_URL + '/analytics_reports/allow'
-
-    @staticmethod
-    def get_scopes(request, view, obj):
-        Scopes = __class__.Scopes
-        return [{
-            'list': Scopes.LIST,
-            'create': Scopes.CREATE,
-        }.get(view.action, None)]
-
-    def get_resource(self):
-        return None
-        
 def load_app_permissions(config: AppConfig) -> None:
     """
     Ensures that permissions and OPA rules from the given app are loaded.
@@ -330,4 +471,4 @@ def load_app_permissions(config: AppConfig) -> None:
         for attr in vars(permissions_module).values()
     )
 
-    add_opa_rules_path(Path(config.path, "rules"))
\ No newline at end of file
+    add_opa_rules_path(Path(config.path, "rules"))
@@ -0,0 +1,106 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+from typing import Optional
+
+from django.test import SimpleTestCase
+
+from cvat.apps.iam.decision_tables import load_decision_tables
+
+APPS_DIR = Path(__file__).resolve().parents[2]
+
+
+def _make_input(scope: str, *,
+    user_id: int = 1, privilege: Optional[str] = 'user',
+    org_id: Optional[int] = None, org_role: Optional[str] = None,
+    resource: Optional[dict] = None,
+) -> dict:
+    return {
+        'scope': scope,
+        'auth': {
+            'user': { 'id': user_id, 'privilege': privilege },
+            'organization': {
+                'id': org_id,
+                'owner': { 'id': None },
+                'user': { 'role': org_role },
+            } if org_id is not None else None,
+        },
+        'resource': resource,
+    }
+
+def _make_task(*, owner_id: int = 10, org_id: Optional[int] = None) -> dict:
+    return {
+        'id': 1,
+        'owner': { 'id': owner_id },
+        'assignee': { 'id': None },
+        'organization': { 'id': org_id } if org_id is not None else None,
+        'project': None,
+    }
+
+class DecisionTableTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tables = load_decision_tables(APPS_DIR.glob('*/rules'))
+
+    def test_can_load_tables(self):
+        self.assertTrue({'tasks', 'jobs', 'projects', 'users'}.issubset(self.tables))
+        self.assertNotIn('memberships', self.tables)
+
+    def test_admin_is_always_allowed(self):
+        self.assertTrue(self.tables['tasks'].evaluate(
+            _make_input('delete', privilege='admin', resource=_make_task())
+        ))
+
+    def test_can_check_ownership(self):
+        tasks = self.tables['tasks']
+
+        self.assertTrue(tasks.evaluate(
+            _make_input('view', privilege=None, resource=_make_task(owner_id=1))
+        ))
+        self.assertFalse(tasks.evaluate(
+            _make_input('view', privilege='business', resource=_make_task(owner_id=10))
+        ))
+
+    def test_can_check_organization_role(self):
+        tasks = self.tables['tasks']
+
+        self.assertTrue(tasks.evaluate(_make_input('view',
+            org_id=5, org_role='maintainer', resource=_make_task(org_id=5))
+        ))
+        self.assertFalse(tasks.evaluate(_make_input('view',
+            org_id=5, org_role='worker', resource=_make_task(org_id=5))
+        ))
+
+    def test_resource_must_be_in_request_organization(self):
+        self.assertFalse(self.tables['tasks'].evaluate(_make_input('view',
+            org_id=5, org_role='owner', resource=_make_task(org_id=6))
+        ))
+
+    def test_can_check_strict_privilege(self):
+        job = {
+            'id': 1,
+            'assignee': { 'id': 1 },
+            'organization': { 'id': 5 },
+            'project': None,
+            'task': { 'owner': { 'id': 10 }, 'assignee': { 'id': None } },
+        }
+
+        self.assertTrue(self.tables['jobs'].evaluate(
+            _make_input('view', privilege='worker', org_id=5, resource=job)
+        ))
+        self.assertFalse(self.tables['jobs'].evaluate(
+            _make_input('view', privilege='user', org_id=5, resource=job)
+        ))
+
+    def test_can_check_limits(self):
+        users = self.tables['users']
+
+        self.assertTrue(users.evaluate(_make_input('view', org_id=5, org_role='worker',
+            resource={ 'id': 2, 'membership': { 'role': 'worker' } }
+        )))
+        self.assertFalse(users.evaluate(_make_input('view', org_id=5, org_role=None,
+            resource={ 'id': 2, 'membership': { 'role': None } }
+        )))
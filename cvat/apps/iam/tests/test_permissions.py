@@ -0,0 +1,114 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from cvat.apps.iam import permissions
+from cvat.apps.iam.permissions import OpenPolicyAgentPermission, _DecisionCache
+
+
+def _make_permission(package: str, scope: str):
+    # Only the query fields are required to check a permission
+    return SimpleNamespace(
+        url=f'{settings.IAM_OPA_DATA_URL}/{package}/allow',
+        payload={'input': {'scope': scope}},
+    )
+
+class DecisionCacheTest(SimpleTestCase):
+    def test_can_expire_results(self):
+        cache = _DecisionCache(ttl=10, max_size=10)
+
+        with mock.patch('cvat.apps.iam.permissions.time.monotonic', return_value=100):
+            cache.set('key', True)
+            self.assertEqual(cache.get('key'), True)
+
+        with mock.patch('cvat.apps.iam.permissions.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('key'))
+
+    def test_can_evict_least_recently_used_results(self):
+        cache = _DecisionCache(ttl=10, max_size=2)
+        cache.set('a', True)
+        cache.set('b', True)
+        cache.get('a')
+        cache.set('c', True)
+
+        self.assertEqual(cache.get('a'), True)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), True)
+
+    def test_can_be_disabled(self):
+        cache = _DecisionCache(ttl=0, max_size=10)
+        cache.set('key', True)
+
+        self.assertIsNone(cache.get('key'))
+
+class PermissionBatchTest(SimpleTestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        for patcher in [
+            mock.patch.object(permissions, 'get_opa_session', return_value=self.session),
+            mock.patch.object(permissions, '_decision_cache', _DecisionCache(ttl=60, max_size=10)),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_can_check_permissions_in_one_request(self):
+        self.session.post.return_value.json.return_value = {
+            'result': [{'r0': True, 'r1': {'allow': False, 'reasons': ['reason']}}]
+        }
+        view_perm = _make_permission('tasks', 'view')
+        delete_perm = _make_permission('jobs', 'delete')
+
+        results = OpenPolicyAgentPermission.check_access_batch(
+            [view_perm, delete_perm, view_perm]
+        )
+
+        self.assertEqual([r.allow for r in results], [True, False, True])
+        self.assertEqual(results[1].reasons, ['reason'])
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.post.call_args.args[0], settings.IAM_OPA_HOST + '/v1/query')
+
+    def test_can_reuse_cached_decisions(self):
+        self.session.post.return_value.json.return_value = {'result': True}
+        perm = _make_permission('tasks', 'view')
+
+        OpenPolicyAgentPermission.check_access_batch([perm])
+        results = OpenPolicyAgentPermission.check_access_batch([perm, perm])
+
+        self.assertEqual([r.allow for r in results], [True, True])
+        self.session.post.assert_called_once_with(perm.url, json=perm.payload)
+
+    def test_can_check_permissions_separately_if_batch_result_is_undefined(self):
+        self.session.post.return_value.json.side_effect = [
+            {'result': []},
+            {'result': True},
+            {'result': False},
+        ]
+
+        results = OpenPolicyAgentPermission.check_access_batch([
+            _make_permission('tasks', 'view'), _make_permission('jobs', 'view'),
+        ])
+
+        self.assertEqual([r.allow for r in results], [True, False])
+        self.assertEqual(self.session.post.call_count, 3)
+
+    @override_settings(IAM_POLICY_ENGINE='embedded')
+    def test_can_evaluate_embedded_rules_without_requests(self):
+        self.session.post.return_value.json.return_value = {'result': True}
+        table = mock.Mock()
+        table.evaluate.return_value = False
+
+        with mock.patch.object(permissions, 'get_decision_tables', return_value={'tasks': table}):
+            results = OpenPolicyAgentPermission.check_access_batch([
+                _make_permission('tasks', 'view'), _make_permission('jobs', 'view'),
+            ])
+
+        self.assertEqual([r.allow for r in results], [False, True])
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.post.call_args.args[0],
+            _make_permission('jobs', 'view').url)
@@ -1,10 +1,12 @@
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Tuple
 import functools
 import hashlib
 import io
 import tarfile
 
+from .decision_tables import DecisionTable, load_decision_tables
+
 _OPA_RULES_PATHS = {
     Path(__file__).parent / 'rules',
 }
@@ -25,6 +27,11 @@ def get_opa_bundle() -> Tuple[bytes, str]:
 def add_opa_rules_path(path: Path) -> None:
     _OPA_RULES_PATHS.add(path)
     get_opa_bundle.cache_clear()
+    get_decision_tables.cache_clear()
+
+@functools.lru_cache(maxsize=None)
+def get_decision_tables() -> Dict[str, DecisionTable]:
+    return load_decision_tables(_OPA_RULES_PATHS)
 
 def get_dummy_user(email):
     from allauth.account.models import EmailAddress
@@ -6,3 +6,9 @@ import os
 
 QUALITY_CHECK_JOB_DELAY = int(os.getenv("CVAT_QUALITY_CHECK_JOB_DELAY", 15 * 60))
 "The delay before the next quality check job is queued, in seconds"
+
+QUALITY_CHECK_WORKERS = int(os.getenv("CVAT_QUALITY_CHECK_WORKERS", 1))
+"The number of processes used to compare jobs in a quality check, 1 means in-process comparison"
+
+QUALITY_CHECK_WORKER_MEMORY_LIMIT = int(os.getenv("CVAT_QUALITY_CHECK_WORKER_MEMORY_LIMIT", 0))
+"The maximum address space of a job comparison process, in bytes. 0 means no limit"
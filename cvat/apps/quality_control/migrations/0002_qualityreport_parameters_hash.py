@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quality_control", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="qualityreport",
+            name="parameters_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
@@ -86,6 +86,9 @@ class QualityReport(models.Model):
     target_last_updated = models.DateTimeField()
     gt_last_updated = models.DateTimeField()
 
+    parameters_hash = models.CharField(max_length=64, blank=True, default="")
+    "Identifies the comparison parameters, the task labels and the deleted frames used for the report"
+
     data = models.JSONField()
 
     conflicts: Sequence[AnnotationConflict]
@@ -4,8 +4,12 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+import hashlib
 import itertools
 import math
+import multiprocessing
+import resource
 from collections import Counter
 from copy import deepcopy
 from datetime import timedelta
@@ -35,9 +39,11 @@ from cvat.apps.dataset_manager.formats.registry import dm_env
 from cvat.apps.dataset_manager.task import JobAnnotation
 from cvat.apps.dataset_manager.util import bulk_create
 from cvat.apps.engine.models import (
+    AttributeSpec,
     DimensionType,
     Job,
     JobType,
+    Label,
     ShapeType,
     StageChoice,
     StatusChoice,
@@ -552,7 +558,7 @@ class JobDataProvider:
     def __init__(self, job_id: int, *, queryset=None, included_frames=None) -> None:
         self.job_id = job_id
         self.job_annotation = JobAnnotation(job_id, queryset=queryset)
-        self.job_annotation.init_from_db()
+        self.job_annotation.init_from_db(streaming=True)
         self.job_data = JobData(
             annotation_ir=self.job_annotation.ir_data,
             db_job=self.job_annotation.db_job,
@@ -570,6 +576,14 @@ class JobDataProvider:
     def dm_item_id_to_frame_id(self, item: dm.DatasetItem) -> int:
         return match_dm_item(item, self.job_data)
 
+    @property
+    def job_frame_count(self) -> int:
+        return len(self.job_data.rel_range)
+
+    @property
+    def segment_frame_set(self) -> Sequence[int]:
+        return self.job_data._db_job.segment.frame_set
+
     def dm_ann_to_ann_id(self, ann: dm.Annotation) -> AnnotationId:
         source_ann = self._annotation_memo.get_source_ann(ann)
         if "track_id" in ann.attributes:
@@ -593,6 +607,66 @@ class JobDataProvider:
         )
 
 
+class JobDataSnapshot:
+    """
+    A compact picklable copy of the job data required for comparisons.
+    It doesn't keep references to DB objects, so it can be sent to other processes.
+    """
+
+    def __init__(self, data_provider: JobDataProvider) -> None:
+        dataset = data_provider.dm_dataset
+
+        self.job_id = data_provider.job_id
+        self.job_frame_count = data_provider.job_frame_count
+        self.segment_frame_set = data_provider.segment_frame_set
+
+        self._categories = dataset.categories()
+        self._items = list(dataset)
+        self._frame_ids = {
+            item.id: data_provider.dm_item_id_to_frame_id(item) for item in self._items
+        }
+        self._ann_ids = [
+            [self._get_source_ann_id(data_provider, ann) for ann in item.annotations]
+            for item in self._items
+        ]
+
+    @staticmethod
+    def _get_source_ann_id(
+        data_provider: JobDataProvider, ann: dm.Annotation
+    ) -> Optional[AnnotationId]:
+        try:
+            return data_provider.dm_ann_to_ann_id(ann)
+        except KeyError:
+            # Not all the annotations have a source annotation,
+            # such annotations are not supposed to be referenced in the report
+            return None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("dm_dataset", None)
+        state.pop("_ann_id_mapping", None)
+        return state
+
+    @cached_property
+    def dm_dataset(self):
+        return dm.Dataset.from_iterable(self._items, categories=self._categories, env=dm_env)
+
+    @cached_property
+    def _ann_id_mapping(self) -> Dict[int, AnnotationId]:
+        # Annotations are identified by objects, like in the original data provider
+        return {
+            id(ann): ann_id
+            for item, item_ann_ids in zip(self._items, self._ann_ids)
+            for ann, ann_id in zip(item.annotations, item_ann_ids)
+        }
+
+    def dm_item_id_to_frame_id(self, item: dm.DatasetItem) -> int:
+        return self._frame_ids[item.id]
+
+    def dm_ann_to_ann_id(self, ann: dm.Annotation) -> AnnotationId:
+        return self._ann_id_mapping[id(ann)]
+
+
 class _MemoizingAnnotationConverterFactory:
     def __init__(self):
         self._annotation_mapping = {}  # dm annotation -> cvat annotation
@@ -645,20 +719,32 @@ def _match_segments(
     distance=dm.ops.segment_iou,
     dist_thresh=1.0,
     label_matcher=lambda a, b: a.label == b.label,
+    *,
+    distance_matrix: Optional[np.ndarray] = None,
 ):
-    assert callable(distance), distance
+    """
+    The distance function is called for each pair of the segments,
+    unless the distance values are provided for all the pairs in a matrix.
+    """
+
     assert callable(label_matcher), label_matcher
 
     max_anns = max(len(a_segms), len(b_segms))
-    distances = np.array(
-        [
+    if distance_matrix is not None:
+        assert distance_matrix.shape == (len(a_segms), len(b_segms)), distance_matrix.shape
+        distances = np.ones((max_anns, max_anns))
+        distances[: len(a_segms), : len(b_segms)] = 1 - distance_matrix
+    else:
+        assert callable(distance), distance
+        distances = np.array(
             [
-                1 - distance(a, b) if a is not None and b is not None else 1
-                for b, _ in itertools.zip_longest(b_segms, range(max_anns), fillvalue=None)
+                [
+                    1 - distance(a, b) if a is not None and b is not None else 1
+                    for b, _ in itertools.zip_longest(b_segms, range(max_anns), fillvalue=None)
+                ]
+                for a, _ in itertools.zip_longest(a_segms, range(max_anns), fillvalue=None)
             ]
-            for a, _ in itertools.zip_longest(a_segms, range(max_anns), fillvalue=None)
-        ]
-    )
+        )
     distances[~np.isfinite(distances)] = 1
     distances[distances > 1 - dist_thresh] = 1
 
@@ -730,8 +816,127 @@ def _OKS(a, b, sigma=0.1, bbox=None, scale=None, visibility_a=None, visibility_b
     ) / np.sum(visibility_a | visibility_b, dtype=float)
 
 
+def _bbox_iou_matrix(a_bboxes: np.ndarray, b_bboxes: np.ndarray) -> np.ndarray:
+    """
+    Computes IoU for all the pairs of the axis-aligned boxes in the (x, y, w, h) format.
+    Like dm.ops.bbox_iou(), returns -1 for the boxes without intersection.
+    """
+
+    a_bboxes = np.reshape(a_bboxes, (-1, 4)).astype(float)
+    b_bboxes = np.reshape(b_bboxes, (-1, 4)).astype(float)
+    a_x0, a_y0, a_w, a_h = (a_bboxes[:, i, np.newaxis] for i in range(4))
+    b_x0, b_y0, b_w, b_h = (b_bboxes[np.newaxis, :, i] for i in range(4))
+
+    in_w = np.maximum(0, np.minimum(a_x0 + a_w, b_x0 + b_w) - np.maximum(a_x0, b_x0))
+    in_h = np.maximum(0, np.minimum(a_y0 + a_h, b_y0 + b_h) - np.maximum(a_y0, b_y0))
+    intersection = in_w * in_h
+    union = a_w * a_h + b_w * b_h - intersection
+
+    has_intersection = intersection != 0
+    return np.divide(
+        intersection, union, out=np.full(intersection.shape, -1.0), where=has_intersection
+    )
+
+
+def _mean_bbox_area_matrix(a_bboxes: np.ndarray, b_bboxes: np.ndarray) -> np.ndarray:
+    "Computes the area of dm.ops.mean_bbox() for all the pairs of the boxes"
+
+    a_bboxes = np.reshape(a_bboxes, (-1, 4)).astype(float)
+    b_bboxes = np.reshape(b_bboxes, (-1, 4)).astype(float)
+    a_x0, a_y0, a_w, a_h = (a_bboxes[:, i, np.newaxis] for i in range(4))
+    b_x0, b_y0, b_w, b_h = (b_bboxes[np.newaxis, :, i] for i in range(4))
+
+    mean_w = (a_x0 + a_w + b_x0 + b_w) / 2 - (a_x0 + b_x0) / 2
+    mean_h = (a_y0 + a_h + b_y0 + b_h) / 2 - (a_y0 + b_y0) / 2
+    return mean_w * mean_h
+
+
+def _OKS_matrix(
+    a_points: Sequence[np.ndarray],
+    b_points: Sequence[np.ndarray],
+    *,
+    sigma: float = 0.1,
+    scale: Union[float, np.ndarray],
+    visibility_a: Optional[Sequence[np.ndarray]] = None,
+    visibility_b: Optional[Sequence[np.ndarray]] = None,
+) -> np.ndarray:
+    """
+    Computes _OKS() for all the pairs of the point sets.
+    The scale can be specified for each pair of the sets.
+    The sets with different point counts have zero similarity.
+    """
+
+    result = np.zeros((len(a_points), len(b_points)))
+    if not len(a_points) or not len(b_points):
+        return result
+
+    a_sizes = np.array([len(p) for p in a_points])
+    b_sizes = np.array([len(p) for p in b_points])
+
+    for size in np.intersect1d(a_sizes, b_sizes):
+        a_ids = np.flatnonzero(a_sizes == size)
+        b_ids = np.flatnonzero(b_sizes == size)
+
+        a_group = np.reshape([a_points[i] for i in a_ids], (len(a_ids), size, 2))
+        b_group = np.reshape([b_points[i] for i in b_ids], (len(b_ids), size, 2))
+
+        if visibility_a is None:
+            a_group_visibility = np.full((len(a_ids), size), True)
+        else:
+            a_group_visibility = np.reshape(
+                [visibility_a[i] for i in a_ids], (len(a_ids), size)
+            ).astype(bool)
+
+        if visibility_b is None:
+            b_group_visibility = np.full((len(b_ids), size), True)
+        else:
+            b_group_visibility = np.reshape(
+                [visibility_b[i] for i in b_ids], (len(b_ids), size)
+            ).astype(bool)
+
+        if np.ndim(scale):
+            group_scale = scale[np.ix_(a_ids, b_ids)][..., np.newaxis]
+        else:
+            group_scale = scale
+
+        a_group_visibility = a_group_visibility[:, np.newaxis]
+        b_group_visibility = b_group_visibility[np.newaxis, :]
+
+        # The same computations as in _OKS(), including the degenerate cases
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dists = np.linalg.norm(a_group[:, np.newaxis] - b_group[np.newaxis, :], axis=-1)
+            similarity = np.exp(-(dists**2) / (2 * group_scale * (2 * sigma) ** 2))
+            result[np.ix_(a_ids, b_ids)] = np.sum(
+                a_group_visibility * b_group_visibility * similarity, axis=-1
+            ) / np.sum(a_group_visibility | b_group_visibility, axis=-1, dtype=float)
+
+    return result
+
+
 @define(kw_only=True)
 class _KeypointsMatcher(dm.ops.PointsMatcher):
+    def distance_matrix(
+        self, a_objs: Sequence[dm.Points], b_objs: Sequence[dm.Points]
+    ) -> np.ndarray:
+        "Computes distance() for all the pairs of the points"
+
+        a_bboxes = np.array([self.instance_map[id(a)][1] for a in a_objs])
+        b_bboxes = np.array([self.instance_map[id(b)][1] for b in b_objs])
+
+        def _get_visibility(points: dm.Points) -> np.ndarray:
+            return np.array([v == dm.Points.Visibility.visible for v in points.visibility])
+
+        result = _OKS_matrix(
+            [np.reshape(a.points, (-1, 2)) for a in a_objs],
+            [np.reshape(b.points, (-1, 2)) for b in b_objs],
+            sigma=self.sigma,
+            scale=_mean_bbox_area_matrix(a_bboxes, b_bboxes),
+            visibility_a=[_get_visibility(a) for a in a_objs],
+            visibility_b=[_get_visibility(b) for b in b_objs],
+        )
+        result[_bbox_iou_matrix(a_bboxes, b_bboxes) <= 0] = 0
+        return result
+
     def distance(self, a: dm.Points, b: dm.Points) -> float:
         a_bbox = self.instance_map[id(a)][1]
         b_bbox = self.instance_map[id(b)][1]
@@ -1005,16 +1210,16 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             return None
 
     def match_labels(self, item_a, item_b):
-        def label_distance(a, b):
-            if a is None or b is None:
-                return 0
-            return 0.5 + (a.label == b.label) / 2
+        def label_distance_matrix(a_objs, b_objs):
+            a_labels = np.array([a.label for a in a_objs])
+            b_labels = np.array([b.label for b in b_objs])
+            return 0.5 + (a_labels[:, np.newaxis] == b_labels[np.newaxis, :]) / 2
 
         return self._match_segments(
             dm.AnnotationType.label,
             item_a,
             item_b,
-            distance=label_distance,
+            distance_matrix=label_distance_matrix,
             label_matcher=lambda a, b: a.label == b.label,
             dist_thresh=0.5,
         )
@@ -1026,17 +1231,23 @@ class _DistanceComparator(dm.ops.DistanceComparator):
         item_b,
         *,
         distance: Callable = dm.ops.segment_iou,
+        distance_matrix: Optional[Callable[[Sequence, Sequence], np.ndarray]] = None,
         label_matcher: Callable = None,
         a_objs: Optional[Sequence[dm.Annotation]] = None,
         b_objs: Optional[Sequence[dm.Annotation]] = None,
         dist_thresh: Optional[float] = None,
     ):
+        """
+        If the distance matrix function is specified, it's used instead of the distance function
+        to compute the distances for all the object pairs at once.
+        """
+
         if a_objs is None:
             a_objs = self._get_ann_type(t, item_a)
         if b_objs is None:
             b_objs = self._get_ann_type(t, item_b)
 
-        if self.return_distances:
+        if self.return_distances and not distance_matrix:
             distance, distances = self._make_memoizing_distance(distance)
 
         if not a_objs and not b_objs:
@@ -1047,6 +1258,20 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             if label_matcher:
                 extra_args["label_matcher"] = label_matcher
 
+            if distance_matrix:
+                computed_distances = distance_matrix(a_objs, b_objs)
+                extra_args["distance_matrix"] = computed_distances
+
+                if self.return_distances:
+                    distances = dict(
+                        zip(
+                            itertools.starmap(
+                                self._make_distance_key, itertools.product(a_objs, b_objs)
+                            ),
+                            computed_distances.ravel().tolist(),
+                        )
+                    )
+
             returned_values = _match_segments(
                 a_objs,
                 b_objs,
@@ -1077,18 +1302,34 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
             return dm.Polygon(points)
 
-        def _bbox_iou(a: dm.Bbox, b: dm.Bbox, *, img_w: int, img_h: int) -> float:
-            if a.attributes.get("rotation", 0) == b.attributes.get("rotation", 0):
-                return dm.ops.bbox_iou(a, b)
-            else:
-                return _segment_iou(_to_polygon(a), _to_polygon(b), img_h=img_h, img_w=img_w)
+        def _bbox_iou_matrix_with_rotation(
+            a_objs: Sequence[dm.Bbox], b_objs: Sequence[dm.Bbox], *, img_w: int, img_h: int
+        ) -> np.ndarray:
+            result = _bbox_iou_matrix(
+                np.array([a.get_bbox() for a in a_objs]), np.array([b.get_bbox() for b in b_objs])
+            )
+
+            # Boxes with different rotations are compared as polygons
+            a_rotations = np.array([a.attributes.get("rotation", 0) for a in a_objs])
+            b_rotations = np.array([b.attributes.get("rotation", 0) for b in b_objs])
+            for a_idx, b_idx in zip(
+                *np.nonzero(a_rotations[:, np.newaxis] != b_rotations[np.newaxis, :])
+            ):
+                result[a_idx, b_idx] = _segment_iou(
+                    _to_polygon(a_objs[a_idx]),
+                    _to_polygon(b_objs[b_idx]),
+                    img_h=img_h,
+                    img_w=img_w,
+                )
+
+            return result
 
         img_h, img_w = item_a.image.size
         return self._match_segments(
             dm.AnnotationType.bbox,
             item_a,
             item_b,
-            distance=partial(_bbox_iou, img_h=img_h, img_w=img_w),
+            distance_matrix=partial(_bbox_iou_matrix_with_rotation, img_h=img_h, img_w=img_w),
         )
 
     def match_segmentations(self, item_a, item_b):
@@ -1184,13 +1425,25 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
             return rle
 
-        def _segment_comparator(a_inst_id: int, b_inst_id: int) -> float:
-            a_segm = _get_segment(a_inst_id, compiled_mask=a_compiled_mask, instances=a_instances)
-            b_segm = _get_segment(b_inst_id, compiled_mask=b_compiled_mask, instances=b_instances)
+        def _segment_iou_matrix(a_inst_ids: Sequence[int], b_inst_ids: Sequence[int]) -> np.ndarray:
+            if not len(a_inst_ids) or not len(b_inst_ids):
+                return np.zeros((len(a_inst_ids), len(b_inst_ids)))
+
+            a_segms = [
+                _get_segment(i, compiled_mask=a_compiled_mask, instances=a_instances)
+                for i in a_inst_ids
+            ]
+            b_segms = [
+                _get_segment(i, compiled_mask=b_compiled_mask, instances=b_instances)
+                for i in b_inst_ids
+            ]
 
             from pycocotools import mask as mask_utils
 
-            return float(mask_utils.iou([b_segm], [a_segm], [0])[0])
+            # All the pairs are compared in a single call.
+            # The segments with non-intersecting bboxes are skipped by pycocotools.
+            # Note that mask_utils.iou expects (dt, gt). Check this if the 3rd param is True
+            return np.asarray(mask_utils.iou(b_segms, a_segms, [0] * len(a_segms)), dtype=float).T
 
         def _label_matcher(a_inst_id: int, b_inst_id: int) -> bool:
             # labels are the same in the instance annotations
@@ -1205,7 +1458,7 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             item_b,
             a_objs=range(len(a_instances)),
             b_objs=range(len(b_instances)),
-            distance=_segment_comparator,
+            distance_matrix=_segment_iou_matrix,
             label_matcher=_label_matcher,
         )
 
@@ -1324,13 +1577,41 @@ class _DistanceComparator(dm.ops.DistanceComparator):
                     len(matched_points) + len(a_extra) + len(b_extra)
                 )
 
+        def _distance_matrix(
+            a_objs: Sequence[dm.Points], b_objs: Sequence[dm.Points]
+        ) -> np.ndarray:
+            a_bboxes = np.reshape([instance_map[id(a)][1] for a in a_objs], (-1, 4))
+            b_bboxes = np.reshape([instance_map[id(b)][1] for b in b_objs], (-1, 4))
+            a_is_singular = a_bboxes[:, 2] * a_bboxes[:, 3] == 0
+            b_is_singular = b_bboxes[:, 2] * b_bboxes[:, 3] == 0
+
+            result = np.zeros((len(a_objs), len(b_objs)))
+
+            # Simple case: singular points without bbox, computed for all the pairs at once
+            a_singular_ids = np.flatnonzero(a_is_singular)
+            b_singular_ids = np.flatnonzero(b_is_singular)
+            result[np.ix_(a_singular_ids, b_singular_ids)] = _OKS_matrix(
+                [np.reshape(a_objs[i].points, (-1, 2)) for i in a_singular_ids],
+                [np.reshape(b_objs[i].points, (-1, 2)) for i in b_singular_ids],
+                sigma=self.oks_sigma,
+                scale=img_h * img_w,
+            )
+
+            # Complex case: only the pairs with intersecting bboxes can have non-zero distance
+            is_complex_pair = ~(a_is_singular[:, np.newaxis] & b_is_singular[np.newaxis, :])
+            has_intersection = _bbox_iou_matrix(a_bboxes, b_bboxes) > 0
+            for a_idx, b_idx in zip(*np.nonzero(is_complex_pair & has_intersection)):
+                result[a_idx, b_idx] = _distance(a_objs[a_idx], b_objs[b_idx])
+
+            return result
+
         return self._match_segments(
             dm.AnnotationType.points,
             item_a,
             item_b,
             a_objs=a_points,
             b_objs=b_points,
-            distance=_distance,
+            distance_matrix=_distance_matrix,
         )
 
     def _get_skeleton_info(self, skeleton_label_id: int):
@@ -1416,7 +1697,7 @@ class _DistanceComparator(dm.ops.DistanceComparator):
             item_b,
             a_objs=a_points,
             b_objs=b_points,
-            distance=matcher.distance,
+            distance_matrix=matcher.distance_matrix,
         )
 
         matched, mismatched, a_extra, b_extra = results[:4]
@@ -1441,16 +1722,20 @@ class _DistanceComparator(dm.ops.DistanceComparator):
 
         return returned_values
 
+    @staticmethod
+    def _make_distance_key(a, b) -> Tuple[int, int]:
+        if isinstance(a, int) and isinstance(b, int):
+            return (a, b)
+        else:
+            return (id(a), id(b))
+
     @classmethod
     def _make_memoizing_distance(cls, distance_function: Callable[[Any, Any], float]):
         distances = {}
         notfound = object()
 
         def memoizing_distance(a, b):
-            if isinstance(a, int) and isinstance(b, int):
-                key = (a, b)
-            else:
-                key = (id(a), id(b))
+            key = cls._make_distance_key(a, b)
 
             dist = distances.get(key, notfound)
 
@@ -1661,8 +1946,8 @@ class DatasetComparator:
 
     def __init__(
         self,
-        ds_data_provider: JobDataProvider,
-        gt_data_provider: JobDataProvider,
+        ds_data_provider: Union[JobDataProvider, JobDataSnapshot],
+        gt_data_provider: Union[JobDataProvider, JobDataSnapshot],
         *,
         settings: Optional[ComparisonParameters] = None,
     ) -> None:
@@ -1679,7 +1964,7 @@ class DatasetComparator:
 
         self.comparator = _Comparator(self._gt_dataset.categories(), settings=settings)
 
-        self.included_frames = gt_data_provider.job_data._db_job.segment.frame_set
+        self.included_frames = gt_data_provider.segment_frame_set
 
     def _dm_item_to_frame_id(self, item: dm.DatasetItem) -> int:
         return self._gt_data_provider.dm_item_id_to_frame_id(item)
@@ -2067,7 +2352,7 @@ class DatasetComparator:
             parameters=self.settings,
             comparison_summary=ComparisonReportComparisonSummary(
                 frame_share=(
-                    len(intersection_frames) / (len(self._ds_data_provider.job_data.rel_range) or 1)
+                    len(intersection_frames) / (self._ds_data_provider.job_frame_count or 1)
                 ),
                 frames=intersection_frames,
                 conflict_count=len(conflicts),
@@ -2231,48 +2516,58 @@ class QualityReportUpdateManager:
             if gt_job is None:
                 return
 
-            # TODO: Probably, can be optimized to this:
-            # - task updated (the gt job, frame set or labels changed) -> everything is computed
-            # - job updated -> job report is computed
-            #   old reports can be reused in this case (need to add M-1 relationship in reports)
-
-            # Add prefetch data to the shared queryset
-            # All the jobs / segments share the same task, so we can load it just once.
-            # We reuse the same object for better memory use (OOM is possible otherwise).
-            # Perform manual "join", since django can't do this.
-            gt_job = JobDataProvider.add_prefetch_info(job_queryset).get(id=gt_job.id)
-            for job in job_queryset:
-                job.segment.task = gt_job.segment.task
-
-            # Preload all the data for the computations
-            # It must be done in a single transaction and before all the remaining computations
-            # because the task and jobs can be changed after the beginning,
-            # which will lead to inconsistent results
-            gt_job_data_provider = JobDataProvider(gt_job.id, queryset=job_queryset)
-            gt_job_frames = gt_job_data_provider.job_data.get_included_frames()
+            quality_params = self._get_task_quality_params(task)
+            parameters_hash = self._compute_parameters_hash(task, quality_params)
 
+            # Job reports are reused if neither the job, nor the GT job, nor the parameters
+            # have changed since the last report. Changes in the task labels, the deleted frames
+            # or the GT job invalidate all the job reports.
             jobs: List[Job] = [j for j in job_queryset if j.type == JobType.ANNOTATION]
-            job_data_providers = {
-                job.id: JobDataProvider(
-                    job.id, queryset=job_queryset, included_frames=gt_job_frames
-                )
-                for job in jobs
-            }
-
-            quality_params = self._get_task_quality_params(task)
+            reusable_job_reports = self._get_reusable_job_reports(
+                task, jobs=jobs, gt_job=gt_job, parameters_hash=parameters_hash
+            )
+            outdated_jobs = [job for job in jobs if job.id not in reusable_job_reports]
+
+            job_data_providers = {}
+            if outdated_jobs:
+                # Add prefetch data to the shared queryset
+                # All the jobs / segments share the same task, so we can load it just once.
+                # We reuse the same object for better memory use (OOM is possible otherwise).
+                # Perform manual "join", since django can't do this.
+                gt_job = JobDataProvider.add_prefetch_info(job_queryset).get(id=gt_job.id)
+                for job in job_queryset:
+                    job.segment.task = gt_job.segment.task
+
+                # Preload all the data for the computations
+                # It must be done in a single transaction and before all the remaining computations
+                # because the task and jobs can be changed after the beginning,
+                # which will lead to inconsistent results
+                gt_job_data_provider = JobDataProvider(gt_job.id, queryset=job_queryset)
+                gt_job_frames = gt_job_data_provider.job_data.get_included_frames()
+
+                job_data_providers = {
+                    job.id: JobDataProvider(
+                        job.id, queryset=job_queryset, included_frames=gt_job_frames
+                    )
+                    for job in outdated_jobs
+                }
 
         job_comparison_reports: Dict[int, ComparisonReport] = {}
-        for job in jobs:
-            job_data_provider = job_data_providers[job.id]
-            comparator = DatasetComparator(
-                job_data_provider, gt_job_data_provider, settings=quality_params
+        if outdated_jobs:
+            job_comparison_reports.update(
+                self._compare_jobs(
+                    job_data_providers, gt_job_data_provider, quality_params=quality_params
+                )
             )
-            job_comparison_reports[job.id] = comparator.generate_report()
 
-            # Release resources
-            del job_data_provider.dm_dataset
+        for job_id, db_job_report in reusable_job_reports.items():
+            job_comparison_reports[job_id] = ComparisonReport.from_json(
+                db_job_report.get_json_report()
+            )
 
-        task_comparison_report = self._compute_task_report(task, job_comparison_reports)
+        task_comparison_report = self._compute_task_report(
+            task, {job.id: job_comparison_reports[job.id] for job in jobs}
+        )
 
         with transaction.atomic():
             # The task could have been deleted during processing
@@ -2293,11 +2588,19 @@ class QualityReportUpdateManager:
             job_quality_reports = {}
             for job in jobs:
                 job_comparison_report = job_comparison_reports[job.id]
+
+                if db_job_report := reusable_job_reports.get(job.id):
+                    # The serialized data doesn't need to be produced again
+                    job_report_data = db_job_report.get_json_report()
+                else:
+                    job_report_data = job_comparison_report.to_json()
+
                 job_report = dict(
                     job=job,
                     target_last_updated=job.updated_date,
                     gt_last_updated=gt_job.updated_date,
-                    data=job_comparison_report.to_json(),
+                    parameters_hash=parameters_hash,
+                    data=job_report_data,
                     conflicts=[c.to_dict() for c in job_comparison_report.conflicts],
                 )
 
@@ -2308,6 +2611,7 @@ class QualityReportUpdateManager:
                     task=task,
                     target_last_updated=task.updated_date,
                     gt_last_updated=gt_job.updated_date,
+                    parameters_hash=parameters_hash,
                     data=task_comparison_report.to_json(),
                     conflicts=[],  # the task doesn't have own conflicts
                 ),
@@ -2316,6 +2620,89 @@ class QualityReportUpdateManager:
 
         return task_report.id
 
+    def _compare_jobs(
+        self,
+        job_data_providers: Dict[int, JobDataProvider],
+        gt_job_data_provider: JobDataProvider,
+        *,
+        quality_params: ComparisonParameters,
+    ) -> Dict[int, ComparisonReport]:
+        worker_count = min(settings.QUALITY_CHECK_WORKERS, len(job_data_providers))
+        if worker_count <= 1:
+            job_comparison_reports = {}
+            for job_id, job_data_provider in job_data_providers.items():
+                comparator = DatasetComparator(
+                    job_data_provider, gt_job_data_provider, settings=quality_params
+                )
+                job_comparison_reports[job_id] = comparator.generate_report()
+
+                # Release resources
+                del job_data_provider.dm_dataset
+
+            return job_comparison_reports
+
+        return _compare_jobs_in_process_pool(
+            job_data_providers,
+            gt_job_data_provider,
+            quality_params=quality_params,
+            worker_count=worker_count,
+            worker_memory_limit=settings.QUALITY_CHECK_WORKER_MEMORY_LIMIT,
+        )
+
+    def _compute_parameters_hash(self, task: Task, quality_params: ComparisonParameters) -> str:
+        if task.project_id:
+            labels = Label.objects.filter(project_id=task.project_id)
+        else:
+            labels = Label.objects.filter(task_id=task.id)
+
+        label_attributes = AttributeSpec.objects.filter(label__in=labels)
+
+        return hashlib.sha256(
+            dump_json(
+                {
+                    "parameters": quality_params.to_dict(),
+                    "labels": list(
+                        labels.order_by("id").values_list("id", "name", "type", "parent_id")
+                    ),
+                    "attributes": list(
+                        label_attributes.order_by("id").values_list(
+                            "id",
+                            "label_id",
+                            "name",
+                            "mutable",
+                            "input_type",
+                            "default_value",
+                            "values",
+                        )
+                    ),
+                    # The deleted frames are changed in the task data,
+                    # which doesn't update the jobs
+                    "deleted_frames": sorted(task.data.deleted_frames),
+                },
+                sort_keys=True,
+            )
+        ).hexdigest()
+
+    def _get_reusable_job_reports(
+        self, task: Task, *, jobs: Sequence[Job], gt_job: Job, parameters_hash: str
+    ) -> Dict[int, models.QualityReport]:
+        last_task_report = (
+            models.QualityReport.objects.filter(task=task).order_by("-created_date").first()
+        )
+        if not last_task_report:
+            return {}
+
+        job_updated_dates = {job.id: job.updated_date for job in jobs}
+        return {
+            db_job_report.job_id: db_job_report
+            for db_job_report in last_task_report.children.filter(
+                job_id__in=job_updated_dates.keys(),
+                gt_last_updated=gt_job.updated_date,
+                parameters_hash=parameters_hash,
+            )
+            if db_job_report.target_last_updated == job_updated_dates[db_job_report.job_id]
+        }
+
     def _get_current_job(self):
         from rq import get_current_job
 
@@ -2413,6 +2800,7 @@ class QualityReportUpdateManager:
             task=task_report["task"],
             target_last_updated=task_report["target_last_updated"],
             gt_last_updated=task_report["gt_last_updated"],
+            parameters_hash=task_report["parameters_hash"],
             data=task_report["data"],
         )
         db_task_report.save()
@@ -2424,6 +2812,7 @@ class QualityReportUpdateManager:
                 job=job_report["job"],
                 target_last_updated=job_report["target_last_updated"],
                 gt_last_updated=job_report["gt_last_updated"],
+                parameters_hash=job_report["parameters_hash"],
                 data=job_report["data"],
             )
             db_job_reports.append(db_job_report)
@@ -2472,6 +2861,72 @@ class QualityReportUpdateManager:
         return ComparisonParameters.from_dict(quality_params.to_dict())
 
 
+_job_comparison_worker_context: Optional[Tuple[JobDataSnapshot, ComparisonParameters]] = None
+
+
+def _init_job_comparison_worker(
+    gt_job_snapshot: JobDataSnapshot, quality_params: ComparisonParameters, memory_limit: int
+):
+    if memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    global _job_comparison_worker_context
+    _job_comparison_worker_context = (gt_job_snapshot, quality_params)
+
+
+def _compare_job_in_worker(job_snapshot: JobDataSnapshot) -> ComparisonReport:
+    gt_job_snapshot, quality_params = _job_comparison_worker_context
+    comparator = DatasetComparator(job_snapshot, gt_job_snapshot, settings=quality_params)
+    return comparator.generate_report()
+
+
+def _compare_jobs_in_process_pool(
+    job_data_providers: Dict[int, JobDataProvider],
+    gt_job_data_provider: JobDataProvider,
+    *,
+    quality_params: ComparisonParameters,
+    worker_count: int,
+    worker_memory_limit: int,
+) -> Dict[int, ComparisonReport]:
+    # The worker processes are forked, so the GT job data is passed to them only once.
+    # The job data is extracted in this process and sent to the workers as snapshots,
+    # which don't require DB access. The number of extracted jobs waiting for a worker
+    # is limited to keep the memory use bounded.
+    gt_job_snapshot = JobDataSnapshot(gt_job_data_provider)
+    del gt_job_data_provider.dm_dataset
+
+    max_pending_jobs = 2 * worker_count
+
+    job_comparison_reports = {}
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=worker_count,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_job_comparison_worker,
+        initargs=(gt_job_snapshot, quality_params, worker_memory_limit),
+    ) as executor:
+        pending_jobs: Dict[concurrent.futures.Future, int] = {}
+
+        def _collect_results(return_when):
+            done, _ = concurrent.futures.wait(pending_jobs, return_when=return_when)
+            for future in done:
+                job_comparison_reports[pending_jobs.pop(future)] = future.result()
+
+        for job_id, job_data_provider in job_data_providers.items():
+            if len(pending_jobs) >= max_pending_jobs:
+                _collect_results(concurrent.futures.FIRST_COMPLETED)
+
+            job_snapshot = JobDataSnapshot(job_data_provider)
+
+            # Release resources
+            del job_data_provider.dm_dataset
+
+            pending_jobs[executor.submit(_compare_job_in_worker, job_snapshot)] = job_id
+
+        _collect_results(concurrent.futures.ALL_COMPLETED)
+
+    return job_comparison_reports
+
+
 def prepare_report_for_downloading(db_report: models.QualityReport, *, host: str) -> str:
     # Decorate the report for better usability and readability:
     # - add conflicting annotation links like:
@@ -0,0 +1,445 @@
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+from datetime import timedelta
+from functools import cached_property
+from typing import List
+
+import datumaro as dm
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from cvat.apps.engine.models import (
+    AttributeSpec,
+    Data,
+    Job,
+    JobType,
+    Label,
+    Segment,
+    SegmentType,
+    Task,
+)
+from cvat.apps.quality_control import models
+from cvat.apps.quality_control.quality_reports import (
+    _OKS,
+    AnnotationId,
+    AnnotationType,
+    ComparisonParameters,
+    DatasetComparator,
+    QualityReportUpdateManager,
+    _bbox_iou_matrix,
+    _KeypointsMatcher,
+    _match_segments,
+    _mean_bbox_area_matrix,
+    _OKS_matrix,
+)
+
+
+class JobReportReuseTest(TestCase):
+    def setUp(self):
+        self.task = Task.objects.create(
+            name="task",
+            data=Data.objects.create(chunk_size=10, size=20, stop_frame=19),
+        )
+        self.label = Label.objects.create(task=self.task, name="car")
+        AttributeSpec.objects.create(
+            label=self.label,
+            name="color",
+            mutable=False,
+            input_type="select",
+            default_value="red",
+            values="red\ngreen",
+        )
+
+        self.jobs = [
+            Job.objects.create(
+                segment=Segment.objects.create(task=self.task, start_frame=start, stop_frame=stop),
+                type=JobType.ANNOTATION,
+            )
+            for start, stop in [(0, 9), (10, 19)]
+        ]
+        self.gt_job = Job.objects.create(
+            segment=Segment.objects.create(
+                task=self.task,
+                start_frame=0,
+                stop_frame=19,
+                type=SegmentType.SPECIFIC_FRAMES,
+                frames=[1, 12],
+            ),
+            type=JobType.GROUND_TRUTH,
+        )
+
+        self.manager = QualityReportUpdateManager()
+
+    def _refresh_task(self) -> Task:
+        return Task.objects.select_related("data").get(id=self.task.id)
+
+    def _compute_parameters_hash(self) -> str:
+        task = self._refresh_task()
+        return self.manager._compute_parameters_hash(
+            task, self.manager._get_task_quality_params(task)
+        )
+
+    def _save_reports(self, parameters_hash: str, *, job_updated_dates=None):
+        job_updated_dates = job_updated_dates or {}
+        task_report = models.QualityReport.objects.create(
+            task=self.task,
+            target_last_updated=self.task.updated_date,
+            gt_last_updated=self.gt_job.updated_date,
+            parameters_hash=parameters_hash,
+            data={},
+        )
+        for job in self.jobs:
+            models.QualityReport.objects.create(
+                job=job,
+                parent=task_report,
+                target_last_updated=job_updated_dates.get(job.id, job.updated_date),
+                gt_last_updated=self.gt_job.updated_date,
+                parameters_hash=parameters_hash,
+                data={},
+            )
+
+    def _get_reusable_job_ids(self, *, gt_job=None):
+        return set(
+            self.manager._get_reusable_job_reports(
+                self._refresh_task(),
+                jobs=self.jobs,
+                gt_job=gt_job or self.gt_job,
+                parameters_hash=self._compute_parameters_hash(),
+            )
+        )
+
+    def test_parameters_hash_is_stable(self):
+        self.assertEqual(self._compute_parameters_hash(), self._compute_parameters_hash())
+
+    def test_parameters_hash_depends_on_deleted_frames(self):
+        initial_hash = self._compute_parameters_hash()
+
+        # The data meta update doesn't change the jobs
+        self.task.data.deleted_frames = [3, 12]
+        self.task.data.save()
+        updated_hash = self._compute_parameters_hash()
+        self.assertNotEqual(updated_hash, initial_hash)
+
+        self.task.data.deleted_frames = []
+        self.task.data.save()
+        self.assertEqual(self._compute_parameters_hash(), initial_hash)
+
+    def test_parameters_hash_depends_on_labels_and_settings(self):
+        hashes = [self._compute_parameters_hash()]
+
+        AttributeSpec.objects.filter(label=self.label).update(mutable=True)
+        hashes.append(self._compute_parameters_hash())
+
+        Label.objects.create(task=self.task, name="person")
+        hashes.append(self._compute_parameters_hash())
+
+        models.QualitySettings.objects.filter(task=self.task).update(iou_threshold=0.9)
+        hashes.append(self._compute_parameters_hash())
+
+        self.assertEqual(len(set(hashes)), len(hashes))
+
+    def test_can_reuse_unchanged_job_reports(self):
+        self._save_reports(self._compute_parameters_hash())
+
+        self.assertEqual(self._get_reusable_job_ids(), {job.id for job in self.jobs})
+
+    def test_does_not_reuse_updated_job_reports(self):
+        self._save_reports(
+            self._compute_parameters_hash(),
+            job_updated_dates={self.jobs[0].id: self.jobs[0].updated_date - timedelta(seconds=1)},
+        )
+
+        self.assertEqual(self._get_reusable_job_ids(), {self.jobs[1].id})
+
+    def test_does_not_reuse_job_reports_after_gt_job_update(self):
+        self._save_reports(self._compute_parameters_hash())
+
+        self.gt_job.save()
+
+        self.assertEqual(
+            self._get_reusable_job_ids(gt_job=Job.objects.get(id=self.gt_job.id)), set()
+        )
+
+    def test_does_not_reuse_job_reports_after_deleted_frames_update(self):
+        self._save_reports(self._compute_parameters_hash())
+
+        self.task.data.deleted_frames = [5]
+        self.task.data.save()
+
+        self.assertEqual(self._get_reusable_job_ids(), set())
+
+    def test_uses_only_last_task_report(self):
+        self._save_reports(self._compute_parameters_hash())
+        self._save_reports("outdated")
+
+        self.assertEqual(self._get_reusable_job_ids(), set())
+
+
+class _FakeJobDataProvider:
+    def __init__(self, job_id: int, items: List[dm.DatasetItem]):
+        self.job_id = job_id
+        self.job_frame_count = len(items)
+        self.segment_frame_set = list(range(len(items)))
+        self._items = items
+
+    @cached_property
+    def dm_dataset(self):
+        return dm.Dataset.from_iterable(self._items, categories=["car", "person"])
+
+    def dm_item_id_to_frame_id(self, item: dm.DatasetItem) -> int:
+        return item.attributes["frame"]
+
+    def dm_ann_to_ann_id(self, ann: dm.Annotation) -> AnnotationId:
+        return AnnotationId(
+            obj_id=ann.id, type=AnnotationType.SHAPE, shape_type=ann.type.name, job_id=self.job_id
+        )
+
+
+class ParallelJobComparisonTest(SimpleTestCase):
+    def _make_items(
+        self,
+        frame_count: int,
+        *,
+        shift: float = 0,
+        extra_ann_frames=(),
+        label_changes=(),
+    ) -> List[dm.DatasetItem]:
+        items = []
+        for frame in range(frame_count):
+            annotations = [
+                dm.Bbox(
+                    5 + frame + shift,
+                    5,
+                    10,
+                    10,
+                    id=1,
+                    label=int(frame in label_changes),
+                    attributes={"occluded": False},
+                ),
+                dm.Points([20, 20, 25 + shift, 25], id=2, label=1),
+                dm.Polygon([30, 30, 40 + shift, 30, 40, 40], id=3, label=0),
+            ]
+            if frame in extra_ann_frames:
+                annotations.append(dm.Bbox(1, 1, 3, 3, id=4, label=0))
+
+            items.append(
+                dm.DatasetItem(
+                    id=f"frame_{frame}",
+                    attributes={"frame": frame},
+                    media=dm.Image(path=f"frame_{frame}.jpg", size=(50, 50)),
+                    annotations=annotations,
+                )
+            )
+
+        return items
+
+    def _make_data_providers(self):
+        gt_data_provider = _FakeJobDataProvider(100, self._make_items(4))
+        job_data_providers = {
+            1: _FakeJobDataProvider(1, self._make_items(4)),
+            2: _FakeJobDataProvider(2, self._make_items(4, shift=3, extra_ann_frames=[1])),
+            3: _FakeJobDataProvider(3, self._make_items(4, shift=8, label_changes=[0, 2])),
+            4: _FakeJobDataProvider(4, self._make_items(4, extra_ann_frames=[0, 3])),
+        }
+        return job_data_providers, gt_data_provider
+
+    def _compare_jobs(self, *, worker_count: int):
+        job_data_providers, gt_data_provider = self._make_data_providers()
+
+        with override_settings(QUALITY_CHECK_WORKERS=worker_count):
+            reports = QualityReportUpdateManager()._compare_jobs(
+                job_data_providers, gt_data_provider, quality_params=ComparisonParameters()
+            )
+
+        return {job_id: report.to_json() for job_id, report in reports.items()}
+
+    def test_parallel_comparison_produces_same_reports(self):
+        serial_reports = self._compare_jobs(worker_count=1)
+
+        # More jobs than the pending job limit of 2 workers
+        parallel_reports = self._compare_jobs(worker_count=2)
+
+        self.assertEqual(parallel_reports, serial_reports)
+        self.assertEqual(list(serial_reports), [1, 2, 3, 4])
+
+    def test_parallel_comparison_produces_same_reports_as_comparator(self):
+        job_data_providers, gt_data_provider = self._make_data_providers()
+        expected_reports = {
+            job_id: DatasetComparator(job_data_provider, gt_data_provider).generate_report()
+            for job_id, job_data_provider in job_data_providers.items()
+        }
+
+        self.assertEqual(
+            self._compare_jobs(worker_count=3),
+            {job_id: report.to_json() for job_id, report in expected_reports.items()},
+        )
+        self.assertGreater(
+            len(expected_reports[2].conflicts) + len(expected_reports[3].conflicts), 0
+        )
+
+
+class DistanceMatrixTest(SimpleTestCase):
+    # The matrix functions are compared with the per-pair functions they replace
+
+    def setUp(self):
+        self.rng = np.random.default_rng(42)
+
+    def _make_bboxes(self, count: int) -> np.ndarray:
+        bboxes = np.concatenate(
+            [self.rng.uniform(0, 50, (count, 2)), self.rng.uniform(0, 20, (count, 2))], axis=1
+        )
+
+        # Degenerate, touching and duplicate boxes
+        bboxes[0, 2:] = 0
+        bboxes[1] = [bboxes[2, 0] + bboxes[2, 2], bboxes[2, 1], 5, 5]
+        bboxes[3] = bboxes[4]
+        return bboxes
+
+    def _make_points(self, count: int, *, point_count: int, visible: bool = True) -> dm.Points:
+        points = []
+        for i in range(count):
+            visibility = None
+            if not visible:
+                visibility = self.rng.choice(
+                    [dm.Points.Visibility.visible, dm.Points.Visibility.hidden], point_count
+                ).tolist()
+
+            points.append(
+                dm.Points(
+                    self.rng.uniform(0, 30, point_count * 2).tolist(),
+                    visibility=visibility,
+                    id=i,
+                    label=0,
+                )
+            )
+
+        return points
+
+    def test_bbox_iou_matrix_matches_bbox_iou(self):
+        a_bboxes = self._make_bboxes(15)
+        b_bboxes = np.concatenate([self._make_bboxes(10), a_bboxes[:5]])
+
+        expected = [[dm.ops.bbox_iou(list(a), list(b)) for b in b_bboxes] for a in a_bboxes]
+
+        np.testing.assert_allclose(_bbox_iou_matrix(a_bboxes, b_bboxes), expected)
+
+    def test_bbox_iou_matrix_can_handle_empty_inputs(self):
+        self.assertEqual(_bbox_iou_matrix(np.zeros((0, 4)), self._make_bboxes(5)).shape, (0, 5))
+        self.assertEqual(_bbox_iou_matrix(self._make_bboxes(5), []).shape, (5, 0))
+
+    def test_mean_bbox_area_matrix_matches_mean_bbox(self):
+        a_bboxes = self._make_bboxes(15)
+        b_bboxes = self._make_bboxes(10)
+
+        expected = []
+        for a in a_bboxes:
+            row = []
+            for b in b_bboxes:
+                mean_bbox = dm.ops.mean_bbox([list(a), list(b)])
+                row.append(mean_bbox[2] * mean_bbox[3])
+            expected.append(row)
+
+        np.testing.assert_allclose(_mean_bbox_area_matrix(a_bboxes, b_bboxes), expected)
+
+    def test_oks_matrix_matches_oks(self):
+        a_points = self._make_points(6, point_count=3) + self._make_points(4, point_count=5)
+        b_points = self._make_points(5, point_count=5) + self._make_points(7, point_count=3)
+        b_points[0] = a_points[6]
+
+        for scale in [100, 0.5]:
+            with self.subTest(scale=scale):
+                expected = [
+                    [_OKS(a, b, sigma=0.2, scale=scale) for b in b_points] for a in a_points
+                ]
+
+                actual = _OKS_matrix(
+                    [np.reshape(a.points, (-1, 2)) for a in a_points],
+                    [np.reshape(b.points, (-1, 2)) for b in b_points],
+                    sigma=0.2,
+                    scale=scale,
+                )
+
+                np.testing.assert_allclose(actual, expected)
+
+    def test_oks_matrix_matches_oks_with_per_pair_scales_and_visibility(self):
+        a_points = self._make_points(8, point_count=4, visible=False)
+        b_points = self._make_points(6, point_count=4, visible=False)
+        scales = self.rng.uniform(1, 500, (len(a_points), len(b_points)))
+
+        # A point set without visible points
+        a_points[0] = a_points[0].wrap(visibility=[dm.Points.Visibility.hidden] * 4)
+
+        def _get_visibility(points: dm.Points) -> List[bool]:
+            return [v == dm.Points.Visibility.visible for v in points.visibility]
+
+        with np.errstate(invalid="ignore"):
+            expected = [
+                [
+                    _OKS(
+                        a,
+                        b,
+                        scale=scales[a_idx, b_idx],
+                        visibility_a=_get_visibility(a),
+                        visibility_b=_get_visibility(b),
+                    )
+                    for b_idx, b in enumerate(b_points)
+                ]
+                for a_idx, a in enumerate(a_points)
+            ]
+
+        actual = _OKS_matrix(
+            [np.reshape(a.points, (-1, 2)) for a in a_points],
+            [np.reshape(b.points, (-1, 2)) for b in b_points],
+            scale=scales,
+            visibility_a=[_get_visibility(a) for a in a_points],
+            visibility_b=[_get_visibility(b) for b in b_points],
+        )
+
+        np.testing.assert_allclose(actual, expected)
+        self.assertFalse(np.any(actual[0] > 0))
+
+    def test_keypoints_matcher_distance_matrix_matches_distance(self):
+        a_points = self._make_points(10, point_count=3, visible=False)
+        b_points = self._make_points(8, point_count=3, visible=False) + self._make_points(
+            3, point_count=2
+        )
+
+        instance_map = {}
+        for points, bboxes in [
+            (a_points, self._make_bboxes(len(a_points))),
+            (b_points, self._make_bboxes(len(b_points))),
+        ]:
+            for p, bbox in zip(points, bboxes):
+                instance_map[id(p)] = [[p], list(bbox)]
+
+        matcher = _KeypointsMatcher(instance_map=instance_map, sigma=0.1)
+
+        expected = [[matcher.distance(a, b) for b in b_points] for a in a_points]
+
+        np.testing.assert_allclose(matcher.distance_matrix(a_points, b_points), expected)
+
+    def test_can_match_segments_by_distance_matrix(self):
+        a_bboxes = [
+            dm.Bbox(*bbox, id=i, label=i % 2) for i, bbox in enumerate(self._make_bboxes(12))
+        ]
+        b_bboxes = [
+            dm.Bbox(*bbox, id=i, label=i % 3) for i, bbox in enumerate(self._make_bboxes(9))
+        ]
+        b_bboxes += [bbox.wrap(id=100 + bbox.id) for bbox in a_bboxes[5:9]]
+
+        expected = _match_segments(a_bboxes, b_bboxes, distance=dm.ops.bbox_iou, dist_thresh=0.3)
+
+        actual = _match_segments(
+            a_bboxes,
+            b_bboxes,
+            distance=None,
+            distance_matrix=_bbox_iou_matrix(
+                [a.get_bbox() for a in a_bboxes], [b.get_bbox() for b in b_bboxes]
+            ),
+            dist_thresh=0.3,
+        )
+
+        self.assertEqual(actual, expected)
+        self.assertGreater(len(expected[0]), 0)
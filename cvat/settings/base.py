@@ -192,6 +192,7 @@ MIDDLEWARE = [
     'django.middleware.gzip.GZipMiddleware',
     'cvat.apps.engine.middleware.RequestTrackingMiddleware',
     'crum.CurrentRequestUserMiddleware',
+    'cvat.apps.events.middleware.EventBufferMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'dj_pagination.middleware.PaginationMiddleware',
@@ -236,6 +237,14 @@ IAM_ADMIN_ROLE = 'admin'
 IAM_ROLES = [IAM_ADMIN_ROLE, 'business', 'user', 'worker']
 IAM_OPA_HOST = 'http://opa:8181'
 IAM_OPA_DATA_URL = f'{IAM_OPA_HOST}/v1/data'
+# OPA results depend only on the query, so they are cached for this number of seconds.
+# Set to 0 to disable the cache, the results will be reused only within a request.
+IAM_OPA_DECISION_CACHE_TTL = int(os.getenv('CVAT_IAM_OPA_DECISION_CACHE_TTL', 60))
+IAM_OPA_DECISION_CACHE_MAX_SIZE = int(os.getenv('CVAT_IAM_OPA_DECISION_CACHE_MAX_SIZE', 10000))
+# 'opa' - all the policy queries are sent to OPA
+# 'embedded' - the "allow" rules which are fully described by the rule tables
+#   (rules/tests/configs) are evaluated in the server process, the others are sent to OPA
+IAM_POLICY_ENGINE = os.getenv('CVAT_IAM_POLICY_ENGINE', 'opa')
 LOGIN_URL = 'rest_login'
 LOGIN_REDIRECT_URL = '/'
 
@@ -277,6 +286,7 @@ class CVAT_QUEUES(Enum):
     QUALITY_REPORTS = 'quality_reports'
     ANALYTICS_REPORTS = 'analytics_reports'
     CLEANING = 'cleaning'
+    CHUNKS = 'chunks'
 
 redis_inmem_host = os.getenv('CVAT_REDIS_INMEM_HOST', 'localhost')
 redis_inmem_port = os.getenv('CVAT_REDIS_INMEM_PORT', 6379)
@@ -322,6 +332,10 @@ RQ_QUEUES = {
         **shared_queue_settings,
         'DEFAULT_TIMEOUT': '1h',
     },
+    CVAT_QUEUES.CHUNKS.value: {
+        **shared_queue_settings,
+        'DEFAULT_TIMEOUT': '1h',
+    },
 }
 
 NUCLIO = {
@@ -520,6 +534,12 @@ CVAT_LOG_IMPORT_ERRORS = to_bool(os.getenv('CVAT_LOG_IMPORT_ERRORS', True))
 if os.getenv('DJANGO_LOG_SERVER_HOST'):
     LOGGING['loggers']['vector']['handlers'] += ['vector']
 
+# The events of a request are sent to the vector logger in a background thread.
+# If the number of pending events exceeds the limit, they are sent in the request thread.
+EVENTS_QUEUE_SIZE = int(os.getenv('CVAT_EVENTS_QUEUE_SIZE', 100000))
+# How long to wait for the pending events to be sent on server shutdown, in seconds
+EVENTS_FLUSH_TIMEOUT = int(os.getenv('CVAT_EVENTS_FLUSH_TIMEOUT', 10))
+
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = None   # this django check disabled
 DATA_UPLOAD_MAX_NUMBER_FILES = None
@@ -550,6 +570,39 @@ CACHES = {
 
 USE_CACHE = True
 
+# Media chunks can be cached in tiers: an in-process LRU cache, a local disk cache and
+# the shared "media" cache. The local tiers are disabled by default, set a tier size in bytes
+# to enable it. The items expire in the local tiers together with the shared cache items.
+MEDIA_CACHE_MEMORY_TIER_SIZE = int(os.getenv('CVAT_MEDIA_CACHE_MEMORY_TIER_SIZE', 0))
+MEDIA_CACHE_MEMORY_TIER_MAX_ITEMS = int(os.getenv('CVAT_MEDIA_CACHE_MEMORY_TIER_MAX_ITEMS', 1000))
+MEDIA_CACHE_DISK_TIER_ROOT = os.path.join(CACHE_ROOT, 'media')
+MEDIA_CACHE_DISK_TIER_SIZE = int(os.getenv('CVAT_MEDIA_CACHE_DISK_TIER_SIZE', 0))
+
+# Concurrent requests for the same missing media cache item wait for a single worker
+# to prepare it instead of preparing it in parallel. Set the timeout to 0 to disable this.
+MEDIA_CACHE_PREPARATION_WAIT_TIMEOUT = int(os.getenv('CVAT_MEDIA_CACHE_PREPARATION_WAIT_TIMEOUT', 60))
+MEDIA_CACHE_PREPARATION_LOCK_TIMEOUT = int(os.getenv('CVAT_MEDIA_CACHE_PREPARATION_LOCK_TIMEOUT', 600))
+
+# How many chunks after the requested one are prepared in the background for a job,
+# and how many such chunks can be pending for a task. Set to 0 to disable prefetching.
+MEDIA_CACHE_PREFETCH_CHUNKS = int(os.getenv('CVAT_MEDIA_CACHE_PREFETCH_CHUNKS', 2))
+MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS = int(os.getenv('CVAT_MEDIA_CACHE_PREFETCH_MAX_TASK_JOBS', 4))
+
+# Exported annotations and datasets are stored in a shared cache, addressed by the
+# exported content. The least recently used files are removed above the size limit.
+EXPORT_CACHE_ROOT = os.path.join(CACHE_ROOT, 'export')
+EXPORT_CACHE_SIZE = int(os.getenv('CVAT_EXPORT_CACHE_SIZE', 20 * 1024 ** 3))
+
+# Project exports prepare the task annotations and media in this number of processes.
+# Set to 1 to export projects in a single process.
+DATASET_EXPORT_WORKERS = int(os.getenv('CVAT_DATASET_EXPORT_WORKERS', 1))
+
+# Open chunk decoders are kept in a per-process pool for random frame access
+MEDIA_DECODER_POOL_MAX_DECODERS = int(os.getenv('CVAT_MEDIA_DECODER_POOL_MAX_DECODERS', 8))
+MEDIA_DECODER_POOL_MEMORY_LIMIT = int(os.getenv('CVAT_MEDIA_DECODER_POOL_MEMORY_LIMIT', 512 * 1024 * 1024))
+MEDIA_DECODER_POOL_IDLE_TIMEOUT = int(os.getenv('CVAT_MEDIA_DECODER_POOL_IDLE_TIMEOUT', 300))
+MEDIA_DECODER_FRAME_BUFFER_SIZE = int(os.getenv('CVAT_MEDIA_DECODER_FRAME_BUFFER_SIZE', 8))
+
 CORS_ALLOW_HEADERS = list(default_headers) + [
     # tus upload protocol headers
     'upload-offset',
@@ -669,6 +722,9 @@ CLICKHOUSE = {
     }
 }
 
+# The number of date ranges, which are fetched in parallel during event export
+EVENTS_EXPORT_WORKERS = int(os.getenv('CVAT_EVENTS_EXPORT_WORKERS', 4))
+
 if (postgres_password_file := os.getenv('CVAT_POSTGRES_PASSWORD_FILE')) is not None:
     if 'CVAT_POSTGRES_PASSWORD' in os.environ:
         raise ImproperlyConfigured(
@@ -719,5 +775,11 @@ ONE_RUNNING_JOB_IN_QUEUE_PER_USER = to_bool(os.getenv('ONE_RUNNING_JOB_IN_QUEUE_
 # How many chunks can be prepared simultaneously during task creation in case the cache is not used
 CVAT_CONCURRENT_CHUNK_PROCESSING = int(os.getenv('CVAT_CONCURRENT_CHUNK_PROCESSING', 1))
 
+# How many threads are used to compress images of a single chunk
+CVAT_CHUNK_ENCODING_THREADS = int(os.getenv('CVAT_CHUNK_ENCODING_THREADS', 4))
+
+# How many threads are used to read images when a task manifest is prepared
+CVAT_MANIFEST_CREATION_WORKERS = int(os.getenv('CVAT_MANIFEST_CREATION_WORKERS', 4))
+
 from cvat.rq_patching import update_started_job_registry_cleanup
 update_started_job_registry_cleanup()
@@ -24,6 +24,12 @@ os.makedirs(MEDIA_DATA_ROOT, exist_ok=True)
 CACHE_ROOT = os.path.join(DATA_ROOT, 'cache')
 os.makedirs(CACHE_ROOT, exist_ok=True)
 
+MEDIA_CACHE_DISK_TIER_ROOT = os.path.join(CACHE_ROOT, 'media')
+EXPORT_CACHE_ROOT = os.path.join(CACHE_ROOT, 'export')
+
+# RQ jobs are executed synchronously in tests, so prefetching would only slow down requests
+MEDIA_CACHE_PREFETCH_CHUNKS = 0
+
 JOBS_ROOT = os.path.join(DATA_ROOT, 'jobs')
 os.makedirs(JOBS_ROOT, exist_ok=True)
 
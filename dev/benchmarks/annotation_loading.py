@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares time and peak memory of the default and streaming annotation loading
+for an existing job. Requires a configured database. Run from the repository root:
+
+    python dev/benchmarks/annotation_loading.py --job 42
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvat.settings.development')
+
+import django # pylint: disable=wrong-import-position
+django.setup()
+
+from django.db import transaction # pylint: disable=wrong-import-position
+
+from cvat.apps.dataset_manager.task import JobAnnotation # pylint: disable=wrong-import-position
+
+def measure(job_id: int, *, streaming: bool) -> tuple[float, int, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    with transaction.atomic():
+        annotation = JobAnnotation(job_id)
+        annotation.init_from_db(streaming=streaming)
+
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    object_count = sum(len(annotation.ir_data[key]) for key in ('tags', 'shapes', 'tracks'))
+    del annotation
+    return elapsed, peak, current, object_count
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--job', type=int, required=True, help='Job id to load')
+    parser.add_argument('--repeat', type=int, default=3, help='Measurements per mode (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    for streaming in (False, True):
+        results = [measure(args.job, streaming=streaming) for _ in range(args.repeat)]
+        elapsed = min(r[0] for r in results)
+        peak = max(r[1] for r in results)
+        retained = max(r[2] for r in results)
+        object_count = results[0][3]
+        print(f"mode: {'streaming' if streaming else 'default':9s}, objects: {object_count}, "
+            f"time: {elapsed:.2f}s, peak memory: {peak / 2**20:.1f} MiB, "
+            f"retained: {retained / 2**20:.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares serial and parallel build times of compressed image chunks
+on a synthetic image set. Run from the repository root:
+
+    python dev/benchmarks/chunk_encoding.py --threads 1 2 4 8
+"""
+
+import argparse
+import io
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvat.settings.development')
+
+import django # pylint: disable=wrong-import-position
+django.setup()
+
+from cvat.apps.engine.media_extractors import ZipCompressedChunkWriter # pylint: disable=wrong-import-position
+
+def make_images(count: int, width: int, height: int) -> list[Image.Image]:
+    rng = np.random.default_rng(42)
+    images = []
+    for _ in range(count):
+        # smooth gradients with noise are closer to real photos than pure noise
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+        noise = rng.normal(0, 20, (height, width, 3)).astype(np.float32)
+        data = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        images.append(Image.fromarray(data, 'RGB'))
+    return images
+
+def build_chunk(images: list[Image.Image], threads: int, quality: int):
+    writer = ZipCompressedChunkWriter(quality, encoding_threads=threads)
+    writer.save_as_chunk([(image, f'{i}.jpeg', None) for i, image in enumerate(images)], io.BytesIO())
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=36, help='Images per chunk (default: %(default)s)')
+    parser.add_argument('--width', type=int, default=4000, help='Image width (default: %(default)s)')
+    parser.add_argument('--height', type=int, default=3000, help='Image height (default: %(default)s)')
+    parser.add_argument('--quality', type=int, default=70, help='JPEG quality (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Measurements per mode (default: %(default)s)')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8],
+        help='Thread counts to compare, 1 means serial encoding (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    images = make_images(args.images, args.width, args.height)
+
+    baseline = None
+    for threads in args.threads:
+        elapsed = min(timeit.repeat(
+            lambda: build_chunk(images, threads, args.quality), number=1, repeat=args.repeat
+        ))
+        baseline = baseline or elapsed
+        print(f'threads: {threads:3d}, chunk build time: {elapsed:.3f}s, '
+            f'speedup: {baseline / elapsed:.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares the latency of "allow" decisions made by OPA and by the embedded
+policy engine (IAM_POLICY_ENGINE=embedded), and checks that the decisions match.
+The inputs are produced by the OPA test generators. Requires a running OPA server
+with the CVAT policies loaded, e.g. the one from the development docker compose setup.
+Run from the repository root:
+
+    python dev/benchmarks/iam_policy_engines.py --opa-url http://localhost:8181 --packages tasks jobs
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+
+import requests
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from cvat.apps.iam.decision_tables import load_decision_tables # pylint: disable=wrong-import-position
+
+APPS_DIR = REPO_ROOT / 'cvat' / 'apps'
+
+def generate_inputs(package: str) -> List[dict]:
+    generator_path = min(APPS_DIR.glob(f'*/rules/tests/generators/{package}_test.gen.rego.py'))
+    rules_dir = generator_path.parents[2]
+
+    with TemporaryDirectory() as temp_dir:
+        subprocess.check_call([sys.executable, generator_path, rules_dir / 'tests' / 'configs'],
+            cwd=temp_dir, stdout=subprocess.DEVNULL)
+        tests = Path(temp_dir, f'{package}_test.gen.rego').read_text()
+
+    return [
+        json.loads(query_input)
+        for query_input in re.findall(r'^\s+(?:not )?allow with input as (.*)$', tests, re.M)
+    ]
+
+def format_latency(latencies: List[float]) -> str:
+    latencies = sorted(latencies)
+    return 'mean: {:8.1f}us, p50: {:8.1f}us, p95: {:8.1f}us'.format(
+        1e6 * statistics.mean(latencies),
+        1e6 * latencies[len(latencies) // 2],
+        1e6 * latencies[int(len(latencies) * 0.95)],
+    )
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--opa-url', default='http://localhost:8181', help='OPA server URL (default: %(default)s)')
+    parser.add_argument('--packages', nargs='+', default=['tasks', 'jobs', 'projects'],
+        help='Policy packages to check (default: %(default)s)')
+    parser.add_argument('--inputs', type=int, default=1000, help='Maximum inputs per package (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    tables = load_decision_tables(APPS_DIR.glob('*/rules'))
+    session = requests.Session()
+    random.seed(42)
+
+    for package in args.packages:
+        inputs = generate_inputs(package)
+        inputs = random.sample(inputs, min(args.inputs, len(inputs)))
+        url = f'{args.opa_url}/v1/data/{package}/allow'
+
+        opa_latencies = []
+        embedded_latencies = []
+        mismatches = 0
+        for query_input in inputs:
+            start = time.perf_counter()
+            response = session.post(url, json={ 'input': query_input })
+            response.raise_for_status()
+            opa_result = response.json()['result']
+            opa_latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            embedded_result = tables[package].evaluate(query_input)
+            embedded_latencies.append(time.perf_counter() - start)
+
+            if opa_result != embedded_result:
+                mismatches += 1
+
+        print(f'package: {package}, inputs: {len(inputs)}, mismatches: {mismatches}')
+        print(f'  opa:      {format_latency(opa_latencies)}')
+        print(f'  embedded: {format_latency(embedded_latencies)}')
+
+if __name__ == '__main__':
+    main()
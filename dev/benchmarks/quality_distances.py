@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares pairwise (per-callback) and vectorized distance computations
+used in quality checks on synthetic dense frames. Run from the repository root:
+
+    python dev/benchmarks/quality_distances.py --objects 50 200 500
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvat.settings.development')
+
+import django # pylint: disable=wrong-import-position
+django.setup()
+
+import datumaro as dm # pylint: disable=wrong-import-position
+from pycocotools import mask as mask_utils # pylint: disable=wrong-import-position
+
+from cvat.apps.quality_control.quality_reports import ( # pylint: disable=wrong-import-position
+    _OKS, _OKS_matrix, _bbox_iou_matrix, _match_segments,
+)
+
+IMAGE_SIZE = (1080, 1920)
+
+def make_boxes(rng: np.random.Generator, count: int) -> list[dm.Bbox]:
+    img_h, img_w = IMAGE_SIZE
+    return [
+        dm.Bbox(x, y, w, h, label=int(label))
+        for x, y, w, h, label in zip(
+            rng.uniform(0, img_w - 100, count), rng.uniform(0, img_h - 100, count),
+            rng.uniform(5, 100, count), rng.uniform(5, 100, count),
+            rng.integers(0, 5, count),
+        )
+    ]
+
+def shift_boxes(rng: np.random.Generator, boxes: list[dm.Bbox]) -> list[dm.Bbox]:
+    # imitates another annotator: the same objects with small differences
+    return [
+        dm.Bbox(*(np.array(b.get_bbox()) + rng.normal(0, 3, 4)), label=b.label)
+        for b in boxes
+    ]
+
+def make_points(boxes: list[dm.Bbox]) -> list[np.ndarray]:
+    return [np.array([[b.x + b.w / 2, b.y + b.h / 2]]) for b in boxes]
+
+def make_rles(boxes: list[dm.Bbox]) -> list[dict]:
+    img_h, img_w = IMAGE_SIZE
+    return [mask_utils.frPyObjects([b.as_polygon()], img_h, img_w)[0] for b in boxes]
+
+def measure(func, repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, nargs='+', default=[50, 200, 500],
+        help='Object counts per frame to compare (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Measurements per mode (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    img_h, img_w = IMAGE_SIZE
+    rng = np.random.default_rng(42)
+
+    for count in args.objects:
+        a_boxes = make_boxes(rng, count)
+        b_boxes = shift_boxes(rng, a_boxes)
+        a_points = make_points(a_boxes)
+        b_points = make_points(b_boxes)
+        a_rles = make_rles(a_boxes)
+        b_rles = make_rles(b_boxes)
+
+        cases = {
+            'box IoU': (
+                lambda: _match_segments(a_boxes, b_boxes, distance=dm.ops.bbox_iou, dist_thresh=0.5),
+                lambda: _match_segments(a_boxes, b_boxes, dist_thresh=0.5,
+                    distance_matrix=_bbox_iou_matrix(
+                        np.array([a.get_bbox() for a in a_boxes]),
+                        np.array([b.get_bbox() for b in b_boxes]),
+                    )
+                ),
+            ),
+            'point OKS': (
+                lambda: _match_segments(range(count), range(count), dist_thresh=0.5,
+                    distance=lambda a, b: _OKS(
+                        dm.Points(a_points[a].ravel()), dm.Points(b_points[b].ravel()),
+                        sigma=0.09, scale=img_h * img_w,
+                    ),
+                    label_matcher=lambda a, b: True,
+                ),
+                lambda: _match_segments(range(count), range(count), dist_thresh=0.5,
+                    distance_matrix=_OKS_matrix(a_points, b_points, sigma=0.09, scale=img_h * img_w),
+                    label_matcher=lambda a, b: True,
+                ),
+            ),
+            'mask IoU': (
+                lambda: _match_segments(range(count), range(count), dist_thresh=0.5,
+                    distance=lambda a, b: float(mask_utils.iou([b_rles[b]], [a_rles[a]], [0])[0][0]),
+                    label_matcher=lambda a, b: True,
+                ),
+                lambda: _match_segments(range(count), range(count), dist_thresh=0.5,
+                    distance_matrix=np.asarray(
+                        mask_utils.iou(b_rles, a_rles, [0] * count), dtype=float
+                    ).T,
+                    label_matcher=lambda a, b: True,
+                ),
+            ),
+        }
+
+        for case_name, (pairwise, vectorized) in cases.items():
+            pairwise_time = measure(pairwise, args.repeat)
+            vectorized_time = measure(vectorized, args.repeat)
+            print(f'objects: {count:5d}, {case_name:9s}: pairwise {pairwise_time:.4f}s, '
+                f'vectorized {vectorized_time:.4f}s, speedup: {pairwise_time / vectorized_time:.1f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Compares time and peak memory of grouping task annotations by frame,
+as it is done in exports, with the task annotations merged in advance
+and merged lazily by segments. Requires a configured database.
+Run from the repository root:
+
+    python dev/benchmarks/task_annotation_grouping.py --task 42
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvat.settings.development')
+
+import django # pylint: disable=wrong-import-position
+django.setup()
+
+from django.db import transaction # pylint: disable=wrong-import-position
+
+from cvat.apps.dataset_manager.bindings import TaskData # pylint: disable=wrong-import-position
+from cvat.apps.dataset_manager.task import TaskAnnotation # pylint: disable=wrong-import-position
+
+def measure(task_id: int, *, lazy: bool) -> tuple[float, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    with transaction.atomic():
+        annotation = TaskAnnotation(task_id)
+        annotation.init_from_db(streaming=True, lazy=lazy)
+
+    task_data = TaskData(annotation_ir=annotation.ir_data, db_task=annotation.db_task)
+    object_count = 0
+    for frame in task_data.group_by_frame(include_empty=True):
+        object_count += len(frame.labeled_shapes) + len(frame.tags)
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, object_count
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--task', type=int, required=True, help='Task id to group')
+    parser.add_argument('--repeat', type=int, default=3, help='Measurements per mode (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    for lazy in (False, True):
+        results = [measure(args.task, lazy=lazy) for _ in range(args.repeat)]
+        elapsed = min(r[0] for r in results)
+        peak = max(r[1] for r in results)
+        object_count = results[0][2]
+        print(f"mode: {'lazy' if lazy else 'default':7s}, frame objects: {object_count}, "
+            f"time: {elapsed:.2f}s, peak memory: {peak / 2**20:.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 CVAT.ai Corporation
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Measures track interpolation time on synthetic tracks with long gaps
+between keyframes. Run from the repository root:
+
+    python dev/benchmarks/track_interpolation.py --frames 1000 --points 10 100 500
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvat.settings.development')
+
+import django # pylint: disable=wrong-import-position
+django.setup()
+
+from cvat.apps.dataset_manager.annotation import TrackManager # pylint: disable=wrong-import-position
+from cvat.apps.engine.models import DimensionType, ShapeType # pylint: disable=wrong-import-position
+
+def make_track(rng: np.random.Generator, shape_type: str, point_count: int,
+    frame_count: int, keyframe_count: int
+) -> dict:
+    keyframes = np.linspace(0, frame_count - 1, keyframe_count).astype(int)
+    return {
+        "frame": 0,
+        "label_id": 0,
+        "group": 0,
+        "source": "manual",
+        "attributes": [],
+        "shapes": [
+            {
+                "frame": int(frame),
+                "type": shape_type,
+                # polygon point counts vary to require point matching between keyframes
+                "points": rng.uniform(0, 1000, 2 * (
+                    point_count + (i % 3 if shape_type == ShapeType.POLYGON else 0)
+                )).tolist(),
+                "rotation": 0.0,
+                "occluded": False,
+                "outside": False,
+                "z_order": 0,
+                "attributes": [],
+            }
+            for i, frame in enumerate(keyframes)
+        ],
+    }
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=1000, help='Track length (default: %(default)s)')
+    parser.add_argument('--keyframes', type=int, default=5,
+        help='Keyframes per track (default: %(default)s)')
+    parser.add_argument('--points', type=int, nargs='+', default=[10, 100, 500],
+        help='Polygon point counts to compare (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Measurements per case (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    rng = np.random.default_rng(42)
+
+    cases = [('rectangle', ShapeType.RECTANGLE, 2)] + [
+        (f'polygon-{count}', ShapeType.POLYGON, count) for count in args.points
+    ]
+    for case_name, shape_type, point_count in cases:
+        track = make_track(rng, shape_type, point_count, args.frames, args.keyframes)
+        elapsed = min(timeit.repeat(
+            lambda: TrackManager.get_interpolated_shapes(
+                deepcopy(track), 0, args.frames, DimensionType.DIM_2D
+            ),
+            number=1, repeat=args.repeat,
+        ))
+        print(f'{case_name:12s}: {elapsed:.3f}s, {elapsed / args.frames * 1000:.3f} ms per frame')
+
+if __name__ == '__main__':
+    main()
@@ -3,11 +3,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
+from collections import deque
 from enum import Enum
 from io import StringIO, BytesIO
 import av
+import concurrent.futures
+import errno
 import json
+import mmap
+import numpy as np
 import os
+import shutil
+import tempfile
 
 from abc import ABC, abstractmethod, abstractproperty, abstractstaticmethod
 from contextlib import closing
@@ -17,7 +25,7 @@ from json.decoder import JSONDecodeError
 from .errors import InvalidManifestError, InvalidVideoError
 from .utils import SortingMethod, md5_hash, rotate_image, sort
 
-from typing import Dict, List, Union, Optional, Iterator, Tuple
+from typing import Dict, Iterable, List, Union, Optional, Iterator, Tuple
 
 class VideoStreamReader:
     def __init__(self, source_path, chunk_size, force):
@@ -138,6 +146,9 @@ class VideoStreamReader:
                 self._frames_number = index
 
 class DatasetImagesReader:
+    # How many images can be processed ahead of the consumer per worker
+    _PENDING_IMAGES_PER_WORKER = 4
+
     def __init__(self,
                 sources: Union[List[str], List[BytesIO]],
                 *,
@@ -147,6 +158,7 @@ class DatasetImagesReader:
                 meta: Optional[Dict[str, List[str]]] = None,
                 sorting_method: SortingMethod =SortingMethod.PREDEFINED,
                 use_image_hash: bool = False,
+                workers: int = 1,
                 **kwargs):
         self._raw_data_used = not isinstance(sources[0], str)
         func = (lambda x: x.filename) if self._raw_data_used else None
@@ -157,6 +169,7 @@ class DatasetImagesReader:
         self._start = start
         self._stop = stop if stop else len(sources)
         self._step = step
+        self._workers = workers
 
     @property
     def start(self):
@@ -182,35 +195,63 @@ class DatasetImagesReader:
     def step(self, value):
         self._step = int(value)
 
-    def __iter__(self):
-        sources = (i for i in self._sources)
-        for idx in range(self._stop):
-            if idx in self.range_:
-                image = next(sources)
-                img = Image.open(image, mode='r')
-
-                img_name = os.path.relpath(image, self._data_dir) if self._data_dir \
-                    else os.path.basename(image) if not self._raw_data_used else image.filename
-                name, extension = os.path.splitext(img_name)
-                image_properties = {
-                    'name': name.replace('\\', '/'),
-                    'extension': extension,
-                }
+    @property
+    def workers(self):
+        return self._workers
+
+    @workers.setter
+    def workers(self, value):
+        self._workers = int(value)
+
+    def _get_image_properties(self, image) -> Dict:
+        # only the image header is read, unless the image hash is required
+        with Image.open(image, mode='r') as img:
+            img_name = os.path.relpath(image, self._data_dir) if self._data_dir \
+                else os.path.basename(image) if not self._raw_data_used else image.filename
+            name, extension = os.path.splitext(img_name)
+            image_properties = {
+                'name': name.replace('\\', '/'),
+                'extension': extension,
+            }
+
+            width, height = img.width, img.height
+            orientation = img.getexif().get(274, 1)
+            if orientation > 4:
+                width, height = height, width
+            image_properties['width'] = width
+            image_properties['height'] = height
+
+            if self._meta and img_name in self._meta:
+                image_properties['meta'] = self._meta[img_name]
 
-                width, height = img.width, img.height
-                orientation = img.getexif().get(274, 1)
-                if orientation > 4:
-                    width, height = height, width
-                image_properties['width'] = width
-                image_properties['height'] = height
+            if self._use_image_hash:
+                image_properties['checksum'] = md5_hash(img)
 
-                if self._meta and img_name in self._meta:
-                    image_properties['meta'] = self._meta[img_name]
+        return image_properties
 
-                if self._use_image_hash:
-                    image_properties['checksum'] = md5_hash(img)
+    def _iterate_image_properties(self, sources: Iterator) -> Iterator[Dict]:
+        if self._workers <= 1:
+            yield from map(self._get_image_properties, sources)
+            return
 
-                yield image_properties
+        # Image decoding and hashing release the GIL, so threads are enough here.
+        # The results are returned in the order of the sources.
+        max_pending_images = self._workers * self._PENDING_IMAGES_PER_WORKER
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._workers) as executor:
+            pending_images = deque()
+            for image in sources:
+                pending_images.append(executor.submit(self._get_image_properties, image))
+                if len(pending_images) >= max_pending_images:
+                    yield pending_images.popleft().result()
+
+            while pending_images:
+                yield pending_images.popleft().result()
+
+    def __iter__(self):
+        image_properties = self._iterate_image_properties(i for i in self._sources)
+        for idx in range(self._stop):
+            if idx in self.range_:
+                yield next(image_properties)
             else:
                 yield dict()
 
@@ -225,23 +266,17 @@ class Dataset3DImagesReader(DatasetImagesReader):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-    def __iter__(self):
-        sources = (i for i in self._sources)
-        for idx in range(self._stop):
-            if idx in self.range_:
-                image = next(sources)
-                img_name = os.path.relpath(image, self._data_dir) if self._data_dir \
-                    else os.path.basename(image)
-                name, extension = os.path.splitext(img_name)
-                image_properties = {
-                    'name': name,
-                    'extension': extension,
-                }
-                if self._meta and img_name in self._meta:
-                    image_properties['meta'] = self._meta[img_name]
-                yield image_properties
-            else:
-                yield dict()
+    def _get_image_properties(self, image) -> Dict:
+        img_name = os.path.relpath(image, self._data_dir) if self._data_dir \
+            else os.path.basename(image)
+        name, extension = os.path.splitext(img_name)
+        image_properties = {
+            'name': name,
+            'extension': extension,
+        }
+        if self._meta and img_name in self._meta:
+            image_properties['meta'] = self._meta[img_name]
+        return image_properties
 
 class _Manifest:
     class SupportedVersion(str, Enum):
@@ -283,55 +318,131 @@ class _Manifest:
 # Needed for faster iteration over the manifest file, will be generated to work inside CVAT
 # and will not be generated when manually creating a manifest
 class _Index:
-    FILE_NAME = 'index.json'
+    """
+    Stores offsets of the manifest lines as an array of uint64 numbers
+    in the native byte order. The saved index is memory-mapped on loading,
+    so only the requested parts of the index are read from the disk.
+    """
+
+    FILE_NAME = 'index.bin'
+
+    # Indices were stored in the JSON format in the previous versions
+    LEGACY_FILE_NAME = 'index.json'
+
+    _OFFSET_TYPE = 'Q'
 
     def __init__(self, path):
         assert path and os.path.isdir(path), 'No index directory path'
         self._path = os.path.join(path, self.FILE_NAME)
-        self._index = {}
+        self._legacy_path = os.path.join(path, self.LEGACY_FILE_NAME)
+        self._index: Union[array, memoryview] = array(self._OFFSET_TYPE)
+        self._mapped_file: Optional[mmap.mmap] = None
 
     @property
     def path(self):
         return self._path
 
+    def exists(self) -> bool:
+        return os.path.exists(self._path) or os.path.exists(self._legacy_path)
+
+    @property
+    def is_legacy(self) -> bool:
+        return not os.path.exists(self._path) and os.path.exists(self._legacy_path)
+
     def dump(self):
-        with open(self._path, 'w') as index_file:
-            json.dump(self._index, index_file,  separators=(',', ':'))
+        # The index can be dumped by several processes at once,
+        # so each of them writes its own temporary file
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=self.FILE_NAME + '.', suffix='.tmp', dir=os.path.dirname(self._path))
+        try:
+            with open(fd, 'wb') as index_file:
+                index_file.write(self._index)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        try:
+            os.remove(self._legacy_path)
+        except FileNotFoundError:
+            pass
 
     def load(self):
-        with open(self._path, 'r') as index_file:
-            self._index = json.load(index_file,
-                object_hook=lambda d: {int(k): v for k, v in d.items()})
+        self._unload()
+
+        if self.is_legacy:
+            with open(self._legacy_path, 'r') as index_file:
+                legacy_index = json.load(index_file)
+            self._index = array(self._OFFSET_TYPE,
+                (legacy_index[str(i)] for i in range(len(legacy_index))))
+            return
+
+        with open(self._path, 'rb') as index_file:
+            if os.fstat(index_file.fileno()).st_size:
+                self._mapped_file = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._index = memoryview(self._mapped_file).cast(self._OFFSET_TYPE)
+            else:
+                # empty files can't be mapped
+                self._index = array(self._OFFSET_TYPE)
+
+    def _unload(self):
+        if self._mapped_file is not None:
+            self._index.release()
+            self._mapped_file.close()
+            self._mapped_file = None
+        self._index = array(self._OFFSET_TYPE)
+
+    def _make_writable(self):
+        if isinstance(self._index, memoryview):
+            index = array(self._OFFSET_TYPE, self._index)
+            self._unload()
+            self._index = index
 
     def remove(self):
-        os.remove(self._path)
+        self._unload()
+        for path in (self._path, self._legacy_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _read_offsets(manifest_file, position):
+        manifest_file.seek(position)
+        for line in iter(manifest_file.readline, b''):
+            if line.strip():
+                yield position
+            position += len(line)
 
     def create(self, manifest, *, skip):
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be created'
-        with open(manifest, 'r+') as manifest_file:
+        self._unload()
+        with open(manifest, 'rb') as manifest_file:
             while skip:
                 manifest_file.readline()
                 skip -= 1
-            image_number = 0
-            position = manifest_file.tell()
-            line = manifest_file.readline()
-            while line:
-                if line.strip():
-                    self._index[image_number] = position
-                    image_number += 1
-                    position = manifest_file.tell()
-                line = manifest_file.readline()
+            self._index.extend(self._read_offsets(manifest_file, manifest_file.tell()))
 
     def partial_update(self, manifest, number):
+        """
+        Updates the index for the manifest lines starting from the specified item,
+        which is required after the items have been rewritten or appended.
+        """
+
         assert os.path.exists(manifest), 'A manifest file not exists, index cannot be updated'
-        with open(manifest, 'r+') as manifest_file:
-            manifest_file.seek(self._index[number])
-            line = manifest_file.readline()
-            while line:
-                if line.strip():
-                    self._index[number] = manifest_file.tell()
-                    number += 1
-                line = manifest_file.readline()
+        assert 0 <= number <= len(self), 'Invalid index number: {}'.format(number)
+        self._make_writable()
+
+        with open(manifest, 'rb') as manifest_file:
+            if number < len(self):
+                position = self._index[number]
+            else:
+                # new items are appended after the last known item
+                manifest_file.seek(self._index[number - 1])
+                manifest_file.readline()
+                position = manifest_file.tell()
+
+            del self._index[number:]
+            self._index.extend(self._read_offsets(manifest_file, position))
 
     def __getitem__(self, number):
         if not 0 <= number < len(self):
@@ -339,12 +450,156 @@ class _Index:
 
         return self._index[number]
 
+    def __iter__(self):
+        return iter(self._index)
+
     def __len__(self):
         return len(self._index)
 
     def is_empty(self) -> bool:
         return not len(self)
 
+class _ImageColumns:
+    """
+    Stores the main properties of the image manifest items in the columnar form,
+    one NumPy array per property. The columns are memory-mapped on loading
+    and allow to filter and search the items without parsing the manifest lines.
+    The columns are bound to the manifest file state and must be recreated
+    when the manifest is changed.
+    """
+
+    DIR_NAME = 'columns'
+
+    _META_FILE_NAME = 'meta.json'
+
+    # the missing width and height values (e.g. for 3D manifests) are stored as -1
+    _MISSING_SIZE = -1
+
+    COLUMNS = ('name', 'extension', 'width', 'height', 'checksum')
+
+    def __init__(self, path):
+        assert path and os.path.isdir(path), 'No columns directory path'
+        self._path = os.path.join(path, self.DIR_NAME)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._full_names: Optional[np.ndarray] = None
+
+    @property
+    def path(self):
+        return self._path
+
+    @staticmethod
+    def _get_manifest_state(manifest) -> Dict[str, int]:
+        manifest_stat = os.stat(manifest)
+        return {'size': manifest_stat.st_size, 'mtime': manifest_stat.st_mtime_ns}
+
+    def is_actual(self, manifest) -> bool:
+        meta_path = os.path.join(self._path, self._META_FILE_NAME)
+        if not os.path.exists(meta_path):
+            return False
+
+        try:
+            with open(meta_path, 'r') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, JSONDecodeError):
+            return False
+
+        return meta.get('manifest') == self._get_manifest_state(manifest) and \
+            set(meta.get('columns', [])) == set(self.COLUMNS)
+
+    def create(self, manifest, items: Iterable[Dict]):
+        manifest_state = self._get_manifest_state(manifest)
+        values = {column: [] for column in self.COLUMNS}
+        for item in items:
+            values['name'].append(item.get('name', '').encode())
+            values['extension'].append(item.get('extension', '').encode())
+            values['width'].append(item.get('width', self._MISSING_SIZE))
+            values['height'].append(item.get('height', self._MISSING_SIZE))
+            values['checksum'].append((item.get('checksum') or '').encode())
+
+        self._unload()
+        self._columns = {
+            'name': np.array(values['name'], dtype=np.bytes_),
+            'extension': np.array(values['extension'], dtype=np.bytes_),
+            'width': np.array(values['width'], dtype=np.int32),
+            'height': np.array(values['height'], dtype=np.int32),
+            'checksum': np.array(values['checksum'], dtype=np.bytes_),
+        }
+
+    def dump(self, manifest):
+        # The columns can be dumped by several processes at once,
+        # so each of them writes its own temporary directory
+        parent_dir = os.path.dirname(self._path)
+        tmp_path = tempfile.mkdtemp(prefix=self.DIR_NAME + '.', suffix='.tmp', dir=parent_dir)
+        try:
+            for column, values in self._columns.items():
+                np.save(os.path.join(tmp_path, f'{column}.npy'), values)
+            with open(os.path.join(tmp_path, self._META_FILE_NAME), 'w') as meta_file:
+                json.dump({
+                    'manifest': self._get_manifest_state(manifest),
+                    'columns': list(self._columns),
+                }, meta_file)
+
+            if os.path.exists(self._path) and not self.is_actual(manifest):
+                # the outdated columns are moved away first, as a non-empty directory
+                # can't be replaced and can be removed by another process meanwhile
+                outdated_path = tempfile.mkdtemp(
+                    prefix=self.DIR_NAME + '.', suffix='.old', dir=parent_dir)
+                try:
+                    os.replace(self._path, outdated_path)
+                except FileNotFoundError:
+                    pass
+                shutil.rmtree(outdated_path, ignore_errors=True)
+
+            try:
+                os.rename(tmp_path, self._path)
+            except OSError as ex:
+                if ex.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                    raise
+                # the columns have been saved by another process
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def load(self):
+        self._unload()
+        self._columns = {
+            column: np.load(os.path.join(self._path, f'{column}.npy'), mmap_mode='r')
+            for column in self.COLUMNS
+        }
+
+    def _unload(self):
+        self._columns = {}
+        self._full_names = None
+
+    def remove(self):
+        self._unload()
+        if os.path.exists(self._path):
+            shutil.rmtree(self._path)
+
+    def is_loaded(self) -> bool:
+        return bool(self._columns)
+
+    def __getitem__(self, column) -> np.ndarray:
+        return self._columns[column]
+
+    @property
+    def full_names(self) -> np.ndarray:
+        """ UTF-8 encoded names of the items with extensions """
+        if self._full_names is None:
+            self._full_names = np.char.add(self._columns['name'], self._columns['extension'])
+        return self._full_names
+
+    def __len__(self):
+        return len(self._columns['name']) if self._columns else 0
+
+def _strip_bytes_prefix(values: np.ndarray, length: int) -> np.ndarray:
+    """ Removes the first bytes of the specified length from each item of a bytes array """
+    item_size = values.dtype.itemsize
+    if item_size <= length:
+        return np.zeros(len(values), dtype='S1')
+
+    stripped = values.view(np.uint8).reshape(-1, item_size)[:, length:]
+    return np.ascontiguousarray(stripped).view(f'S{item_size - length}').ravel()
+
 class _ManifestManager(ABC):
     BASE_INFORMATION = {
         'version' : 1,
@@ -387,16 +642,31 @@ class _ManifestManager(ABC):
                 self._json_item_is_valid(**parsed_properties)
                 return parsed_properties
 
+    def _parse_lines(self, numbers: Iterable[int]) -> Iterator['ImageProperties']:
+        """ Getting several lines from the manifest file, the file is opened once """
+        with open(self._manifest.path, 'r') as manifest_file:
+            for number in numbers:
+                manifest_file.seek(self._index[number])
+                parsed_properties = ImageProperties(json.loads(manifest_file.readline()))
+                self._json_item_is_valid(**parsed_properties)
+                yield parsed_properties
+
+    def get_items(self, numbers: Iterable[int]) -> Iterator['ImageProperties']:
+        """ Reads only the requested items from the manifest """
+        return self._parse_lines(numbers)
+
     def init_index(self):
-        if os.path.exists(self._index.path):
+        if self._index.exists():
             self._index.load()
+            if self._create_index and self._index.is_legacy:
+                self._index.dump()
         else:
             self._index.create(self._manifest.path, skip=self._manifest.get_header_lines_count())
             if self._create_index:
                 self._index.dump()
 
     def reset_index(self):
-        if self._create_index and os.path.exists(self._index.path):
+        if self._create_index and self._index.exists():
             self._index.remove()
 
     def set_index(self):
@@ -419,14 +689,7 @@ class _ManifestManager(ABC):
     def __iter__(self):
         self.set_index()
 
-        with open(self._manifest.path, 'r') as manifest_file:
-            manifest_file.seek(self._index[0])
-            for idx, line_start in enumerate(self._index):
-                manifest_file.seek(line_start)
-                line = manifest_file.readline()
-                item = ImageProperties(json.loads(line))
-                self._json_item_is_valid(**item)
-                yield (idx, item)
+        yield from enumerate(self._parse_lines(range(len(self._index))))
 
     @property
     def manifest(self):
@@ -442,7 +705,7 @@ class _ManifestManager(ABC):
 
     def __getitem__(self, item):
         if isinstance(item, slice):
-            return [self._parse_line(i) for i in range(item.start or 0, item.stop or len(self), item.step or 1)]
+            return list(self._parse_lines(range(item.start or 0, item.stop or len(self), item.step or 1)))
         return self._parse_line(item)
 
     @property
@@ -575,9 +838,11 @@ class ImageProperties(dict):
 class ImageManifestManager(_ManifestManager):
     _required_item_attributes = {'name', 'extension'}
 
-    def __init__(self, manifest_path, upload_dir=None, create_index=True):
+    def __init__(self, manifest_path, upload_dir=None, create_index=True, create_columns=False):
         super().__init__(manifest_path, create_index, upload_dir)
         setattr(self._manifest, 'TYPE', 'images')
+        self._columns = _ImageColumns(os.path.dirname(self._manifest.path))
+        self._create_columns = create_columns
 
     def link(self, **kwargs):
         ReaderClass = DatasetImagesReader if not kwargs.get('DIM_3D', None) else Dataset3DImagesReader
@@ -602,23 +867,75 @@ class ImageManifestManager(_ManifestManager):
             }, separators=(',', ':'))
             file.write(f"{json_line}\n")
 
-    def create(self, content=None, _tqdm=None):
-        """ Creating and saving a manifest file for the specialized dataset"""
+    def create(self, content=None, _tqdm=None, *, workers: Optional[int] = None):
+        """
+        Creating and saving a manifest file for the specialized dataset.
+        If the number of workers is specified, the linked images are processed in parallel.
+        """
+        if workers is not None and self._reader is not None:
+            self._reader.workers = workers
+
         with open(self._manifest.path, 'w') as manifest_file:
             self._write_base_information(manifest_file)
             obj = content if content else self._reader
             self._write_core_part(manifest_file, obj, _tqdm)
 
         self.set_index()
+        if self._create_columns:
+            self._init_columns()
 
     def partial_update(self, number, properties):
         pass
 
+    def _init_columns(self) -> Optional[_ImageColumns]:
+        """
+        Returns the columnar representation of the manifest items.
+        The existing columns are used, if they match the manifest. Otherwise,
+        the columns are created only if it is enabled for the manager, so that
+        they are not saved next to the manifests which are not supposed to have them
+        (e.g. task data). When there are no columns, None is returned
+        and the manifest lines are supposed to be read instead.
+        """
+
+        if self._columns.is_loaded() and self._columns.is_actual(self._manifest.path):
+            return self._columns
+
+        if self._columns.is_actual(self._manifest.path):
+            try:
+                self._columns.load()
+            except FileNotFoundError:
+                # the columns have been recreated by another process meanwhile
+                return None
+        elif self._create_columns:
+            with open(self._manifest.path, 'r') as manifest_file:
+                for _ in range(self._manifest.get_header_lines_count()):
+                    manifest_file.readline()
+                # blank lines are skipped, as the index does
+                items = (json.loads(line) for line in manifest_file if line.strip())
+                self._columns.create(self._manifest.path, items)
+            self._columns.dump(self._manifest.path)
+        else:
+            return None
+
+        return self._columns
+
+    def remove(self):
+        self._columns.remove()
+        super().remove()
+
     @property
     def data(self):
+        columns = self._init_columns()
+        if columns is not None:
+            return (full_name.decode() for full_name in columns.full_names)
+
         return (f"{image.full_name}" for _, image in self)
 
     def get_subset(self, subset_names):
+        columns = self._init_columns()
+        if columns is not None:
+            return self._get_subset_from_columns(columns, subset_names)
+
         index_list = []
         subset = []
         for _, image in self:
@@ -638,6 +955,38 @@ class ImageManifestManager(_ManifestManager):
                 subset.append(properties)
         return index_list, subset
 
+    def _get_subset_from_columns(self, columns: _ImageColumns, subset_names):
+        if not len(columns) or not len(subset_names):
+            return [], []
+
+        # the first occurrence of a name in the subset must be found, as list.index() does
+        requested_names = np.array([name.encode() for name in subset_names], dtype=np.bytes_)
+        requested_order = np.argsort(requested_names, kind='stable')
+        sorted_requested_names = requested_names[requested_order]
+
+        full_names = columns.full_names
+        positions = np.searchsorted(sorted_requested_names, full_names)
+        positions[positions == len(sorted_requested_names)] = 0
+        matched = sorted_requested_names[positions] == full_names
+
+        index_list = requested_order[positions[matched]].tolist()
+        self.init_index()
+
+        subset = []
+        for image in self.get_items(np.flatnonzero(matched).tolist()):
+            properties = {
+                'name': f"{image['name']}",
+                'extension': f"{image['extension']}",
+                'width': image['width'],
+                'height': image['height'],
+            }
+            for optional_field in {'meta', 'checksum'}:
+                value = image.get(optional_field)
+                if value:
+                    properties[optional_field] =  value
+            subset.append(properties)
+        return index_list, subset
+
     def emulate_hierarchical_structure(
         self,
         page_size: int,
@@ -674,6 +1023,32 @@ class ImageManifestManager(_ManifestManager):
         # get part of manifest content
         # generally we cannot rely to slice with manifest content because it may not be sorted.
         # And then this can lead to incorrect index calculation.
+        columns = self._init_columns()
+        if columns is not None:
+            directories, files_in_root = self._get_level_from_columns(
+                columns, manifest_prefix=manifest_prefix, search_prefix=search_prefix
+            )
+        else:
+            directories, files_in_root = self._get_level_from_lines(
+                manifest_prefix=manifest_prefix, search_prefix=search_prefix
+            )
+
+        level_in_hierarchical_structure = [{'name': d, 'type': 'DIR'} for d in sort(directories, SortingMethod.NATURAL)]
+        level_in_hierarchical_structure.extend([{'name': f, 'type': 'REG'} for f in sort(files_in_root, SortingMethod.NATURAL)])
+
+        level_in_hierarchical_structure = level_in_hierarchical_structure[start_index:]
+        if len(level_in_hierarchical_structure) > page_size:
+            level_in_hierarchical_structure = level_in_hierarchical_structure[:page_size]
+            next_start_index = start_index + page_size
+
+        return {
+            'content': level_in_hierarchical_structure,
+            'next': next_start_index,
+        }
+
+    def _get_level_from_lines(
+        self, *, manifest_prefix: Optional[str], search_prefix: str
+    ) -> Tuple[List[str], List[str]]:
         if manifest_prefix:
             content = [os.path.join(manifest_prefix, f[1].full_name) for f in self]
         else:
@@ -694,18 +1069,33 @@ class ImageManifestManager(_ManifestManager):
                 files_in_root.append(f)
 
         directories = list(set([d.split(os.path.sep)[0] for d in files_in_directories]))
-        level_in_hierarchical_structure = [{'name': d, 'type': 'DIR'} for d in sort(directories, SortingMethod.NATURAL)]
-        level_in_hierarchical_structure.extend([{'name': f, 'type': 'REG'} for f in sort(files_in_root, SortingMethod.NATURAL)])
+        return directories, files_in_root
 
-        level_in_hierarchical_structure = level_in_hierarchical_structure[start_index:]
-        if len(level_in_hierarchical_structure) > page_size:
-            level_in_hierarchical_structure = level_in_hierarchical_structure[:page_size]
-            next_start_index = start_index + page_size
+    @staticmethod
+    def _get_level_from_columns(
+        columns: _ImageColumns, *, manifest_prefix: Optional[str], search_prefix: str
+    ) -> Tuple[List[str], List[str]]:
+        content = columns.full_names
+        content = content[content != b'']
+        if manifest_prefix:
+            content = np.char.add(os.path.join(manifest_prefix, '').encode(), content)
 
-        return {
-            'content': level_in_hierarchical_structure,
-            'next': next_start_index,
-        }
+        if search_prefix:
+            content = content[np.char.startswith(content, search_prefix.encode())]
+            if os.path.sep in search_prefix:
+                last_slash = search_prefix.rindex(os.path.sep)
+                content = _strip_bytes_prefix(content, len(search_prefix[:last_slash + 1].encode()))
+
+        if not len(content):
+            return [], []
+
+        # each item is split into the first path component, the separator and the tail
+        parts = np.char.partition(content, os.path.sep.encode()).reshape(-1, 3)
+        is_file_in_root = parts[:, 1] == b''
+
+        directories = [d.decode() for d in np.unique(parts[~is_file_in_root, 0])]
+        files_in_root = [f.decode() for f in parts[is_file_in_root, 0]]
+        return directories, files_in_root
 
 class _BaseManifestValidator(ABC):
     def __init__(self, full_manifest_path):
@@ -24,6 +24,8 @@ def get_args():
         default=os.getcwd())
     parser.add_argument('--sorting', choices=[v[0] for v in SortingMethod.choices()],
         type=str, default=SortingMethod.LEXICOGRAPHICAL.value)
+    parser.add_argument('--workers', type=int, default=1,
+        help='Number of workers used to read images when the manifest is prepared for images')
     parser.add_argument('source', type=str, help='Source paths')
     return parser.parse_args()
 
@@ -72,7 +74,7 @@ def main():
             manifest = ImageManifestManager(manifest_path=manifest_directory)
             manifest.link(sources=sources, meta=meta, sorting_method=args.sorting,
                     use_image_hash=True, data_dir=data_dir)
-            manifest.create(_tqdm=tqdm)
+            manifest.create(_tqdm=tqdm, workers=args.workers)
         except Exception as ex:
             sys.exit(str(ex))
     else: # video